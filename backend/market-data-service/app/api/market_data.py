@@ -4,10 +4,11 @@ Endpoints ULTRA-SIMPLIFICADOS do Market Data Service.
 Removidos args, kwargs, validações complexas e middleware desnecessário.
 Foco na simplicidade e facilidade de uso.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from typing import List
 from core.config import settings
 from core.logging import get_logger
+from core.serialization import dumps_json, json_response
 from models.requests import BulkDataRequest, SearchRequest, StockDataRequest
 
 from models.responses import (
@@ -53,20 +54,36 @@ def list_available_stocks() -> List[SearchResultItem]:
     "/stocks/{symbol}/history",
     response_model=List[HistoricalDataPoint],
     summary="Obter histórico de dados de uma ação",
-    description="Retorna a série histórica de dados de uma ação específica.",
+    description=(
+        "Retorna a série histórica de dados de uma ação específica. Com format=columnar, "
+        'a resposta é {"index": [...], "open": [...], ..., "adj_close": [...]}, um array por coluna.'
+    ),
 )
-def get_stock_history(symbol: str, period: str = "1mo", interval: str = "1d") -> List[HistoricalDataPoint]:
+def get_stock_history(
+    symbol: str,
+    period: str = "1mo",
+    interval: str = "1d",
+    response_format: str = Query(
+        "records", alias="format", pattern="^(records|columnar)$",
+        description="records (lista de registros) ou columnar (um array por coluna, mais leve para gráficos)",
+    ),
+):
     """
     Endpoint para obter o histórico de dados de uma ação.
     :param symbol: Símbolo da ação (ex: PETR4.SA, AAPL)
     :param period: Período dos dados (ex: 1mo, 1y, etc)
     :param interval: Intervalo dos dados (ex: 1d, 1h, etc)
-    :return: Lista de pontos históricos de dados
+    :param response_format: records ou columnar
+    :return: Lista de pontos históricos de dados (ou dicionário colunar)
     """
     logger.info(f"Obtendo histórico para {symbol}, período {period}, intervalo {interval}")
-    return market_data_service.get_stock_history(
-        symbol, period, interval, client_id="simple-client"
+    history = market_data_service.get_stock_history(
+        symbol, period, interval, client_id="simple-client", response_format=response_format
     )
+    if response_format == "columnar":
+        # Resposta já serializada: os arrays não passam pela validação do response_model
+        return json_response(dumps_json(history))
+    return history
 
 
 @router.get(
@@ -1,68 +1,460 @@
+import asyncio
 import functools
-from typing import Callable
-from cachetools import TTLCache
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.executor import upstream_executor
 from core.logging import get_logger
+from core.serialization import dumps_json, json_response, loads_json
 
 logger = get_logger(__name__)
 
+_MISSING = object()
+
+# Quantidade de entradas mais antigas inspecionadas na evicção LFU aproximada
+_LFU_SAMPLE_SIZE = 8
+
+
+class _Entry:
+    """
+    Entrada de cache com expiração própria e contador de acessos.
+
+    ``expires_at`` marca o fim do período fresco e ``stale_until`` o fim da
+    janela em que o valor ainda pode ser servido enquanto é revalidado.
+    ``delta`` é o tempo (s) que a computação levou, usado na expiração antecipada.
+    """
+    __slots__ = ("value", "expires_at", "stale_until", "delta", "hits")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, delta: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.delta = delta
+        self.hits = 0
+
+
+class CacheNamespace:
+    """
+    Espaço de cache de uma única função decorada.
+
+    Cada namespace tem TTL e capacidade próprios, de forma que uma rajada de
+    chaves de histórico não expulsa as cotações e entradas de 24h realmente
+    vivem 24h. A expiração é por entrada, indexada por um heap de
+    ``(stale_until, seq, key)`` com remoção preguiçosa; a evicção por capacidade
+    segue a política LRU ou LFU (aproximada por amostragem das entradas mais
+    antigas, como no Redis).
+
+    Para evitar stampedes, o TTL de cada entrada recebe um jitter aleatório e,
+    perto da expiração, um hit pode pedir revalidação antecipada com
+    probabilidade crescente (algoritmo XFetch: ``now - delta * beta * ln(rand)``).
+    Dentro da janela ``stale_ttl`` o valor vencido continua sendo servido
+    enquanto a revalidação roda em segundo plano.
+
+    Attributes:
+        name: Nome do namespace (nome da função decorada)
+        ttl: Tempo de vida das entradas em segundos
+        maxsize: Número máximo de entradas
+        policy: Política de evicção ("lru" ou "lfu")
+        stale_ttl: Janela (s) em que valores vencidos ainda são servidos
+        jitter: Fração de variação aleatória aplicada ao TTL (0.1 = ±10%)
+        early_beta: Agressividade da expiração antecipada (0 desativa)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int,
+        policy: str = "lru",
+        stale_ttl: float = 0,
+        jitter: float = 0.1,
+        early_beta: float = 1.0,
+    ):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Política de cache inválida: '{policy}'. Use 'lru' ou 'lfu'.")
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.policy = policy
+        self.stale_ttl = stale_ttl
+        self.jitter = jitter
+        self.early_beta = early_beta
+
+        self.lock = threading.Lock()
+        # Computações em andamento por chave (single-flight)
+        self.inflight: Dict[tuple, Future] = {}
+        self.counters: Dict[str, int] = {
+            "hits": 0, "misses": 0, "executed": 0, "coalesced": 0,
+            "evictions": 0, "expirations": 0,
+            "stale_hits": 0, "refreshes": 0, "early_refreshes": 0, "refresh_errors": 0,
+        }
+
+        self._data: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._expiry: List[Tuple[float, int, tuple]] = []
+        self._seq = itertools.count()
+
+    # Os métodos abaixo assumem que ``self.lock`` já está adquirido.
+
+    def get(self, key: tuple, now: float) -> Tuple[Any, Optional[str]]:
+        """
+        Retorna o valor utilizável da chave e se ele precisa ser revalidado.
+
+        Returns:
+            Tupla (valor ou _MISSING, motivo da revalidação). O motivo é None
+            para valores frescos, "stale" para valores vencidos dentro da janela
+            de stale e "early" para a expiração antecipada probabilística.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING, None
+        if entry.stale_until <= now:
+            del self._data[key]
+            self.counters["expirations"] += 1
+            return _MISSING, None
+        entry.hits += 1
+        self._data.move_to_end(key)
+
+        if entry.expires_at <= now:
+            return entry.value, "stale"
+        if self.early_beta > 0 and entry.delta > 0:
+            # XFetch: quanto mais perto da expiração e mais cara a computação,
+            # maior a chance de um hit disparar a revalidação antecipada
+            gap = -entry.delta * self.early_beta * math.log(1.0 - random.random())
+            if now + gap >= entry.expires_at:
+                return entry.value, "early"
+        return entry.value, None
+
+    def set(self, key: tuple, value: Any, now: float, delta: float = 0.0, ttl: Optional[float] = None) -> None:
+        """Armazena o valor com expiração própria, respeitando a capacidade."""
+        self.purge_expired(now)
+        ttl = self.ttl if ttl is None else ttl
+        if self.jitter:
+            ttl *= 1 + random.uniform(-self.jitter, self.jitter)
+        expires_at = now + ttl
+        stale_until = expires_at + self.stale_ttl
+        self._data[key] = _Entry(value, expires_at, stale_until, delta)
+        self._data.move_to_end(key)
+        heapq.heappush(self._expiry, (stale_until, next(self._seq), key))
+
+        while len(self._data) > self.maxsize:
+            self._evict()
+
+        # Compacta o heap quando as referências obsoletas dominam
+        if len(self._expiry) > 2 * len(self._data) + 64:
+            self._expiry = [
+                (entry.stale_until, next(self._seq), k) for k, entry in self._data.items()
+            ]
+            heapq.heapify(self._expiry)
+
+    def purge_expired(self, now: float) -> None:
+        """Remove todas as entradas expiradas em O(k log n)."""
+        while self._expiry and self._expiry[0][0] <= now:
+            stale_until, _, key = heapq.heappop(self._expiry)
+            entry = self._data.get(key)
+            # Ignora referências obsoletas (entrada regravada com outra expiração)
+            if entry is not None and entry.stale_until == stale_until:
+                del self._data[key]
+                self.counters["expirations"] += 1
+
+    def _evict(self) -> None:
+        if self.policy == "lfu":
+            sample = itertools.islice(self._data.items(), _LFU_SAMPLE_SIZE)
+            victim = min(sample, key=lambda item: item[1].hits)[0]
+            del self._data[victim]
+        else:
+            self._data.popitem(last=False)
+        self.counters["evictions"] += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._expiry.clear()
+
+
 class CacheManager:
     """
-    Gerencia uma instância de cache TTL para a aplicação.
+    Gerencia os caches das funções pesadas da aplicação.
     O cache armazena os resultados de funções pesadas (como chamadas à API yfinance)
     por um tempo determinado para melhorar a performance e evitar requisições repetidas.
+
+    Cada função decorada ganha seu próprio namespace, com TTL por entrada e
+    capacidade/política de evicção independentes.
+
+    Misses simultâneos para a mesma chave são coalescidos (single-flight): apenas
+    uma chamada ao Yahoo é executada e todos os chamadores aguardam o mesmo resultado.
     """
-    def __init__(self, maxsize: int = 512, default_ttl: int = 300):
+    def __init__(self, maxsize: int = 512, default_ttl: int = 300, clock: Callable[[], float] = time.monotonic):
         """
         Inicializa o CacheManager.
-        
+
         Args:
-            maxsize (int): O número máximo de itens a serem mantidos no cache.
+            maxsize (int): Capacidade padrão de cada namespace (número de itens).
             default_ttl (int): O tempo de vida padrão (em segundos) para um item no cache.
                                (300 segundos = 5 minutos)
+            clock (Callable): Relógio monotônico usado nas expirações (injetável nos testes).
         """
-        self.cache = TTLCache(maxsize=maxsize, ttl=default_ttl)
-        logger.info(f"CacheManager inicializado com maxsize={maxsize} e ttl={default_ttl}s.")
+        self.default_maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        logger.info(f"CacheManager inicializado com maxsize={maxsize} e ttl={default_ttl}s por namespace.")
 
-    def cached(self, ttl: int = None) -> Callable:
+    def namespace(self, name: str, ttl: int = None, maxsize: int = None, policy: str = "lru", **options) -> CacheNamespace:
+        """
+        Obtém (ou cria) o namespace de cache com o nome informado.
+
+        Args:
+            name (str): Nome do namespace.
+            ttl (int, optional): TTL das entradas. Se None, usa o TTL padrão.
+            maxsize (int, optional): Capacidade. Se None, usa a capacidade padrão.
+            policy (str): Política de evicção, "lru" ou "lfu".
+            **options: stale_ttl, jitter e early_beta (ver CacheNamespace).
+        """
+        ns = self._namespaces.get(name)
+        if ns is None:
+            ns = CacheNamespace(
+                name,
+                ttl=ttl if ttl is not None else self.default_ttl,
+                maxsize=maxsize if maxsize is not None else self.default_maxsize,
+                policy=policy,
+                **options,
+            )
+            self._namespaces[name] = ns
+        return ns
+
+    def cached(
+        self,
+        ttl: int = None,
+        maxsize: int = None,
+        policy: str = "lru",
+        group: str = "default",
+        stale_ttl: int = 0,
+        jitter: float = 0.1,
+        early_beta: float = 1.0,
+        serialize: bool = False,
+    ) -> Callable:
         """
         Decorador para aplicar cache a uma função.
-        Permite sobrescrever o TTL padrão para funções específicas.
+        Permite sobrescrever o TTL e a capacidade padrão para funções específicas.
+
+        A função decorada continua síncrona (para chamadores em threads) e ganha
+        o atributo ``aio``, uma corrotina que responde cache hits direto no event
+        loop e executa misses no executor upstream do grupo informado.
+
+        Com ``stale_ttl`` > 0 a função passa a usar stale-while-revalidate: após o
+        TTL, o valor antigo continua sendo servido por até ``stale_ttl`` segundos
+        enquanto uma revalidação roda em segundo plano no executor upstream.
+
+        Com ``serialize=True`` o resultado é guardado como bytes JSON imutáveis.
+        Cada leitura via chamada direta ou ``aio`` recebe uma cópia decodificada
+        independente (ninguém altera o valor em cache), e ``response`` devolve os
+        bytes como ``Response`` sem nenhuma re-serialização.
 
         Args:
             ttl (int, optional): Tempo de vida específico para esta função (em segundos).
                                  Se None, usa o TTL padrão do cache.
+            maxsize (int, optional): Número máximo de entradas desta função.
+                                     Se None, usa a capacidade padrão.
+            policy (str): Política de evicção do namespace, "lru" ou "lfu".
+            group (str): Grupo do executor upstream usado pelas chamadas assíncronas
+                         e pelas revalidações em segundo plano.
+            stale_ttl (int): Janela (s) em que o valor vencido ainda é servido.
+            jitter (float): Variação aleatória do TTL por entrada (0.1 = ±10%).
+            early_beta (float): Agressividade da expiração antecipada (0 desativa).
+            serialize (bool): Armazena o resultado como bytes JSON pré-codificados.
         """
         def decorator(func: Callable):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                # Cria uma chave de cache baseada no nome da função e seus argumentos
+            ns = self.namespace(
+                func.__name__, ttl=ttl, maxsize=maxsize, policy=policy,
+                stale_ttl=stale_ttl, jitter=jitter, early_beta=early_beta,
+            )
+            counters = ns.counters
+            encode = dumps_json if serialize else None
+
+            def decode(value):
+                return loads_json(value) if serialize else value
+
+            def make_key(args, kwargs):
+                # Cria uma chave de cache baseada nos argumentos da função
                 # Converte listas em tuplas para serem "hasheáveis"
                 args_for_key = tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args)
-                key_args = (args_for_key, tuple(sorted(kwargs.items())))
-                cache_key = (func.__name__,) + key_args
-
-                # Verifica se o resultado já está no cache
-                if cache_key in self.cache:
-                    logger.debug(f"Cache HIT para a chave: {cache_key}")
-                    return self.cache[cache_key]
-
-                logger.debug(f"Cache MISS para a chave: {cache_key}")
-                
-                # Se não estiver, executa a função
-                result = func(*args, **kwargs)
-
-                # Armazena o resultado no cache com o TTL correto
-                # O TTLCache lida com o TTL na inserção se o TTL do cache geral for usado
-                # Para TTLs customizados, teríamos que gerenciar caches separados.
-                # A implementação padrão do TTLCache usa um único TTL.
-                # Para simplificar, vamos manter o TTL padrão, mas o design está aqui.
-                # Nota: A biblioteca cachetools não suporta TTL por item nativamente.
-                # O TTL é do cache. Vamos usar o TTL padrão para todos.
-                self.cache[cache_key] = result
-                
+                return (args_for_key, tuple(sorted(kwargs.items())))
+
+            def lookup(cache_key, args, kwargs):
+                """
+                Retorna o valor em cache ou _MISSING, contabilizando o acesso.
+                Agenda a revalidação em segundo plano quando o valor está vencido
+                (dentro da janela de stale) ou foi sorteado para expiração antecipada.
+                """
+                with ns.lock:
+                    value, refresh = ns.get(cache_key, self.clock())
+                    counters["hits" if value is not _MISSING else "misses"] += 1
+                    if refresh == "stale":
+                        counters["stale_hits"] += 1
+                if value is not _MISSING:
+                    logger.debug(f"Cache HIT em {ns.name} para a chave: {cache_key}")
+                    if refresh:
+                        revalidate(cache_key, args, kwargs, refresh)
+                return value
+
+            def revalidate(cache_key, args, kwargs, reason):
+                """Dispara uma única revalidação em segundo plano para a chave."""
+                with ns.lock:
+                    if cache_key in ns.inflight:
+                        return
+                    flight = Future()
+                    ns.inflight[cache_key] = flight
+                    counters["refreshes" if reason == "stale" else "early_refreshes"] += 1
+                logger.debug(f"Revalidando ({reason}) em {ns.name} a chave: {cache_key}")
+
+                def background():
+                    try:
+                        compute(cache_key, flight, args, kwargs)
+                    except Exception as e:
+                        # Mantém o valor antigo; a próxima leitura tenta de novo
+                        with ns.lock:
+                            counters["refresh_errors"] += 1
+                        logger.warning(f"Falha ao revalidar {ns.name} {cache_key}: {str(e)}")
+
+                try:
+                    upstream_executor.submit(group, background)
+                except Exception as e:
+                    with ns.lock:
+                        ns.inflight.pop(cache_key, None)
+                        counters["refresh_errors"] += 1
+                    flight.set_exception(e)
+                    logger.warning(f"Revalidação de {ns.name} não agendada: {str(e)}")
+
+            def join_or_lead(cache_key):
+                """
+                Entra na computação em andamento para a chave ou se torna o líder dela.
+
+                Returns:
+                    Tupla (future, is_leader). Se o valor tiver chegado ao cache nesse
+                    meio tempo, retorna um future já resolvido.
+                """
+                with ns.lock:
+                    value, _ = ns.get(cache_key, self.clock())
+                    if value is not _MISSING:
+                        done = Future()
+                        done.set_result(value)
+                        return done, False
+                    flight = ns.inflight.get(cache_key)
+                    if flight is not None:
+                        counters["coalesced"] += 1
+                        logger.debug(f"Cache MISS coalescido em {ns.name} para a chave: {cache_key}")
+                        return flight, False
+                    flight = Future()
+                    ns.inflight[cache_key] = flight
+                    counters["executed"] += 1
+                logger.debug(f"Cache MISS em {ns.name} para a chave: {cache_key}")
+                return flight, True
+
+            def compute(cache_key, flight, args, kwargs):
+                """Executa a função (líder), publica o resultado e libera os aguardando."""
+                started_at = self.clock()
+                try:
+                    result = func(*args, **kwargs)
+                    if encode is not None:
+                        result = encode(result)
+                except BaseException as e:
+                    with ns.lock:
+                        ns.inflight.pop(cache_key, None)
+                    flight.set_exception(e)
+                    raise
+                now = self.clock()
+                with ns.lock:
+                    ns.set(cache_key, result, now, delta=now - started_at)
+                    ns.inflight.pop(cache_key, None)
+                flight.set_result(result)
                 return result
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                cache_key = make_key(args, kwargs)
+                value = lookup(cache_key, args, kwargs)
+                if value is _MISSING:
+                    flight, is_leader = join_or_lead(cache_key)
+                    if is_leader:
+                        value = compute(cache_key, flight, args, kwargs)
+                    else:
+                        value = flight.result()
+                return decode(value)
+
+            async def fetch(args, kwargs):
+                """Obtém o valor armazenado (objeto ou bytes JSON) sem travar o event loop."""
+                cache_key = make_key(args, kwargs)
+                value = lookup(cache_key, args, kwargs)
+                if value is not _MISSING:
+                    return value
+
+                flight, is_leader = join_or_lead(cache_key)
+                if is_leader:
+                    try:
+                        upstream_executor.submit(group, compute, cache_key, flight, args, kwargs)
+                    except BaseException as e:
+                        with ns.lock:
+                            ns.inflight.pop(cache_key, None)
+                        flight.set_exception(e)
+                        raise
+                # shield: o cancelamento de um chamador não cancela o future compartilhado
+                return await asyncio.shield(asyncio.wrap_future(flight))
+
+            async def aio(*args, **kwargs):
+                return decode(await fetch(args, kwargs))
+
+            async def response(*args, **kwargs):
+                """Retorna o resultado como Response JSON (sem re-serializar se ``serialize``)."""
+                value = await fetch(args, kwargs)
+                return json_response(value if serialize else dumps_json(value))
+
+            wrapper.aio = aio
+            wrapper.response = response
+            wrapper.cache_namespace = ns
             return wrapper
         return decorator
 
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna os contadores do cache por namespace (função decorada).
+
+        ``executed`` conta as chamadas reais ao upstream e ``coalesced`` os misses
+        que apenas aguardaram uma computação já em andamento.
+        """
+        functions = {}
+        for name, ns in list(self._namespaces.items()):
+            with ns.lock:
+                ns.purge_expired(self.clock())
+                functions[name] = {
+                    **ns.counters,
+                    "size": len(ns),
+                    "maxsize": ns.maxsize,
+                    "ttl": ns.ttl,
+                    "policy": ns.policy,
+                    "stale_ttl": ns.stale_ttl,
+                    "inflight": len(ns.inflight),
+                }
+        totals = {
+            metric: sum(f[metric] for f in functions.values())
+            for metric in ("hits", "misses", "executed", "coalesced", "evictions",
+                           "expirations", "stale_hits", "refreshes", "early_refreshes",
+                           "refresh_errors", "size", "inflight")
+        }
+        return {"totals": totals, "functions": functions}
+
+    def clear(self) -> None:
+        """Remove todas as entradas de todos os namespaces."""
+        for ns in list(self._namespaces.values()):
+            with ns.lock:
+                ns.clear()
+
 # Instância única (Singleton) que será importada em outros módulos
-cache_manager = CacheManager(maxsize=1024, default_ttl=300)
\ No newline at end of file
+cache_manager = CacheManager(maxsize=256, default_ttl=300)
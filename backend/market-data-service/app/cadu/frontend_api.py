@@ -4,7 +4,14 @@ from datetime import datetime
 
 # Importa as funções de lógica, não o yfinance diretamente
 from app.cadu import yfinance_logic as logic
+from core.config import settings
+from core.executor import upstream_executor
 from core.logging import get_logger
+from core.serialization import dumps_json, json_response
+from services.quote_batch import quote_batch_engine
+from services.screener_store import SORT_FIELDS, screener_store
+from services.ticker_universe import ticker_universe
+from services.translation import translation_service
 
 # Se você mover os modelos Pydantic para um arquivo separado (ex: models.py),
 # importe-os daqui. Por enquanto, eles podem ser omitidos desta camada.
@@ -14,6 +21,9 @@ logger = get_logger(__name__)
 # O router define o prefixo e as tags para agrupar os endpoints na documentação do Swagger/OpenAPI
 router = APIRouter( tags=["API YFinance Personalizada para o FrontEnd"])
 
+# Limite de tickers do /multi-history (o histórico é baixado em lote)
+MAX_MULTI_HISTORY_SYMBOLS = 20
+
 
 def handle_logic_errors(e: Exception, symbol: str = None):
     """Função auxiliar para tratar exceções da camada de lógica de forma consistente."""
@@ -33,6 +43,20 @@ def handle_logic_errors(e: Exception, symbol: str = None):
         raise HTTPException(status_code=500, detail="Ocorreu um erro interno inesperado no servidor.")
 
 
+async def translate_fields(records, fields, group: str):
+    """
+    Traduz campos de texto das respostas da lógica (o cache da lógica guarda o texto original).
+
+    Com TRANSLATION_ASYNC apenas o cache de traduções é consultado: textos ainda
+    não traduzidos seguem no original e são traduzidos em segundo plano. Caso
+    contrário a tradução é aguardada (até TRANSLATION_TIMEOUT_SECONDS). Nos dois
+    casos a consulta ao cache (SQLite) roda no grupo do executor da rota.
+    """
+    return await upstream_executor.run(
+        group, translation_service.translate_fields, records, fields, wait=not settings.TRANSLATION_ASYNC
+    )
+
+
 # ==================== ENDPOINTS ====================
 
 
@@ -50,16 +74,57 @@ async def get_multiple_tickers_info(
     ```
     
     Retorna informações básicas como preço, volume, market cap, etc. para cada ticker.
+    As cotações são buscadas em lote (como em /quotes); setor, beta, ROE e
+    website vêm de um cache de perfis e ficam vazios até a primeira busca terminar.
     """
-    symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(',') if s.strip()))
     if not symbol_list:
         raise HTTPException(status_code=400, detail="Nenhum símbolo válido fornecido.")
-    if len(symbol_list) > 5:
-        raise HTTPException(status_code=400, detail="Número máximo de 5 tickers permitido por requisição.")
+    if len(symbol_list) > settings.QUOTE_BATCH_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Número máximo de {settings.QUOTE_BATCH_MAX_SYMBOLS} tickers permitido por requisição.",
+        )
 
     try:
-        return logic.get_multiple_tickers_info_logic(symbol_list)
+        result = await logic.get_multiple_tickers_info_logic.aio(symbol_list)
+        # Perfis mesclados depois do cache de cotações, que não congela campos ainda vazios
+        return json_response(dumps_json(
+            await upstream_executor.run("quote", logic.merge_ticker_profiles, result)
+        ))
+
+    except Exception as e:
+        handle_logic_errors(e)
+
+@router.get("/quotes", summary="Obter cotações de muitos tickers em lote")
+async def get_quotes(
+    symbols: str = Query(..., description="Símbolos dos tickers separados por vírgula (ex: AAPL,MSFT,PETR4.SA)")
+):
+    """
+    Obtém cotações leves (preço, variação, volume, market cap, P/L, etc.) para
+    até centenas de tickers em uma única requisição.
+
+    Exemplo de uso:
+    ```
+    GET /api/v1/market-data/quotes?symbols=PETR4.SA,VALE3.SA,ITUB4.SA,AAPL
+    ```
 
+    Diferente do /multi-info, não inclui setor, beta, ROE e website. As cotações
+    vêm do endpoint multi-símbolo do Yahoo e ficam em cache por símbolo.
+    Símbolos que falharem aparecem com success=false sem afetar os demais.
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(',') if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="Nenhum símbolo válido fornecido.")
+    if len(symbol_list) > settings.QUOTE_BATCH_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Número máximo de {settings.QUOTE_BATCH_MAX_SYMBOLS} tickers permitido por requisição.",
+        )
+
+    try:
+        quotes = await upstream_executor.run("quote", quote_batch_engine.get_quotes, symbol_list)
+        return json_response(dumps_json(quotes))
     except Exception as e:
         handle_logic_errors(e)
 
@@ -72,18 +137,29 @@ async def get_multiple_historical_data(
     end: Optional[str] = Query(None, description="Data fim (YYYY-MM-DD)"),
     prepost: bool = Query(False, description="Incluir pre/post market"),
     auto_adjust: bool = Query(True, description="Ajustar dividendos/splits"),
+    response_format: str = Query(
+        "records", alias="format", pattern="^(records|columnar)$",
+        description="records (lista de registros) ou columnar (um array por coluna, mais leve para gráficos)",
+    ),
 ):
     """
     Obtém dados históricos de preços para múltiplos tickers simultaneamente.
+
+    Os tickers são baixados em lote (uma chamada ao Yahoo por bloco de tickers).
     """
-    symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(',') if s.strip()))
     if not symbol_list:
         raise HTTPException(status_code=400, detail="Nenhum símbolo válido fornecido.")
-    if len(symbol_list) > 5:
-        raise HTTPException(status_code=400, detail="Número máximo de 5 tickers permitido por requisição.")
+    if len(symbol_list) > MAX_MULTI_HISTORY_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Número máximo de {MAX_MULTI_HISTORY_SYMBOLS} tickers permitido por requisição.",
+        )
 
     try:
-        return logic.get_multiple_historical_data_logic(symbol_list, period, interval, start, end, prepost, auto_adjust)
+        return await logic.get_multiple_historical_data_logic.response(
+            symbol_list, period, interval, start, end, prepost, auto_adjust, response_format=response_format
+        )
         
     except Exception as e:
         handle_logic_errors(e)
@@ -97,14 +173,23 @@ async def get_historical_data(
     end: Optional[str] = Query(None, description="Data fim (YYYY-MM-DD)"),
     prepost: bool = Query(False, description="Incluir pre/post market"),
     auto_adjust: bool = Query(True, description="Ajustar dividendos/splits"),
+    response_format: str = Query(
+        "records", alias="format", pattern="^(records|columnar)$",
+        description="records (lista de registros) ou columnar (um array por coluna, mais leve para gráficos)",
+    ),
 ):
     """
     Obtém dados históricos de preços para um ticker.
     
     Retorna: Open, High, Low, Close, Volume, Dividends, Stock Splits
+
+    Com format=columnar a resposta é {"index": [...], "open": [...], "high": [...], ...},
+    sem repetir os nomes das colunas em cada barra.
     """
     try:
-        return logic.get_historical_data_logic(symbol, period, interval, start, end, prepost, auto_adjust)
+        return await logic.get_historical_data_logic.response(
+            symbol, period, interval, start, end, prepost, auto_adjust, response_format=response_format
+        )
     except Exception as e:
         handle_logic_errors(e, symbol)
 
@@ -118,7 +203,7 @@ async def get_ticker_fulldata (symbol: str = Path(..., description="Símbolo do
 
     """
     try:
-        return logic.get_ticker_fulldata_logic(symbol)
+        return await logic.get_ticker_fulldata_logic.response(symbol)
     except Exception as e:
         handle_logic_errors(e, symbol)
 
@@ -130,7 +215,9 @@ async def get_ticker_info(symbol: str = Path(..., description="Símbolo do ticke
     Obtém informações principais.
     """
     try:
-        return logic.get_ticker_info_logic(symbol)
+        info = await logic.get_ticker_info_logic.aio(symbol)
+        info = await translate_fields(info, ("business_summary", "industry"), group="quote")
+        return json_response(dumps_json(info))
     except Exception as e:
         handle_logic_errors(e, symbol)
 
@@ -155,10 +242,23 @@ async def search_tickers(
     Busca por tickers, empresas, setores ou países no Yahoo Finance.
     """
     try:
-        return logic.search_tickers_logic(q, limit)
+        return await logic.search_tickers_logic.aio(q, limit)
     except Exception as e:
         handle_logic_errors(e)
 
+@router.get("/autocomplete", summary="Autocomplete de tickers da B3")
+async def autocomplete_tickers(
+    q: str = Query(..., description="Início do símbolo ou do nome", min_length=1),
+    limit: int = Query(8, ge=1, le=50, description="Número máximo de sugestões (máx: 50)")
+):
+    """
+    Sugestões de tickers por prefixo do símbolo ou do nome, trecho e erros de digitação.
+
+    Usa só o índice em memória do universo de tickers (sem chamadas ao Yahoo).
+    """
+    results = ticker_universe.snapshot().index.search(q, limit)
+    return {"query": q, "count": len(results), "results": results}
+
 # ==================== ENDPOINT DE EXPERIMENTAL DE LOOKUP ====================
 
 @router.get("/lookup",
@@ -191,8 +291,8 @@ async def lookup_instruments(
     """
     try:
         # Chama a função de lógica, passando os parâmetros da requisição
-        results = logic.lookup_instruments_logic(
-            query=query.strip(), 
+        results = await logic.lookup_instruments_logic.aio(
+            query=query.strip(),
             instrument_type=type, 
             count=count
         )
@@ -205,7 +305,7 @@ async def lookup_instruments(
 async def get_dividends(symbol: str = Path(..., description="Símbolo do ticker")):
     """Obtém histórico de dividendos pagos."""
     try:
-        return logic.get_dividends_logic(symbol)
+        return await logic.get_dividends_logic.response(symbol)
     except Exception as e:
         handle_logic_errors(e, symbol)
 
@@ -215,7 +315,7 @@ async def get_dividends(symbol: str = Path(..., description="Símbolo do ticker"
 async def get_recommendations(symbol: str = Path(..., description="Símbolo do ticker")):
     """Obtém recomendações detalhadas de analistas."""
     try:
-        return logic.get_recommendations_logic(symbol)
+        return await logic.get_recommendations_logic.aio(symbol)
     except Exception as e:
         handle_logic_errors(e, symbol)
 
@@ -226,7 +326,7 @@ async def get_recommendations(symbol: str = Path(..., description="Símbolo do t
 async def get_calendar(symbol: str = Path(..., description="Símbolo do ticker")):
     """Obtém calendário de eventos corporativos."""
     try:
-        return logic.get_calendar_logic(symbol)
+        return await logic.get_calendar_logic.aio(symbol)
     except Exception as e:
         handle_logic_errors(e, symbol)
 
@@ -237,7 +337,8 @@ async def get_news(symbol: str = Path(..., description="Símbolo do ticker"),
                    num: int = Query(5, ge=1, le=20, description="Contagem de noticias")):
     """Obtém notícias relacionadas ao ticker."""
     try:
-        return logic.get_news_logic(symbol, num)
+        news = await logic.get_news_logic.aio(symbol, num)
+        return await translate_fields(news, ("title", "summary"), group="fundamentals")
     except Exception as e:
         handle_logic_errors(e, symbol)
 
@@ -291,8 +392,22 @@ async def obter_trending(
     """
     Obtém lista de ações baseada na categoria de screening selecionada.
     """
+    # Validado aqui: o ValueError da lógica viraria 404 em handle_logic_errors
+    if (sort_field or "").strip().lower() not in SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campo de ordenação '{sort_field}' não suportado. Use: {', '.join(sorted(SORT_FIELDS))}",
+        )
     try:
-        return logic.get_trending_logic(categoria, setor, limit, offset, sort_field, sort_asc)
+        if screener_store.ready(categoria):
+            # Resultado completo já em memória: filtro, ordenação e página são locais
+            result = logic.get_trending_logic(categoria, setor, limit, offset, sort_field, sort_asc)
+        else:
+            # Primeira consulta da categoria: executa o screener fora do event loop
+            result = await upstream_executor.run(
+                "screener", logic.get_trending_logic, categoria, setor, limit, offset, sort_field, sort_asc
+            )
+        return json_response(dumps_json(result))
     except Exception as e:
         handle_logic_errors(e)
 
@@ -319,7 +434,7 @@ async def get_market_overview(
     Obtém visão geral do mercado para uma categoria específica.
     """
     try:
-        return logic.get_market_overview_logic(category.lower())
+        return await logic.get_market_overview_logic.response(category.lower())
     except Exception as e:
         handle_logic_errors(e)
         
@@ -340,16 +455,19 @@ async def get_market_overview(
 
     **Exemplo de uso:**""")
 async def get_period_performance(
-    symbols: str = Query(..., description="Lista de símbolos separados por vírgula (máx 5). Ex: PETR4.SA,VALE3.SA,^BVSP")
+    symbols: str = Query(..., description="Lista de símbolos separados por vírgula (máx 50). Ex: PETR4.SA,VALE3.SA,^BVSP")
 ):
-    symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(',') if s.strip()))
     if not symbol_list:
         raise HTTPException(status_code=400, detail="Nenhum símbolo válido fornecido.")
-    if len(symbol_list) > 5:
-        raise HTTPException(status_code=400, detail="Número máximo de 5 tickers permitido por requisição.")
+    if len(symbol_list) > settings.PERIOD_PERFORMANCE_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Número máximo de {settings.PERIOD_PERFORMANCE_MAX_SYMBOLS} tickers permitido por requisição.",
+        )
 
     try:
-        performance_data = logic.get_period_performance_logic(symbol_list)
+        performance_data = await logic.get_period_performance_logic.aio(symbol_list)
         return {
             "timestamp": datetime.now().isoformat(),
             "symbols_count": len(symbol_list),
@@ -364,7 +482,7 @@ async def get_period_performance(
 async def yfinance_health_check():
     """Health check específico para os endpoints do yfinance."""
     try:
-        return logic.yfinance_health_check_logic()
+        return await upstream_executor.run("quote", logic.yfinance_health_check_logic)
     except Exception as e:
         handle_logic_errors(e)
         
@@ -4,11 +4,17 @@ import yfinance as yf
 from yfinance import EquityQuery
 import pandas as pd
 import numpy as np
-from deep_translator import GoogleTranslator
 from concurrent.futures import ThreadPoolExecutor
 
 from .caching import cache_manager  # Importa o gerenciador de cache
 from core.logging import get_logger
+from core.serialization import arrays_to_columnar, frame_to_columnar
+from services.company_websites import company_websites, logo_url
+from services.hot_series import hot_series_tier
+from services.ohlcv_store import arrays_to_frame, ohlcv_store
+from services.performance import period_performance_calculator
+from services.quote_batch import quote_batch_engine
+from services.screener_store import screener_store
 
 logger = get_logger(__name__)
 
@@ -83,6 +89,9 @@ BR_PREDEFINED_SCREENER_QUERIES = {
     ])
 }
 
+# Os screeners predefinidos são executados por inteiro em segundo plano e paginados localmente
+screener_store.register(BR_PREDEFINED_SCREENER_QUERIES)
+
 MARKET_OVERVIEW_SYMBOLS = {
     "all": [
         "^BVSP", "SMLL.SA", "IFIX.SA", "WEGE3.SA", "PETR4.SA", "VALE3.SA", "ITUB4.SA",
@@ -98,6 +107,9 @@ MARKET_OVERVIEW_SYMBOLS = {
     "moedas": ["USDBRL=X", "EURBRL=X", "GBPBRL=X", "JPYBRL=X", "AUDBRL=X"]
 }
 
+# Os símbolos do panorama são consultados o tempo todo: mantê-los na camada quente
+hot_series_tier.register(MARKET_OVERVIEW_SYMBOLS["all"])
+
 SYMBOL_NAMES = {
     "^BVSP": "Ibovespa", "SMLL.SA": "Small Cap", "IFIX.SA": "IND FDO IMOB", "WEGE3.SA": "WEG ON",
     "PETR4.SA": "Petrobras PN", "VALE3.SA": "Vale ON", "ITUB4.SA": "Itaú PN", "^GSPC": "S&P 500",
@@ -144,7 +156,8 @@ def convert_to_serializable(data):
     """Converte dados pandas/numpy para formato serializável (lógica original)."""
     if isinstance(data, pd.DataFrame):
         if isinstance(data.index, pd.DatetimeIndex):
-            data.index = data.index.strftime('%Y-%m-%d %H:%M:%S')
+            # set_axis gera um novo DataFrame: o objeto recebido não é alterado
+            data = data.set_axis(data.index.strftime('%Y-%m-%d %H:%M:%S'), axis=0)
         return data.reset_index().fillna(0).to_dict(orient='records')
     elif isinstance(data, pd.Series):
         return data.fillna(0).to_dict()
@@ -166,73 +179,127 @@ def convert_to_serializable(data):
 
 # ==================== LÓGICA DOS ENDPOINTS ====================
 
-@cache_manager.cached(ttl=600)  # Cache de 10 minutos
+@cache_manager.cached(ttl=60, maxsize=256, group="quote", stale_ttl=60, serialize=True)  # Cache de 1 minuto, como as cotações (+1 min servindo valor antigo)
 def get_multiple_tickers_info_logic(symbol_list: List[str]):
-    """Lógica para obter informações básicas para múltiplos tickers."""
+    """
+    Lógica para obter informações básicas para múltiplos tickers.
+
+    Preço, volume e demais campos de cotação vêm das cotações em lote (uma
+    chamada por bloco de símbolos). Setor, beta, ROE e website ficam vazios
+    aqui e são preenchidos por ``merge_ticker_profiles`` depois do cache, para
+    que perfis buscados em segundo plano apareçam sem esperar o TTL.
+    """
+    quotes = quote_batch_engine.get_quotes(symbol_list)
     result = {}
     for symbol in symbol_list:
-        try:
-            def get_info(ticker):
-                info = ticker.info
-                logo = f"https://t1.gstatic.com/faviconV2?client=SOCIAL&type=FAVICON&fallback_opts=TYPE,SIZE,URL&size=128&url={info.get('website')}" if info.get("website") else None
-                return {
-                    "symbol": symbol,
-                    "name": str(info.get("shortName", "") or info.get("longName", "")),
-                    "sector": str(info.get("sector", "")),
-                    "price": float(info.get("regularMarketPrice", 0) or 0),
-                    "change": float(info.get("regularMarketChangePercent", 0) or 0),
-                    "volume": int(info.get("regularMarketVolume", 0) or 0),
-                    "market_cap": float(info.get("marketCap", 0) or 0),
-                    "pe_ratio": float(info.get("trailingPE", 0) or 0),
-                    "dividend_yield": float(info.get("dividendYield", 0) or 0),
-                    "beta": float(info.get("beta", 0) or 0),
-                    "fiftyTwoWeekChangePercent": float(info.get("fiftyTwoWeekChangePercent", 0)or 0),
-                    "avg_volume_3m": int(info.get("averageDailyVolume3Month", 0) or 0),
-                    "returnOnEquity": float(info.get("returnOnEquity", 0) or 0),
-                    "book_value": float(info.get("bookValue", 0) or 0),
-                    "exchange": str(info.get("exchange", "")),
-                    "fullExchangeName": str(info.get("fullExchangeName", "")),
-                    "currency": str(info.get("currency", "")),
-                    "website": str(info.get("website", "")),
-                    "logo": logo
-                }
-            ticker_info = safe_ticker_operation(symbol, get_info)
-            result[symbol] = {"success": True, "data": ticker_info}
-        except Exception as e:
-            logger.error(f"Erro ao obter dados para {symbol} em multi-info: {str(e)}")
-            result[symbol] = {"success": False, "error": str(e), "data": None}
+        quote = quotes.get(symbol)
+        if quote is None or not quote["success"]:
+            error = quote["error"] if quote is not None else "Cotação não disponível."
+            logger.error(f"Erro ao obter dados para {symbol} em multi-info: {error}")
+            result[symbol] = {"success": False, "error": error, "data": None}
+            continue
+        data = quote["data"]
+        result[symbol] = {"success": True, "data": {
+            "symbol": symbol,
+            "name": str(data.get("name") or ""),
+            "sector": "",
+            "price": float(data.get("price") or 0),
+            "change": float(data.get("change") or 0),
+            "volume": int(data.get("volume") or 0),
+            "market_cap": float(data.get("market_cap") or 0),
+            "pe_ratio": float(data.get("pe_ratio") or 0),
+            "dividend_yield": float(data.get("dividend_yield") or 0),
+            "beta": 0.0,
+            "fiftyTwoWeekChangePercent": float(data.get("fiftyTwoWeekChangePercent") or 0),
+            "avg_volume_3m": int(data.get("avg_volume_3m") or 0),
+            "returnOnEquity": 0.0,
+            "book_value": float(data.get("book_value") or 0),
+            "exchange": str(data.get("exchange") or ""),
+            "fullExchangeName": str(data.get("fullExchangeName") or ""),
+            "currency": str(data.get("currency") or ""),
+            "website": "",
+            "logo": None,
+        }}
+    return result
+
+def merge_ticker_profiles(result: dict) -> dict:
+    """
+    Preenche setor, beta, ROE, website e logo do resultado de ``get_multiple_tickers_info_logic``.
+
+    Os perfis vêm do cache de perfis, que busca os ausentes em segundo plano
+    (ficam vazios até lá). O resultado recebido é alterado e devolvido.
+    """
+    profiles = company_websites.get_profiles(result)
+    for symbol, item in result.items():
+        profile = profiles.get(symbol)
+        if not item["success"] or not profile:
+            continue
+        item["data"].update({
+            "sector": str(profile.get("sector") or ""),
+            "beta": float(profile.get("beta") or 0),
+            "returnOnEquity": float(profile.get("returnOnEquity") or 0),
+            "website": str(profile.get("website") or ""),
+            "logo": logo_url(profile.get("website")),
+        })
     return result
 
-@cache_manager.cached(ttl=300) # Cache de 5 minutos
-def get_multiple_historical_data_logic(symbol_list: List[str], period: str, interval: str, start: Optional[str], end: Optional[str], prepost: bool, auto_adjust: bool):
-    """Lógica para obter dados históricos de preços para múltiplos tickers."""
+@cache_manager.cached(ttl=300, maxsize=64, group="history", serialize=True) # Cache de 5 minutos
+def get_multiple_historical_data_logic(symbol_list: List[str], period: str, interval: str, start: Optional[str], end: Optional[str], prepost: bool, auto_adjust: bool, response_format: str = "records"):
+    """
+    Lógica para obter dados históricos de preços para múltiplos tickers (download em lote).
+    Com response_format="columnar", o "data" de cada ticker vem no formato colunar.
+    """
+    convert = frame_to_columnar if response_format == "columnar" else convert_to_serializable
+    frames, errors = ohlcv_store.fetch(
+        symbol_list, period=period, interval=interval, start=start, end=end, prepost=prepost, auto_adjust=auto_adjust
+    )
     result = {}
     for symbol in symbol_list:
-        try:
-            ticker_data = safe_ticker_operation(symbol, lambda t: t.history(
-                period=period, interval=interval, start=start, end=end, prepost=prepost, auto_adjust=auto_adjust
-            ))
-            result[symbol] = {
-                "success": True,
-                "data": convert_to_serializable(ticker_data)
-            }
-        except Exception as e:
-            logger.error(f"Erro ao obter histórico para {symbol}: {str(e)}")
-            result[symbol] = {"success": False, "error": str(e), "data": []}
+        if symbol in frames:
+            result[symbol] = {"success": True, "data": convert(frames[symbol])}
+        else:
+            error = errors.get(symbol, f"Nenhum dado histórico encontrado para o ticker '{symbol}'.")
+            logger.error(f"Erro ao obter histórico para {symbol}: {error}")
+            result[symbol] = {"success": False, "error": error, "data": []}
     return result
 
-@cache_manager.cached(ttl=300) # Cache de 5 minutos
-def get_historical_data_logic(symbol: str, period: str, interval: str, start: Optional[str], end: Optional[str], prepost: bool, auto_adjust: bool):
-    """Lógica para obter dados históricos de um ticker."""
-    data = safe_ticker_operation(symbol, lambda t: t.history(
-        period=period, interval=interval, start=start, end=end, prepost=prepost, auto_adjust=auto_adjust
-    ))
+@cache_manager.cached(ttl=300, maxsize=256, group="history", serialize=True) # Cache de 5 minutos
+def get_historical_data_logic(symbol: str, period: str, interval: str, start: Optional[str], end: Optional[str], prepost: bool, auto_adjust: bool, response_format: str = "records"):
+    """
+    Lógica para obter dados históricos de um ticker.
+    Com response_format="columnar", retorna um array por coluna em vez de uma lista de registros.
+    """
+    symbol = symbol.upper()
+    if ohlcv_store.supports(interval, period, start):
+        # Barras diárias ou maiores: recorte local, só as barras novas vêm do Yahoo
+        series, errors = ohlcv_store.fetch_arrays(
+            [symbol], period=period, interval=interval, start=start, end=end, auto_adjust=auto_adjust
+        )
+        if symbol not in series:
+            raise ValueError(errors.get(symbol, f"Nenhum dado histórico encontrado para o ticker '{symbol}'."))
+        if response_format == "columnar":
+            # Direto dos arrays (mapeados em memória nos símbolos quentes), sem DataFrame
+            arrays = series[symbol]
+            return arrays_to_columnar(
+                arrays["ts"].astype("datetime64[s]"), {k: v for k, v in arrays.items() if k != "ts"}
+            )
+        data = arrays_to_frame(series[symbol])
+    else:
+        # Intraday: recorte da série em cache que cobre a janela pedida
+        frames, errors = ohlcv_store.fetch(
+            [symbol], period=period, interval=interval, start=start, end=end, prepost=prepost, auto_adjust=auto_adjust
+        )
+        if symbol not in frames:
+            raise ValueError(errors.get(symbol, f"Nenhum dado histórico encontrado para o ticker '{symbol}'."))
+        data = frames[symbol]
+    if response_format == "columnar":
+        return frame_to_columnar(data)
     return convert_to_serializable(data)
 
 
 # ==================== ENDPOINTS DE INFO COMPLETAS ====================
 
-@cache_manager.cached(ttl=3600) # Cache de 1 hora
+@cache_manager.cached(ttl=3600, maxsize=256, group="quote", serialize=True) # Cache de 1 hora
 def get_ticker_fulldata_logic(symbol: str):
     """Lógica para obter todas as informações de um ticker."""
     info = safe_ticker_operation(symbol, lambda t: t.info)
@@ -240,23 +307,22 @@ def get_ticker_fulldata_logic(symbol: str):
 
 # ==================== ENDPOINT DE INFO ESSENCIAIS ====================
 
-@cache_manager.cached(ttl=3600) # Cache de 1 hora
+@cache_manager.cached(ttl=3600, maxsize=512, policy="lfu", group="quote", stale_ttl=3600, serialize=True) # Cache de 1 hora (+1 h servindo valor antigo)
 def get_ticker_info_logic(symbol: str):
     """Lógica para obter informações principais de um ticker."""
     def get_ticker_details(ticker):
         info = ticker.info
         logo = f"https://t1.gstatic.com/faviconV2?client=SOCIAL&type=FAVICON&fallback_opts=TYPE,SIZE,URL&size=128&url={info.get('website')}" if info.get("website") else None
         
+        # Texto original: a tradução é aplicada na rota, sobre o valor em cache
         summary = info.get("longBusinessSummary", "Resumo não disponível")
-        translated_summary = GoogleTranslator(source='auto', target='pt').translate(summary)
         industry = info.get("industry", "Resumo não disponível")
-        translated_industry = GoogleTranslator(source='auto', target='pt').translate(industry)
 
         return {
             "timestamp" : datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
-            "longName": info.get("longName"), "sector": info.get("sector"), "industry": translated_industry,
+            "longName": info.get("longName"), "sector": info.get("sector"), "industry": industry,
             "employees": info.get("fullTimeEmployees"), "website": info.get("website"), "country": info.get("country"),
-            "business_summary": translated_summary, "fullExchangeName": info.get("fullExchangeName"), "companyOfficers": info.get("companyOfficers"), 
+            "business_summary": summary, "fullExchangeName": info.get("fullExchangeName"), "companyOfficers": info.get("companyOfficers"), 
             "type": info.get("quoteType"), "currency": info.get("currency"), "logo": logo,
             "priceAndVariation": {
                 "currentPrice": info.get("regularMarketPrice"), "previousClose": info.get("previousClose"), "regularMarketOpen": info.get("regularMarketOpen"),
@@ -313,7 +379,7 @@ def get_ticker_info_logic(symbol: str):
 
 # ==================== ENDPOINT DE SEARCH ====================
 
-@cache_manager.cached(ttl=1800) # Cache de 30 minutos
+@cache_manager.cached(ttl=1800, maxsize=256, group="search") # Cache de 30 minutos
 def search_tickers_logic(q: str, limit: int):
     """Lógica para buscar por tickers, empresas, etc."""
     try:
@@ -341,7 +407,7 @@ def search_tickers_logic(q: str, limit: int):
         logger.error(f"Erro na lógica de busca por '{q}': {str(e)}")
         raise RuntimeError(f"Erro ao realizar busca: {str(e)}")
 
-@cache_manager.cached(ttl=3600)  # Cache de 1 hora para buscas de lookup
+@cache_manager.cached(ttl=3600, maxsize=256, group="search")  # Cache de 1 hora para buscas de lookup
 def lookup_instruments_logic(query: str, instrument_type: str, count: int):
     """
     Lógica de negócio para buscar instrumentos financeiros usando yf.Lookup.
@@ -386,25 +452,25 @@ def lookup_instruments_logic(query: str, instrument_type: str, count: int):
         # Lança um erro genérico que a camada da API irá capturar
         raise RuntimeError(f"Erro ao realizar lookup: {str(e)}")
 
-@cache_manager.cached(ttl=3600) # Cache de 1 hora
+@cache_manager.cached(ttl=3600, maxsize=256, group="fundamentals", serialize=True) # Cache de 1 hora
 def get_dividends_logic(symbol: str):
     """Lógica para obter histórico de dividendos."""
     data = safe_ticker_operation(symbol, lambda t: t.dividends)
     return convert_to_serializable(data)
 
-@cache_manager.cached(ttl=86400) # Cache de 24 horas para dados que mudam pouco
+@cache_manager.cached(ttl=86400, maxsize=256, group="fundamentals") # Cache de 24 horas para dados que mudam pouco
 def get_recommendations_logic(symbol: str):
     """Lógica para obter recomendações de analistas."""
     data = safe_ticker_operation(symbol, lambda t: t.recommendations)
     return convert_to_serializable(data)
 
-@cache_manager.cached(ttl=86400) # Cache de 24 horas
+@cache_manager.cached(ttl=86400, maxsize=256, group="fundamentals") # Cache de 24 horas
 def get_calendar_logic(symbol: str):
     """Lógica para obter calendário de eventos corporativos."""
     data = safe_ticker_operation(symbol, lambda t: t.calendar)
     return convert_to_serializable(data)
 
-@cache_manager.cached(ttl=1800) # Cache de 30 minutos para notícias
+@cache_manager.cached(ttl=1800, maxsize=256, group="fundamentals") # Cache de 30 minutos para notícias
 def get_news_logic(symbol: str, num: int):
     """Lógica para obter notícias relacionadas ao ticker."""
     def process_news(ticker):
@@ -412,11 +478,12 @@ def get_news_logic(symbol: str, num: int):
         simplified_news = []
         for item in news:
             news_content = item.get('content', {})
+            # Título e resumo originais: a tradução é aplicada na rota
             simplified_item = {
                 "id": news_content.get('id'),
-                "title": GoogleTranslator(source='auto', target='pt').translate(news_content.get('title', "Título não disponível")),
+                "title": news_content.get('title', "Título não disponível"),
                 "date": news_content.get('pubDate'),
-                "summary": GoogleTranslator(source='auto', target='pt').translate(news_content.get('summary', "Resumo não disponível")),
+                "summary": news_content.get('summary', "Resumo não disponível"),
                 "url": news_content.get('canonicalUrl', {}).get('url'),
                 "thumbnail": news_content.get('thumbnail', {}).get('resolutions', [{}])[0].get('url') if news_content.get('thumbnail') else None
             }
@@ -437,50 +504,38 @@ def list_categories_logic():
         }
     }
 
-@cache_manager.cached(ttl=900) # Cache de 15 minutos para screeners
 def get_trending_logic(categoria: str, setor: Optional[str], limit: int, offset: int, sort_field: str, sort_asc: bool):
-    """Lógica para obter lista de ações baseada na categoria de screening."""
+    """Lógica para obter lista de ações baseada na categoria de screening (paginada a partir do screener_store)."""
     if categoria not in BR_PREDEFINED_SCREENER_QUERIES:
         raise KeyError(f"Categoria '{categoria}' não encontrada.")
-        
-    base_query = BR_PREDEFINED_SCREENER_QUERIES[categoria]
-    query = EquityQuery('and', [base_query, EquityQuery('eq', ['sector', setor])]) if setor else base_query
-    
-    try:
-        results = yf.screen(query=query, size=limit, offset=offset, sortField=sort_field, sortAsc=sort_asc)
-    except Exception as e:
-        logger.error(f"Erro no yf.screen() para categoria '{categoria}': {str(e)}")
-        raise RuntimeError(f"Erro ao executar screening: {str(e)}")
-        
-    quotes = results.get('quotes', [])
-    if not quotes:
-        return {"categoria": categoria, "resultados": [], "total": 0, "total_disponivel": 0}
+
+    page = screener_store.page(categoria, setor=setor, limit=limit, offset=offset, sort_field=sort_field, sort_asc=sort_asc)
 
     formatted_results = []
-    for item in quotes:
-        if not isinstance(item, dict): continue
-        info = safe_ticker_operation(str(item.get("symbol", "")), lambda t: t.info)
-        website = str(info.get("website", ""))
+    for item in page["resultados"]:
+        website = item["website"]
         logo = f"https://t1.gstatic.com/faviconV2?client=SOCIAL&type=FAVICON&fallback_opts=TYPE,SIZE,URL&size=128&url={website}" if website else None
         formatted_results.append({
             "symbol": str(item.get("symbol", "")), "name": str(item.get("longName", "") or item.get("shortName", "")),
-            "sector": str(item.get("sector", "")), "price": float(item.get("regularMarketPrice", 0) or 0),
+            "sector": str(item.get("sector", "") or ""), "price": float(item.get("regularMarketPrice", 0) or 0),
             "change": float(item.get("regularMarketChangePercent", 0) or 0), "volume": int(item.get("regularMarketVolume", 0) or 0),
             "market_cap": float(item.get("marketCap", 0) or 0), "pe_ratio": float(item.get("trailingPE", 0) or 0),
             "dividend_yield": float(item.get("dividendYield", 0) or 0), "fiftyTwoWeekChangePercent": float(item.get("fiftyTwoWeekChangePercent", 0)or 0),
             "avg_volume_3m": int(item.get("averageDailyVolume3Month", 0) or 0), "returnOnEquity": float(item.get("returnOnEquity", 0) or 0),
-            "book_value": float(item.get("bookValue", 0) or 0), "exchange": str(item.get("exchange", "")),
-            "fullExchangeName": str(item.get("fullExchangeName", "")), "currency": str(item.get("currency", "")),
+            "book_value": float(item.get("bookValue", 0) or 0), "exchange": str(item.get("exchange", "") or ""),
+            "fullExchangeName": str(item.get("fullExchangeName", "") or ""), "currency": str(item.get("currency", "") or ""),
             "website": website, "logo": logo
         })
-    
+
     return {
         "categoria": categoria, "resultados": formatted_results, "total": len(formatted_results),
-        "total_disponivel": int(results.get("total", len(formatted_results))), "offset": offset, "limit": limit,
-        "ordenacao": {"campo": sort_field, "ascendente": sort_asc}
+        "total_disponivel": page["total_disponivel"], "offset": offset, "limit": limit,
+        "ordenacao": {"campo": sort_field, "ascendente": sort_asc},
+        "fonte": page["fonte"], "atualizado_em": page["atualizado_em"], "idade_segundos": page["idade_segundos"],
+        "desatualizado": page["desatualizado"]
     }
 
-@cache_manager.cached(ttl=600) # Cache de 10 minutos
+@cache_manager.cached(ttl=600, maxsize=16, group="quote", stale_ttl=1200, serialize=True) # Cache de 10 minutos (+20 min servindo valor antigo)
 def get_market_overview_logic(category: str):
     """Lógica para obter visão geral do mercado para uma categoria."""
     if category not in MARKET_OVERVIEW_SYMBOLS:
@@ -508,43 +563,10 @@ def get_market_overview_logic(category: str):
     market_data = [r for r in results if r is not None]
     return {"category": category, "timestamp": datetime.now().isoformat(), "count": len(market_data), "data": market_data}
 
-@cache_manager.cached(ttl=300) # Cache de 5 minutos
+@cache_manager.cached(ttl=300, maxsize=128, group="history", stale_ttl=600) # Cache de 5 minutos (+10 min servindo valor antigo)
 def get_period_performance_logic(symbol_list: List[str]):
-    """Lógica para calcular a performance de múltiplos ativos em diferentes períodos."""
-    periods = {"1D": ("1d", "1d"), "7D": ("7d", "1d"), "1M": ("1mo", "1d"), "3M": ("3mo", "1d"), "6M": ("6mo", "1d"), "1Y": ("1y", "1d")}
-    results = {}
-    for symbol in symbol_list:
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            logo = f"https://t1.gstatic.com/faviconV2?client=SOCIAL&type=FAVICON&fallback_opts=TYPE,SIZE,URL&size=128&url={info.get('website')}" if info.get("website") else None
-            
-            ticker_data = {
-                "name": info.get("shortName", "") or info.get("longName", ""), "current_price": info.get("regularMarketPrice", 0),
-                "currency": info.get("currency", ""), "logo": logo, "performance": {}
-            }
-
-            for period_name, (period, interval) in periods.items():
-                try:
-                    hist = ticker.history(period=period, interval=interval)
-                    if not hist.empty:
-                        first_price = hist['Close'].iloc[0]
-                        last_price = hist['Close'].iloc[-1]
-                        change_percent = ((last_price - first_price) / first_price) * 100
-                        ticker_data["performance"][period_name] = {
-                            "change_percent": round(change_percent, 2), "start_price": round(first_price, 2),
-                            "end_price": round(last_price, 2), "start_date": hist.index[0].strftime('%Y-%m-%d'),
-                            "end_date": hist.index[-1].strftime('%Y-%m-%d')
-                        }
-                    else:
-                        ticker_data["performance"][period_name] = None
-                except Exception:
-                    ticker_data["performance"][period_name] = None
-            results[symbol] = {"success": True, "data": ticker_data}
-        except Exception as e:
-            logger.error(f"Erro ao processar performance para {symbol}: {str(e)}")
-            results[symbol] = {"success": False, "error": str(e), "data": None}
-    return results
+    """Lógica para calcular a performance de múltiplos ativos em diferentes períodos (um download em lote)."""
+    return period_performance_calculator.calculate(symbol_list)
 
 def yfinance_health_check_logic():
     """Lógica para o health check."""
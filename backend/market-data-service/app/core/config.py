@@ -13,7 +13,7 @@ Example:
     print(settings.ALLOWED_ORIGINS)
 """
 
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -43,6 +43,42 @@ class Settings(BaseSettings):
         RATE_LIMIT_WINDOW (int): Janela de tempo para rate limiting
         YAHOO_FINANCE_TIMEOUT (int): Timeout para requisições ao Yahoo Finance
         MAX_RETRIES (int): Número máximo de tentativas para requisições
+        UPSTREAM_GROUP_LIMITS (Dict[str, int]): Chamadas simultâneas ao Yahoo por grupo de rotas
+        UPSTREAM_DEFAULT_LIMIT (int): Limite para grupos não configurados
+        UPSTREAM_MAX_QUEUE (int): Chamadas aguardando por grupo antes de responder 503
+        HISTORY_BATCH_CHUNK_SIZE (int): Tickers por chamada de histórico em lote
+        HISTORY_BATCH_THREADS (int): Threads por chamada de histórico em lote
+        QUOTE_BATCH_CHUNK_SIZE (int): Símbolos por chamada de cotações em lote
+        QUOTE_BATCH_WORKERS (int): Blocos de cotações buscados em paralelo
+        QUOTE_BATCH_MAX_SYMBOLS (int): Máximo de símbolos por requisição de cotações
+        QUOTE_CACHE_TTL_SECONDS (int): TTL das cotações em cache por símbolo
+        SEARCH_ENRICH_TIMEOUT_SECONDS (float): Prazo para completar os resultados da busca com cotações
+        TICKER_UNIVERSE_REFRESH_SECONDS (int): Intervalo entre verificações do tickers.csv para recompilar o universo
+        PERIOD_PERFORMANCE_MAX_SYMBOLS (int): Máximo de ativos na tabela de performance
+        LOCAL_STORAGE_DIR (str): Diretório dos dados persistidos localmente
+        OHLCV_STORE_ENABLED (bool): Servir históricos diários/semanais/mensais do armazenamento local
+        OHLCV_STORE_REFRESH_SECONDS (int): Intervalo mínimo entre buscas incrementais de uma série
+        HOT_SERIES_ENABLED (bool): Manter os símbolos mais consultados em arquivos mapeados em memória
+        HISTORY_RANGE_CACHE_TTL_SECONDS (int): Intervalo mínimo entre buscas incrementais de séries intraday
+        HISTORY_RANGE_CACHE_MAXSIZE (int): Número máximo de séries intraday em memória
+        HISTORY_RANGE_CACHE_PERSIST (bool): Persistir as séries intraday no armazenamento local
+        HISTORY_CHUNK_WORKERS (int): Blocos de uma janela intraday longa buscados em paralelo
+        INDICATOR_STATE_MAXSIZE (int): Séries com estado de indicadores técnicos em memória
+        SCAN_WORKERS (int): Processos usados na varredura de indicadores do universo
+        SCAN_PARALLEL_THRESHOLD (int): Células da matriz de fechamentos a partir das quais a varredura usa processos
+        CORRELATION_BLOCK_SIZE (int): Linhas das matrizes de correlação calculadas por vez
+        CORRELATION_CACHE_MAXSIZE (int): Conjuntos de matrizes de correlação em cache (por pregão)
+        CORRELATION_MAX_SYMBOLS (int): Máximo de tickers por consulta de correlação
+        CORRELATION_MIN_PERIODS (int): Mínimo de pregões em comum para correlacionar um par
+        PORTFOLIO_BENCHMARK (str): Índice de referência do beta das carteiras
+        PORTFOLIO_RISK_FREE_RATE (float): Taxa livre de risco anual (fração) padrão do Sharpe/Sortino
+        SCREENER_REFRESH_SECONDS (int): Intervalo entre atualizações em segundo plano de cada screener predefinido
+        SCREENER_MAX_RESULTS (int): Máximo de resultados guardados por screener (das maiores empresas para as menores)
+        TRANSLATION_TARGET (str): Idioma de destino das descrições e notícias
+        TRANSLATION_ASYNC (bool): Responder com o texto original e traduzir em segundo plano quando não houver tradução em cache
+            (desativado por padrão: a primeira resposta já vem traduzida, aguardando até TRANSLATION_TIMEOUT_SECONDS)
+        TRANSLATION_TIMEOUT_SECONDS (float): Prazo para aguardar traduções quando TRANSLATION_ASYNC é False
+        TRANSLATION_CACHE_MAXSIZE (int): Traduções mantidas em memória (as demais ficam no armazenamento local)
         HOST (str): Host do servidor
         PORT (int): Porta do servidor
     """
@@ -75,6 +111,68 @@ class Settings(BaseSettings):
     # External APIs
     YAHOO_FINANCE_TIMEOUT: int = 30
     MAX_RETRIES: int = 3
+
+    # Upstream Executor
+    UPSTREAM_GROUP_LIMITS: Dict[str, int] = {
+        "quote": 16,
+        "history": 8,
+        "fundamentals": 8,
+        "search": 4,
+        "screener": 4,
+        "translation": 4,
+    }
+    UPSTREAM_DEFAULT_LIMIT: int = 4
+    UPSTREAM_MAX_QUEUE: int = 200
+
+    # Histórico em lote (yf.download)
+    HISTORY_BATCH_CHUNK_SIZE: int = 25
+    HISTORY_BATCH_THREADS: int = 8
+
+    # Cotações em lote (/v7/finance/quote)
+    QUOTE_BATCH_CHUNK_SIZE: int = 50
+    QUOTE_BATCH_WORKERS: int = 8
+    QUOTE_BATCH_MAX_SYMBOLS: int = 500
+    QUOTE_CACHE_TTL_SECONDS: int = 60
+    SEARCH_ENRICH_TIMEOUT_SECONDS: float = 1.5
+    TICKER_UNIVERSE_REFRESH_SECONDS: int = 300
+    PERIOD_PERFORMANCE_MAX_SYMBOLS: int = 50
+
+    # Armazenamento local (séries OHLCV)
+    LOCAL_STORAGE_DIR: str = "storage"
+    OHLCV_STORE_ENABLED: bool = True
+    OHLCV_STORE_REFRESH_SECONDS: int = 300
+    HOT_SERIES_ENABLED: bool = True
+
+    # Cache de histórico por faixa de datas (intraday)
+    HISTORY_RANGE_CACHE_TTL_SECONDS: int = 60
+    HISTORY_RANGE_CACHE_MAXSIZE: int = 256
+    HISTORY_RANGE_CACHE_PERSIST: bool = True
+    HISTORY_CHUNK_WORKERS: int = 4
+
+    # Motor de indicadores técnicos
+    INDICATOR_STATE_MAXSIZE: int = 128
+    SCAN_WORKERS: int = 2
+    SCAN_PARALLEL_THRESHOLD: int = 1_000_000
+
+    # Análises de carteira
+    PORTFOLIO_BENCHMARK: str = "^BVSP"
+    PORTFOLIO_RISK_FREE_RATE: float = 0.0
+
+    # Correlação entre tickers
+    CORRELATION_BLOCK_SIZE: int = 256
+    CORRELATION_CACHE_MAXSIZE: int = 16
+    CORRELATION_MAX_SYMBOLS: int = 1000
+    CORRELATION_MIN_PERIODS: int = 20
+
+    # Screeners predefinidos (atualizados em segundo plano)
+    SCREENER_REFRESH_SECONDS: int = 300
+    SCREENER_MAX_RESULTS: int = 1000
+
+    # Tradução de descrições e notícias
+    TRANSLATION_TARGET: str = "pt"
+    TRANSLATION_ASYNC: bool = False
+    TRANSLATION_TIMEOUT_SECONDS: float = 10.0
+    TRANSLATION_CACHE_MAXSIZE: int = 4096
     
     # Server Configuration
     HOST: str = "0.0.0.0"
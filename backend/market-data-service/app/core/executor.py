@@ -0,0 +1,252 @@
+"""
+Executor gerenciado para chamadas bloqueantes ao Yahoo Finance.
+
+Todas as rotas do serviço são ``async def``, mas a biblioteca yfinance é
+síncrona: uma chamada lenta a ``Ticker.info`` ou ``Ticker.history`` executada
+diretamente na rota trava o event loop inteiro do worker uvicorn. Este módulo
+fornece uma camada única, criada no ``lifespan`` da aplicação, por onde passam
+todas as chamadas upstream.
+
+Cada grupo de rotas (cotações, histórico, fundamentos, busca, screener) possui
+seu próprio pool de threads com limite de concorrência e fila limitada, de
+forma que uma rajada de downloads de histórico não consome os workers usados
+pelas cotações, e o event loop continua livre para ``/ping`` e cache hits.
+
+Example:
+    from core.executor import upstream_executor
+
+    info = await upstream_executor.run("quote", lambda: yf.Ticker("PETR4.SA").info)
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from core.config import settings
+from core.logging import LoggerMixin
+
+
+class UpstreamSaturatedError(ConnectionError):
+    """
+    Exceção lançada quando a fila de um grupo do executor está cheia.
+
+    Herda de ConnectionError para que as rotas a tratem como indisponibilidade
+    temporária do upstream (HTTP 503).
+    """
+
+
+class UpstreamExecutor(LoggerMixin):
+    """
+    Executor limitado, particionado por grupo de rotas.
+
+    Attributes:
+        group_limits: Número máximo de chamadas simultâneas por grupo
+        default_limit: Limite usado para grupos não configurados
+        max_queue: Número máximo de chamadas aguardando por grupo
+    """
+
+    def __init__(
+        self,
+        group_limits: Optional[Dict[str, int]] = None,
+        default_limit: int = None,
+        max_queue: int = None,
+    ):
+        """
+        Inicializa o executor (os pools só são criados em ``start``).
+
+        Args:
+            group_limits: Limite de concorrência por grupo
+                (padrão: configuração global)
+            default_limit: Limite para grupos não configurados
+                (padrão: configuração global)
+            max_queue: Tamanho máximo da fila por grupo
+                (padrão: configuração global)
+        """
+        self.group_limits = dict(group_limits or settings.UPSTREAM_GROUP_LIMITS)
+        self.default_limit = default_limit or settings.UPSTREAM_DEFAULT_LIMIT
+        self.max_queue = max_queue or settings.UPSTREAM_MAX_QUEUE
+
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self) -> None:
+        """Cria os pools de threads de todos os grupos configurados."""
+        for group in self.group_limits:
+            self._get_pool(group)
+        self.logger.info(
+            f"UpstreamExecutor iniciado com grupos {self.group_limits} "
+            f"(fila máx. {self.max_queue} por grupo)"
+        )
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Encerra os pools, cancelando chamadas que ainda não começaram.
+
+        Args:
+            wait: Se True, aguarda as chamadas em andamento terminarem
+        """
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self.logger.info("UpstreamExecutor finalizado")
+
+    # ==================== EXECUÇÃO ====================
+
+    def submit(self, group: str, func: Callable, *args, **kwargs) -> Future:
+        """
+        Agenda uma chamada bloqueante no pool do grupo.
+
+        Pode ser usado tanto por código síncrono quanto assíncrono.
+
+        Args:
+            group: Grupo de rotas (ex: "quote", "history")
+            func: Função bloqueante a executar
+            *args: Argumentos posicionais da função
+            **kwargs: Argumentos nomeados da função
+
+        Returns:
+            Future com o resultado da chamada
+
+        Raises:
+            UpstreamSaturatedError: Se a fila do grupo estiver cheia
+        """
+        pool = self._get_pool(group)
+        stats = self._stats[group]
+
+        with self._lock:
+            if stats["queued"] >= self.max_queue:
+                stats["rejected"] += 1
+                raise UpstreamSaturatedError(
+                    f"Fila de chamadas '{group}' cheia ({self.max_queue}). "
+                    "Tente novamente em instantes."
+                )
+            stats["queued"] += 1
+            stats["submitted"] += 1
+            stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+
+        enqueued_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                stats["queued"] -= 1
+                stats["active"] += 1
+                stats["wait_seconds"] += started_at - enqueued_at
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    stats["failed"] += 1
+                raise
+            finally:
+                with self._lock:
+                    stats["active"] -= 1
+                    stats["completed"] += 1
+                    stats["run_seconds"] += time.perf_counter() - started_at
+
+        try:
+            future = pool.submit(task)
+        except RuntimeError:
+            # Pool encerrado (shutdown em andamento)
+            with self._lock:
+                stats["queued"] -= 1
+            raise
+        future.add_done_callback(functools.partial(self._on_done, stats))
+        return future
+
+    async def run(self, group: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Executa uma chamada bloqueante sem travar o event loop.
+
+        Args:
+            group: Grupo de rotas (ex: "quote", "history")
+            func: Função bloqueante a executar
+            *args: Argumentos posicionais da função
+            **kwargs: Argumentos nomeados da função
+
+        Returns:
+            Resultado da função
+        """
+        return await asyncio.wrap_future(self.submit(group, func, *args, **kwargs))
+
+    # ==================== MÉTRICAS ====================
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna métricas de ocupação e fila por grupo.
+
+        Returns:
+            Dicionário grupo -> métricas (limite, ativos, em fila, tempos médios)
+        """
+        with self._lock:
+            snapshot = {group: dict(stats) for group, stats in self._stats.items()}
+
+        result = {}
+        for group, stats in snapshot.items():
+            completed = stats["completed"] or 1
+            result[group] = {
+                "limit": self.group_limits.get(group, self.default_limit),
+                "active": int(stats["active"]),
+                "queued": int(stats["queued"]),
+                "max_queued": int(stats["max_queued"]),
+                "submitted": int(stats["submitted"]),
+                "completed": int(stats["completed"]),
+                "failed": int(stats["failed"]),
+                "cancelled": int(stats["cancelled"]),
+                "rejected": int(stats["rejected"]),
+                "avg_wait_ms": round(stats["wait_seconds"] / completed * 1000, 2),
+                "avg_run_ms": round(stats["run_seconds"] / completed * 1000, 2),
+            }
+        return result
+
+    # ==================== AUXILIARES ====================
+
+    def _get_pool(self, group: str) -> ThreadPoolExecutor:
+        """Obtém (ou cria sob demanda) o pool de threads de um grupo."""
+        pool = self._pools.get(group)
+        if pool is not None:
+            return pool
+
+        with self._lock:
+            pool = self._pools.get(group)
+            if pool is None:
+                limit = self.group_limits.get(group, self.default_limit)
+                pool = ThreadPoolExecutor(
+                    max_workers=limit, thread_name_prefix=f"upstream-{group}"
+                )
+                self._pools[group] = pool
+                self._stats.setdefault(group, self._empty_stats())
+        return pool
+
+    def _on_done(self, stats: Dict[str, float], future: Future) -> None:
+        """Contabiliza chamadas canceladas antes de começar a executar."""
+        if future.cancelled():
+            with self._lock:
+                stats["queued"] -= 1
+                stats["cancelled"] += 1
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, float]:
+        return {
+            "active": 0,
+            "queued": 0,
+            "max_queued": 0,
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+
+# Instância única compartilhada pelas rotas; os pools são criados no lifespan
+upstream_executor = UpstreamExecutor()
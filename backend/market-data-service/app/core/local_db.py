@@ -0,0 +1,70 @@
+"""
+Bancos SQLite locais compartilhados pelos serviços.
+
+Os armazenamentos persistentes do serviço (séries OHLCV, séries intraday,
+traduções) usam arquivos SQLite no diretório de armazenamento local. Este
+módulo concentra a parte comum: criação do diretório e do esquema na primeira
+utilização, uma conexão por thread (conexões SQLite não devem ser
+compartilhadas entre threads) e modo WAL, para que leitores de vários workers
+do uvicorn não bloqueiem a escrita.
+
+Example:
+    from core.local_db import LocalDatabase
+
+    db = LocalDatabase("storage/exemplo.sqlite3", "CREATE TABLE IF NOT EXISTS t (k TEXT PRIMARY KEY)")
+    with db.connection() as conn:
+        conn.execute("INSERT OR REPLACE INTO t VALUES (?)", ("a",))
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class LocalDatabase:
+    """
+    Arquivo SQLite com uma conexão por thread.
+
+    Attributes:
+        path: Caminho do arquivo do banco
+    """
+
+    def __init__(self, path: str, schema: str):
+        """
+        Configura o banco (o arquivo é criado no primeiro uso).
+
+        Args:
+            path: Caminho do arquivo do banco
+            schema: Script SQL idempotente (``CREATE TABLE IF NOT EXISTS ...``)
+        """
+        self.path = path
+        self._schema = schema
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, criando o banco no primeiro uso."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._initialize()
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _initialize(self) -> None:
+        """Cria o diretório e o esquema (uma vez por processo)."""
+        with self._init_lock:
+            if self._initialized:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                conn.executescript(self._schema)
+            finally:
+                conn.close()
+            self._initialized = True
@@ -0,0 +1,172 @@
+"""
+Serialização JSON rápida para respostas da API.
+
+Os resultados das funções de lógica misturam tipos Python, numpy e pandas.
+Este módulo converte esses resultados diretamente em bytes JSON com orjson,
+permitindo que o cache guarde a resposta já codificada (imutável) e que as
+rotas a devolvam sem nenhuma re-serialização.
+
+Example:
+    from core.serialization import dumps_json, json_response
+
+    body = dumps_json({"close": np.float64(31.2), "volume": np.int64(1000)})
+    return json_response(body)
+"""
+
+import datetime
+import decimal
+import math
+from typing import Any, Dict
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import Response
+
+# Arrays numpy nativos e chaves de dicionário não-string (int, float, datetime)
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """
+    Converte tipos que o orjson não serializa nativamente.
+
+    NaN/inf viram null (o orjson já faz isso para floats Python e arrays numpy).
+    """
+    if isinstance(obj, pd.Timestamp):
+        return None if pd.isna(obj) else obj.isoformat()
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+    # O retorno do ``default`` não passa pela normalização de chaves de ``dumps_json``:
+    # índices/colunas de datas (ex: dividendos) são convertidos aqui
+    if isinstance(obj, pd.DataFrame):
+        return _normalize_keys(obj.astype(object).where(obj.notna(), None).to_dict(orient="records"))
+    if isinstance(obj, pd.Series):
+        return _normalize_keys(obj.astype(object).where(obj.notna(), None).to_dict())
+    if isinstance(obj, pd.Index):
+        return obj.tolist()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    # Mesmo comportamento de convert_to_serializable para tipos desconhecidos
+    return str(obj)
+
+
+def _normalize_keys(obj: Any) -> Any:
+    """Converte recursivamente chaves de dicionário que o orjson não aceita."""
+    if isinstance(obj, dict):
+        return {
+            (k if isinstance(k, (str, int, float, bool)) or k is None else _default(k)):
+                _normalize_keys(v)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_normalize_keys(v) for v in obj]
+    return obj
+
+
+def dumps_json(data: Any) -> bytes:
+    """
+    Serializa um resultado em bytes JSON.
+
+    Args:
+        data: Objeto a serializar (dict, list, tipos numpy/pandas, etc.)
+
+    Returns:
+        Documento JSON codificado em UTF-8
+    """
+    try:
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+    except TypeError:
+        # Chaves como pd.Timestamp (ex: Series.to_dict() de dividendos) não passam
+        # pelo ``default``; normaliza a estrutura e tenta novamente
+        return orjson.dumps(_normalize_keys(data), default=_default, option=_ORJSON_OPTIONS)
+
+
+def frame_to_columnar(frame: pd.DataFrame, date_unit: str = "s") -> Dict[str, Any]:
+    """
+    Converte um DataFrame de histórico para o formato colunar.
+
+    Em vez de uma lista de registros que repete os nomes das colunas a cada
+    barra, retorna um array por coluna (``{"index": [...], "open": [...], ...}``).
+    Os arrays numéricos saem direto dos buffers numpy e são serializados pelo
+    orjson sem passar por objetos Python; NaN vira null.
+
+    Args:
+        frame: DataFrame indexado por data (ex: retorno de ``Ticker.history``)
+        date_unit: Precisão das datas do índice, "s" (YYYY-MM-DD HH:MM:SS) ou "D" (YYYY-MM-DD)
+
+    Returns:
+        Dicionário com "index" (datas no horário local da bolsa) e uma chave
+        snake_case por coluna ("Stock Splits" -> "stock_splits")
+    """
+    index = frame.index
+    if isinstance(index, pd.DatetimeIndex):
+        local = index.tz_localize(None) if index.tz is not None else index
+        dates = local.values
+    else:
+        dates = index.astype(str).tolist()
+    return arrays_to_columnar(
+        dates, {name: frame[name].to_numpy() for name in frame.columns}, date_unit
+    )
+
+
+def arrays_to_columnar(index: Any, columns: Dict[str, np.ndarray], date_unit: str = "s") -> Dict[str, Any]:
+    """
+    Monta o formato colunar a partir de arrays, sem construir um DataFrame.
+
+    Args:
+        index: Datas (array datetime64 no horário local) ou lista já formatada
+        columns: Nome da coluna -> array de valores
+        date_unit: Precisão das datas, "s" (YYYY-MM-DD HH:MM:SS) ou "D" (YYYY-MM-DD)
+
+    Returns:
+        Dicionário no mesmo formato de ``frame_to_columnar``
+    """
+    if isinstance(index, np.ndarray) and index.dtype.kind == "M":
+        dates = np.datetime_as_string(index, unit=date_unit)
+        if date_unit != "D":
+            dates = np.char.replace(dates, "T", " ")
+        index = dates.tolist()
+
+    result = {"index": index}
+    for name, values in columns.items():
+        if values.dtype.kind not in "fiub":
+            values = values.astype(float)
+        result[str(name).strip().lower().replace(" ", "_")] = np.ascontiguousarray(values)
+    return result
+
+
+def loads_json(body: bytes) -> Any:
+    """
+    Decodifica bytes JSON em uma cópia nova (e independente) do objeto.
+
+    Args:
+        body: Documento JSON codificado
+
+    Returns:
+        Objeto Python correspondente
+    """
+    return orjson.loads(body)
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """
+    Cria uma resposta HTTP a partir de bytes JSON já codificados.
+
+    Args:
+        body: Documento JSON codificado
+        status_code: Código HTTP da resposta
+
+    Returns:
+        Response do FastAPI com media type application/json
+    """
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -19,9 +19,16 @@ from fastapi.responses import JSONResponse
 
 from yfinance_endpoints import router as yfinance_router
 from cadu.frontend_api import router as frontend_router
+from app.cadu.caching import cache_manager
 from core.config import settings
+from core.executor import upstream_executor
 from core.logging import get_logger
 from models.responses import ErrorResponse
+from services.history_cache import history_range_cache
+from services.quote_batch import quote_batch_engine
+from services.scanner import technical_scanner
+from services.screener_store import screener_store
+from services.ticker_universe import ticker_universe
 
 # Configurar logger
 logger = get_logger(__name__)
@@ -54,7 +61,15 @@ async def lifespan(app: FastAPI):
     # - Pré-carregamento de dados
 
     try:
-        # Teste básico de funcionalidade
+        # Pools de threads para as chamadas bloqueantes ao Yahoo Finance
+        upstream_executor.start()
+
+        # Universo de tickers (snapshot compilado + índice de busca)
+        ticker_universe.start()
+
+        # Screeners predefinidos (resultados completos atualizados em segundo plano)
+        screener_store.start()
+
         logger.info("✅ Serviços inicializados com sucesso")
         logger.info(f"🌐 Servidor rodando em {settings.HOST}:{settings.PORT}")
 
@@ -66,6 +81,12 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("🛑 Finalizando Market Data Service...")
+    upstream_executor.shutdown()
+    quote_batch_engine.shutdown()
+    history_range_cache.shutdown()
+    technical_scanner.shutdown()
+    ticker_universe.stop()
+    screener_store.stop()
     logger.info("✅ Recursos liberados com sucesso")
 
 
@@ -350,6 +371,42 @@ async def ping():
     }
 
 
+@app.get(
+    "/metrics/upstream",
+    summary="Métricas do executor upstream",
+    description="Ocupação, profundidade de fila e tempos médios por grupo de rotas.",
+)
+async def upstream_metrics():
+    """
+    Expõe as métricas do executor de chamadas ao Yahoo Finance.
+
+    Returns:
+        Métricas por grupo (ativos, em fila, rejeitados, tempos médios)
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "groups": upstream_executor.metrics(),
+    }
+
+
+@app.get(
+    "/metrics/cache",
+    summary="Métricas do cache de dados de mercado",
+    description="Hits, misses e chamadas executadas vs. coalescidas por função.",
+)
+async def cache_metrics():
+    """
+    Expõe os contadores do cache das funções de lógica.
+
+    Returns:
+        Totais e contadores por função (hits, misses, executed, coalesced)
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **cache_manager.stats(),
+    }
+
+
 # Configuração adicional para desenvolvimento
 if settings.DEBUG:
     logger.info("🔧 Modo DEBUG ativado")
@@ -0,0 +1,320 @@
+"""
+Análises de múltiplos tickers sobre uma matriz de preços alinhada.
+
+A comparação de performance fazia um laço por ticker sobre DataFrames
+separados, cada um com as próprias datas. Aqui os históricos (lidos do
+armazenamento local, em lote) são alinhados em uma única matriz (datas nas
+linhas, tickers nas colunas) mantendo só as datas presentes em todos os
+tickers: ativos de bolsas com calendários diferentes são comparados nos mesmos
+dias. Retorno, volatilidade, drawdown, séries rebaseadas e as matrizes de
+correlação/covariância saem de operações numpy sobre a matriz inteira, com
+custo praticamente constante entre 2 e 50 tickers.
+
+Example:
+    from services.analytics import compare_tickers
+
+    result = compare_tickers(["PETR4.SA", "VALE3.SA", "^BVSP"], period="1y")
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.market_calendar import MarketCalendar, calendar_for
+from services.ohlcv_store import ohlcv_store
+from services.resampling import INTRADAY_SECONDS
+
+# Períodos por ano usados na anualização, por intervalo
+_PERIODS_PER_YEAR = {"1d": 252, "5d": 252 / 5, "1wk": 52, "1mo": 12, "3mo": 4}
+
+# Colunas do histórico mantidas na matriz alinhada
+_PRICE_COLUMNS = ("Close", "High", "Low", "Volume")
+
+# Calendários cujo fuso é o mesmo das barras gravadas (horário local da bolsa).
+# Nos demais (câmbio e bolsas sem calendário próprio) o fuso real da bolsa é
+# desconhecido e os horários intraday não podem ser convertidos para UTC.
+_KNOWN_ZONES = {"B3", "US", "CRYPTO"}
+
+
+def periods_per_year(interval: str) -> float:
+    """Número de barras do intervalo em um ano (intraday: pregões de 6,5 horas)."""
+    if interval in INTRADAY_SECONDS:
+        return 252 * 6.5 * 3600 / INTRADAY_SECONDS[interval]
+    return _PERIODS_PER_YEAR.get(interval, 252)
+
+
+class AlignedPrices:
+    """
+    Históricos de vários tickers alinhados nas datas comuns.
+
+    Attributes:
+        ts: Datas (segundos, horário local) presentes em todos os tickers; em
+            intraday entre fusos diferentes, no horário local do primeiro ticker
+        symbols: Tickers com histórico, na ordem pedida (colunas das matrizes)
+        columns: Nome da coluna ("Close", "High", "Low", "Volume") -> matriz datas x tickers
+        errors: Mensagem de erro por ticker sem histórico
+        calendar: Calendário do horário local de ``ts`` (None sem tickers)
+    """
+
+    __slots__ = ("ts", "symbols", "columns", "errors", "calendar")
+
+    def __init__(
+        self,
+        ts: np.ndarray,
+        symbols: List[str],
+        columns: Dict[str, np.ndarray],
+        errors: Dict[str, str],
+        calendar: Optional[MarketCalendar] = None,
+    ):
+        self.ts = ts
+        self.symbols = symbols
+        self.columns = columns
+        self.errors = errors
+        self.calendar = calendar
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.columns["Close"]
+
+    def returns(self) -> np.ndarray:
+        """Retornos simples entre datas consecutivas (uma linha a menos que os preços)."""
+        return self.close[1:] / self.close[:-1] - 1.0
+
+    def dates(self, fmt: str = "%Y-%m-%d") -> List[str]:
+        """Datas formatadas, para as respostas."""
+        return pd.DatetimeIndex(self.ts.astype("datetime64[s]")).strftime(fmt).tolist()
+
+
+def load_aligned_prices(
+    symbols: Iterable[str],
+    period: Optional[str] = "1y",
+    interval: str = "1d",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> AlignedPrices:
+    """
+    Lê os históricos do armazenamento local e os alinha nas datas comuns (junção interna).
+
+    Em barras diárias ou maiores a junção é pela data; em intraday, pelo
+    horário exato da barra. As barras são gravadas no horário local de cada
+    bolsa, então em intraday entre fusos diferentes a junção é feita em UTC.
+    Datas sem fechamento em algum ticker são descartadas.
+
+    Args:
+        symbols: Tickers (duplicatas são ignoradas)
+        period: Período (ex: "1mo", "1y"); ignorado quando ``start`` é informado
+        interval: Intervalo dos candles
+        start: Data inicial (YYYY-MM-DD)
+        end: Data final exclusiva (YYYY-MM-DD)
+
+    Returns:
+        Preços alinhados (matrizes vazias se nenhum ticker tiver histórico)
+
+    Raises:
+        ValueError: Comparação intraday entre fusos diferentes envolvendo um
+            ticker cujo fuso da bolsa não é conhecido
+    """
+    requested = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    series: Dict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]] = {}
+    if ohlcv_store.supports(interval, period, start):
+        arrays, errors = ohlcv_store.fetch_arrays(
+            requested, period=period, interval=interval, start=start, end=end, actions=False
+        )
+        for symbol, data in arrays.items():
+            series[symbol] = (data["ts"], {name: data[name] for name in _PRICE_COLUMNS})
+    else:
+        frames, errors = ohlcv_store.fetch(
+            requested, period=period, interval=interval, start=start, end=end, actions=False
+        )
+        for symbol, frame in frames.items():
+            series[symbol] = (
+                frame.index.as_unit("s").asi8,
+                {name: frame[name].to_numpy(dtype=np.float64) for name in _PRICE_COLUMNS},
+            )
+
+    tickers = [symbol for symbol in requested if symbol in series and len(series[symbol][0])]
+    if not tickers:
+        empty = {name: np.empty((0, 0)) for name in _PRICE_COLUMNS}
+        return AlignedPrices(np.empty(0, dtype=np.int64), [], empty, errors)
+
+    calendars = {symbol: calendar_for(symbol) for symbol in tickers}
+    utc = _needs_utc(calendars, interval)
+
+    # Datas (ou horários) com fechamento em todos os tickers; ``rows`` aponta
+    # para a barra de cada chave na série original
+    keys: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    common = None
+    for symbol in tickers:
+        ts, values = series[symbol]
+        rows = np.flatnonzero(~np.isnan(values["Close"]))
+        key = ts[rows]
+        if utc:
+            key, rows = _local_to_utc(key, rows, calendars[symbol].tz)
+        keys[symbol] = (key, rows)
+        common = key if common is None else np.intersect1d(common, key, assume_unique=True)
+
+    columns = {name: np.empty((len(common), len(tickers))) for name in _PRICE_COLUMNS}
+    for j, symbol in enumerate(tickers):
+        values = series[symbol][1]
+        key, rows = keys[symbol]
+        positions = rows[np.searchsorted(key, common)]
+        for name in _PRICE_COLUMNS:
+            columns[name][:, j] = np.asarray(values[name], dtype=np.float64)[positions]
+    calendar = calendars[tickers[0]]
+    if utc:
+        common = _utc_to_local(common, calendar.tz)
+    return AlignedPrices(common, tickers, columns, errors, calendar)
+
+
+def common_dates(
+    prices: AlignedPrices, other: AlignedPrices, interval: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Datas comuns a dois conjuntos de preços alinhados (ex: carteira e índice de referência).
+
+    Segue a mesma regra de ``load_aligned_prices``: em intraday entre fusos
+    diferentes, a junção é em UTC.
+
+    Args:
+        prices: Preços alinhados (define o horário das datas devolvidas)
+        other: Outro conjunto de preços alinhados
+        interval: Intervalo dos candles
+
+    Returns:
+        Tupla (datas, posições em ``prices``, posições em ``other``)
+
+    Raises:
+        ValueError: Ver ``load_aligned_prices``
+    """
+    if not len(prices.ts) or not len(other.ts):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    calendars = {prices.symbols[0]: prices.calendar, other.symbols[0]: other.calendar}
+    if not _needs_utc(calendars, interval):
+        return np.intersect1d(prices.ts, other.ts, assume_unique=True, return_indices=True)
+    own, own_rows = _local_to_utc(prices.ts, np.arange(len(prices.ts)), prices.calendar.tz)
+    their, their_rows = _local_to_utc(other.ts, np.arange(len(other.ts)), other.calendar.tz)
+    _, own_at, their_at = np.intersect1d(own, their, assume_unique=True, return_indices=True)
+    own_rows = own_rows[own_at]
+    return prices.ts[own_rows], own_rows, their_rows[their_at]
+
+
+def _needs_utc(calendars: Dict[str, MarketCalendar], interval: str) -> bool:
+    """Se a junção deve ser em UTC (intraday entre fusos diferentes)."""
+    if interval not in INTRADAY_SECONDS or len({calendar.tz for calendar in calendars.values()}) < 2:
+        return False
+    unknown = [name for name, calendar in calendars.items() if calendar.name not in _KNOWN_ZONES]
+    if unknown:
+        raise ValueError(
+            f"Comparação intraday entre fusos diferentes não suportada para {', '.join(unknown)}; "
+            "use barras diárias"
+        )
+    return True
+
+
+def _local_to_utc(ts: np.ndarray, rows: np.ndarray, tz) -> Tuple[np.ndarray, np.ndarray]:
+    """Converte horários locais (segundos) para UTC, descartando os ambíguos/inexistentes na troca de horário."""
+    index = pd.DatetimeIndex(ts.astype("datetime64[s]")).tz_localize(tz, ambiguous="NaT", nonexistent="NaT")
+    keep = ~index.isna()
+    return index[keep].as_unit("s").asi8, rows[keep]
+
+
+def _utc_to_local(ts: np.ndarray, tz) -> np.ndarray:
+    """Converte horários UTC (segundos) para o horário local do fuso, sem fuso."""
+    index = pd.DatetimeIndex(ts.astype("datetime64[s]")).tz_localize("UTC").tz_convert(tz)
+    return index.tz_localize(None).as_unit("s").asi8
+
+
+def max_drawdown(close: np.ndarray) -> np.ndarray:
+    """Maior queda (fração negativa) desde o topo anterior, por coluna."""
+    if not len(close):
+        return np.full(close.shape[1:], np.nan)
+    return (close / np.maximum.accumulate(close, axis=0) - 1.0).min(axis=0)
+
+
+def to_finite(values: Any, digits: int = 4) -> Any:
+    """Converte arrays/escalares em listas/floats arredondados, com NaN/inf como None."""
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim == 0:
+        return round(float(array), digits) if np.isfinite(array) else None
+    rounded = np.round(array, digits).astype(object)
+    rounded[~np.isfinite(array)] = None
+    return rounded.tolist()
+
+
+def compare_tickers(
+    symbols: Iterable[str],
+    period: Optional[str] = "1y",
+    interval: str = "1d",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compara a performance de vários tickers nas datas comuns a todos.
+
+    Args:
+        symbols: Tickers a comparar
+        period: Período (ex: "1mo", "1y")
+        interval: Intervalo dos candles
+        start: Data inicial (YYYY-MM-DD)
+        end: Data final exclusiva (YYYY-MM-DD)
+
+    Returns:
+        Dicionário com as métricas por ticker ("comparison"), as datas comuns
+        ("dates"), as séries rebaseadas em 100 ("rebased"), as matrizes de
+        correlação e de covariância anualizada dos retornos e os erros por ticker
+    """
+    prices = load_aligned_prices(symbols, period=period, interval=interval, start=start, end=end)
+    symbols = prices.symbols
+    if not symbols or not len(prices.ts):
+        return {
+            "comparison": {},
+            "dates": [],
+            "rebased": {},
+            "correlation": None,
+            "covariance": None,
+            "errors": prices.errors,
+        }
+
+    close = prices.close
+    returns = prices.returns()
+    annualization = periods_per_year(interval)
+    volatility = np.full(len(symbols), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total_return = (close[-1] / close[0] - 1.0) * 100
+        if len(returns) > 1:
+            volatility = returns.std(axis=0, ddof=1) * np.sqrt(annualization) * 100
+        drawdown = max_drawdown(close) * 100
+        rebased = close / close[0] * 100
+
+    metrics = {
+        "total_return_pct": to_finite(total_return, 2),
+        "volatility_pct": to_finite(volatility, 2),
+        "max_drawdown_pct": to_finite(drawdown, 2),
+        "max_price": to_finite(np.nanmax(prices.columns["High"], axis=0)),
+        "min_price": to_finite(np.nanmin(prices.columns["Low"], axis=0)),
+        "current_price": to_finite(close[-1]),
+        "avg_volume": to_finite(np.nanmean(prices.columns["Volume"], axis=0), 2),
+    }
+    comparison = {
+        symbol: {name: values[j] for name, values in metrics.items()} for j, symbol in enumerate(symbols)
+    }
+
+    correlation = covariance = None
+    if len(returns) > 1:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance_matrix = np.atleast_2d(np.cov(returns, rowvar=False)) * annualization
+            deviations = np.sqrt(np.diag(covariance_matrix))
+            correlation_matrix = covariance_matrix / np.outer(deviations, deviations)
+        correlation = {symbol: dict(zip(symbols, to_finite(row))) for symbol, row in zip(symbols, correlation_matrix)}
+        covariance = {symbol: dict(zip(symbols, to_finite(row, 6))) for symbol, row in zip(symbols, covariance_matrix)}
+
+    return {
+        "comparison": comparison,
+        "dates": prices.dates("%Y-%m-%d" if interval not in INTRADAY_SECONDS else "%Y-%m-%d %H:%M"),
+        "rebased": {symbol: to_finite(rebased[:, j]) for j, symbol in enumerate(symbols)},
+        "correlation": correlation,
+        "covariance": covariance,
+        "errors": prices.errors,
+    }
@@ -0,0 +1,222 @@
+"""
+Websites das empresas (usados nos logos) em um cache único e persistente.
+
+O website não vem nas cotações em lote nem no screener: só no ``Ticker.info``,
+uma requisição completa por símbolo. Da mesma resposta são guardados também
+os poucos campos de perfil que as cotações em lote não trazem (setor, beta e
+ROE, em ``PROFILE_FIELDS``). A tabela de performance e o screener
+mantinham caches próprios e buscavam os ausentes durante a requisição ou em
+rajadas sem nova tentativa. Aqui há um só cache, em memória e em SQLite no
+diretório de armazenamento local: as rotas só leem o cache e agendam os
+ausentes no grupo "fundamentals" do executor upstream (o logo fica None até a
+busca terminar). Sites encontrados valem por ``WEBSITE_TTL_SECONDS``; falhas
+(ex: limite de requisições do Yahoo) são tentadas de novo após
+``WEBSITE_ERROR_TTL_SECONDS``, mantendo o último site conhecido.
+
+Example:
+    from services.company_websites import company_websites
+
+    logos = company_websites.logos(["PETR4.SA", "VALE3.SA"])  # agenda os ausentes
+    profiles = company_websites.get_profiles(["PETR4.SA"])  # {"PETR4.SA": {"sector": ...} ou None}
+    company_websites.fill(symbols)  # tarefas em segundo plano: busca em lotes e aguarda
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, wait as wait_futures
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yfinance as yf
+
+from core.config import settings
+from core.executor import UpstreamSaturatedError, upstream_executor
+from core.local_db import LocalDatabase
+from core.logging import LoggerMixin
+from core.serialization import dumps_json, loads_json
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS company_profiles (
+    symbol TEXT PRIMARY KEY,
+    profile BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Campos do ``Ticker.info`` guardados por símbolo
+PROFILE_FIELDS = ("website", "sector", "beta", "returnOnEquity")
+
+LOGO_URL = "https://t1.gstatic.com/faviconV2?client=SOCIAL&type=FAVICON&fallback_opts=TYPE,SIZE,URL&size=128&url={}"
+WEBSITE_TTL_SECONDS = 7 * 24 * 3600
+# Falhas ao buscar o website são tentadas de novo bem antes
+WEBSITE_ERROR_TTL_SECONDS = 300
+
+
+def logo_url(website: Optional[str]) -> Optional[str]:
+    """URL do logo a partir do website da empresa."""
+    return LOGO_URL.format(website) if website else None
+
+
+class CompanyWebsites(LoggerMixin):
+    """
+    Cache de websites (e campos de perfil) por símbolo, preenchido de forma assíncrona.
+
+    Attributes:
+        path: Caminho do banco SQLite
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Configura o cache (o banco é lido no primeiro uso).
+
+        Args:
+            path: Caminho do banco (padrão: diretório de armazenamento local)
+        """
+        self.path = path or os.path.join(settings.LOCAL_STORAGE_DIR, "websites.sqlite3")
+        self._db = LocalDatabase(self.path, _SCHEMA)
+        # símbolo -> (perfil ou None, expires_at em epoch)
+        self._entries: Dict[str, Tuple[Optional[Dict[str, Any]], float]] = {}
+        self._pending: set = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get_many(self, symbols: Iterable[str], fetch: bool = True) -> Dict[str, Optional[str]]:
+        """
+        Websites conhecidos por símbolo (None quando ainda desconhecido).
+
+        Args:
+            symbols: Símbolos dos ativos
+            fetch: Agendar a busca dos ausentes e vencidos (sem aguardar)
+
+        Returns:
+            Dicionário símbolo -> website ou None
+        """
+        return {
+            symbol: profile.get("website") if profile else None
+            for symbol, profile in self.get_profiles(symbols, fetch=fetch).items()
+        }
+
+    def get_profiles(self, symbols: Iterable[str], fetch: bool = True) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Campos de perfil conhecidos por símbolo (None quando ainda desconhecidos).
+
+        Args:
+            symbols: Símbolos dos ativos
+            fetch: Agendar a busca dos ausentes e vencidos (sem aguardar)
+
+        Returns:
+            Dicionário símbolo -> {campo de ``PROFILE_FIELDS``: valor} ou None
+        """
+        self._ensure_loaded()
+        symbols = list(dict.fromkeys(symbols))
+        now = time.time()
+        profiles, due = {}, []
+        for symbol in symbols:
+            entry = self._entries.get(symbol)
+            profiles[symbol] = entry[0] if entry is not None else None
+            if entry is None or entry[1] <= now:
+                due.append(symbol)
+        if fetch and due:
+            self._submit(due)
+        return profiles
+
+    def logos(self, symbols: Iterable[str]) -> Dict[str, Optional[str]]:
+        """URL do logo por símbolo (None até o website estar em cache); agenda os ausentes."""
+        return {symbol: logo_url(website) for symbol, website in self.get_many(symbols).items()}
+
+    def fill(self, symbols: Iterable[str], batch: int = 8, stop: Optional[threading.Event] = None) -> int:
+        """
+        Busca os websites ausentes ou vencidos em lotes, aguardando cada lote.
+
+        Para tarefas em segundo plano: no máximo ``batch`` buscas ocupam o grupo
+        "fundamentals" por vez, e a fila cheia interrompe o preenchimento.
+
+        Args:
+            symbols: Símbolos dos ativos
+            batch: Buscas simultâneas
+            stop: Evento que interrompe o preenchimento
+
+        Returns:
+            Número de símbolos buscados
+        """
+        self._ensure_loaded()
+        now = time.time()
+        due = [s for s in dict.fromkeys(symbols) if self._entries.get(s, (None, 0.0))[1] <= now]
+        fetched = 0
+        for start in range(0, len(due), batch):
+            if stop is not None and stop.is_set():
+                break
+            futures = self._submit(due[start:start + batch])
+            if not futures:
+                break
+            wait_futures(futures)
+            fetched += len(futures)
+        return fetched
+
+    # ==================== AUXILIARES ====================
+
+    def _submit(self, symbols: List[str]) -> List[Future]:
+        """Agenda a busca dos símbolos que ainda não estão sendo buscados."""
+        with self._lock:
+            symbols = [s for s in symbols if s not in self._pending]
+            self._pending.update(symbols)
+        futures = []
+        for i, symbol in enumerate(symbols):
+            try:
+                future = upstream_executor.submit("fundamentals", self._fetch, symbol)
+            except (UpstreamSaturatedError, RuntimeError) as e:
+                # Requisições de usuários têm prioridade: o restante fica para depois
+                self.logger.warning(f"Busca de {len(symbols) - i} website(s) adiada: {str(e)}")
+                with self._lock:
+                    self._pending.difference_update(symbols[i:])
+                break
+            # Fora do lock: um Future já concluído executa o callback na hora
+            future.add_done_callback(lambda _, symbol=symbol: self._release(symbol))
+            futures.append(future)
+        return futures
+
+    def _release(self, symbol: str) -> None:
+        with self._lock:
+            self._pending.discard(symbol)
+
+    def _fetch(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Busca o perfil e grava no cache (falhas mantêm o último perfil conhecido)."""
+        previous = self._entries.get(symbol, (None, 0.0))[0]
+        try:
+            info = yf.Ticker(symbol).info
+            profile = {field: info.get(field) or None for field in PROFILE_FIELDS}
+            expires_at = time.time() + WEBSITE_TTL_SECONDS
+        except Exception as e:
+            self.logger.warning(f"Não foi possível obter o website de {symbol}: {str(e)}")
+            profile, expires_at = previous, time.time() + WEBSITE_ERROR_TTL_SECONDS
+        self._entries[symbol] = (profile, expires_at)
+        try:
+            with self._db.connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO company_profiles VALUES (?, ?, ?)",
+                    (symbol, dumps_json(profile), expires_at),
+                )
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"Website de {symbol} não gravado: {str(e)}")
+        return profile
+
+    def _ensure_loaded(self) -> None:
+        """Carrega os websites gravados para a memória (uma vez por processo)."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                rows = self._db.connection().execute(
+                    "SELECT symbol, profile, expires_at FROM company_profiles"
+                ).fetchall()
+                self._entries.update({symbol: (loads_json(profile), expires_at) for symbol, profile, expires_at in rows})
+            except (sqlite3.Error, OSError) as e:
+                self.logger.warning(f"Websites gravados indisponíveis: {str(e)}")
+            self._loaded = True
+
+
+# Instância única compartilhada pelas rotas e serviços
+company_websites = CompanyWebsites()
@@ -0,0 +1,316 @@
+"""
+Correlação e covariância entre centenas de tickers, calculadas em blocos.
+
+Um ``DataFrame.corr()`` sobre um frame largo com datas desalinhadas percorre
+os pares um a um e fica lento e pesado em memória com centenas de tickers.
+Aqui os fechamentos dos pregões encerrados formam uma matriz de retornos
+(união das datas, NaN onde o ticker não negociou) e os momentos de cada par
+são obtidos com produtos de matrizes sobre blocos de linhas do resultado,
+considerando só as datas em que os dois tickers têm retorno (tratamento par a
+par de lacunas, como no pandas).
+
+Opcionalmente a correlação é encolhida em direção à matriz identidade
+(covariância em direção à diagonal), com intensidade fixa ou estimada pelo
+método de Schäfer-Strimmer, o que estabiliza matrizes com mais tickers do que
+pregões. Como só pregões encerrados entram no cálculo, as matrizes ficam em
+cache até o próximo pregão e cada consulta (top-k de pares, matriz completa)
+é montada a partir delas.
+
+Example:
+    from services.correlation import correlation_service
+
+    result = correlation_service.correlate(["PETR4.SA", "VALE3.SA", "ITUB4.SA"], top_k=5)
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from core.config import settings
+from core.logging import LoggerMixin
+from services.analytics import periods_per_year, to_finite
+from services.market_calendar import CALENDARS
+from services.ohlcv_store import ohlcv_store
+
+
+def _column_means(returns: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Média de cada coluna ignorando NaN (0 em colunas vazias, sem avisos)."""
+    return np.where(valid, returns, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+
+
+def pairwise_moments(
+    returns: np.ndarray, min_periods: int, block_size: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Covariância e correlação de todos os pares com datas em comum (par a par).
+
+    Args:
+        returns: Matriz datas x tickers, com NaN onde não há retorno
+        min_periods: Mínimo de datas em comum para o par ter resultado
+        block_size: Linhas do resultado calculadas por vez
+
+    Returns:
+        Tupla (counts, covariance, correlation) de matrizes tickers x tickers;
+        pares com menos de ``min_periods`` datas ficam com NaN
+    """
+    valid = ~np.isnan(returns)
+    # Centralizar antes reduz o cancelamento numérico das somas de quadrados
+    centered = np.where(valid, returns - _column_means(returns, valid), 0.0)
+    present = valid.astype(np.float64)
+    squares = centered * centered
+
+    size = returns.shape[1]
+    counts = np.empty((size, size))
+    covariance = np.empty((size, size))
+    correlation = np.empty((size, size))
+    for first in range(0, size, block_size):
+        rows = slice(first, min(first + block_size, size))
+        n = present[:, rows].T @ present
+        sum_i = centered[:, rows].T @ present
+        sum_j = present[:, rows].T @ centered
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (centered[:, rows].T @ centered - sum_i * sum_j / n) / (n - 1)
+            var_i = (squares[:, rows].T @ present - sum_i * sum_i / n) / (n - 1)
+            var_j = (present[:, rows].T @ squares - sum_j * sum_j / n) / (n - 1)
+            corr = np.clip(cov / np.sqrt(var_i * var_j), -1.0, 1.0)
+        insufficient = n < max(min_periods, 2)
+        cov[insufficient] = np.nan
+        corr[insufficient] = np.nan
+        counts[rows], covariance[rows], correlation[rows] = n, cov, corr
+
+    diagonal = np.arange(size)
+    correlation[diagonal, diagonal] = np.where(np.isnan(np.diag(covariance)), np.nan, 1.0)
+    return counts, covariance, correlation
+
+
+def shrinkage_intensity(returns: np.ndarray, min_periods: int, block_size: int) -> float:
+    """
+    Intensidade ótima de encolhimento da correlação em direção à identidade.
+
+    Estimador de Schäfer-Strimmer (alvo "D"): soma das variâncias estimadas
+    das correlações fora da diagonal dividida pela soma dos seus quadrados.
+
+    Args:
+        returns: Matriz datas x tickers, com NaN onde não há retorno
+        min_periods: Mínimo de datas em comum para o par entrar na estimativa
+        block_size: Linhas calculadas por vez
+
+    Returns:
+        Intensidade entre 0 (sem encolhimento) e 1 (correlações zeradas)
+    """
+    valid = ~np.isnan(returns)
+    centered = np.where(valid, returns - _column_means(returns, valid), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        deviation = np.sqrt((centered * centered).sum(axis=0) / (valid.sum(axis=0) - 1))
+        standardized = centered / deviation
+    standardized = np.where(valid & np.isfinite(standardized), standardized, 0.0)
+    present = valid.astype(np.float64)
+    squares = standardized * standardized
+
+    size = returns.shape[1]
+    variance_sum = squared_sum = 0.0
+    for first in range(0, size, block_size):
+        rows = slice(first, min(first + block_size, size))
+        n = present[:, rows].T @ present
+        products = standardized[:, rows].T @ standardized
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = products / (n - 1)
+            variance = n / (n - 1) ** 3 * (squares[:, rows].T @ squares - products * products / n)
+        usable = n >= max(min_periods, 3)
+        usable[np.arange(rows.stop - rows.start), np.arange(rows.start, rows.stop)] = False
+        variance_sum += variance[usable].sum()
+        squared_sum += (corr[usable] ** 2).sum()
+    if squared_sum <= 0:
+        return 0.0
+    return float(np.clip(variance_sum / squared_sum, 0.0, 1.0))
+
+
+class CorrelationService(LoggerMixin):
+    """
+    Matrizes de correlação/covariância do universo, em cache por pregão.
+
+    Attributes:
+        block_size: Linhas das matrizes calculadas por vez
+        maxsize: Conjuntos de matrizes mantidos em cache
+        max_symbols: Máximo de tickers por consulta
+    """
+
+    def __init__(self, block_size: int = None, maxsize: int = None, max_symbols: int = None):
+        """
+        Inicializa o serviço.
+
+        Args:
+            block_size: Linhas por bloco (padrão: configuração global)
+            maxsize: Entradas do cache (padrão: configuração global)
+            max_symbols: Tickers por consulta (padrão: configuração global)
+        """
+        self.block_size = block_size or settings.CORRELATION_BLOCK_SIZE
+        self.maxsize = maxsize or settings.CORRELATION_CACHE_MAXSIZE
+        self.max_symbols = max_symbols or settings.CORRELATION_MAX_SYMBOLS
+        self.calendar = CALENDARS["B3"]
+        self._results: Dict[tuple, dict] = {}
+        self._results_session: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def correlate(
+        self,
+        symbols: List[str],
+        period: str = "1y",
+        min_periods: Optional[int] = None,
+        shrinkage: Optional[Union[float, str]] = None,
+        top_k: int = 20,
+        include_matrix: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Correlações entre os tickers nos pregões encerrados do período.
+
+        Args:
+            symbols: Tickers a correlacionar
+            period: Período dos retornos diários (ex: "6mo", "1y")
+            min_periods: Mínimo de pregões em comum por par (padrão: configuração global)
+            shrinkage: Intensidade do encolhimento (0 a 1), "auto" para estimá-la
+                ou None para não encolher
+            top_k: Número de pares mais e menos correlacionados retornados
+            include_matrix: Incluir as matrizes completas na resposta
+
+        Returns:
+            Dicionário com o pregão de referência, os tickers avaliados, a
+            intensidade de encolhimento aplicada, os pares mais e menos
+            correlacionados, as matrizes (se pedidas) e os erros por ticker
+
+        Raises:
+            ValueError: Se os parâmetros forem inválidos
+        """
+        universe = sorted({s.strip().upper() for s in symbols if s and s.strip()})
+        if len(universe) < 2:
+            raise ValueError("Informe ao menos dois tickers")
+        if len(universe) > self.max_symbols:
+            raise ValueError(f"Máximo de {self.max_symbols} tickers por consulta")
+        if isinstance(shrinkage, str) and shrinkage.lower() != "auto":
+            raise ValueError("shrinkage deve ser um número entre 0 e 1 ou 'auto'")
+        if isinstance(shrinkage, (int, float)) and not 0 <= shrinkage <= 1:
+            raise ValueError("shrinkage deve estar entre 0 e 1")
+        if top_k < 0:
+            raise ValueError("top_k não pode ser negativo")
+        min_periods = settings.CORRELATION_MIN_PERIODS if min_periods is None else min_periods
+        shrinkage = shrinkage.lower() if isinstance(shrinkage, str) else shrinkage
+
+        session_close = self.calendar.last_close()
+        key = (tuple(universe), period, min_periods, shrinkage)
+        with self._lock:
+            if self._results_session != session_close:
+                # Novo pregão encerrado: matrizes anteriores não valem mais
+                self._results.clear()
+                self._results_session = session_close
+            entry = self._results.get(key)
+        if entry is None:
+            entry = self._compute(universe, period, min_periods, shrinkage, session_close)
+            with self._lock:
+                if self._results_session == session_close:
+                    while len(self._results) >= self.maxsize:
+                        self._results.pop(next(iter(self._results)))
+                    self._results[key] = entry
+
+        tickers = entry["symbols"]
+        result = {
+            "date": entry["date"],
+            "period": period,
+            "symbols": tickers,
+            "observations": entry["observations"],
+            "min_periods": min_periods,
+            "shrinkage": entry["shrinkage"],
+            "most_correlated": self._pairs(entry, top_k, largest=True),
+            "least_correlated": self._pairs(entry, top_k, largest=False),
+            "matrix": None,
+            "errors": entry["errors"] or None,
+        }
+        if include_matrix:
+            result["matrix"] = {
+                "correlation": to_finite(entry["correlation"]),
+                "covariance": to_finite(entry["covariance"], 6),
+            }
+        return result
+
+    # ==================== AUXILIARES ====================
+
+    def _compute(
+        self,
+        symbols: List[str],
+        period: str,
+        min_periods: int,
+        shrinkage: Optional[Union[float, str]],
+        session_close: float,
+    ) -> dict:
+        """Calcula as matrizes e os pares (triângulo superior) ordenáveis."""
+        started = time.perf_counter()
+        last_day = datetime.fromtimestamp(session_close, self.calendar.tz).date()
+        end = (pd.Timestamp(last_day) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        series, errors = ohlcv_store.fetch_arrays(symbols, period=period, end=end, actions=False)
+
+        tickers = [symbol for symbol in symbols if symbol in series and len(series[symbol]["ts"]) > 1]
+        ts = np.unique(np.concatenate([series[symbol]["ts"] for symbol in tickers])) if tickers else np.empty(0)
+        closes = np.full((len(ts), len(tickers)), np.nan)
+        for j, symbol in enumerate(tickers):
+            closes[np.searchsorted(ts, series[symbol]["ts"]), j] = series[symbol]["Close"]
+        returns = closes[1:] / closes[:-1] - 1.0
+
+        counts, covariance, correlation = pairwise_moments(returns, min_periods, self.block_size)
+        intensity = None
+        if shrinkage is not None and len(tickers) > 1:
+            intensity = (
+                shrinkage_intensity(returns, min_periods, self.block_size)
+                if shrinkage == "auto"
+                else float(shrinkage)
+            )
+            off_diagonal = ~np.eye(len(tickers), dtype=bool)
+            correlation[off_diagonal] *= 1.0 - intensity
+            covariance[off_diagonal] *= 1.0 - intensity
+        covariance *= periods_per_year("1d")
+
+        upper = np.triu_indices(len(tickers), 1)
+        pair_values = correlation[upper]
+        finite = np.isfinite(pair_values)
+        self.logger.info(
+            f"Correlação de {len(tickers)} tickers ({int(finite.sum())} pares) "
+            f"em {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return {
+            "date": last_day.isoformat() if len(ts) else None,
+            "symbols": tickers,
+            "observations": max(len(ts) - 1, 0),
+            "shrinkage": round(intensity, 4) if intensity is not None else None,
+            "counts": counts,
+            "covariance": covariance,
+            "correlation": correlation,
+            "pairs": (upper[0][finite], upper[1][finite], pair_values[finite]),
+            "errors": errors,
+        }
+
+    @staticmethod
+    def _pairs(entry: dict, top_k: int, largest: bool) -> List[dict]:
+        """Os ``top_k`` pares de maior (ou menor) correlação."""
+        first, second, values = entry["pairs"]
+        k = min(top_k, len(values))
+        if not k:
+            return []
+        ranked = -values if largest else values
+        selected = np.argpartition(ranked, k - 1)[:k]
+        selected = selected[np.argsort(ranked[selected], kind="stable")]
+        symbols = entry["symbols"]
+        return [
+            {
+                "pair": [symbols[first[p]], symbols[second[p]]],
+                "correlation": round(float(values[p]), 4),
+                "covariance": to_finite(entry["covariance"][first[p], second[p]], 6),
+                "observations": int(entry["counts"][first[p], second[p]]),
+            }
+            for p in selected
+        ]
+
+
+# Instância única compartilhada pelas rotas
+correlation_service = CorrelationService()
@@ -0,0 +1,150 @@
+"""
+Download de histórico em lote para múltiplos tickers.
+
+Buscar o histórico de N tickers com ``yf.Ticker(symbol).history()`` em um laço
+custa N idas sequenciais ao Yahoo. Este módulo usa ``yf.download`` agrupado
+por ticker e com threads, dividindo listas grandes em blocos, e separa o
+resultado de volta em um DataFrame por símbolo com erros individuais, de forma
+que um símbolo inválido não derruba o lote inteiro.
+
+Example:
+    from services.history_batch import history_batch_fetcher
+
+    frames, errors = history_batch_fetcher.fetch(["PETR4.SA", "VALE3.SA"], period="1y")
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+from core.config import settings
+from core.logging import LoggerMixin
+
+
+class HistoryBatchFetcher(LoggerMixin):
+    """
+    Busca o histórico de vários tickers em poucas chamadas ao Yahoo Finance.
+
+    Attributes:
+        chunk_size: Número máximo de tickers por chamada a ``yf.download``
+        threads: Número de threads usadas pelo ``yf.download`` em cada bloco
+    """
+
+    def __init__(self, chunk_size: int = None, threads: int = None):
+        """
+        Inicializa o buscador em lote.
+
+        Args:
+            chunk_size: Tickers por bloco (padrão: configuração global)
+            threads: Threads por bloco (padrão: configuração global)
+        """
+        self.chunk_size = chunk_size or settings.HISTORY_BATCH_CHUNK_SIZE
+        self.threads = threads or settings.HISTORY_BATCH_THREADS
+
+    def fetch(
+        self,
+        symbols: Iterable[str],
+        period: Optional[str] = "1mo",
+        interval: str = "1d",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        prepost: bool = False,
+        auto_adjust: bool = True,
+        actions: bool = True,
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Obtém o histórico de vários tickers.
+
+        Os parâmetros seguem ``yf.Ticker.history``. Com ``actions=True`` as colunas
+        Dividends e Stock Splits são incluídas, como no histórico por ticker.
+
+        Args:
+            symbols: Símbolos dos tickers (duplicatas são ignoradas)
+            period: Período (ex: "1mo", "1y"); ignorado quando ``start`` é informado
+            interval: Intervalo dos candles (ex: "1d", "1h")
+            start: Data inicial (YYYY-MM-DD)
+            end: Data final (YYYY-MM-DD)
+            prepost: Incluir pre/post market
+            auto_adjust: Ajustar preços por dividendos/splits
+            actions: Incluir dividendos e desdobramentos
+
+        Returns:
+            Tupla (frames, errors): DataFrame por símbolo com índice de datas no
+            horário local da bolsa, e mensagem de erro por símbolo que falhou
+        """
+        requested = list(dict.fromkeys(s.strip() for s in symbols if s and s.strip()))
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+
+        for i in range(0, len(requested), self.chunk_size):
+            chunk = requested[i:i + self.chunk_size]
+            try:
+                data = yf.download(
+                    chunk,
+                    period=period,
+                    interval=interval,
+                    start=start,
+                    end=end,
+                    prepost=prepost,
+                    auto_adjust=auto_adjust,
+                    actions=actions,
+                    group_by="ticker",
+                    threads=min(self.threads, len(chunk)),
+                    # Horário local de cada bolsa, como em Ticker.history
+                    ignore_tz=True,
+                    progress=False,
+                )
+            except Exception as e:
+                self.logger.error(f"Erro no download em lote de {chunk}: {str(e)}")
+                for symbol in chunk:
+                    errors[symbol] = f"Erro ao obter histórico para {symbol}: {str(e)}"
+                continue
+
+            chunk_frames = self._split(data, chunk)
+            for symbol in chunk:
+                frame = chunk_frames.get(symbol)
+                if frame is None or frame.empty:
+                    errors[symbol] = f"Nenhum dado histórico encontrado para o ticker '{symbol}'."
+                else:
+                    frames[symbol] = frame
+
+        self.logger.info(
+            f"Histórico em lote: {len(frames)} sucessos, {len(errors)} erros "
+            f"em {math.ceil(len(requested) / self.chunk_size)} chamada(s)"
+        )
+        return frames, errors
+
+    @staticmethod
+    def _split(data: Optional[pd.DataFrame], symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Separa o DataFrame retornado pelo ``yf.download`` em um DataFrame por símbolo.
+
+        O download alinha todos os tickers no mesmo índice; as linhas que só
+        existem para outros tickers (feriados, fusos diferentes) são descartadas.
+        """
+        if data is None or data.empty:
+            return {}
+
+        result = {}
+        if isinstance(data.columns, pd.MultiIndex):
+            available = {str(t).upper(): t for t in data.columns.get_level_values(0).unique()}
+            for symbol in symbols:
+                key = available.get(symbol.upper())
+                if key is not None:
+                    result[symbol] = data[key]
+        elif len(symbols) == 1:
+            result[symbols[0]] = data
+
+        for symbol, frame in result.items():
+            frame = frame.dropna(how="all").rename_axis(columns=None)
+            if "Volume" in frame.columns and not frame["Volume"].isna().any():
+                # O alinhamento do download converte o volume para float
+                frame = frame.astype({"Volume": "int64"})
+            result[symbol] = frame
+        return result
+
+
+# Instância única compartilhada pelas rotas e serviços
+history_batch_fetcher = HistoryBatchFetcher()
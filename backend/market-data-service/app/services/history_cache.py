@@ -0,0 +1,598 @@
+"""
+Cache de histórico por faixa de datas.
+
+O cache das rotas usa como chave a tupla exata dos parâmetros, de forma que
+``period=1mo``, ``period=3mo`` e um ``start``/``end`` qualquer do mesmo ticker
+viram três downloads. Este cache guarda, por símbolo/intervalo, uma única série
+que cobre a maior janela já pedida: períodos são convertidos em janelas
+concretas (``services.market_calendar.resolve_period``) e qualquer pedido
+contido na cobertura é recortado localmente. Na primeira busca de um intervalo
+é baixada uma janela padrão mais larga que a pedida, para que a troca de
+período no gráfico não volte ao Yahoo.
+
+A série é atualizada com busca incremental (a partir do dia da última barra)
+somente depois do TTL e se houve pregão desde a última verificação. Pedidos
+sobrepostos de símbolos em comum esperam a mesma busca em vez de repeti-la.
+
+Intervalos mais grossos (ex: 15m, 1h) são agregados localmente a partir de uma
+série mais fina em cache que cubra a janela (``services.resampling``); o Yahoo
+só é consultado quando nenhuma série cobre o pedido.
+
+O Yahoo limita o intraday tanto no intervalo de cada requisição (ex: 7 dias
+para 1m) quanto na distância ao passado (ex: 30 dias para 1m, 60 para 5m), de
+forma que um ``start``/``end`` longo falhava ou vinha truncado. Janelas longas
+são recortadas ao histórico disponível, divididas em blocos permitidos e
+buscadas em paralelo (pool limitado); os blocos são unidos e as barras
+repetidas nas fronteiras descartadas. Um pedido que começa antes da cobertura
+só busca o trecho que falta.
+
+As séries são persistidas em SQLite no diretório de armazenamento local: uma
+série que saiu da memória (LRU ou reinício do processo) é recarregada do banco
+em vez de baixada de novo, e as barras continuam disponíveis depois que saem
+da janela servida pelo Yahoo.
+
+É usado para os intervalos intraday; barras diárias ou maiores ficam no
+armazenamento persistente (``services.ohlcv_store``).
+
+Example:
+    from services.history_cache import history_range_cache
+
+    frames, errors = history_range_cache.fetch(["PETR4.SA"], period="5d", interval="5m")
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import settings
+from core.local_db import LocalDatabase
+from core.logging import LoggerMixin
+from services.history_batch import history_batch_fetcher
+from services.hot_series import FIELDS
+from services.market_calendar import MAX_COVERAGE, calendar_for, last_sessions, resolve_period
+from services.resampling import INTRADAY_SECONDS, finer_intervals, resample_frame
+
+# Janela baixada na primeira busca de cada intervalo (dentro dos limites do Yahoo)
+SUPERSET_PERIODS = {
+    "1m": "5d",
+    "2m": "1mo",
+    "5m": "1mo",
+    "15m": "1mo",
+    "30m": "1mo",
+    "60m": "3mo",
+    "90m": "1mo",
+    "1h": "3mo",
+}
+
+# Limites do Yahoo por intervalo: (dias por requisição, dias de histórico disponíveis)
+YAHOO_INTRADAY_LIMITS = {
+    "1m": (7, 29),
+    "2m": (30, 59),
+    "5m": (30, 59),
+    "15m": (30, 59),
+    "30m": (30, 59),
+    "60m": (180, 729),
+    "90m": (30, 59),
+    "1h": (180, 729),
+}
+
+_ACTION_COLUMNS = ["Dividends", "Stock Splits"]
+
+# Campo do banco -> coluna do histórico (mesma ordem de ``FIELDS``)
+_FIELD_COLUMNS = dict(zip(
+    FIELDS, ("Open", "High", "Low", "Close", "Adj Close", "Volume", "Dividends", "Stock Splits")
+))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    series TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    adj_close REAL,
+    volume REAL,
+    dividends REAL,
+    splits REAL,
+    PRIMARY KEY (series, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS series (
+    series TEXT PRIMARY KEY,
+    covered_from INTEGER NOT NULL,
+    checked_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class _Series:
+    """Série em cache: barras, início da cobertura e última verificação."""
+
+    __slots__ = ("frame", "ts", "covered_from", "checked_at")
+
+    def __init__(self, frame: pd.DataFrame, covered_from: int, checked_at: float):
+        self.frame = frame
+        self.ts = frame.index.as_unit("s").asi8
+        self.covered_from = covered_from
+        self.checked_at = checked_at
+
+
+class HistoryRangeCache(LoggerMixin):
+    """
+    Séries de histórico em memória, servidas por recorte de faixa de datas.
+
+    Attributes:
+        ttl: Intervalo mínimo (s) entre buscas incrementais de uma série
+        maxsize: Número máximo de séries em cache (LRU)
+        workers: Blocos de uma janela longa buscados em paralelo
+        path: Caminho do banco SQLite (None = sem persistência)
+    """
+
+    def __init__(self, ttl: int = None, maxsize: int = None, workers: int = None, path: str = None):
+        """
+        Inicializa o cache (o banco é criado no primeiro uso).
+
+        Args:
+            ttl: Intervalo entre buscas incrementais (padrão: configuração global)
+            maxsize: Número máximo de séries (padrão: configuração global)
+            workers: Blocos buscados em paralelo (padrão: configuração global)
+            path: Caminho do banco (padrão: diretório de armazenamento local,
+                se a persistência estiver habilitada)
+        """
+        self.ttl = ttl if ttl is not None else settings.HISTORY_RANGE_CACHE_TTL_SECONDS
+        self.maxsize = maxsize or settings.HISTORY_RANGE_CACHE_MAXSIZE
+        self.workers = workers or settings.HISTORY_CHUNK_WORKERS
+        if path is None and settings.HISTORY_RANGE_CACHE_PERSIST:
+            path = os.path.join(settings.LOCAL_STORAGE_DIR, "intraday.sqlite3")
+        self.path = path
+        self._db = LocalDatabase(path, _SCHEMA) if path else None
+        # (símbolo, intervalo, prepost, auto_adjust) -> série
+        self._series: "OrderedDict[tuple, _Series]" = OrderedDict()
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def fetch(
+        self,
+        symbols: Iterable[str],
+        period: Optional[str] = "1mo",
+        interval: str = "1d",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        prepost: bool = False,
+        auto_adjust: bool = True,
+        actions: bool = True,
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Obtém o histórico de vários tickers, recortando de séries em cache.
+
+        Mesma assinatura e retorno de ``HistoryBatchFetcher.fetch``; períodos
+        não reconhecidos são repassados ao download em lote.
+        """
+        try:
+            start_ts, end_ts, sessions = resolve_period(period, start, end)
+        except ValueError:
+            return history_batch_fetcher.fetch(
+                symbols, period=period, interval=interval, start=start, end=end,
+                prepost=prepost, auto_adjust=auto_adjust, actions=actions,
+            )
+
+        requested = list(dict.fromkeys(s.strip() for s in symbols if s and s.strip()))
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+
+        # Símbolos cuja janela já está coberta por uma série mais fina: agregação local
+        for source, group in self._derivable(requested, interval, start_ts, prepost, auto_adjust).items():
+            source_frames, source_errors = self.fetch(
+                group, period=period, interval=source, start=start, end=end,
+                prepost=prepost, auto_adjust=auto_adjust, actions=actions,
+            )
+            errors.update(source_errors)
+            for symbol, frame in source_frames.items():
+                frames[symbol] = resample_frame(frame, interval, calendar_for(symbol))
+        requested = [symbol for symbol in requested if symbol not in frames and symbol not in errors]
+        if not requested:
+            return frames, errors
+
+        keys = {symbol: (symbol.upper(), interval, prepost, auto_adjust) for symbol in requested}
+
+        # Locks em ordem fixa: pedidos sobrepostos aguardam a mesma busca
+        with ExitStack() as stack:
+            for key in sorted(set(keys.values())):
+                stack.enter_context(self._key_lock(key))
+            errors.update(self._sync(keys, start_ts, end_ts, interval, prepost, auto_adjust))
+            cached = {symbol: self._load(key) for symbol, key in keys.items() if symbol not in errors}
+
+        for symbol, series in cached.items():
+            if series is None:
+                errors[symbol] = f"Nenhum dado histórico encontrado para o ticker '{symbol}'."
+                continue
+            lo = int(np.searchsorted(series.ts, start_ts, side="left"))
+            hi = len(series.ts) if end_ts is None else int(np.searchsorted(series.ts, end_ts, side="left"))
+            if sessions is not None:
+                lo += last_sessions(series.ts[lo:hi], sessions)
+            frame = series.frame.iloc[lo:hi]
+            if not actions:
+                frame = frame.drop(columns=_ACTION_COLUMNS, errors="ignore")
+            if frame.empty:
+                errors[symbol] = f"Nenhum dado histórico encontrado para o ticker '{symbol}'."
+            else:
+                frames[symbol] = frame
+        return frames, errors
+
+    def clear(self) -> None:
+        """Remove todas as séries em memória (as persistidas são mantidas)."""
+        with self._lock:
+            self._series.clear()
+
+    def shutdown(self) -> None:
+        """Encerra o pool de threads dos blocos."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ==================== AUXILIARES ====================
+
+    def _derivable(
+        self, symbols: List[str], interval: str, start_ts: int, prepost: bool, auto_adjust: bool
+    ) -> Dict[str, List[str]]:
+        """
+        Agrupa, por intervalo de origem, os símbolos que podem ser agregados de uma série mais fina.
+
+        Só entram símbolos sem série própria cobrindo a janela e com uma série
+        mais fina em cache que a cubra.
+        """
+        groups: Dict[str, List[str]] = {}
+        for symbol in symbols:
+            own = self._load((symbol.upper(), interval, prepost, auto_adjust))
+            if own is not None and own.covered_from <= start_ts:
+                continue
+            for source in finer_intervals(interval):
+                series = self._load((symbol.upper(), source, prepost, auto_adjust))
+                if series is not None and series.covered_from <= start_ts:
+                    groups.setdefault(source, []).append(symbol)
+                    break
+        return groups
+
+    def _sync(
+        self,
+        keys: Dict[str, tuple],
+        start_ts: int,
+        end_ts: Optional[int],
+        interval: str,
+        prepost: bool,
+        auto_adjust: bool,
+    ) -> Dict[str, str]:
+        """Busca as séries ausentes, o trecho que falta das que não cobrem o início e as desatualizadas."""
+        superset = SUPERSET_PERIODS.get(interval)
+        superset_start = resolve_period(superset)[0] if superset else None
+        now = time.time()
+
+        # (início, fim exclusivo; None = até agora) -> símbolos
+        fills: Dict[Tuple[int, Optional[int]], List[str]] = {}
+        delta: Dict[int, List[str]] = {}
+        limits = YAHOO_INTRADAY_LIMITS.get(interval)
+        horizon = now - limits[1] * 86400 if limits else None
+        for symbol, key in keys.items():
+            series = self._load(key)
+            if series is not None and horizon is not None and int(series.ts[-1]) < horizon:
+                # Lacuna além do histórico do Yahoo (ex: série gravada antes de um reinício
+                # longo): não há como completá-la, a série é baixada de novo
+                self._drop(key)
+                series = None
+            if series is None or start_ts < series.covered_from:
+                fill_from = superset_start if superset_start is not None and start_ts >= superset_start else start_ts
+                fill_until = None if series is None else series.covered_from
+                fills.setdefault((fill_from, fill_until), []).append(symbol)
+            elif (
+                (end_ts is None or end_ts > int(series.ts[-1]))
+                and now - series.checked_at >= self.ttl
+                and calendar_for(symbol).traded_since(series.checked_at, now, prepost)
+            ):
+                last_day = int(pd.Timestamp(int(series.ts[-1]), unit="s").normalize().timestamp())
+                delta.setdefault(last_day, []).append(symbol)
+
+        errors: Dict[str, str] = {}
+        for (fill_from, fill_until), group in fills.items():
+            frames, fetch_errors = self._fetch_range(group, fill_from, fill_until, interval, prepost, auto_adjust)
+            for symbol in group:
+                series = self._get(keys[symbol])
+                new = frames.get(symbol)
+                if new is not None:
+                    # Sobreposição com a série atual: prevalecem as barras recém-baixadas
+                    merged = new if series is None else self._stitch([series.frame, new])
+                    self._put(keys[symbol], _Series(merged, fill_from, now))
+                    self._save(keys[symbol], new, fill_from, now)
+                elif series is not None:
+                    # Trecho fora do histórico do Yahoo (ou falha): a série atual continua valendo
+                    if symbol not in fetch_errors:
+                        series.covered_from = fill_from
+                        self._save(keys[symbol], None, fill_from, series.checked_at)
+                else:
+                    errors[symbol] = fetch_errors.get(
+                        symbol, f"Nenhum dado histórico encontrado para o ticker '{symbol}'."
+                    )
+
+        for last_day, group in delta.items():
+            # Mesmo caminho em blocos da carga inicial (respeita os limites por requisição)
+            frames, fetch_errors = self._fetch_range(group, last_day, None, interval, prepost, auto_adjust)
+            for symbol in group:
+                series = self._get(keys[symbol])
+                new = frames.get(symbol)
+                if new is None:
+                    if symbol not in fetch_errors:
+                        # Sem barras novas: a série atual continua valendo até o próximo TTL
+                        series.checked_at = now
+                        self._save(keys[symbol], None, series.covered_from, now)
+                    # Falha: a série atual é servida, mas a busca é refeita na próxima requisição
+                    continue
+                merged = pd.concat([series.frame[series.frame.index < new.index[0]], new])
+                self._put(keys[symbol], _Series(merged, series.covered_from, now))
+                self._save(keys[symbol], new, series.covered_from, now, replace_from=new.index[0])
+        return errors
+
+    def _fetch_range(
+        self,
+        symbols: List[str],
+        start_ts: int,
+        end_ts: Optional[int],
+        interval: str,
+        prepost: bool,
+        auto_adjust: bool,
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Baixa uma janela em blocos permitidos pelo Yahoo, em paralelo, e une os blocos.
+
+        A janela é recortada ao histórico disponível do intervalo. Um símbolo
+        só entra nos erros se todos os blocos falharem; sem nenhum bloco a
+        buscar (janela inteira fora do histórico do Yahoo), nada é retornado.
+        """
+        specs = self._chunk_specs(start_ts, end_ts, interval)
+        if not specs:
+            return {}, {}
+
+        def download(spec: Tuple[Optional[str], Optional[str], Optional[str]]):
+            chunk_period, chunk_start, chunk_end = spec
+            return history_batch_fetcher.fetch(
+                symbols, period=chunk_period, interval=interval, start=chunk_start, end=chunk_end,
+                prepost=prepost, auto_adjust=auto_adjust, actions=True,
+            )
+
+        if len(specs) == 1:
+            results = [download(specs[0])]
+        else:
+            self.logger.info(f"Histórico {interval} de {len(symbols)} símbolo(s) em {len(specs)} blocos")
+            results = list(self._get_pool().map(download, specs))
+
+        frames: Dict[str, pd.DataFrame] = {}
+        errors: Dict[str, str] = {}
+        for symbol in symbols:
+            pieces = [self._naive(chunk_frames[symbol]) for chunk_frames, _ in results if symbol in chunk_frames]
+            if pieces:
+                frames[symbol] = self._stitch(pieces)
+            else:
+                errors[symbol] = results[-1][1].get(symbol, f"Erro ao obter histórico para {symbol}")
+        return frames, errors
+
+    @staticmethod
+    def _chunk_specs(
+        start_ts: int, end_ts: Optional[int], interval: str
+    ) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        """
+        Divide [start_ts, end_ts) em blocos (period, start, end) aceitos pelo Yahoo.
+
+        Os blocos são alinhados em dias; ``end_ts`` None deixa o último bloco
+        aberto, para trazer as barras mais recentes.
+        """
+        limits = YAHOO_INTRADAY_LIMITS.get(interval)
+        if limits is None:
+            # Intervalos sem limite conhecido: uma única requisição
+            if start_ts == MAX_COVERAGE:
+                return [("max", None, None)]
+            last = None
+            if end_ts is not None:
+                last = (pd.Timestamp(end_ts, unit="s") + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            return [(None, pd.Timestamp(start_ts, unit="s").strftime("%Y-%m-%d"), last)]
+
+        chunk_days, lookback_days = limits
+        today = pd.Timestamp.now().normalize()
+        first = today - pd.Timedelta(days=lookback_days)
+        if start_ts != MAX_COVERAGE:
+            first = max(first, pd.Timestamp(start_ts, unit="s").normalize())
+        # Fim exclusivo no dia seguinte ao limite, para sobrepor a série existente
+        last = today + pd.Timedelta(days=1)
+        if end_ts is not None:
+            last = min(last, pd.Timestamp(end_ts, unit="s").normalize() + pd.Timedelta(days=1))
+
+        specs = []
+        step = pd.Timedelta(days=chunk_days)
+        current = first
+        while current < last:
+            following = min(current + step, last)
+            open_end = end_ts is None and following == last
+            specs.append((
+                None, current.strftime("%Y-%m-%d"), None if open_end else following.strftime("%Y-%m-%d"),
+            ))
+            current = following
+        return specs
+
+    @staticmethod
+    def _stitch(pieces: List[pd.DataFrame]) -> pd.DataFrame:
+        """Une blocos em ordem cronológica; em barras repetidas prevalece o bloco mais recente da lista."""
+        merged = pd.concat(pieces) if len(pieces) > 1 else pieces[0]
+        merged = merged.sort_index(kind="stable")
+        return merged[~merged.index.duplicated(keep="last")]
+
+    @staticmethod
+    def _naive(frame: pd.DataFrame) -> pd.DataFrame:
+        """Garante índice sem fuso (horário local da bolsa), como no download em lote."""
+        if isinstance(frame.index, pd.DatetimeIndex) and frame.index.tz is not None:
+            return frame.tz_localize(None)
+        return frame
+
+    def _get(self, key: tuple) -> Optional[_Series]:
+        """Retorna a série em cache, marcando-a como usada recentemente."""
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+            return series
+
+    def _put(self, key: tuple, series: _Series) -> None:
+        """Armazena a série, descartando as menos usadas além de ``maxsize``."""
+        with self._lock:
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.maxsize:
+                self._series.popitem(last=False)
+
+    def _drop(self, key: tuple) -> None:
+        """Remove a série da memória e do banco."""
+        with self._lock:
+            self._series.pop(key, None)
+        if self._db is None:
+            return
+        try:
+            with self._db.connection() as conn:
+                conn.execute("DELETE FROM bars WHERE series = ?", (self._db_key(key),))
+                conn.execute("DELETE FROM series WHERE series = ?", (self._db_key(key),))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Erro ao remover série intraday {key}: {str(e)}")
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        """Lock de busca de uma série (os livres de séries fora da memória são descartados)."""
+        with self._lock:
+            if len(self._locks) > 2 * self.maxsize:
+                # Na pior hipótese, um pedido concorrente cria outro lock e repete uma busca
+                self._locks = {
+                    k: lock for k, lock in self._locks.items() if lock.locked() or k in self._series
+                }
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Cria sob demanda o pool usado para buscar blocos em paralelo."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="history-chunk"
+                    )
+        return self._pool
+
+    # ==================== PERSISTÊNCIA ====================
+
+    @staticmethod
+    def _db_key(key: tuple) -> str:
+        """Identificador da série no banco."""
+        symbol, interval, prepost, auto_adjust = key
+        return f"{symbol}|{interval}|{int(prepost)}|{int(auto_adjust)}"
+
+    def _load(self, key: tuple) -> Optional[_Series]:
+        """Retorna a série da memória ou, na ausência, do banco."""
+        series = self._get(key)
+        if series is not None or self._db is None:
+            return series
+        try:
+            conn = self._db.connection()
+            meta = conn.execute(
+                "SELECT covered_from, checked_at FROM series WHERE series = ?", (self._db_key(key),)
+            ).fetchone()
+            if meta is None:
+                return None
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, adj_close, volume, dividends, splits "
+                "FROM bars WHERE series = ? ORDER BY ts",
+                (self._db_key(key),),
+            ).fetchall()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Erro ao ler série intraday {key}: {str(e)}")
+            return None
+        if not rows:
+            return None
+
+        data = np.array(rows, dtype=float).T
+        interval, auto_adjust = key[1], key[3]
+        index = pd.DatetimeIndex(
+            data[0].astype(np.int64).astype("datetime64[s]"),
+            name="Datetime" if interval in INTRADAY_SECONDS else "Date",
+        )
+        columns = {}
+        for field, values in zip(FIELDS, data[1:]):
+            if field == "adj_close" and auto_adjust:
+                continue
+            if field == "volume" and not np.isnan(values).any():
+                values = values.astype(np.int64)
+            columns[_FIELD_COLUMNS[field]] = values
+        series = _Series(pd.DataFrame(columns, index=index), meta[0], meta[1])
+        self._put(key, series)
+        return series
+
+    def _save(
+        self,
+        key: tuple,
+        frame: Optional[pd.DataFrame],
+        covered_from: int,
+        checked_at: float,
+        replace_from: Optional[pd.Timestamp] = None,
+    ) -> None:
+        """
+        Persiste barras novas e a cobertura de uma série.
+
+        Args:
+            key: Chave da série
+            frame: Barras a gravar (None = só a cobertura/verificação)
+            covered_from: Início da cobertura
+            checked_at: Última verificação
+            replace_from: Remove antes as barras a partir deste instante (busca incremental)
+        """
+        if self._db is None:
+            return
+        series_key = self._db_key(key)
+        try:
+            with self._db.connection() as conn:
+                if replace_from is not None:
+                    conn.execute(
+                        "DELETE FROM bars WHERE series = ? AND ts >= ?",
+                        (series_key, int(replace_from.timestamp())),
+                    )
+                if frame is not None and len(frame):
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._rows(series_key, frame),
+                    )
+                conn.execute(
+                    "INSERT OR REPLACE INTO series VALUES (?, ?, ?)", (series_key, covered_from, checked_at)
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Erro ao gravar série intraday {key}: {str(e)}")
+
+    @staticmethod
+    def _rows(series_key: str, frame: pd.DataFrame) -> List[tuple]:
+        """Converte um DataFrame de histórico em linhas da tabela ``bars``."""
+        columns = [frame.index.as_unit("s").asi8.tolist()]
+        for field in FIELDS:
+            name = _FIELD_COLUMNS[field]
+            if field == "adj_close" and name not in frame.columns:
+                name = "Close"
+            if name not in frame.columns:
+                columns.append([None] * len(frame))
+                continue
+            values = frame[name].astype(float).to_numpy()
+            columns.append(np.where(np.isnan(values), None, values).tolist())
+        return [(series_key, *row) for row in zip(*columns)]
+
+
+# Instância única compartilhada pelas rotas e serviços
+history_range_cache = HistoryRangeCache()
@@ -0,0 +1,199 @@
+"""
+Camada quente de séries OHLCV em arquivos mapeados em memória.
+
+Para os ~100 tickers mais consultados (carteira do Ibovespa e os símbolos do
+panorama de mercado), cada série fica em um arquivo binário com colunas
+contíguas: timestamps int64 seguidos de um bloco float64 com uma linha por
+campo (open, high, low, close, adj_close, volume, dividends, splits). Cada
+worker do uvicorn mapeia o arquivo com ``np.memmap`` e recorta janelas por
+busca binária na coluna de timestamps, sem copiar dados nem montar DataFrames;
+as páginas são compartilhadas entre os workers pelo cache do sistema.
+
+Os arquivos são escritos pelo armazenamento OHLCV após cada sincronização e
+substituídos atomicamente (``os.replace``): leitores com o mapeamento antigo
+continuam válidos e a nova versão é detectada pelo ``stat`` do arquivo.
+
+Example:
+    from services.hot_series import hot_series_tier
+
+    series = hot_series_tier.get("PETR4.SA", "1d")
+    if series is not None:
+        window = series.window(start_ts, end_ts)
+        closes = window["close"]
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+from core.config import settings
+from core.logging import LoggerMixin
+
+# Campos do bloco float64, na ordem em que são gravados
+FIELDS = ("open", "high", "low", "close", "adj_close", "volume", "dividends", "splits")
+
+_MAGIC = b"OHLCV001"
+_HEADER_SIZE = 16  # magic (8 bytes) + número de barras (int64)
+
+# Carteira teórica do Ibovespa (aproximada; revisar a cada rebalanceamento quadrimestral)
+IBOV_SYMBOLS = [
+    f"{code}.SA" for code in (
+        "ABEV3", "ALOS3", "ASAI3", "AURE3", "AZZA3", "B3SA3", "BBAS3", "BBDC3", "BBDC4",
+        "BBSE3", "BEEF3", "BPAC11", "BRAP4", "BRAV3", "BRFS3", "BRKM5", "CCRO3", "CMIG4",
+        "CMIN3", "COGN3", "CPFE3", "CPLE6", "CRFB3", "CSAN3", "CSNA3", "CVCB3", "CXSE3",
+        "CYRE3", "DIRR3", "EGIE3", "ELET3", "ELET6", "EMBR3", "ENEV3", "ENGI11", "EQTL3",
+        "FLRY3", "GGBR4", "GOAU4", "HAPV3", "HYPE3", "IGTI11", "IRBR3", "ISAE4", "ITSA4",
+        "ITUB4", "KLBN11", "LREN3", "MGLU3", "MOTV3", "MRVE3", "MULT3", "NTCO3", "PCAR3",
+        "PETR3", "PETR4", "PETZ3", "POMO4", "PRIO3", "PSSA3", "RADL3", "RAIL3", "RAIZ4",
+        "RDOR3", "RECV3", "RENT3", "SANB11", "SBSP3", "SLCE3", "SMTO3", "STBP3", "SUZB3",
+        "TAEE11", "TIMS3", "TOTS3", "UGPA3", "USIM5", "VALE3", "VAMO3", "VBBR3", "VIVA3",
+        "VIVT3", "WEGE3", "YDUQ3",
+    )
+]
+
+
+class HotSeries:
+    """
+    Série OHLCV mapeada em memória.
+
+    Attributes:
+        ts: Timestamps (segundos, horário local da bolsa) em ordem crescente
+        columns: Campo -> array float64 (visões do arquivo mapeado)
+    """
+
+    def __init__(self, path: str):
+        """
+        Mapeia o arquivo da série.
+
+        Args:
+            path: Caminho do arquivo gravado por ``HotSeriesTier.publish``
+
+        Raises:
+            ValueError: Se o arquivo não estiver no formato esperado
+        """
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if raw.size < _HEADER_SIZE or bytes(raw[:8]) != _MAGIC:
+            raise ValueError(f"Arquivo de série inválido: {path}")
+        count = int(raw[8:_HEADER_SIZE].view(np.int64)[0])
+        ts_end = _HEADER_SIZE + 8 * count
+        self.ts = raw[_HEADER_SIZE:ts_end].view(np.int64)
+        block = raw[ts_end:ts_end + 8 * count * len(FIELDS)].view(np.float64).reshape(len(FIELDS), count)
+        self.columns = dict(zip(FIELDS, block))
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def window(self, start_ts: int, end_ts: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Recorta a janela [start_ts, end_ts) sem copiar os dados.
+
+        Args:
+            start_ts: Início inclusivo (segundos)
+            end_ts: Fim exclusivo (segundos); None = até a última barra
+
+        Returns:
+            Dicionário com "ts" e cada campo de ``FIELDS``, como visões somente leitura
+        """
+        lo = int(np.searchsorted(self.ts, start_ts, side="left"))
+        hi = len(self.ts) if end_ts is None else int(np.searchsorted(self.ts, end_ts, side="left"))
+        result = {"ts": self.ts[lo:hi]}
+        for field, values in self.columns.items():
+            result[field] = values[lo:hi]
+        return result
+
+
+class HotSeriesTier(LoggerMixin):
+    """
+    Conjunto de séries quentes mapeadas em memória, compartilhado pelos workers.
+
+    Attributes:
+        directory: Diretório dos arquivos das séries
+    """
+
+    def __init__(self, directory: str = None, symbols: Iterable[str] = IBOV_SYMBOLS):
+        """
+        Inicializa a camada quente.
+
+        Args:
+            directory: Diretório dos arquivos (padrão: diretório de armazenamento local)
+            symbols: Símbolos mantidos na camada quente
+        """
+        self.directory = directory or os.path.join(settings.LOCAL_STORAGE_DIR, "hot")
+        self._symbols = {s.upper() for s in symbols}
+        # (símbolo, intervalo) -> (identidade do arquivo, série mapeada)
+        self._mapped: Dict[Tuple[str, str], Tuple[tuple, HotSeries]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, symbols: Iterable[str]) -> None:
+        """Adiciona símbolos à camada quente (ex: os do panorama de mercado)."""
+        with self._lock:
+            self._symbols.update(s.upper() for s in symbols)
+
+    def is_hot(self, symbol: str) -> bool:
+        """Indica se o símbolo é mantido na camada quente."""
+        return settings.HOT_SERIES_ENABLED and symbol.upper() in self._symbols
+
+    def get(self, symbol: str, interval: str) -> Optional[HotSeries]:
+        """
+        Retorna a série mapeada, remapeando se o arquivo foi substituído.
+
+        Args:
+            symbol: Símbolo do ticker
+            interval: Intervalo dos candles
+
+        Returns:
+            Série mapeada ou None se o arquivo ainda não existe
+        """
+        key = (symbol.upper(), interval)
+        path = self._path(*key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._mapped.get(key)
+            if cached is not None and cached[0] == identity:
+                return cached[1]
+        try:
+            series = HotSeries(path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Não foi possível mapear a série quente {key}: {str(e)}")
+            return None
+        with self._lock:
+            self._mapped[key] = (identity, series)
+        return series
+
+    def publish(self, symbol: str, interval: str, ts: np.ndarray, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Grava a série completa e substitui o arquivo atual atomicamente.
+
+        Args:
+            symbol: Símbolo do ticker
+            interval: Intervalo dos candles
+            ts: Timestamps em segundos, em ordem crescente
+            columns: Campo de ``FIELDS`` -> valores (NaN para ausentes)
+        """
+        path = self._path(symbol.upper(), interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        block = np.vstack([np.asarray(columns[field], dtype=np.float64) for field in FIELDS])
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(np.int64(len(ts)).tobytes())
+            f.write(np.ascontiguousarray(ts, dtype=np.int64).tobytes())
+            f.write(np.ascontiguousarray(block).tobytes())
+        os.replace(tmp_path, path)
+
+    def _path(self, symbol: str, interval: str) -> str:
+        """Caminho do arquivo de uma série (símbolos como ^BVSP e USDBRL=X são escapados)."""
+        return os.path.join(self.directory, interval, quote(symbol, safe="") + ".bin")
+
+
+# Instância única compartilhada pelas rotas e serviços
+hot_series_tier = HotSeriesTier()
@@ -0,0 +1,677 @@
+"""
+Motor de indicadores técnicos com estado incremental.
+
+A análise técnica baixava o histórico e recalculava todos os indicadores com
+``rolling``/``ewm`` do pandas a cada chamada. Aqui cada (símbolo, intervalo)
+mantém o estado dos indicadores já calculados (somas da janela móvel, último
+valor das médias exponenciais, médias de Wilder do RSI/ATR, acumulados do OBV e
+VWAP): barras novas atualizam os indicadores em O(barras novas), e um
+indicador pedido pela primeira vez é calculado uma única vez sobre as barras já
+guardadas.
+
+A última barra de uma série pode estar em formação (pregão aberto), então ela
+nunca entra no estado: é aplicada sobre uma cópia a cada leitura. Se o ajuste
+por proventos alterar os preços já guardados, ou o pedido precisar de
+histórico anterior ao estado, o estado do símbolo é recalculado.
+
+Os cálculos são vetorizados em numpy; as médias exponenciais usam a forma
+fechada da recorrência em blocos (sem laço por barra).
+
+Novos indicadores são subclasses de ``Indicator`` registradas em
+``INDICATORS``; o pedido usa o nome e os parâmetros separados por "_"
+(ex: "sma_200", "bbands_20_2", "macd_12_26_9").
+
+Example:
+    from services.indicators import indicator_engine
+
+    frame = indicator_engine.compute("PETR4.SA", period="1y", indicators="sma_20,rsi_14,macd")
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.config import settings
+from core.logging import LoggerMixin
+from services.market_calendar import MAX_COVERAGE, last_sessions, resolve_period
+from services.ohlcv_store import ohlcv_store
+from services.resampling import INTRADAY_SECONDS
+
+# Indicadores calculados quando o pedido não especifica nenhum
+DEFAULT_INDICATORS = "sma_20,sma_50,ema_12,ema_26,rsi_14,bbands_20_2"
+
+# Colunas de preço guardadas no estado e devolvidas junto com os indicadores
+_BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits")
+
+# Tamanho dos blocos da forma fechada da média exponencial
+_EMA_BLOCK = 64
+
+
+def exponential_smoothing(values: np.ndarray, alpha: float, carry) -> np.ndarray:
+    """
+    Média exponencial ``y[k] = (1 - alpha) * y[k-1] + alpha * x[k]`` a partir de ``carry``.
+
+    Em cada bloco, ``y[k] = d^(k+1) * (carry + alpha * sum(x[j] / d^(j+1)))``
+    com ``d = 1 - alpha``; blocos curtos mantêm ``d^-k`` dentro da precisão.
+    Aceita uma matriz (barras nas linhas, séries nas colunas) com ``carry``
+    por coluna.
+    """
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return values.astype(np.float64, copy=True)
+    result = np.empty(values.shape)
+    for lo in range(0, len(values), _EMA_BLOCK):
+        block = values[lo:lo + _EMA_BLOCK]
+        powers = decay ** np.arange(1, len(block) + 1)
+        if block.ndim == 2:
+            powers = powers[:, None]
+        smoothed = powers * (carry + alpha * np.cumsum(block / powers, axis=0))
+        result[lo:lo + len(block)] = smoothed
+        carry = smoothed[-1]
+    return result
+
+
+class _Smoother:
+    """Média exponencial semeada pela média simples dos primeiros ``period`` valores."""
+
+    def __init__(self, period: int, alpha: float):
+        self.period = period
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = np.nan
+
+    def update(self, values: np.ndarray) -> np.ndarray:
+        """Consome valores novos e retorna a média após cada um (NaN no aquecimento)."""
+        result = np.full(len(values), np.nan)
+        position = 0
+        if self.count < self.period:
+            position = min(self.period - self.count, len(values))
+            self.total += float(values[:position].sum())
+            self.count += position
+            if self.count == self.period:
+                self.value = self.total / self.period
+                result[position - 1] = self.value
+        if position < len(values):
+            result[position:] = exponential_smoothing(values[position:], self.alpha, self.value)
+            self.value = float(result[-1])
+        return result
+
+
+class _Window:
+    """Últimos ``size - 1`` valores, para janelas móveis que atravessam atualizações."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tail = np.empty(0)
+
+    def extend(self, values: np.ndarray) -> Tuple[np.ndarray, int, int]:
+        """
+        Junta os valores novos ao final guardado.
+
+        Returns:
+            Tupla (valores, primeira, janela): valores com o final anterior, posição
+            em ``values`` da primeira janela completa e índice dessa janela em
+            ``valores``
+        """
+        previous = len(self.tail)
+        joined = np.concatenate((self.tail, values))
+        self.tail = joined[max(0, len(joined) - (self.size - 1)):]
+        first = max(0, self.size - 1 - previous)
+        return joined, first, previous + first - self.size + 1
+
+
+class Indicator:
+    """
+    Indicador com estado incremental.
+
+    Subclasses definem ``warmup`` (barras até os valores estabilizarem, usado
+    para buscar histórico anterior à janela pedida), ``columns`` e ``update``,
+    que consome barras novas em ordem e avança o estado.
+    """
+
+    warmup = 0
+
+    def columns(self) -> Tuple[str, ...]:
+        """Nomes das colunas produzidas."""
+        raise NotImplementedError
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Consome barras novas.
+
+        Args:
+            bars: Arrays "ts", "open", "high", "low", "close" e "volume" das barras novas
+
+        Returns:
+            Valores de cada coluna para as barras novas (NaN no aquecimento)
+        """
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    """Média móvel simples (soma da janela por somas acumuladas)."""
+
+    def __init__(self, period: int = 20):
+        self.period = int(period)
+        self.warmup = self.period
+        self._window = _Window(self.period)
+
+    def columns(self) -> Tuple[str, ...]:
+        return (f"SMA_{self.period}",)
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        joined, first, window = self._window.extend(bars["close"])
+        result = np.full(len(bars["close"]), np.nan)
+        if first < len(result):
+            sums = np.concatenate(([0.0], np.cumsum(joined)))
+            result[first:] = (sums[self.period:] - sums[:-self.period])[window:] / self.period
+        return {self.columns()[0]: result}
+
+
+class EMA(Indicator):
+    """Média móvel exponencial (semeada pela média simples do primeiro período)."""
+
+    def __init__(self, period: int = 20):
+        self.period = int(period)
+        self.warmup = 3 * self.period
+        self._smoother = _Smoother(self.period, 2.0 / (self.period + 1))
+
+    def columns(self) -> Tuple[str, ...]:
+        return (f"EMA_{self.period}",)
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        return {self.columns()[0]: self._smoother.update(bars["close"])}
+
+
+class RSI(Indicator):
+    """Índice de força relativa com as médias de Wilder."""
+
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self.warmup = 5 * self.period
+        self._gains = _Smoother(self.period, 1.0 / self.period)
+        self._losses = _Smoother(self.period, 1.0 / self.period)
+        self._last_close: Optional[float] = None
+
+    def columns(self) -> Tuple[str, ...]:
+        return ("RSI",) if self.period == 14 else (f"RSI_{self.period}",)
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        close = bars["close"]
+        result = np.full(len(close), np.nan)
+        if not len(close):
+            return {self.columns()[0]: result}
+        # A primeira barra da série não tem variação
+        offset = 1 if self._last_close is None else 0
+        previous = close[:1] if self._last_close is None else np.array([self._last_close])
+        delta = np.diff(np.concatenate((previous, close)))[offset:]
+        self._last_close = float(close[-1])
+
+        gains = self._gains.update(np.maximum(delta, 0.0))
+        losses = self._losses.update(np.maximum(-delta, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + gains / losses)
+        result[offset:] = np.where(losses == 0.0, np.where(gains == 0.0, 50.0, 100.0), rsi)
+        result[offset:][np.isnan(gains)] = np.nan
+        return {self.columns()[0]: result}
+
+
+class BollingerBands(Indicator):
+    """Bandas de Bollinger: média simples ± ``deviations`` desvios-padrão amostrais."""
+
+    def __init__(self, period: int = 20, deviations: float = 2.0):
+        self.period = int(period)
+        self.deviations = float(deviations)
+        self.warmup = self.period
+        self._window = _Window(self.period)
+
+    def columns(self) -> Tuple[str, ...]:
+        if self.period == 20 and self.deviations == 2.0:
+            return ("BB_Middle", "BB_Upper", "BB_Lower")
+        suffix = f"{self.period}_{self.deviations:g}"
+        return (f"BB_Middle_{suffix}", f"BB_Upper_{suffix}", f"BB_Lower_{suffix}")
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        joined, first, window = self._window.extend(bars["close"])
+        middle = np.full(len(bars["close"]), np.nan)
+        upper, lower = middle.copy(), middle.copy()
+        if first < len(middle):
+            windows = sliding_window_view(joined, self.period)[window:]
+            mean = windows.mean(axis=1)
+            band = self.deviations * windows.std(axis=1, ddof=1)
+            middle[first:], upper[first:], lower[first:] = mean, mean + band, mean - band
+        return dict(zip(self.columns(), (middle, upper, lower)))
+
+
+class MACD(Indicator):
+    """MACD: diferença entre as médias exponenciais rápida e lenta, linha de sinal e histograma."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = int(fast), int(slow), int(signal)
+        self.warmup = 3 * self.slow + self.signal
+        self._fast = _Smoother(self.fast, 2.0 / (self.fast + 1))
+        self._slow = _Smoother(self.slow, 2.0 / (self.slow + 1))
+        self._signal = _Smoother(self.signal, 2.0 / (self.signal + 1))
+
+    def columns(self) -> Tuple[str, ...]:
+        if (self.fast, self.slow, self.signal) == (12, 26, 9):
+            return ("MACD", "MACD_Signal", "MACD_Hist")
+        suffix = f"{self.fast}_{self.slow}_{self.signal}"
+        return (f"MACD_{suffix}", f"MACD_Signal_{suffix}", f"MACD_Hist_{suffix}")
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        macd = self._fast.update(bars["close"]) - self._slow.update(bars["close"])
+        signal = np.full(len(macd), np.nan)
+        # A linha de sinal só começa quando a média lenta termina o aquecimento
+        valid = ~np.isnan(macd)
+        signal[valid] = self._signal.update(macd[valid])
+        return dict(zip(self.columns(), (macd, signal, macd - signal)))
+
+
+class ATR(Indicator):
+    """Average True Range com a média de Wilder."""
+
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self.warmup = 5 * self.period
+        self._smoother = _Smoother(self.period, 1.0 / self.period)
+        self._last_close: Optional[float] = None
+
+    def columns(self) -> Tuple[str, ...]:
+        return (f"ATR_{self.period}",)
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        high, low, close = bars["high"], bars["low"], bars["close"]
+        if not len(close):
+            return {self.columns()[0]: np.empty(0)}
+        previous = np.concatenate(([np.nan if self._last_close is None else self._last_close], close[:-1]))
+        self._last_close = float(close[-1])
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+        return {self.columns()[0]: self._smoother.update(true_range)}
+
+
+class OBV(Indicator):
+    """On-Balance Volume: volume acumulado com o sinal da variação do fechamento."""
+
+    def __init__(self):
+        self._total = 0.0
+        self._last_close: Optional[float] = None
+
+    def columns(self) -> Tuple[str, ...]:
+        return ("OBV",)
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        close = bars["close"]
+        if not len(close):
+            return {"OBV": np.empty(0)}
+        previous = np.concatenate(([close[0] if self._last_close is None else self._last_close], close[:-1]))
+        self._last_close = float(close[-1])
+        result = self._total + np.cumsum(np.sign(close - previous) * bars["volume"])
+        self._total = float(result[-1])
+        return {"OBV": result}
+
+
+class VWAP(Indicator):
+    """Preço médio ponderado por volume, reiniciado a cada sessão (dia)."""
+
+    def __init__(self):
+        self._day: Optional[int] = None
+        self._price_volume = 0.0
+        self._volume = 0.0
+
+    def columns(self) -> Tuple[str, ...]:
+        return ("VWAP",)
+
+    def update(self, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        if not len(bars["ts"]):
+            return {"VWAP": np.empty(0)}
+        day = bars["ts"] // 86400
+        volume = bars["volume"]
+        price_volume = (bars["high"] + bars["low"] + bars["close"]) / 3.0 * volume
+
+        new_day = np.empty(len(day), dtype=bool)
+        new_day[0] = day[0] != self._day
+        new_day[1:] = day[1:] != day[:-1]
+        # Acumulados desde o início da sessão de cada barra (ou desde o estado anterior)
+        last_reset = np.maximum.accumulate(np.where(new_day, np.arange(len(day)), -1))
+        cumulative_pv, cumulative_v = np.cumsum(price_volume), np.cumsum(volume)
+        base_pv = np.where(last_reset >= 0, (cumulative_pv - price_volume)[last_reset], -self._price_volume)
+        base_v = np.where(last_reset >= 0, (cumulative_v - volume)[last_reset], -self._volume)
+        session_pv, session_v = cumulative_pv - base_pv, cumulative_v - base_v
+
+        self._day = int(day[-1])
+        self._price_volume, self._volume = float(session_pv[-1]), float(session_v[-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"VWAP": np.where(session_v > 0, session_pv / session_v, np.nan)}
+
+
+# Nome usado nos pedidos -> (classe, parâmetros padrão)
+INDICATORS = {
+    "sma": (SMA, (20,)),
+    "ema": (EMA, (20,)),
+    "rsi": (RSI, (14,)),
+    "bbands": (BollingerBands, (20, 2)),
+    "macd": (MACD, (12, 26, 9)),
+    "atr": (ATR, (14,)),
+    "obv": (OBV, ()),
+    "vwap": (VWAP, ()),
+}
+
+
+def parse_indicators(spec: Optional[str]) -> List[str]:
+    """
+    Normaliza uma lista de indicadores separada por vírgulas.
+
+    Parâmetros omitidos recebem os valores padrão ("rsi" vira "rsi_14").
+
+    Raises:
+        ValueError: Se um indicador ou parâmetro não for reconhecido
+    """
+    names = []
+    for item in (spec or DEFAULT_INDICATORS).split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        kind, *params = item.split("_")
+        if kind not in INDICATORS:
+            raise ValueError(f"Indicador não suportado: '{kind}' (disponíveis: {', '.join(INDICATORS)})")
+        defaults = INDICATORS[kind][1]
+        if len(params) > len(defaults):
+            raise ValueError(f"Parâmetros demais para o indicador '{kind}': '{item}'")
+        try:
+            values = [float(value) for value in params]
+        except ValueError:
+            raise ValueError(f"Parâmetro inválido no indicador '{item}'")
+        # Períodos são inteiros positivos; só o número de desvios das bandas aceita fração
+        for position, value in enumerate(values):
+            fractional = kind == "bbands" and position == 1
+            if value <= 0 or not (fractional or value.is_integer()):
+                raise ValueError(f"Parâmetros do indicador '{item}' devem ser períodos inteiros positivos")
+        values += list(defaults[len(values):])
+        names.append("_".join([kind, *(f"{value:g}" for value in values)]))
+    return list(dict.fromkeys(names))
+
+
+def create_indicator(name: str) -> Indicator:
+    """Cria o indicador a partir de um nome normalizado por ``parse_indicators``."""
+    kind, *params = name.split("_")
+    indicator_class = INDICATORS[kind][0]
+    return indicator_class(*(float(value) for value in params))
+
+
+class _Buffer:
+    """Array que cresce por duplicação da capacidade (acréscimo amortizado O(novos))."""
+
+    __slots__ = ("_data", "_size")
+
+    def __init__(self, dtype=np.float64):
+        self._data = np.empty(256, dtype=dtype)
+        self._size = 0
+
+    def extend(self, values: np.ndarray) -> None:
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self._size]
+
+
+class _State:
+    """Barras consolidadas de uma série e o estado/saídas de cada indicador."""
+
+    def __init__(self, columns: List[str]):
+        self.ts = _Buffer(np.int64)
+        self.bars = {name: _Buffer() for name in columns}
+        self.indicators: Dict[str, Indicator] = {}
+        self.outputs: Dict[str, _Buffer] = {}
+
+    def __len__(self) -> int:
+        return len(self.ts.values)
+
+    def append(self, ts: np.ndarray, bars: Dict[str, np.ndarray]) -> None:
+        """Consolida barras novas e avança todos os indicadores."""
+        self.ts.extend(ts)
+        for name, buffer in self.bars.items():
+            buffer.extend(bars[name])
+        inputs = _inputs(ts, bars)
+        for indicator in self.indicators.values():
+            for column, values in indicator.update(inputs).items():
+                self.outputs[column].extend(values)
+
+    def add(self, name: str) -> None:
+        """Inclui um indicador, calculando-o sobre as barras já consolidadas."""
+        indicator = self.indicators[name] = create_indicator(name)
+        for column in indicator.columns():
+            self.outputs[column] = _Buffer()
+        inputs = _inputs(self.ts.values, {name: buffer.values for name, buffer in self.bars.items()})
+        for column, values in indicator.update(inputs).items():
+            self.outputs[column].extend(values)
+
+
+def _inputs(ts: np.ndarray, bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Arrays de entrada dos indicadores a partir das colunas de histórico."""
+    return {
+        "ts": ts,
+        "open": bars["Open"],
+        "high": bars["High"],
+        "low": bars["Low"],
+        "close": bars["Close"],
+        "volume": np.nan_to_num(bars["Volume"]),
+    }
+
+
+class IndicatorEngine(LoggerMixin):
+    """
+    Indicadores técnicos mantidos por (símbolo, intervalo).
+
+    Attributes:
+        maxsize: Número máximo de séries com estado em memória (LRU)
+    """
+
+    def __init__(self, maxsize: int = None):
+        """
+        Inicializa o motor.
+
+        Args:
+            maxsize: Número máximo de séries (padrão: configuração global)
+        """
+        self.maxsize = maxsize or settings.INDICATOR_STATE_MAXSIZE
+        self._states: "OrderedDict[tuple, _State]" = OrderedDict()
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def compute(
+        self,
+        symbol: str,
+        period: Optional[str] = "3mo",
+        interval: str = "1d",
+        indicators: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Calcula indicadores técnicos sobre o histórico de um ticker.
+
+        O histórico é buscado com folga antes da janela pedida, para que os
+        indicadores já estejam aquecidos na primeira barra devolvida.
+
+        Args:
+            symbol: Símbolo do ticker
+            period: Período da janela devolvida (ex: "3mo", "1y")
+            interval: Intervalo dos candles
+            indicators: Indicadores separados por vírgula (padrão: ``DEFAULT_INDICATORS``)
+            start: Data inicial (YYYY-MM-DD)
+            end: Data final exclusiva (YYYY-MM-DD)
+
+        Returns:
+            DataFrame com as colunas de preço e uma coluna por saída de
+            indicador, ou None se não houver histórico
+
+        Raises:
+            ValueError: Se um indicador ou o período não for reconhecido
+        """
+        symbol = symbol.upper()
+        names = parse_indicators(indicators)
+        start_ts, end_ts, sessions = resolve_period(period, start, end)
+        warmup = max(create_indicator(name).warmup for name in names)
+        ts, bars = self._load(symbol, interval, self._warmup_start(start_ts, warmup, interval))
+        if not len(ts):
+            return None
+
+        with self._key_lock((symbol, interval)):
+            ts, columns = self._update((symbol, interval), ts, bars, names)
+
+        lo = int(np.searchsorted(ts, start_ts, side="left"))
+        hi = len(ts) if end_ts is None else int(np.searchsorted(ts, end_ts, side="left"))
+        if sessions is not None:
+            lo += last_sessions(ts[lo:hi], sessions)
+        if lo >= hi:
+            return None
+        index = pd.DatetimeIndex(ts[lo:hi].astype("datetime64[s]"), name="Date")
+        return pd.DataFrame({name: values[lo:hi] for name, values in columns.items()}, index=index)
+
+    def clear(self) -> None:
+        """Descarta o estado de todas as séries."""
+        with self._lock:
+            self._states.clear()
+            for key in list(self._locks):
+                self._discard_lock(key)
+
+    # ==================== AUXILIARES ====================
+
+    def _update(
+        self, key: tuple, ts: np.ndarray, bars: Dict[str, np.ndarray], names: List[str]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Avança o estado da série com as barras recebidas e calcula a última barra.
+
+        Returns:
+            Tupla (ts, columns) com todas as barras do estado mais a barra em
+            formação, e as colunas de preço e de indicadores
+        """
+        state = self._get(key)
+        if state is not None and len(state):
+            last = state.ts.values[-1]
+            position = int(np.searchsorted(ts, last))
+            if (
+                ts[0] < state.ts.values[0]
+                or position >= len(ts)
+                or ts[position] != last
+                or not np.isclose(bars["Close"][position], state.bars["Close"].values[-1], rtol=1e-9)
+            ):
+                # Histórico anterior ao estado, lacuna ou preços reajustados: recalcula
+                state = None
+            else:
+                start = position + 1
+        if state is None or not len(state):
+            state = _State(list(bars))
+            start = 0
+        self._put(key, state)
+
+        for name in names:
+            if name not in state.indicators:
+                state.add(name)
+        # A última barra pode estar em formação: só as anteriores são consolidadas
+        if start < len(ts) - 1:
+            state.append(ts[start:-1], {name: values[start:-1] for name, values in bars.items()})
+
+        last_ts, last_bar = ts[-1:], {name: values[-1:] for name, values in bars.items()}
+        inputs = _inputs(last_ts, last_bar)
+        columns = {name: np.concatenate((buffer.values, last_bar[name])) for name, buffer in state.bars.items()}
+        for name in names:
+            indicator = state.indicators[name]
+            for column, values in copy.deepcopy(indicator).update(inputs).items():
+                columns[column] = np.concatenate((state.outputs[column].values, values))
+        return np.concatenate((state.ts.values, last_ts)), columns
+
+    def _load(self, symbol: str, interval: str, start: Optional[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Lê o histórico do armazenamento local a partir de ``start`` (None = desde o início)."""
+        period = "max" if start is None else None
+        if ohlcv_store.supports(interval, period, start):
+            series, _ = ohlcv_store.fetch_arrays([symbol], period=period, interval=interval, start=start)
+            arrays = series.get(symbol)
+            if arrays is None:
+                return np.empty(0, dtype=np.int64), {}
+            ts = arrays["ts"]
+            bars = {name: np.asarray(arrays[name], dtype=np.float64) for name in _BAR_COLUMNS if name in arrays}
+        else:
+            frames, _ = ohlcv_store.fetch([symbol], period=period, interval=interval, start=start)
+            frame = frames.get(symbol)
+            if frame is None:
+                return np.empty(0, dtype=np.int64), {}
+            ts = frame.index.as_unit("s").asi8
+            bars = {name: frame[name].to_numpy(dtype=np.float64) for name in _BAR_COLUMNS if name in frame.columns}
+
+        # Barras sem fechamento (ex: pregão sem negócios) não entram nos indicadores
+        valid = ~np.isnan(bars["Close"])
+        if not valid.all():
+            ts = ts[valid]
+            bars = {name: values[valid] for name, values in bars.items()}
+        return ts, bars
+
+    @staticmethod
+    def _warmup_start(start_ts: int, warmup: int, interval: str) -> Optional[str]:
+        """Data inicial da busca: ``warmup`` barras antes da janela, com folga para fins de semana e feriados."""
+        if start_ts == MAX_COVERAGE:
+            return None
+        if interval in INTRADAY_SECONDS:
+            # Pelo menos 6 horas de pregão por dia útil
+            days = warmup * INTRADAY_SECONDS[interval] / (6 * 3600) * 7 / 5 + 3
+        elif interval == "1wk":
+            days = warmup * 7 + 7
+        elif interval == "1mo":
+            days = warmup * 31 + 31
+        else:
+            days = warmup * 7 / 5 + 10
+        return (pd.Timestamp(start_ts, unit="s") - pd.Timedelta(days=int(days) + 1)).strftime("%Y-%m-%d")
+
+    def _get(self, key: tuple) -> Optional[_State]:
+        """Retorna o estado da série, marcando-o como usado recentemente."""
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+            return state
+
+    def _put(self, key: tuple, state: _State) -> None:
+        """Armazena o estado, descartando os menos usados (e seus locks livres) além de ``maxsize``."""
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.maxsize:
+                evicted, _ = self._states.popitem(last=False)
+                self._discard_lock(evicted)
+
+    def _discard_lock(self, key: tuple) -> None:
+        """Descarta o lock de uma série fora da memória se ninguém o estiver usando (com ``_lock``)."""
+        lock = self._locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._locks[key]
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        """Lock de atualização de uma série."""
+        with self._lock:
+            if len(self._locks) > 2 * self.maxsize:
+                # Locks que estavam em uso quando a série saiu da memória
+                for stale in [k for k in self._locks if k not in self._states]:
+                    self._discard_lock(stale)
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+
+# Instância única compartilhada pelas rotas e serviços
+indicator_engine = IndicatorEngine()
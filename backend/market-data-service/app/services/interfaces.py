@@ -33,7 +33,8 @@ class IMarketDataProvider(ABC):
     def get_stock_data(
         self,
         symbol: str,
-        request: StockDataRequest
+        request: StockDataRequest,
+        history: Optional[Any] = None
     ) -> StockDataResponse:
         """
         Obtém dados de uma ação específica.
@@ -41,6 +42,7 @@ class IMarketDataProvider(ABC):
         Args:
             symbol: Símbolo da ação
             request: Parâmetros da requisição
+            history: Histórico já obtido (ex: download em lote), opcional
             
         Returns:
             Dados formatados da ação
@@ -50,6 +52,28 @@ class IMarketDataProvider(ABC):
         """
         pass
     
+    def get_batch_history(
+        self,
+        symbols: List[str],
+        period: str = "1mo",
+        interval: str = "1d"
+    ) -> Dict[str, Any]:
+        """
+        Obtém o histórico de vários símbolos de uma só vez.
+        
+        Implementação opcional: provedores sem suporte a lote retornam um
+        dicionário vazio e o histórico é buscado por ticker em get_stock_data.
+        
+        Args:
+            symbols: Símbolos das ações
+            period: Período dos dados
+            interval: Intervalo dos dados
+            
+        Returns:
+            Histórico por símbolo, no formato aceito por get_stock_data(history=...)
+        """
+        return {}
+    
     @abstractmethod
     def validate_ticker(self, symbol: str) -> ValidationResponse:
         """
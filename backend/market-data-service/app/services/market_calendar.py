@@ -0,0 +1,332 @@
+"""
+Calendário de pregões e resolução de períodos do Yahoo em janelas concretas.
+
+Os caches de histórico precisam saber duas coisas: qual janela de datas um
+``period`` ("ytd", "6mo", "max") representa, para que pedidos sobrepostos
+compartilhem a mesma série; e se houve pregão desde a última busca, para não
+consultar o Yahoo de novo com o mercado fechado (noites, fins de semana e
+feriados).
+
+Os calendários cobrem B3 e bolsas americanas (feriados fixos, móveis baseados
+na Páscoa e, nos EUA, regras de feriado observado); câmbio negocia 24h em dias
+úteis e criptomoedas o tempo todo. Demais bolsas usam dias úteis, sem horário.
+
+Example:
+    from services.market_calendar import calendar_for
+
+    if calendar_for("PETR4.SA").traded_since(last_fetch):
+        ...
+"""
+
+import re
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from functools import lru_cache
+from typing import Callable, FrozenSet, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+# Cobertura de uma série baixada com period="max"
+MAX_COVERAGE = -(2 ** 62)
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+# Barras finais podem chegar alguns minutos após o fechamento
+_CLOSE_GRACE = timedelta(minutes=30)
+
+
+def _easter(year: int) -> date:
+    """Domingo de Páscoa (algoritmo anônimo gregoriano)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """N-ésimo dia da semana do mês (n=-1 para o último)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _b3_holidays(year: int) -> FrozenSet[date]:
+    """Feriados sem pregão na B3."""
+    easter = _easter(year)
+    days = {
+        date(year, 1, 1),
+        easter - timedelta(days=48),  # Carnaval (segunda)
+        easter - timedelta(days=47),  # Carnaval (terça)
+        easter - timedelta(days=2),   # Sexta-feira Santa
+        date(year, 4, 21),
+        date(year, 5, 1),
+        easter + timedelta(days=60),  # Corpus Christi
+        date(year, 9, 7),
+        date(year, 10, 12),
+        date(year, 11, 2),
+        date(year, 11, 15),
+        date(year, 12, 24),
+        date(year, 12, 25),
+        date(year, 12, 31),
+    }
+    if year >= 2024:
+        days.add(date(year, 11, 20))  # Dia da Consciência Negra
+    return frozenset(days)
+
+
+def _us_holidays(year: int) -> FrozenSet[date]:
+    """Feriados sem pregão na NYSE/Nasdaq, com as regras de feriado observado."""
+
+    def observed(day: date) -> date:
+        if day.weekday() == 5:
+            return day - timedelta(days=1)
+        if day.weekday() == 6:
+            return day + timedelta(days=1)
+        return day
+
+    days = {
+        _nth_weekday(year, 1, 0, 3),   # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),   # Presidents' Day
+        _easter(year) - timedelta(days=2),
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),   # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        observed(date(year, 12, 25)),
+    }
+    # Ano-novo no sábado não é observado na sexta anterior
+    if date(year, 1, 1).weekday() != 5:
+        days.add(observed(date(year, 1, 1)))
+    if year >= 2022:
+        days.add(observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(days)
+
+
+class MarketCalendar:
+    """
+    Calendário de pregões de um mercado.
+
+    Attributes:
+        name: Identificador do mercado
+        tz: Fuso horário da bolsa
+        open_time: Abertura do pregão regular (None = o dia inteiro)
+        close_time: Fechamento do pregão regular
+        extended: Janela estendida (pre/post market), usada com prepost=True
+        weekdays: Dias da semana com pregão (0 = segunda)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tz: str,
+        open_time: Optional[dtime] = None,
+        close_time: Optional[dtime] = None,
+        extended: Optional[Tuple[dtime, dtime]] = None,
+        holidays: Optional[Callable[[int], FrozenSet[date]]] = None,
+        weekdays: FrozenSet[int] = frozenset(range(5)),
+    ):
+        """
+        Inicializa o calendário.
+
+        Args:
+            name: Identificador do mercado
+            tz: Fuso horário da bolsa (ex: "America/Sao_Paulo")
+            open_time: Abertura do pregão regular (None = o dia inteiro)
+            close_time: Fechamento do pregão regular
+            extended: (abertura, fechamento) do pre/post market
+            holidays: Função ano -> feriados sem pregão
+            weekdays: Dias da semana com pregão (0 = segunda)
+        """
+        self.name = name
+        self.tz = ZoneInfo(tz)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.extended = extended
+        self.weekdays = weekdays
+        self._holidays = lru_cache(maxsize=None)(holidays) if holidays else None
+
+    def is_session(self, day: date) -> bool:
+        """Indica se há pregão no dia."""
+        if day.weekday() not in self.weekdays:
+            return False
+        return not (self._holidays and day in self._holidays(day.year))
+
+    def is_open(self, now: Optional[float] = None, prepost: bool = False) -> bool:
+        """Indica se o mercado está aberto no instante ``now`` (epoch; padrão: agora)."""
+        local = datetime.fromtimestamp(time.time() if now is None else now, self.tz)
+        if not self.is_session(local.date()):
+            return False
+        hours = self._hours(prepost)
+        if hours is None:
+            return True
+        return hours[0] <= local.time() < hours[1]
+
+    def last_close(self, now: Optional[float] = None, prepost: bool = False) -> float:
+        """
+        Instante (epoch) do fechamento do último pregão encerrado até ``now``.
+
+        Para mercados sem horário definido, o fechamento é o fim do dia.
+        """
+        local = datetime.fromtimestamp(time.time() if now is None else now, self.tz)
+        hours = self._hours(prepost)
+        close_time = hours[1] if hours else dtime(23, 59, 59)
+        day = local.date()
+        if local.time() < close_time or not self.is_session(day):
+            day -= timedelta(days=1)
+        for _ in range(15):
+            if self.is_session(day):
+                break
+            day -= timedelta(days=1)
+        return datetime.combine(day, close_time, self.tz).timestamp()
+
+    def traded_since(self, since: float, now: Optional[float] = None, prepost: bool = False) -> bool:
+        """
+        Indica se pode haver barras novas desde ``since`` (epoch).
+
+        Verdadeiro se o mercado está aberto agora ou se algum pregão terminou
+        (com uma folga para as barras finais) depois de ``since``.
+        """
+        now = time.time() if now is None else now
+        if self.is_open(now, prepost):
+            return True
+        return self.last_close(now, prepost) + _CLOSE_GRACE.total_seconds() > since
+
+    def _hours(self, prepost: bool) -> Optional[Tuple[dtime, dtime]]:
+        """Horário do pregão (estendido com prepost) ou None para o dia inteiro."""
+        if prepost and self.extended:
+            return self.extended
+        if self.open_time is None:
+            return None
+        return self.open_time, self.close_time
+
+
+CALENDARS = {
+    "B3": MarketCalendar(
+        "B3", "America/Sao_Paulo", dtime(10, 0), dtime(18, 0), holidays=_b3_holidays
+    ),
+    "US": MarketCalendar(
+        "US", "America/New_York", dtime(9, 30), dtime(16, 0),
+        extended=(dtime(4, 0), dtime(20, 0)), holidays=_us_holidays,
+    ),
+    "FX": MarketCalendar("FX", "UTC"),
+    "CRYPTO": MarketCalendar("CRYPTO", "UTC", weekdays=frozenset(range(7))),
+    # Demais bolsas: dias úteis, sem horário nem feriados
+    "GENERIC": MarketCalendar("GENERIC", "UTC"),
+}
+
+# Índices negociados nos EUA (símbolos sem sufixo de bolsa)
+_US_INDICES = {"^GSPC", "^IXIC", "^DJI", "^VIX", "^RUT", "^NDX", "^NYA"}
+_B3_INDICES = {"^BVSP"}
+
+
+def calendar_for(symbol: str) -> MarketCalendar:
+    """
+    Escolhe o calendário de um símbolo pelo sufixo do Yahoo.
+
+    Args:
+        symbol: Símbolo do ticker (ex: "PETR4.SA", "AAPL", "USDBRL=X")
+
+    Returns:
+        Calendário do mercado do símbolo
+    """
+    symbol = symbol.upper()
+    if symbol.endswith(".SA") or symbol in _B3_INDICES:
+        return CALENDARS["B3"]
+    if symbol.endswith("=X"):
+        return CALENDARS["FX"]
+    if re.search(r"-(USD|BRL|EUR)$", symbol):
+        return CALENDARS["CRYPTO"]
+    if symbol in _US_INDICES or not ("." in symbol or symbol.startswith("^") or "=" in symbol):
+        return CALENDARS["US"]
+    return CALENDARS["GENERIC"]
+
+
+def resolve_period(
+    period: Optional[str],
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    now: Optional[pd.Timestamp] = None,
+) -> Tuple[int, Optional[int], Optional[int]]:
+    """
+    Converte period/start/end do Yahoo em uma janela concreta.
+
+    Como no Yahoo, ``start`` tem precedência sobre ``period`` e ``end`` é
+    exclusivo. Períodos em dias ("1d", "5d") contam pregões, não dias
+    corridos: são resolvidos como uma janela com folga para fins de semana e
+    feriados mais o número de pregões finais a manter, contados nos próprios
+    dados (que refletem o calendário real da bolsa).
+
+    Args:
+        period: Período do Yahoo (ex: "5d", "1mo", "ytd", "max")
+        start: Data inicial (YYYY-MM-DD)
+        end: Data final exclusiva (YYYY-MM-DD)
+        now: Instante de referência, no horário local (padrão: agora)
+
+    Returns:
+        Tupla (start_ts, end_ts, sessions): limites em segundos no horário
+        local (end None = aberto, start ``MAX_COVERAGE`` = desde o início) e
+        número de pregões finais a manter (None = todos)
+
+    Raises:
+        ValueError: Se o período não for reconhecido
+    """
+    today = (pd.Timestamp.now() if now is None else pd.Timestamp(now)).normalize()
+    end_ts = int(pd.Timestamp(end).timestamp()) if end else None
+    if start:
+        return int(pd.Timestamp(start).timestamp()), end_ts, None
+
+    period = (period or "1mo").lower()
+    if period == "max":
+        return MAX_COVERAGE, end_ts, None
+    if period == "ytd":
+        return int(today.replace(month=1, day=1).timestamp()), end_ts, None
+
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Período não suportado: '{period}'")
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        start_day = today - pd.DateOffset(days=amount * 2 + 10)
+        return int(start_day.timestamp()), end_ts, amount
+    if unit == "wk":
+        offset = pd.DateOffset(weeks=amount)
+    elif unit == "mo":
+        offset = pd.DateOffset(months=amount)
+    else:
+        offset = pd.DateOffset(years=amount)
+    return int((today - offset).timestamp()), end_ts, None
+
+
+def last_sessions(ts: np.ndarray, sessions: int) -> int:
+    """
+    Posição inicial das últimas ``sessions`` sessões em um array de timestamps.
+
+    Barras intraday do mesmo dia pertencem à mesma sessão; em barras diárias,
+    cada barra é uma sessão.
+
+    Args:
+        ts: Timestamps em segundos (horário local), em ordem crescente
+        sessions: Número de sessões finais
+
+    Returns:
+        Índice da primeira barra da janela
+    """
+    if not len(ts):
+        return 0
+    days = ts // 86400
+    boundaries = (days[1:] != days[:-1]).nonzero()[0] + 1
+    if sessions > len(boundaries):
+        return 0
+    return int(boundaries[len(boundaries) - sessions])
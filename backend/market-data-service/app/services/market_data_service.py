@@ -8,8 +8,7 @@ import yfinance as yf
 import pandas as pd
 from yfinance import EquityQuery
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional
-from deep_translator import GoogleTranslator
+from typing import Any, Dict, List, Optional, Union
 
 from core.config import settings
 from core.logging import LoggerMixin
@@ -29,6 +28,9 @@ from services.interfaces import (
     ProviderException,
     RateLimitException,
 )
+from services.ohlcv_store import ohlcv_store
+from services.performance import period_performance_calculator
+from services.translation import translation_service
 from services.yahoo_finance_provider import YahooFinanceProvider
 from utils.Ticker_ops import convert_to_serializable, safe_ticker_operation
 
@@ -287,8 +289,9 @@ class MarketDataService(LoggerMixin):
         symbol: str,
         period: str = "1mo",
         interval: str = "1d",
-        client_id: str = "default"
-    ) -> List[HistoricalDataPoint]:
+        client_id: str = "default",
+        response_format: str = "records"
+    ) -> Union[List[HistoricalDataPoint], Dict[str, Any]]:
         """
         Obtém a série histórica de uma ação para o período especificado.
         Args:
@@ -296,8 +299,9 @@ class MarketDataService(LoggerMixin):
             period: Período (ex: '1mo', '1y', etc)
             interval: Intervalo (ex: '1d', '1h', etc)
             client_id: Identificador do cliente
+            response_format: "records" (lista de pontos) ou "columnar" (um array por coluna)
         Returns:
-            Lista de pontos históricos
+            Lista de pontos históricos (ou dicionário colunar)
         """
         from models.requests import StockDataRequest
         from models.responses import HistoricalDataPoint
@@ -313,7 +317,7 @@ class MarketDataService(LoggerMixin):
         try:
             request = StockDataRequest(symbol=symbol, period=period, interval=interval)
             ticker = yf.Ticker(symbol)
-            return self.provider._get_historical_data(ticker, request, symbol)
+            return self.provider._get_historical_data(ticker, request, symbol, response_format)
         except Exception as e:
             self.logger.error(f"Erro ao obter histórico para {symbol}: {e}")
             return []
@@ -511,6 +515,11 @@ class MarketDataService(LoggerMixin):
         
         successful_data = {}
         errors = {}
+
+        # Histórico de todos os tickers em lote (poucas chamadas ao Yahoo)
+        histories = self.provider.get_batch_history(
+            request.symbols, period=request.period, interval=request.interval
+        )
         
         # Processar cada ticker
         for symbol in request.symbols:  # Corrigido: usar 'symbols' em vez de 'tickers'
@@ -522,8 +531,10 @@ class MarketDataService(LoggerMixin):
                     interval=request.interval,
                 )
                 
-                # Obter dados (sem verificar rate limit novamente)
-                data = self.provider.get_stock_data(symbol, stock_request)
+                # Obter dados (sem verificar rate limit novamente), reaproveitando o histórico
+                data = self.provider.get_stock_data(
+                    symbol, stock_request, history=histories.get(symbol)
+                )
                 successful_data[symbol] = data
             except Exception as e:
                 self.logger.warning(f"Erro ao obter dados para {symbol}: {e}")
@@ -839,52 +850,36 @@ class MarketDataService(LoggerMixin):
                     f"Nenhum símbolo válido fornecido"
                 )
 
+            # Baixa todos os símbolos em lote e separa o resultado por ticker
+            use_range = bool(start and end)
+            frames, errors = ohlcv_store.fetch(
+                symbol_list,
+                period=period,
+                interval=interval,
+                start=start if use_range else None,
+                end=end if use_range else None,
+                prepost=prepost,
+                auto_adjust=auto_adjust,
+            )
+
             result = {}
-            # Processa cada símbolo individualmente para garantir maior confiabilidade
             for symbol in symbol_list:
-                try:
-                    def fetch_history(ticker):
-                        # Condição para usar start/end OU period
-                        if start and end:
-                            return ticker.history(
-                                interval=interval,
-                                start=start,
-                                end=end,
-                                prepost=prepost,
-                                auto_adjust=auto_adjust
-                            )
-                        else:
-                            return ticker.history(
-                                period=period,
-                                interval=interval,
-                                prepost=prepost,
-                                auto_adjust=auto_adjust
-                            )
-
-                    ticker_data = safe_ticker_operation(symbol, fetch_history)
-
-                    # Processa os dados
-                    if isinstance(ticker_data, pd.DataFrame) and not ticker_data.empty:
-                        # Converte o índice de datetime para string
-                        ticker_data.index = ticker_data.index.strftime('%Y-%m-%d %H:%M:%S')
-                        
-                        # Converte para o formato desejado
-                        result[symbol] = {
-                            "success": True,
-                            "data": ticker_data.reset_index().fillna(0).to_dict(orient='records')
-                        }
-                    else:
-                        result[symbol] = {
-                            "success": False,
-                            "error": "Dados não encontrados",
-                            "data": []
-                        }
-                        
-                except Exception as e:
-                    self.logger.error(f"Erro ao obter dados para {symbol}: {str(e)}")
+                ticker_data = frames.get(symbol)
+                if ticker_data is not None:
+                    # Converte o índice de datetime para string
+                    ticker_data = ticker_data.set_axis(
+                        ticker_data.index.strftime('%Y-%m-%d %H:%M:%S'), axis=0
+                    )
+                    result[symbol] = {
+                        "success": True,
+                        "data": ticker_data.reset_index().fillna(0).to_dict(orient='records')
+                    }
+                else:
+                    error = errors.get(symbol, "Dados não encontrados")
+                    self.logger.error(f"Erro ao obter dados para {symbol}: {error}")
                     result[symbol] = {
                         "success": False,
-                        "error": str(e),
+                        "error": error,
                         "data": []
                     }
 
@@ -976,7 +971,9 @@ class MarketDataService(LoggerMixin):
             "employees": info.get("fullTimeEmployees"),
             "website": info.get("website"),
             "country": info.get("country"),
-            "business_summary": GoogleTranslator(source='auto', target='pt').translate(info.get("longBusinessSummary", "Resumo não disponível"), dest='pt'),
+            "business_summary": translation_service.translate(
+                info.get("longBusinessSummary", "Resumo não disponível"), wait=not settings.TRANSLATION_ASYNC
+            ),
             "fullExchangeName": info.get("fullExchangeName"),
             "type": info.get("quoteType"),
             "currency": info.get("currency"),
@@ -1262,14 +1259,17 @@ class MarketDataService(LoggerMixin):
                 news_content = item.get('content', {})
                 simplified_item = {
                     "id": news_content.get('id'),
-                    "title": GoogleTranslator(source='auto', target='pt').translate(news_content.get('title', "Resumo não disponível"), dest='pt'),
+                    "title": news_content.get('title', "Resumo não disponível"),
                     "date": news_content.get('pubDate'),
-                    "summary": GoogleTranslator(source='auto', target='pt').translate(news_content.get('summary', "Resumo não disponível"), dest='pt'),
+                    "summary": news_content.get('summary', "Resumo não disponível"),
                     "url": news_content.get('canonicalUrl', {}).get('url'),
                     "thumbnail": news_content.get('thumbnail', {}).get('resolutions', [{}])[0].get('url') if news_content.get('thumbnail') else None
                 }
                 simplified_news.append(simplified_item)
-            return simplified_news
+            # Títulos e resumos traduzidos em lote (uma consulta ao cache de traduções)
+            return translation_service.translate_fields(
+                simplified_news, ("title", "summary"), wait=not settings.TRANSLATION_ASYNC
+            )
         
         data = safe_ticker_operation(symbol, get_news)
         return {
@@ -1581,85 +1581,21 @@ class MarketDataService(LoggerMixin):
             symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
             
             # Validar número máximo de tickers
-            if len(symbol_list) > 5:
+            max_symbols = settings.PERIOD_PERFORMANCE_MAX_SYMBOLS
+            if len(symbol_list) > max_symbols:
                 raise ValueError(
                     
-                   f"Número máximo de tickers excedido. Máximo permitido: 5, fornecido: {len(symbol_list)}"
+                   f"Número máximo de tickers excedido. Máximo permitido: {max_symbols}, fornecido: {len(symbol_list)}"
                 )
                 
-            # Limpar e validar símbolos
-            symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
             if not symbol_list:
                 raise ValueError(
                     
                    f"Nenhum símbolo válido fornecido"
                 )
 
-            # Definir períodos e intervalos para os cálculos
-            periods = {
-                "1D": ("1d", "1d"),    # período, intervalo
-                "7D": ("7d", "1d"),
-                "1M": ("1mo", "1d"),
-                "3M": ("3mo", "1d"),
-                "6M": ("6mo", "1d"),
-                "1Y": ("1y", "1d")
-            }
-
-            results = {}
-            for symbol in symbol_list:
-                try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    
-                    # Pegar logo se disponível
-                    if info.get("website", False):
-                        logo = f"https://t1.gstatic.com/faviconV2?client=SOCIAL&type=FAVICON&fallback_opts=TYPE,SIZE,URL&size=128&url={info.get('website', None)}"
-                    else:
-                        logo = None
-
-                    # Inicializar dados do ticker
-                    ticker_data = {
-                        "name": info.get("shortName", "") or info.get("longName", ""),
-                        "current_price": info.get("regularMarketPrice", 0),
-                        "currency": info.get("currency", ""),
-                        "logo": logo,
-                        "performance": {}
-                    }
-
-                    # Calcular performance para cada período
-                    for period_name, (period, interval) in periods.items():
-                        try:
-                            hist = ticker.history(period=period, interval=interval)
-                            if not hist.empty:
-                                first_price = hist['Close'].iloc[0]
-                                last_price = hist['Close'].iloc[-1]
-                                change_percent = ((last_price - first_price) / first_price) * 100
-                                
-                                ticker_data["performance"][period_name] = {
-                                    "change_percent": round(change_percent, 2),
-                                    "start_price": round(first_price, 2),
-                                    "end_price": round(last_price, 2),
-                                    "start_date": hist.index[0].strftime('%Y-%m-%d'),
-                                    "end_date": hist.index[-1].strftime('%Y-%m-%d')
-                                }
-                            else:
-                                ticker_data["performance"][period_name] = None
-                        except Exception as e:
-                            self.logger.warning(f"Erro ao calcular {period_name} para {symbol}: {str(e)}")
-                            ticker_data["performance"][period_name] = None
-
-                    results[symbol] = {
-                        "success": True,
-                        "data": ticker_data
-                    }
-
-                except Exception as e:
-                    self.logger.error(f"Erro ao processar {symbol}: {str(e)}")
-                    results[symbol] = {
-                        "success": False,
-                        "error": str(e),
-                        "data": None
-                    }
+            # Todas as janelas saem de um único download em lote de ~1 ano
+            results = period_performance_calculator.calculate(symbol_list)
 
             return {
                 "timestamp": datetime.now().isoformat(),
@@ -0,0 +1,482 @@
+"""
+Armazenamento local de séries OHLCV com busca incremental.
+
+Barras diárias, semanais e mensais de pregões já encerrados não mudam, mas
+cada requisição de histórico baixava o período inteiro do Yahoo de novo. Este
+módulo mantém as séries em um banco SQLite local (uma partição por
+símbolo/intervalo) e só busca as barras mais novas que a última armazenada;
+qualquer ``period``/``start``/``end`` pedido é então recortado localmente.
+
+Os preços são armazenados sem ajuste (com a coluna Adj Close) e o ajuste por
+dividendos/desdobramentos é aplicado na leitura, como faz o yfinance. Como um
+novo evento corporativo altera retroativamente os preços ajustados, uma busca
+incremental que traz um dividendo ou desdobramento novo recarrega a série
+inteira.
+
+Barras semanais e mensais não são baixadas: são agregadas da série diária
+(``services.resampling``), o que evita uma série e uma busca por intervalo.
+
+Séries da camada quente (``services.hot_series``) são republicadas em arquivos
+mapeados em memória a cada sincronização e lidas de lá, sem consultar o banco.
+
+Example:
+    from services.ohlcv_store import ohlcv_store
+
+    frames, errors = ohlcv_store.fetch(["PETR4.SA"], period="5y", interval="1d")
+"""
+
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import settings
+from core.local_db import LocalDatabase
+from core.logging import LoggerMixin
+from services.history_batch import history_batch_fetcher
+from services.history_cache import history_range_cache
+from services.hot_series import FIELDS, hot_series_tier
+from services.market_calendar import MAX_COVERAGE, calendar_for, last_sessions, resolve_period
+from services.resampling import FROM_DAILY, bucket_starts, resample_arrays
+
+# Intervalos armazenados localmente; os demais (intraday) vão direto ao Yahoo
+STORE_INTERVALS = ("1d", "1wk", "1mo")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    adj_close REAL,
+    volume REAL,
+    dividends REAL,
+    splits REAL,
+    PRIMARY KEY (symbol, interval, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS series (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    covered_from INTEGER NOT NULL,
+    last_ts INTEGER NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (symbol, interval)
+) WITHOUT ROWID;
+"""
+
+
+def _history_columns(raw: Dict[str, np.ndarray], auto_adjust: bool, actions: bool) -> Dict[str, np.ndarray]:
+    """
+    Monta as colunas no formato de ``Ticker.history`` a partir dos campos sem ajuste.
+
+    Sem ajuste, os preços são as próprias visões recebidas. Com ajuste, aplica
+    o mesmo cálculo do yfinance: Open/High/Low pela razão Adj Close / Close.
+    """
+    columns = {"ts": raw["ts"]}
+    if auto_adjust:
+        ratio = raw["adj_close"] / raw["close"]
+        columns["Open"] = raw["open"] * ratio
+        columns["High"] = raw["high"] * ratio
+        columns["Low"] = raw["low"] * ratio
+        columns["Close"] = raw["adj_close"]
+    else:
+        columns["Open"] = raw["open"]
+        columns["High"] = raw["high"]
+        columns["Low"] = raw["low"]
+        columns["Close"] = raw["close"]
+        columns["Adj Close"] = raw["adj_close"]
+
+    volume = raw["volume"]
+    columns["Volume"] = volume if np.isnan(volume).any() else volume.astype(np.int64)
+    if actions:
+        columns["Dividends"] = raw["dividends"]
+        columns["Stock Splits"] = raw["splits"]
+    return columns
+
+
+def arrays_to_frame(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Converte o retorno de ``OHLCVStore.fetch_arrays`` em um DataFrame indexado por data."""
+    index = pd.DatetimeIndex(arrays["ts"].astype("datetime64[s]"), name="Date")
+    return pd.DataFrame({name: values for name, values in arrays.items() if name != "ts"}, index=index)
+
+
+class OHLCVStore(LoggerMixin):
+    """
+    Séries OHLCV persistidas localmente, atualizadas por busca incremental.
+
+    Attributes:
+        path: Caminho do banco SQLite
+        refresh_seconds: Intervalo mínimo entre buscas incrementais de uma série
+    """
+
+    def __init__(self, path: str = None, refresh_seconds: int = None):
+        """
+        Inicializa o armazenamento (o banco é criado no primeiro uso).
+
+        Args:
+            path: Caminho do banco (padrão: diretório de armazenamento local)
+            refresh_seconds: Intervalo entre buscas incrementais (padrão: configuração global)
+        """
+        self.path = path or os.path.join(settings.LOCAL_STORAGE_DIR, "ohlcv.sqlite3")
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None else settings.OHLCV_STORE_REFRESH_SECONDS
+        )
+        self._db = LocalDatabase(self.path, _SCHEMA)
+
+    def supports(self, interval: str, period: Optional[str] = None, start: Optional[str] = None) -> bool:
+        """Indica se a combinação de intervalo e período pode ser servida pelo armazenamento."""
+        if not settings.OHLCV_STORE_ENABLED or interval not in STORE_INTERVALS:
+            return False
+        try:
+            resolve_period(period, start)
+        except ValueError:
+            return False
+        return True
+
+    def fetch(
+        self,
+        symbols: Iterable[str],
+        period: Optional[str] = "1mo",
+        interval: str = "1d",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        prepost: bool = False,
+        auto_adjust: bool = True,
+        actions: bool = True,
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Obtém o histórico de vários tickers a partir do armazenamento local.
+
+        Mesma assinatura e retorno de ``HistoryBatchFetcher.fetch``. Séries
+        ausentes ou que não cobrem o início pedido são baixadas; as demais só
+        recebem as barras novas (no máximo a cada ``refresh_seconds`` e só se
+        houve pregão desde a última verificação, ver ``services.market_calendar``). Janelas
+        que terminam antes da última barra armazenada não consultam o Yahoo.
+        Intervalos não suportados (intraday) são servidos pelo cache por faixa
+        de datas (``services.history_cache``).
+
+        Args:
+            symbols: Símbolos dos tickers (duplicatas são ignoradas)
+            period: Período (ex: "1mo", "5y"); ignorado quando ``start`` é informado
+            interval: Intervalo dos candles (ex: "1d", "1wk")
+            start: Data inicial (YYYY-MM-DD)
+            end: Data final exclusiva (YYYY-MM-DD)
+            prepost: Incluir pre/post market (sem efeito em barras diárias ou maiores)
+            auto_adjust: Ajustar preços por dividendos/splits
+            actions: Incluir dividendos e desdobramentos
+
+        Returns:
+            Tupla (frames, errors): DataFrame por símbolo com índice de datas no
+            horário local da bolsa, e mensagem de erro por símbolo que falhou
+        """
+        if not self.supports(interval, period, start):
+            return history_range_cache.fetch(
+                symbols, period=period, interval=interval, start=start, end=end,
+                prepost=prepost, auto_adjust=auto_adjust, actions=actions,
+            )
+
+        series, errors = self.fetch_arrays(
+            symbols, period=period, interval=interval, start=start, end=end,
+            auto_adjust=auto_adjust, actions=actions,
+        )
+        return {symbol: arrays_to_frame(arrays) for symbol, arrays in series.items()}, errors
+
+    def fetch_arrays(
+        self,
+        symbols: Iterable[str],
+        period: Optional[str] = "1mo",
+        interval: str = "1d",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        auto_adjust: bool = True,
+        actions: bool = True,
+    ) -> Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, str]]:
+        """
+        Como ``fetch``, mas retorna arrays numpy em vez de DataFrames.
+
+        Símbolos da camada quente são recortados direto dos arquivos mapeados
+        em memória: sem ajuste, as colunas são visões somente leitura, sem cópia.
+
+        Args:
+            symbols: Símbolos dos tickers (duplicatas são ignoradas)
+            period: Período (ex: "1mo", "5y"); ignorado quando ``start`` é informado
+            interval: Intervalo dos candles (deve ser suportado, ver ``supports``)
+            start: Data inicial (YYYY-MM-DD)
+            end: Data final exclusiva (YYYY-MM-DD)
+            auto_adjust: Ajustar preços por dividendos/splits
+            actions: Incluir dividendos e desdobramentos
+
+        Returns:
+            Tupla (series, errors): por símbolo, dicionário com "ts" (segundos,
+            horário local) e as colunas no formato de ``Ticker.history``
+            ("Open", "High", ...); e mensagem de erro por símbolo que falhou
+
+        Raises:
+            ValueError: Se o intervalo ou período não for suportado
+        """
+        if not self.supports(interval, period, start):
+            raise ValueError(f"Intervalo/período não suportado pelo armazenamento local: {interval}/{period}")
+
+        requested = list(dict.fromkeys(s.strip() for s in symbols if s and s.strip()))
+        start_ts, end_ts, sessions = resolve_period(period, start, end)
+
+        # Semanal e mensal são agregados da série diária, a partir do início do bloco
+        source = "1d" if interval in FROM_DAILY else interval
+        if source != interval and start_ts != MAX_COVERAGE:
+            start_ts = int(bucket_starts(np.array([start_ts]), interval)[0])
+        errors = self._sync(requested, source, start_ts, end_ts)
+
+        series: Dict[str, Dict[str, np.ndarray]] = {}
+        for symbol in requested:
+            if symbol in errors:
+                continue
+            raw = self._read_raw(symbol, source, start_ts, end_ts)
+            if sessions is not None:
+                first = last_sessions(raw["ts"], sessions)
+                raw = {field: values[first:] for field, values in raw.items()}
+            if not len(raw["ts"]):
+                errors[symbol] = f"Nenhum dado histórico encontrado para o ticker '{symbol}'."
+                continue
+            columns = _history_columns(raw, auto_adjust, actions)
+            if source != interval:
+                ts, aggregated = resample_arrays(
+                    columns.pop("ts"), columns, interval, calendar_for(symbol)
+                )
+                columns = {"ts": ts, **aggregated}
+            series[symbol] = columns
+        return series, errors
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        """Remove as séries armazenadas (de um símbolo ou todas)."""
+        conn = self._connection()
+        with conn:
+            if symbol is None:
+                conn.execute("DELETE FROM bars")
+                conn.execute("DELETE FROM series")
+            else:
+                conn.execute("DELETE FROM bars WHERE symbol = ?", (symbol,))
+                conn.execute("DELETE FROM series WHERE symbol = ?", (symbol,))
+
+    # ==================== SINCRONIZAÇÃO ====================
+
+    def _sync(
+        self, symbols: List[str], interval: str, start_ts: int, end_ts: Optional[int]
+    ) -> Dict[str, str]:
+        """
+        Garante que as séries cobrem a janela pedida, buscando só o que falta.
+
+        Returns:
+            Mensagem de erro por símbolo sem dados locais e cuja busca falhou
+        """
+        meta = self._load_meta(symbols, interval)
+        now = time.time()
+
+        # Início da busca -> símbolos; None = period="max"
+        full: Dict[Optional[int], List[str]] = {}
+        delta: Dict[int, List[str]] = {}
+        for symbol in symbols:
+            series = meta.get(symbol)
+            if series is None or start_ts < series["covered_from"]:
+                fetch_from = None if start_ts == MAX_COVERAGE else start_ts
+                full.setdefault(fetch_from, []).append(symbol)
+            elif (
+                (end_ts is None or end_ts > series["last_ts"])
+                and now - series["checked_at"] >= self.refresh_seconds
+                # Sem pregão desde a última verificação não há barras novas
+                and calendar_for(symbol).traded_since(series["checked_at"], now)
+            ):
+                delta.setdefault(series["last_ts"], []).append(symbol)
+
+        errors: Dict[str, str] = {}
+        for fetch_from, group in full.items():
+            errors.update(self._download(group, interval, fetch_from, meta, replace=True))
+
+        reload: Dict[Optional[int], List[str]] = {}
+        for last_ts, group in delta.items():
+            new_events = []
+            errors.update(self._download(group, interval, last_ts, meta, replace=False, new_events=new_events))
+            for symbol in new_events:
+                covered_from = meta[symbol]["covered_from"]
+                reload.setdefault(None if covered_from == MAX_COVERAGE else covered_from, []).append(symbol)
+
+        for fetch_from, group in reload.items():
+            self.logger.info(f"Novos eventos corporativos em {group}; recarregando séries {interval}")
+            errors.update(self._download(group, interval, fetch_from, meta, replace=True))
+
+        # Símbolos com série local continuam sendo servidos mesmo se a atualização falhou
+        return {symbol: error for symbol, error in errors.items() if symbol not in meta}
+
+    def _download(
+        self,
+        symbols: List[str],
+        interval: str,
+        fetch_from: Optional[int],
+        meta: Dict[str, dict],
+        replace: bool,
+        new_events: Optional[List[str]] = None,
+    ) -> Dict[str, str]:
+        """
+        Baixa as barras a partir de ``fetch_from`` e grava no banco.
+
+        Com ``replace=True`` a série é substituída (e sua cobertura passa a
+        começar em ``fetch_from``); caso contrário as barras são mescladas e os
+        símbolos com dividendo ou desdobramento novo são anotados em ``new_events``.
+        """
+        if fetch_from is None:
+            frames, errors = history_batch_fetcher.fetch(
+                symbols, period="max", interval=interval, auto_adjust=False, actions=True
+            )
+        else:
+            start = pd.Timestamp(fetch_from, unit="s").strftime("%Y-%m-%d")
+            frames, errors = history_batch_fetcher.fetch(
+                symbols, period=None, interval=interval, start=start, auto_adjust=False, actions=True
+            )
+
+        now = time.time()
+        published = []
+        conn = self._connection()
+        with conn:
+            for symbol in symbols:
+                frame = frames.get(symbol)
+                series = meta.get(symbol)
+                if frame is None:
+                    if not replace and series is not None:
+                        # Sem barras novas (ex: fim de semana): a série segue válida
+                        self._touch(conn, symbol, interval, now)
+                        errors.pop(symbol, None)
+                    continue
+
+                rows = self._rows(frame)
+                if replace:
+                    conn.execute("DELETE FROM bars WHERE symbol = ? AND interval = ?", (symbol, interval))
+                    covered_from = MAX_COVERAGE if fetch_from is None else fetch_from
+                elif new_events is not None and any(
+                    row[0] > series["last_ts"] and (row[7] or row[8]) for row in rows
+                ):
+                    new_events.append(symbol)
+                    continue
+                else:
+                    covered_from = series["covered_from"]
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(symbol, interval) + row for row in rows],
+                )
+                last_ts = max(rows[-1][0], series["last_ts"]) if series and not replace else rows[-1][0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?)",
+                    (symbol, interval, covered_from, last_ts, now),
+                )
+                meta[symbol] = {"covered_from": covered_from, "last_ts": last_ts, "checked_at": now}
+                published.append(symbol)
+
+        for symbol in published:
+            if hot_series_tier.is_hot(symbol):
+                self._publish(symbol, interval)
+        return errors
+
+    @staticmethod
+    def _rows(frame: pd.DataFrame) -> List[tuple]:
+        """Converte o DataFrame sem ajuste do download em linhas da tabela ``bars``."""
+        index = frame.index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        ts = index.as_unit("s").asi8.tolist()
+
+        def column(name: str, default: float = 0.0) -> list:
+            if name not in frame.columns:
+                return [default] * len(frame)
+            values = frame[name].astype(float).to_numpy()
+            return np.where(np.isnan(values), None, values).tolist()
+
+        close = column("Close", None)
+        adj_close = column("Adj Close", None) if "Adj Close" in frame.columns else close
+        return list(zip(
+            ts, column("Open", None), column("High", None), column("Low", None), close,
+            adj_close, column("Volume", None), column("Dividends"), column("Stock Splits"),
+        ))
+
+    # ==================== LEITURA ====================
+
+    def _read_raw(
+        self, symbol: str, interval: str, start_ts: int, end_ts: Optional[int]
+    ) -> Dict[str, np.ndarray]:
+        """Lê a janela pedida, sem ajuste, da camada quente ou do banco."""
+        if hot_series_tier.is_hot(symbol):
+            series = hot_series_tier.get(symbol, interval)
+            if series is None:
+                # Série baixada antes de o símbolo entrar na camada quente
+                self._publish(symbol, interval)
+                series = hot_series_tier.get(symbol, interval)
+            if series is not None:
+                return series.window(start_ts, end_ts)
+        return self._query(symbol, interval, start_ts, end_ts)
+
+    def _query(
+        self, symbol: str, interval: str, start_ts: int = MAX_COVERAGE, end_ts: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Lê uma janela do banco como arrays (um por campo de ``FIELDS``)."""
+        query = (
+            "SELECT ts, open, high, low, close, adj_close, volume, dividends, splits "
+            "FROM bars WHERE symbol = ? AND interval = ? AND ts >= ?"
+        )
+        params: list = [symbol, interval, start_ts]
+        if end_ts is not None:
+            query += " AND ts < ?"
+            params.append(end_ts)
+        rows = self._connection().execute(query + " ORDER BY ts", params).fetchall()
+
+        data = np.array(rows, dtype=float).reshape(len(rows), len(FIELDS) + 1).T
+        result = {"ts": data[0].astype(np.int64)}
+        result.update(zip(FIELDS, data[1:]))
+        return result
+
+    def _publish(self, symbol: str, interval: str) -> None:
+        """Regrava o arquivo da camada quente com a série completa do banco."""
+        series = self._query(symbol, interval)
+        if not len(series["ts"]):
+            return
+        try:
+            hot_series_tier.publish(symbol, interval, series["ts"], series)
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar a série quente {symbol}/{interval}: {str(e)}")
+
+    # ==================== BANCO ====================
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, criando o banco no primeiro uso."""
+        return self._db.connection()
+
+    def _load_meta(self, symbols: List[str], interval: str) -> Dict[str, dict]:
+        """Carrega a cobertura, a última barra e a última verificação de cada série."""
+        if not symbols:
+            return {}
+        placeholders = ",".join("?" * len(symbols))
+        rows = self._connection().execute(
+            f"SELECT symbol, covered_from, last_ts, checked_at FROM series "
+            f"WHERE interval = ? AND symbol IN ({placeholders})",
+            [interval, *symbols],
+        ).fetchall()
+        return {
+            symbol: {"covered_from": covered_from, "last_ts": last_ts, "checked_at": checked_at}
+            for symbol, covered_from, last_ts, checked_at in rows
+        }
+
+    @staticmethod
+    def _touch(conn: sqlite3.Connection, symbol: str, interval: str, now: float) -> None:
+        """Registra que a série foi verificada agora."""
+        conn.execute(
+            "UPDATE series SET checked_at = ? WHERE symbol = ? AND interval = ?",
+            (now, symbol, interval),
+        )
+
+
+# Instância única compartilhada pelas rotas e serviços
+ohlcv_store = OHLCVStore()
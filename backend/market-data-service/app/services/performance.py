@@ -0,0 +1,159 @@
+"""
+Performance de ativos por período (1D, 7D, 1M, 3M, 6M, 1Y).
+
+Em vez de um ``ticker.history()`` por janela e por ativo, todas as janelas são
+derivadas de uma única série diária de ~1 ano por ativo, lida do armazenamento
+local de séries (que só busca no Yahoo, em lote, as barras novas). Os preços de início de cada janela são localizados com
+uma única busca binária vetorizada (``searchsorted``) sobre o array de datas,
+sem montar DataFrames (nos ativos da camada quente, direto dos arquivos
+mapeados em memória).
+
+Nome, preço atual e moeda vêm das cotações em lote; a URL do logo depende do
+website da empresa, lido do cache compartilhado de websites (os ausentes são
+buscados em segundo plano e o logo fica None até lá).
+
+Example:
+    from services.performance import period_performance_calculator
+
+    results = period_performance_calculator.calculate(["PETR4.SA", "VALE3.SA"])
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.logging import LoggerMixin
+from services.company_websites import company_websites
+from services.ohlcv_store import ohlcv_store
+from services.quote_batch import quote_batch_engine
+
+# Janela -> deslocamento a partir do último pregão (None = pregão anterior)
+PERFORMANCE_WINDOWS: Dict[str, Optional[pd.DateOffset]] = {
+    "1D": None,
+    "7D": pd.DateOffset(days=7),
+    "1M": pd.DateOffset(months=1),
+    "3M": pd.DateOffset(months=3),
+    "6M": pd.DateOffset(months=6),
+    "1Y": pd.DateOffset(years=1),
+}
+
+# Histórico buscado: 1 ano mais uma folga para achar o pregão de referência do 1Y
+_HISTORY_DAYS = 380
+
+
+def compute_window_performance(close: pd.Series) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Calcula a variação de cada janela a partir de uma série diária de fechamentos.
+
+    Args:
+        close: Série de fechamentos indexada por data, em ordem crescente
+
+    Returns:
+        O mesmo retorno de ``compute_window_performance_arrays``
+    """
+    dates = pd.DatetimeIndex(close.index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return compute_window_performance_arrays(dates.values, close.to_numpy(dtype=float))
+
+
+def compute_window_performance_arrays(
+    dates: np.ndarray, prices: np.ndarray
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Calcula a variação de cada janela a partir de arrays de datas e fechamentos.
+
+    O preço inicial de cada janela é o último fechamento até a data de corte
+    (último pregão menos o deslocamento da janela); se o histórico não cobrir a
+    janela inteira, usa o primeiro fechamento disponível.
+
+    Args:
+        dates: Datas (datetime64, horário local) em ordem crescente
+        prices: Fechamentos correspondentes (NaN são ignorados)
+
+    Returns:
+        Dicionário janela -> {change_percent, start_price, end_price, start_date,
+        end_date} ou None quando não há dados suficientes
+    """
+    valid = ~np.isnan(prices)
+    if not valid.all():
+        dates, prices = dates[valid], prices[valid]
+    if not len(prices):
+        return {name: None for name in PERFORMANCE_WINDOWS}
+
+    last = len(prices) - 1
+    anchor = pd.Timestamp(dates[last])
+
+    offsets = [offset for offset in PERFORMANCE_WINDOWS.values() if offset is not None]
+    cutoffs = np.array([(anchor - offset).to_datetime64() for offset in offsets]).astype(dates.dtype)
+    positions = iter(np.maximum(np.searchsorted(dates, cutoffs, side="right") - 1, 0))
+    labels = np.datetime_as_string(dates, unit="D")
+
+    end_price = prices[last]
+    result = {}
+    for name, offset in PERFORMANCE_WINDOWS.items():
+        start = max(last - 1, 0) if offset is None else int(next(positions))
+        start_price = prices[start]
+        if not start_price:
+            result[name] = None
+            continue
+        result[name] = {
+            "change_percent": round((end_price - start_price) / start_price * 100, 2),
+            "start_price": round(float(start_price), 2),
+            "end_price": round(float(end_price), 2),
+            "start_date": str(labels[start]),
+            "end_date": str(labels[last]),
+        }
+    return result
+
+
+class PeriodPerformanceCalculator(LoggerMixin):
+    """Calcula a tabela de performance por período para vários ativos."""
+
+    def calculate(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Calcula a performance 1D/7D/1M/3M/6M/1Y dos ativos.
+
+        Args:
+            symbols: Símbolos dos ativos (ex: ["PETR4.SA", "^BVSP"])
+
+        Returns:
+            Dicionário símbolo -> {"success": True, "data": {...}} ou
+            {"success": False, "error": "...", "data": None}
+        """
+        start = (date.today() - timedelta(days=_HISTORY_DAYS)).isoformat()
+        series, errors = ohlcv_store.fetch_arrays(
+            symbols, period=None, interval="1d", start=start, actions=False
+        )
+        quotes = quote_batch_engine.get_quotes(symbols)
+        logos = company_websites.logos([s for s in symbols if s in series])
+
+        results = {}
+        for symbol in symbols:
+            arrays = series.get(symbol)
+            if arrays is None:
+                error = errors.get(symbol, f"Nenhum dado histórico encontrado para o ticker '{symbol}'.")
+                self.logger.error(f"Erro ao processar performance para {symbol}: {error}")
+                results[symbol] = {"success": False, "error": error, "data": None}
+                continue
+
+            quote = quotes.get(symbol, {}).get("data") or {}
+            dates, close = arrays["ts"].astype("datetime64[s]"), arrays["Close"]
+            performance = compute_window_performance_arrays(dates, close)
+            results[symbol] = {
+                "success": True,
+                "data": {
+                    "name": quote.get("name") or "",
+                    "current_price": quote.get("price") or (performance["1D"] or {}).get("end_price"),
+                    "currency": quote.get("currency") or "",
+                    "logo": logos.get(symbol),
+                    "performance": performance,
+                },
+            }
+        return results
+
+
+# Instância única compartilhada pelas rotas e serviços
+period_performance_calculator = PeriodPerformanceCalculator()
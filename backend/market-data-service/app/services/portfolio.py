@@ -0,0 +1,191 @@
+"""
+Análise de carteiras sobre os históricos armazenados localmente.
+
+Os clientes montavam as estatísticas de carteira a partir de várias chamadas a
+``/history``. Aqui os fechamentos dos ativos e do índice de referência são
+lidos do armazenamento local (sem novas consultas ao Yahoo quando o histórico
+já está em disco), alinhados nas datas comuns e combinados em uma única série
+de valor da carteira. Retorno, volatilidade, beta, Sharpe/Sortino, drawdown e
+VaR saem de operações numpy sobre essa série.
+
+A carteira pode ser informada de duas formas:
+
+- pesos: a carteira é rebalanceada a cada barra para manter os pesos
+  (retorno da carteira = retornos dos ativos x pesos);
+- posições (quantidade de ações): carteira comprada e mantida, cujo valor é a
+  soma de quantidade x fechamento em cada data.
+
+Example:
+    from services.portfolio import analyze_portfolio
+
+    result = analyze_portfolio(weights={"PETR4.SA": 0.6, "VALE3.SA": 0.4}, period="1y")
+"""
+
+from statistics import NormalDist
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from core.config import settings
+from services.analytics import common_dates, load_aligned_prices, max_drawdown, periods_per_year, to_finite
+from services.resampling import INTRADAY_SECONDS
+
+
+def _normalize_holdings(holdings: Dict[str, float]) -> Dict[str, float]:
+    """Padroniza os tickers (maiúsculas, sem espaços) somando entradas repetidas."""
+    normalized: Dict[str, float] = {}
+    for symbol, amount in holdings.items():
+        symbol = symbol.strip().upper()
+        if not symbol:
+            continue
+        normalized[symbol] = normalized.get(symbol, 0.0) + float(amount)
+    return normalized
+
+
+def analyze_portfolio(
+    weights: Optional[Dict[str, float]] = None,
+    positions: Optional[Dict[str, float]] = None,
+    period: Optional[str] = "1y",
+    interval: str = "1d",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    benchmark: Optional[str] = None,
+    risk_free_rate: Optional[float] = None,
+    confidence: float = 0.95,
+) -> Dict[str, Any]:
+    """
+    Calcula as métricas de risco e retorno de uma carteira.
+
+    Args:
+        weights: Peso por ticker (normalizados para somar 1; carteira rebalanceada)
+        positions: Quantidade de ações por ticker (carteira comprada e mantida)
+        period: Período (ex: "6mo", "1y"); ignorado quando ``start`` é informado
+        interval: Intervalo dos candles
+        start: Data inicial (YYYY-MM-DD)
+        end: Data final exclusiva (YYYY-MM-DD)
+        benchmark: Índice de referência do beta (padrão: PORTFOLIO_BENCHMARK)
+        risk_free_rate: Taxa livre de risco anual em fração (padrão: PORTFOLIO_RISK_FREE_RATE)
+        confidence: Nível de confiança do VaR (ex: 0.95)
+
+    Returns:
+        Dicionário com a composição ("holdings"), as métricas ("metrics"), as
+        datas comuns, a série de valor, os retornos da carteira, a série
+        rebaseada do índice de referência (nas datas da carteira, None onde o
+        índice não tem pregão) e os erros por ticker
+
+    Raises:
+        ValueError: Carteira inválida ou histórico comum insuficiente
+    """
+    if (weights is None) == (positions is None):
+        raise ValueError("Informe os pesos (weights) ou as posições (positions) da carteira")
+    if not 0 < confidence < 1:
+        raise ValueError("O nível de confiança deve estar entre 0 e 1")
+
+    holdings = _normalize_holdings(weights if weights is not None else positions)
+    if not holdings:
+        raise ValueError("A carteira não possui ativos")
+    benchmark = (benchmark or settings.PORTFOLIO_BENCHMARK).strip().upper()
+    risk_free_rate = settings.PORTFOLIO_RISK_FREE_RATE if risk_free_rate is None else risk_free_rate
+
+    # Só os ativos definem o calendário da carteira; o índice de referência (que
+    # pode ser de outra bolsa ou ter histórico menor) é alinhado à parte no beta
+    prices = load_aligned_prices(holdings, period=period, interval=interval, start=start, end=end)
+    reference_prices = load_aligned_prices([benchmark], period=period, interval=interval, start=start, end=end)
+    missing = [symbol for symbol in holdings if symbol not in prices.symbols]
+    if missing:
+        raise ValueError(f"Sem histórico para: {', '.join(missing)}")
+    if len(prices.ts) < 3:
+        raise ValueError("Histórico comum insuficiente para a análise da carteira")
+
+    symbols = list(holdings)
+    columns = [prices.symbols.index(symbol) for symbol in symbols]
+    close = prices.close[:, columns]
+    amounts = np.array([holdings[symbol] for symbol in symbols])
+
+    if weights is not None:
+        if amounts.sum() <= 0:
+            raise ValueError("A soma dos pesos deve ser positiva")
+        initial_weights = amounts / amounts.sum()
+        returns = prices.returns()[:, columns] @ initial_weights
+        value = 100.0 * np.concatenate(([1.0], np.cumprod(1.0 + returns)))
+        # Pesos efetivos ao fim do período, se a carteira não fosse rebalanceada
+        drift = initial_weights * close[-1] / close[0]
+        current_weights = drift / drift.sum()
+    else:
+        market_value = close * amounts
+        value = market_value.sum(axis=1)
+        if value[0] <= 0:
+            raise ValueError("O valor inicial da carteira deve ser positivo")
+        returns = value[1:] / value[:-1] - 1.0
+        initial_weights = market_value[0] / value[0]
+        current_weights = market_value[-1] / value[-1]
+
+    annualization = periods_per_year(interval)
+    bars = len(returns)
+    deviation = returns.std(ddof=1)
+    excess = returns - ((1.0 + risk_free_rate) ** (1.0 / annualization) - 1.0)
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))
+
+    # VaR de um período, como perda positiva (fração do valor da carteira)
+    historical_var = -np.quantile(returns, 1.0 - confidence)
+    tail = returns[returns <= -historical_var]
+    parametric_var = -(returns.mean() + NormalDist().inv_cdf(1.0 - confidence) * deviation)
+
+    beta = correlation = None
+    benchmark_rebased = None
+    common = ()
+    if reference_prices.symbols:
+        try:
+            common, own, other = common_dates(prices, reference_prices, interval)
+        except ValueError as e:
+            # Índice em outro fuso que não pode ser alinhado em intraday: segue sem beta
+            reference_prices.errors[benchmark] = str(e)
+    if len(common):
+        # Retornos da carteira e do índice entre as datas comuns aos dois
+        reference = reference_prices.close[other, 0]
+        if len(common) >= 3:
+            covariance = np.cov(value[own][1:] / value[own][:-1] - 1.0, reference[1:] / reference[:-1] - 1.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                beta = covariance[0, 1] / covariance[1, 1]
+                correlation = covariance[0, 1] / np.sqrt(covariance[0, 0] * covariance[1, 1])
+        # Nas datas da carteira; None onde o índice não tem pregão
+        rebased = np.full(len(prices.ts), np.nan)
+        rebased[own] = reference / reference[0] * 100
+        benchmark_rebased = to_finite(rebased)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total_return = value[-1] / value[0] - 1.0
+        metrics = {
+            "total_return_pct": to_finite(total_return * 100, 2),
+            "annualized_return_pct": to_finite(((1.0 + total_return) ** (annualization / bars) - 1.0) * 100, 2),
+            "volatility_pct": to_finite(deviation * np.sqrt(annualization) * 100, 2),
+            "sharpe_ratio": to_finite(excess.mean() / deviation * np.sqrt(annualization), 3),
+            "sortino_ratio": to_finite(excess.mean() / downside * np.sqrt(annualization), 3),
+            "max_drawdown_pct": to_finite(max_drawdown(value[:, None])[0] * 100, 2),
+            "beta": to_finite(beta, 3) if beta is not None else None,
+            "correlation": to_finite(correlation, 3) if correlation is not None else None,
+            "var_historical_pct": to_finite(historical_var * 100, 2),
+            "var_parametric_pct": to_finite(parametric_var * 100, 2),
+            "expected_shortfall_pct": to_finite(-tail.mean() * 100, 2) if len(tail) else None,
+            "confidence": confidence,
+            "risk_free_rate": risk_free_rate,
+        }
+    if positions is not None:
+        # Posições: VaR também em valor monetário, sobre o valor atual da carteira
+        metrics["current_value"] = to_finite(value[-1], 2)
+        metrics["var_historical_amount"] = to_finite(historical_var * value[-1], 2)
+        metrics["var_parametric_amount"] = to_finite(parametric_var * value[-1], 2)
+
+    return {
+        "holdings": {
+            symbol: {"weight": to_finite(initial_weights[j]), "current_weight": to_finite(current_weights[j])}
+            for j, symbol in enumerate(symbols)
+        },
+        "benchmark": benchmark,
+        "metrics": metrics,
+        "dates": prices.dates("%Y-%m-%d" if interval not in INTRADAY_SECONDS else "%Y-%m-%d %H:%M"),
+        "value": to_finite(value),
+        "returns": to_finite(returns, 6),
+        "benchmark_rebased": benchmark_rebased,
+        "errors": {**prices.errors, **reference_prices.errors},
+    }
@@ -0,0 +1,311 @@
+"""
+Cotações em lote para centenas de tickers.
+
+``Ticker.info`` busca o perfil completo de um único ticker (vários módulos do
+quoteSummary) quando as telas de lista só precisam de uns poucos campos de
+cotação. Este módulo usa o endpoint multi-símbolo de cotações do Yahoo
+(``/v7/finance/quote``, o mesmo usado internamente pelo yfinance), dividindo
+listas grandes em blocos buscados em paralelo. Cada símbolo tem sua própria
+entrada de cache, de forma que lotes sobrepostos reaproveitam cotações, e
+falhas são reportadas por símbolo sem derrubar o lote.
+
+Blocos cuja chamada em lote falha são buscados símbolo a símbolo via
+``Ticker.fast_info`` (que não depende do endpoint de cotações).
+
+Example:
+    from services.quote_batch import quote_batch_engine
+
+    quotes = quote_batch_engine.get_quotes(["PETR4.SA", "VALE3.SA", "AAPL"])
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+import yfinance as yf
+from yfinance.data import YfData
+
+from core.config import settings
+from core.logging import LoggerMixin
+
+_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+# TTL das falhas: símbolos inválidos não são consultados de novo a cada lote
+_ERROR_TTL_SECONDS = 60
+
+
+def _quote_from_v7(quote: Dict[str, Any]) -> Dict[str, Any]:
+    """Extrai os campos de cotação de um item da resposta do /v7/finance/quote."""
+    dividend_yield = quote.get("dividendYield")
+    if dividend_yield is None and quote.get("trailingAnnualDividendYield") is not None:
+        dividend_yield = quote["trailingAnnualDividendYield"] * 100
+    return {
+        "symbol": quote.get("symbol"),
+        "name": quote.get("shortName") or quote.get("longName"),
+        "price": quote.get("regularMarketPrice"),
+        "change": quote.get("regularMarketChangePercent"),
+        "change_value": quote.get("regularMarketChange"),
+        "previous_close": quote.get("regularMarketPreviousClose"),
+        "open": quote.get("regularMarketOpen"),
+        "day_high": quote.get("regularMarketDayHigh"),
+        "day_low": quote.get("regularMarketDayLow"),
+        "volume": quote.get("regularMarketVolume"),
+        "avg_volume_3m": quote.get("averageDailyVolume3Month"),
+        "market_cap": quote.get("marketCap"),
+        "pe_ratio": quote.get("trailingPE"),
+        "dividend_yield": dividend_yield,
+        "book_value": quote.get("bookValue"),
+        "fifty_two_week_high": quote.get("fiftyTwoWeekHigh"),
+        "fifty_two_week_low": quote.get("fiftyTwoWeekLow"),
+        "fiftyTwoWeekChangePercent": quote.get("fiftyTwoWeekChangePercent"),
+        "currency": quote.get("currency"),
+        "exchange": quote.get("exchange"),
+        "fullExchangeName": quote.get("fullExchangeName"),
+        "quote_type": quote.get("quoteType"),
+        "market_state": quote.get("marketState"),
+        "market_time": quote.get("regularMarketTime"),
+    }
+
+
+def _quote_from_fast_info(symbol: str, info: Any) -> Dict[str, Any]:
+    """Monta os mesmos campos a partir de ``Ticker.fast_info`` (fallback)."""
+    price = info.get("lastPrice")
+    previous_close = info.get("previousClose")
+    change_value = change = None
+    if price is not None and previous_close:
+        change_value = price - previous_close
+        change = change_value / previous_close * 100
+    year_change = info.get("yearChange")
+    return {
+        "symbol": symbol,
+        "name": None,
+        "price": price,
+        "change": change,
+        "change_value": change_value,
+        "previous_close": previous_close,
+        "open": info.get("open"),
+        "day_high": info.get("dayHigh"),
+        "day_low": info.get("dayLow"),
+        "volume": info.get("lastVolume"),
+        "avg_volume_3m": info.get("threeMonthAverageVolume"),
+        "market_cap": info.get("marketCap"),
+        "pe_ratio": None,
+        "dividend_yield": None,
+        "book_value": None,
+        "fifty_two_week_high": info.get("yearHigh"),
+        "fifty_two_week_low": info.get("yearLow"),
+        "fiftyTwoWeekChangePercent": year_change * 100 if year_change is not None else None,
+        "currency": info.get("currency"),
+        "exchange": info.get("exchange"),
+        "fullExchangeName": None,
+        "quote_type": info.get("quoteType"),
+        "market_state": None,
+        "market_time": None,
+    }
+
+
+class QuoteBatchEngine(LoggerMixin):
+    """
+    Busca cotações leves de muitos tickers com cache por símbolo.
+
+    Attributes:
+        chunk_size: Símbolos por chamada ao endpoint de cotações
+        workers: Blocos buscados em paralelo
+        ttl: Tempo de vida (s) de cada cotação em cache
+        maxsize: Número máximo de símbolos em cache
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = None,
+        workers: int = None,
+        ttl: int = None,
+        maxsize: int = 5000,
+    ):
+        """
+        Inicializa o motor de cotações em lote.
+
+        Args:
+            chunk_size: Símbolos por chamada (padrão: configuração global)
+            workers: Blocos em paralelo (padrão: configuração global)
+            ttl: TTL das cotações em cache (padrão: configuração global)
+            maxsize: Número máximo de símbolos em cache
+        """
+        self.chunk_size = chunk_size or settings.QUOTE_BATCH_CHUNK_SIZE
+        self.workers = workers or settings.QUOTE_BATCH_WORKERS
+        self.ttl = ttl or settings.QUOTE_CACHE_TTL_SECONDS
+        self.maxsize = maxsize
+
+        # símbolo -> (expires_at, resultado no formato {"success", "data"/"error"})
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._fallback_pool: Optional[ThreadPoolExecutor] = None
+
+    def get_quotes(self, symbols: List[str], timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtém as cotações de uma lista de símbolos.
+
+        Args:
+            symbols: Símbolos dos tickers (ex: ["PETR4.SA", "AAPL"])
+            timeout: Prazo (s) para as cotações fora do cache. Símbolos não
+                obtidos no prazo ficam de fora do resultado; a busca continua
+                em segundo plano e as cotações entram no cache ao chegar
+
+        Returns:
+            Dicionário símbolo -> {"success": True, "data": {...}} ou
+            {"success": False, "error": "...", "data": None}, na ordem recebida
+        """
+        requested = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        results = self._from_cache(requested)
+        missing = [s for s in requested if s not in results]
+
+        if missing:
+            chunks = [missing[i:i + self.chunk_size] for i in range(0, len(missing), self.chunk_size)]
+            if timeout is not None:
+                futures = [self._get_pool().submit(self._fetch_and_store, chunk) for chunk in chunks]
+                done, pending = wait(futures, timeout=timeout)
+                for future in done:
+                    results.update(future.result())
+                if pending:
+                    self.logger.info(f"Cotações em lote: prazo de {timeout}s esgotado para {len(pending)} bloco(s)")
+            else:
+                if len(chunks) == 1:
+                    fetched = [self._fetch_chunk(chunks[0])]
+                else:
+                    fetched = list(self._get_pool().map(self._fetch_chunk, chunks))
+                for chunk_result in fetched:
+                    results.update(chunk_result)
+                self._store(missing, results)
+
+        self.logger.info(
+            f"Cotações em lote: {len(requested)} símbolos, {len(requested) - len(missing)} do cache, "
+            f"{len(missing)} buscados"
+        )
+        return {symbol: results[symbol] for symbol in requested if symbol in results}
+
+    def clear(self) -> None:
+        """Remove todas as cotações em cache."""
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self) -> None:
+        """Encerra os pools de threads dos blocos e do fallback por símbolo."""
+        for name in ("_pool", "_fallback_pool"):
+            pool = getattr(self, name)
+            setattr(self, name, None)
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    # ==================== AUXILIARES ====================
+
+    def _from_cache(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retorna as entradas válidas em cache para os símbolos."""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for symbol in symbols:
+                entry = self._cache.get(symbol)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._cache[symbol]
+                    continue
+                self._cache.move_to_end(symbol)
+                found[symbol] = entry[1]
+        return found
+
+    def _store(self, symbols: List[str], results: Dict[str, Dict[str, Any]]) -> None:
+        """Armazena os resultados buscados, com TTL menor para falhas."""
+        now = time.monotonic()
+        with self._lock:
+            for symbol in symbols:
+                result = results[symbol]
+                ttl = self.ttl if result["success"] else min(self.ttl, _ERROR_TTL_SECONDS)
+                self._cache[symbol] = (now + ttl, result)
+                self._cache.move_to_end(symbol)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def _fetch_and_store(self, chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Busca um bloco e o guarda no cache (mesmo que quem pediu já tenha desistido)."""
+        result = self._fetch_chunk(chunk)
+        self._store(chunk, result)
+        return result
+
+    def _fetch_chunk(self, chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Busca um bloco em uma única chamada, com fallback por símbolo."""
+        try:
+            quotes = self._fetch_v7(chunk)
+        except Exception as e:
+            self.logger.warning(
+                f"Cotação em lote falhou para {len(chunk)} símbolos ({str(e)}); usando fast_info"
+            )
+            if len(chunk) == 1:
+                return {chunk[0]: self._fetch_fast_info(chunk[0])}
+            # Pool próprio: os blocos já rodam no pool principal
+            return dict(zip(chunk, self._get_fallback_pool().map(self._fetch_fast_info, chunk)))
+
+        result = {}
+        for symbol in chunk:
+            quote = quotes.get(symbol)
+            if quote is None or quote.get("regularMarketPrice") is None:
+                result[symbol] = {
+                    "success": False,
+                    "error": f"Nenhuma cotação encontrada para o ticker '{symbol}'.",
+                    "data": None,
+                }
+            else:
+                result[symbol] = {"success": True, "data": _quote_from_v7(quote)}
+        return result
+
+    def _fetch_v7(self, chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Chama o endpoint multi-símbolo de cotações do Yahoo."""
+        payload = YfData().get_raw_json(
+            _QUOTE_URL,
+            params={"symbols": ",".join(chunk), "formatted": "false"},
+            timeout=settings.YAHOO_FINANCE_TIMEOUT,
+        )
+        response = (payload or {}).get("quoteResponse") or {}
+        if response.get("error"):
+            raise ConnectionError(str(response["error"]))
+        return {
+            str(quote.get("symbol", "")).upper(): quote
+            for quote in response.get("result") or []
+        }
+
+    def _fetch_fast_info(self, symbol: str) -> Dict[str, Any]:
+        """Busca a cotação de um único símbolo via fast_info."""
+        try:
+            quote = _quote_from_fast_info(symbol, yf.Ticker(symbol).fast_info)
+            if quote["price"] is None:
+                raise ValueError(f"Nenhuma cotação encontrada para o ticker '{symbol}'.")
+            return {"success": True, "data": quote}
+        except Exception as e:
+            return {"success": False, "error": str(e), "data": None}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Cria sob demanda o pool usado para buscar blocos em paralelo."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="quote-batch"
+                    )
+        return self._pool
+
+    def _get_fallback_pool(self) -> ThreadPoolExecutor:
+        """Cria sob demanda o pool das buscas por símbolo via fast_info."""
+        if self._fallback_pool is None:
+            with self._lock:
+                if self._fallback_pool is None:
+                    self._fallback_pool = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="quote-fallback"
+                    )
+        return self._fallback_pool
+
+
+# Instância única compartilhada pelas rotas
+quote_batch_engine = QuoteBatchEngine()
@@ -0,0 +1,162 @@
+"""
+Reamostragem de barras OHLCV para intervalos maiores.
+
+Trocar a aba do gráfico de 5m para 15m ou 1h (ou de 1d para 1wk/1mo) não
+precisa de uma nova chamada ao Yahoo quando a série mais fina já está em
+cache: as barras maiores são agregadas localmente (abertura da primeira barra,
+máxima, mínima, fechamento da última, soma do volume).
+
+Os blocos intraday são ancorados na abertura do pregão de cada mercado, como
+no Yahoo: na B3 as barras de 1h começam às 10:00, nos EUA às 9:30. Barras
+semanais começam na segunda-feira e mensais no primeiro dia do mês.
+
+A agregação é feita em numpy sobre arrays ordenados (``reduceat`` nos limites
+de cada bloco), sem ``DataFrame.resample``.
+
+Example:
+    from services.resampling import resample_frame
+
+    hourly = resample_frame(frame_5m, "1h", calendar_for("PETR4.SA"))
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.market_calendar import MarketCalendar
+
+# Duração dos intervalos intraday, em segundos
+INTRADAY_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "60m": 3600,
+    "90m": 5400,
+    "1h": 3600,
+}
+
+# Intervalos derivados das barras diárias
+FROM_DAILY = ("1wk", "1mo")
+
+# Agregação por coluna (nomes normalizados: minúsculos, sem espaços)
+_AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "adj_close": "last",
+    "volume": "sum",
+    "dividends": "sum",
+    "splits": "max",
+    "stock_splits": "max",
+}
+
+
+def finer_intervals(interval: str) -> Tuple[str, ...]:
+    """
+    Intervalos mais finos dos quais ``interval`` pode ser derivado.
+
+    Ordenados do mais grosso para o mais fino (menos barras a agregar primeiro).
+    """
+    if interval in FROM_DAILY:
+        return ("1d",)
+    target = INTRADAY_SECONDS.get(interval)
+    if target is None:
+        return ()
+    candidates = [
+        (seconds, name) for name, seconds in INTRADAY_SECONDS.items()
+        if seconds < target and target % seconds == 0 and name != "1h"
+    ]
+    return tuple(name for _, name in sorted(candidates, reverse=True))
+
+
+def bucket_starts(ts: np.ndarray, interval: str, calendar: Optional[MarketCalendar] = None) -> np.ndarray:
+    """
+    Calcula o início do bloco de cada barra.
+
+    Args:
+        ts: Timestamps em segundos (horário local da bolsa), em ordem crescente
+        interval: Intervalo de destino (intraday, "1wk" ou "1mo")
+        calendar: Calendário do mercado, para ancorar os blocos na abertura
+
+    Returns:
+        Array int64 com o início (segundos) do bloco de cada barra
+    """
+    if interval == "1wk":
+        days = ts // 86400
+        # 01/01/1970 foi uma quinta-feira (dia 3 da semana, com segunda = 0)
+        return (days - (days + 3) % 7) * 86400
+    if interval == "1mo":
+        months = ts.astype("datetime64[s]").astype("datetime64[M]")
+        return months.astype("datetime64[s]").astype(np.int64)
+
+    step = INTRADAY_SECONDS[interval]
+    anchor = 0
+    if calendar is not None and calendar.open_time is not None:
+        anchor = calendar.open_time.hour * 3600 + calendar.open_time.minute * 60
+    day = ts // 86400 * 86400
+    return day + anchor + (ts - day - anchor) // step * step
+
+
+def resample_arrays(
+    ts: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    interval: str,
+    calendar: Optional[MarketCalendar] = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Agrega barras em blocos do intervalo de destino.
+
+    Args:
+        ts: Timestamps em segundos (horário local), em ordem crescente
+        columns: Nome da coluna -> valores (nomes como em ``Ticker.history`` ou
+            nos campos do armazenamento; colunas desconhecidas usam a última barra)
+        interval: Intervalo de destino
+        calendar: Calendário do mercado (ancoragem dos blocos intraday)
+
+    Returns:
+        Tupla (ts, columns) com uma barra por bloco
+    """
+    if not len(ts):
+        return ts, dict(columns)
+    buckets = bucket_starts(ts, interval, calendar)
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.append(starts[1:], len(ts)) - 1
+
+    result = {}
+    for name, values in columns.items():
+        how = _AGGREGATIONS.get(str(name).strip().lower().replace(" ", "_"), "last")
+        if how == "first":
+            result[name] = values[starts]
+        elif how == "last":
+            result[name] = values[ends]
+        elif how == "max":
+            result[name] = np.fmax.reduceat(values, starts)
+        elif how == "min":
+            result[name] = np.fmin.reduceat(values, starts)
+        else:
+            summed = np.add.reduceat(np.nan_to_num(values.astype(np.float64)), starts)
+            result[name] = summed.astype(values.dtype) if values.dtype.kind in "iu" else summed
+    return buckets[starts], result
+
+
+def resample_frame(frame: pd.DataFrame, interval: str, calendar: Optional[MarketCalendar] = None) -> pd.DataFrame:
+    """
+    Agrega um DataFrame de histórico (índice sem fuso, horário local) no intervalo de destino.
+
+    Args:
+        frame: Histórico no formato de ``Ticker.history``
+        interval: Intervalo de destino
+        calendar: Calendário do mercado (ancoragem dos blocos intraday)
+
+    Returns:
+        DataFrame com uma linha por bloco e as mesmas colunas
+    """
+    ts = frame.index.as_unit("s").asi8
+    columns = {name: frame[name].to_numpy() for name in frame.columns}
+    bucket_ts, aggregated = resample_arrays(ts, columns, interval, calendar)
+    index = pd.DatetimeIndex(bucket_ts.astype("datetime64[s]"), name=frame.index.name)
+    return pd.DataFrame(aggregated, index=index, columns=frame.columns)
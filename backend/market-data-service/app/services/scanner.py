@@ -0,0 +1,387 @@
+"""
+Varredura de indicadores sobre o universo de tickers da B3.
+
+Perguntas como "quais tickers cruzaram para cima da média de 200 dias" ou
+"quais estão com RSI abaixo de 30" exigiam uma chamada de análise técnica por
+ticker. Aqui os fechamentos diários de todo o universo (``tickers.csv``) são
+alinhados em uma matriz (pregões nas linhas, tickers nas colunas), os
+indicadores são calculados para todas as colunas de uma vez e os predicados
+são avaliados sobre a última linha.
+
+Matrizes grandes são divididas em blocos de colunas avaliados em um pool de
+processos. A varredura usa só pregões encerrados, então o resultado de um
+mesmo filtro não muda ao longo do dia e fica em cache até o próximo pregão.
+
+Sintaxe dos filtros (separados por vírgula, combinados com "e"):
+    - comparação: ``rsi_14<30``, ``close>sma_200``, ``sma_50>=ema_20``
+    - cruzamento no último pregão: ``cross_above:sma_200`` (fechamento cruza
+      a série) ou ``cross_below:sma_50:sma_200`` (primeira série cruza a segunda)
+
+Séries disponíveis: ``close``, ``sma_N``, ``ema_N`` e ``rsi_N`` (Wilder).
+
+Example:
+    from services.scanner import technical_scanner
+
+    result = technical_scanner.scan("cross_above:sma_200,rsi_14<70")
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import settings
+from core.logging import LoggerMixin
+from services.hot_series import IBOV_SYMBOLS
+from services.indicators import exponential_smoothing
+from services.market_calendar import CALENDARS
+from services.ohlcv_store import ohlcv_store
+from services.ticker_universe import ticker_universe
+
+_SERIES_RE = re.compile(r"^(close|(sma|ema|rsi)_(\d+))$")
+_NUMBER_RE = re.compile(r"^-?\d+(\.\d+)?$")
+_COMPARISON_RE = re.compile(r"^([^<>=]+)(<=|>=|<|>)([^<>=]+)$")
+_CROSSES = ("cross_above", "cross_below")
+
+# Pregões sem fechamento a partir dos quais um ticker é considerado inativo
+_STALE_SESSIONS = 5
+
+
+def _parse_operand(text: str) -> str:
+    """Valida uma série ou constante de um filtro."""
+    match = _SERIES_RE.match(text)
+    if match and match.group(3) is not None and int(match.group(3)) == 0:
+        raise ValueError(f"Período inválido na série '{text}'")
+    if match or _NUMBER_RE.match(text):
+        return text
+    raise ValueError(f"Série não suportada: '{text}' (use close, sma_N, ema_N, rsi_N ou um número)")
+
+
+def parse_filters(where: str) -> Tuple[Tuple[str, str, str], ...]:
+    """
+    Converte os filtros da varredura em termos (operador, a, b).
+
+    Raises:
+        ValueError: Se algum filtro não seguir a sintaxe do módulo
+    """
+    terms = []
+    for item in where.split(","):
+        item = item.strip().lower().replace(" ", "")
+        if not item:
+            continue
+        if item.split(":")[0] in _CROSSES:
+            parts = item.split(":")
+            if len(parts) not in (2, 3):
+                raise ValueError(f"Filtro de cruzamento inválido: '{item}'")
+            left, right = ("close", parts[1]) if len(parts) == 2 else (parts[1], parts[2])
+            terms.append((parts[0], _parse_operand(left), _parse_operand(right)))
+            continue
+        match = _COMPARISON_RE.match(item)
+        if not match:
+            raise ValueError(f"Filtro inválido: '{item}'")
+        terms.append((match.group(2), _parse_operand(match.group(1)), _parse_operand(match.group(3))))
+    if not terms:
+        raise ValueError("Nenhum filtro informado")
+    return tuple(dict.fromkeys(terms))
+
+
+def _warmup(terms: Tuple[Tuple[str, str, str], ...]) -> int:
+    """Pregões necessários para aquecer as séries dos filtros (mais um para cruzamentos)."""
+    bars = 2
+    for _, *operands in terms:
+        for operand in operands:
+            match = _SERIES_RE.match(operand)
+            if match and match.group(2):
+                period = int(match.group(3))
+                bars = max(bars, period + 2 if match.group(2) == "sma" else 5 * period)
+    return bars
+
+
+def _seeded_smoothing(values: np.ndarray, start: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """
+    Média exponencial por coluna semeada pela média simples dos ``period`` primeiros valores.
+
+    Equivale a ``_Smoother`` do motor de indicadores aplicado a cada coluna a
+    partir da linha ``start`` da coluna: as colunas são deslocadas para
+    começar na linha 0, suavizadas juntas e devolvidas às posições originais.
+    Linhas antes da semente ficam NaN.
+    """
+    rows, cols = values.shape
+    columns = np.arange(cols)
+    source = np.arange(rows)[:, None] + start[None, :]
+    aligned = np.where(source < rows, values[np.minimum(source, rows - 1), columns], np.nan)
+    smoothed = np.full(values.shape, np.nan)
+    if rows >= period:
+        seed = aligned[:period].mean(axis=0)
+        smoothed[period - 1] = seed
+        smoothed[period:] = exponential_smoothing(aligned[period:], alpha, seed)
+    shifted = np.arange(rows)[:, None] - start[None, :]
+    return np.where(shifted >= 0, smoothed[np.maximum(shifted, 0), columns], np.nan)
+
+
+def _series(closes: np.ndarray, name: str, cache: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Calcula uma série para todas as colunas da matriz de fechamentos.
+
+    Lacunas já vêm preenchidas com o último fechamento; os NaN restantes são o
+    período anterior à listagem. Valores sem ``N`` pregões válidos ficam NaN.
+    As médias exponenciais (EMA e médias de Wilder do RSI) são semeadas pela
+    média simples dos primeiros ``N`` valores de cada coluna, como no motor de
+    indicadores.
+    """
+    if name in cache:
+        return cache[name]
+    if _NUMBER_RE.match(name):
+        return np.float64(name)
+    valid = ~np.isnan(closes)
+    count = np.cumsum(valid, axis=0)
+    match = _SERIES_RE.match(name)
+    kind, period = match.group(2), int(match.group(3) or 0)
+
+    if kind is None:
+        result = closes
+    elif kind == "sma":
+        sums = np.cumsum(np.where(valid, closes, 0.0), axis=0)
+        result = np.full(closes.shape, np.nan)
+        if len(closes) >= period:
+            window = sums[period - 1:] - np.vstack((np.zeros((1, closes.shape[1])), sums[:-period]))
+            result[period - 1:] = window / period
+        result[count < period] = np.nan
+    else:
+        # Primeira linha válida de cada coluna (colunas vazias começam após o fim)
+        listed = valid.any(axis=0)
+        start = np.where(listed, valid.argmax(axis=0), len(closes))
+        if kind == "ema":
+            result = _seeded_smoothing(closes, start, period, 2.0 / (period + 1))
+        else:
+            # A primeira barra de cada coluna não tem variação
+            delta = np.diff(closes, axis=0, prepend=np.nan)
+            gains = _seeded_smoothing(np.maximum(delta, 0.0), start + 1, period, 1.0 / period)
+            losses = _seeded_smoothing(np.maximum(-delta, 0.0), start + 1, period, 1.0 / period)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result = 100.0 - 100.0 / (1.0 + gains / losses)
+            result = np.where(losses == 0.0, np.where(gains == 0.0, 50.0, 100.0), result)
+            result[np.isnan(gains)] = np.nan
+    cache[name] = result
+    return result
+
+
+def evaluate_block(
+    closes: np.ndarray, terms: Tuple[Tuple[str, str, str], ...]
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Avalia os filtros sobre um bloco de colunas da matriz de fechamentos.
+
+    Função de módulo para poder ser executada no pool de processos.
+
+    Args:
+        closes: Fechamentos (pregões nas linhas, tickers nas colunas)
+        terms: Termos retornados por ``parse_filters``
+
+    Returns:
+        Tupla (mask, values): tickers que atendem a todos os filtros e o
+        último valor de cada série citada nos filtros
+    """
+    cache: Dict[str, np.ndarray] = {}
+    mask = np.ones(closes.shape[1], dtype=bool)
+    for operator, left, right in terms:
+        a, b = _series(closes, left, cache), _series(closes, right, cache)
+        a_last = a[-1] if np.ndim(a) else a
+        b_last = b[-1] if np.ndim(b) else b
+        with np.errstate(invalid="ignore"):
+            if operator in _CROSSES and len(closes) < 2:
+                hit = np.zeros(closes.shape[1], dtype=bool)
+            elif operator in _CROSSES:
+                a_prev = a[-2] if np.ndim(a) else a
+                b_prev = b[-2] if np.ndim(b) else b
+                if operator == "cross_above":
+                    hit = (a_prev <= b_prev) & (a_last > b_last)
+                else:
+                    hit = (a_prev >= b_prev) & (a_last < b_last)
+            elif operator == "<":
+                hit = a_last < b_last
+            elif operator == "<=":
+                hit = a_last <= b_last
+            elif operator == ">":
+                hit = a_last > b_last
+            else:
+                hit = a_last >= b_last
+        mask &= hit
+    values = {name: series[-1] for name, series in cache.items()}
+    return mask, values
+
+
+class TechnicalScanner(LoggerMixin):
+    """
+    Varredura de filtros técnicos sobre o universo de tickers.
+
+    Attributes:
+        workers: Processos usados em matrizes grandes
+        parallel_threshold: Número de células da matriz a partir do qual a
+            avaliação é dividida entre os processos
+    """
+
+    def __init__(self, workers: int = None, parallel_threshold: int = None):
+        """
+        Inicializa a varredura (o pool de processos é criado sob demanda).
+
+        Args:
+            workers: Processos do pool (padrão: configuração global)
+            parallel_threshold: Células para usar o pool (padrão: configuração global)
+        """
+        self.workers = workers or settings.SCAN_WORKERS
+        self.parallel_threshold = parallel_threshold or settings.SCAN_PARALLEL_THRESHOLD
+        self.calendar = CALENDARS["B3"]
+        self._results: Dict[tuple, dict] = {}
+        self._results_session: Optional[float] = None
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def scan(self, where: str, symbols: Optional[List[str]] = None) -> dict:
+        """
+        Avalia filtros técnicos no último pregão encerrado.
+
+        Args:
+            where: Filtros separados por vírgula (ver docstring do módulo)
+            symbols: Tickers a varrer (padrão: universo do ``tickers.csv``)
+
+        Returns:
+            Dicionário com a data do pregão avaliado, os tickers que atendem a
+            todos os filtros (com o último valor de cada série citada) e o
+            número de tickers avaliados
+
+        Raises:
+            ValueError: Se os filtros forem inválidos
+        """
+        terms = parse_filters(where)
+        universe = sorted({s.strip().upper() for s in symbols if s.strip()}) if symbols else self.universe()
+        session_close = self.calendar.last_close()
+        key = (terms, tuple(universe))
+
+        with self._lock:
+            if self._results_session != session_close:
+                # Novo pregão encerrado: resultados anteriores não valem mais
+                self._results.clear()
+                self._results_session = session_close
+            cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        tickers, dates, closes = self._close_matrix(universe, _warmup(terms), session_close)
+        matches = []
+        if closes.shape[1]:
+            mask, values = self._evaluate(closes, terms)
+            for j in np.flatnonzero(mask):
+                entry = {"symbol": tickers[j]}
+                entry.update({name: float(series[j]) for name, series in values.items()})
+                matches.append(entry)
+
+        result = {
+            "date": dates[-1].strftime("%Y-%m-%d") if len(dates) else None,
+            "filters": [item.strip() for item in where.split(",") if item.strip()],
+            "universe_size": len(universe),
+            "evaluated": len(tickers),
+            "count": len(matches),
+            "matches": matches,
+        }
+        self.logger.info(
+            f"Varredura '{where}': {len(matches)}/{len(tickers)} tickers "
+            f"em {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        with self._lock:
+            if self._results_session == session_close:
+                self._results[key] = result
+        return result
+
+    def universe(self) -> List[str]:
+        """
+        Tickers do universo compartilhado (``tickers.csv``).
+
+        Sem universo carregado, usa a carteira do Ibovespa.
+        """
+        symbols = ticker_universe.snapshot().symbols
+        return list(symbols) if symbols else sorted(IBOV_SYMBOLS)
+
+    def shutdown(self) -> None:
+        """Encerra o pool de processos."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ==================== AUXILIARES ====================
+
+    def _close_matrix(
+        self, symbols: List[str], bars: int, session_close: float
+    ) -> Tuple[List[str], pd.DatetimeIndex, np.ndarray]:
+        """
+        Monta a matriz de fechamentos ajustados dos pregões encerrados.
+
+        As linhas são a união das datas de todos os tickers; lacunas de um
+        ticker (pregão sem negócios) repetem o último fechamento.
+        """
+        # Folga para fins de semana e feriados
+        last_day = datetime.fromtimestamp(session_close, self.calendar.tz).date()
+        start = (pd.Timestamp(last_day) - pd.Timedelta(days=int(bars * 7 / 5) + 10)).strftime("%Y-%m-%d")
+        end = (pd.Timestamp(last_day) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        series, errors = ohlcv_store.fetch_arrays(symbols, period=None, start=start, end=end, actions=False)
+        if errors:
+            self.logger.warning(f"Varredura sem histórico para {len(errors)} ticker(s)")
+
+        tickers = [symbol for symbol in symbols if symbol in series and len(series[symbol]["ts"])]
+        if not tickers:
+            return [], pd.DatetimeIndex([]), np.empty((0, 0))
+        ts = np.unique(np.concatenate([series[symbol]["ts"] for symbol in tickers]))
+        closes = np.full((len(ts), len(tickers)), np.nan)
+        for j, symbol in enumerate(tickers):
+            closes[np.searchsorted(ts, series[symbol]["ts"]), j] = series[symbol]["Close"]
+
+        # Preenche lacunas com o último fechamento válido de cada coluna
+        valid = ~np.isnan(closes)
+        last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(ts))[:, None], 0), axis=0)
+        closes = np.where(np.maximum.accumulate(valid, axis=0), closes[last_valid, np.arange(len(tickers))], np.nan)
+
+        # Tickers sem negócios nos últimos pregões (suspensos, deslistados) ficam de fora
+        active = last_valid[-1] >= len(ts) - _STALE_SESSIONS
+        if not active.all():
+            tickers = [symbol for symbol, keep in zip(tickers, active) if keep]
+            closes = closes[:, active]
+        return tickers, pd.DatetimeIndex(ts.astype("datetime64[s]")), closes
+
+    def _evaluate(
+        self, closes: np.ndarray, terms: Tuple[Tuple[str, str, str], ...]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Avalia os filtros, dividindo as colunas entre processos em matrizes grandes."""
+        if closes.size < self.parallel_threshold or self.workers < 2:
+            return evaluate_block(closes, terms)
+
+        blocks = np.array_split(np.arange(closes.shape[1]), self.workers)
+        try:
+            futures = [self._get_pool().submit(evaluate_block, closes[:, columns], terms) for columns in blocks]
+            results = [future.result() for future in futures]
+        except Exception as e:
+            # Pool quebrado (processo encerrado): recria no próximo uso e avalia aqui
+            self.logger.warning(f"Falha no pool da varredura, avaliando no processo atual: {str(e)}")
+            self.shutdown()
+            return evaluate_block(closes, terms)
+        mask = np.concatenate([block_mask for block_mask, _ in results])
+        values = {name: np.concatenate([block[name] for _, block in results]) for name in results[0][1]}
+        return mask, values
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Cria sob demanda o pool de processos (spawn: o servidor tem threads ativas)."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+        return self._pool
+
+
+# Instância única compartilhada pelas rotas
+technical_scanner = TechnicalScanner()
@@ -0,0 +1,447 @@
+"""
+Resultados dos screeners predefinidos mantidos em memória e atualizados em segundo plano.
+
+A rota de tendências chamava ``yf.screen`` para cada combinação distinta de
+categoria, setor, limite, offset e ordenação: paginar ``alta_do_dia`` ou
+reordenar por volume consultava o Yahoo de novo. Aqui cada consulta
+registrada é executada periodicamente por inteiro (páginas de 250 até
+``SCREENER_MAX_RESULTS``, das maiores empresas para as menores) e o resultado
+fica em uma tabela compacta. Setor, ordenação, offset e limite são aplicados
+localmente: as ordens por campo e as máscaras por setor são calculadas uma vez
+por versão da tabela e cada página é só um recorte de índices.
+
+Consultas com mais resultados que ``SCREENER_MAX_RESULTS`` (ex:
+``mercado_todo``) guardam só as maiores empresas: as páginas que esse recorte
+responde exatamente (ordem por valor de mercado, sem setor) saem da tabela, e
+as demais vão ao Yahoo (com cache curto), como antes. A resposta indica a
+origem da página ("fonte").
+
+Os sites das empresas (para os logos) não vêm no screener; eles ficam no
+cache compartilhado de websites, preenchido em segundo plano. As tabelas são
+gravadas no diretório de armazenamento local, de modo que um reinício já
+responde com os últimos resultados (marcados como desatualizados até a
+próxima atualização).
+
+Example:
+    from services.screener_store import screener_store
+
+    screener_store.register({"alta_do_dia": query})
+    page = screener_store.page("alta_do_dia", sort_field="dayvolume", limit=25, offset=25)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+import yfinance as yf
+from yfinance import EquityQuery
+
+from core.config import settings
+from core.logging import LoggerMixin
+from services.company_websites import company_websites
+
+# Limite de resultados por chamada ao screener do Yahoo
+_SCREEN_PAGE_SIZE = 250
+
+# Páginas buscadas no Yahoo (consultas truncadas) mantidas em cache
+_LIVE_CACHE_MAXSIZE = 128
+
+# Campos das cotações do screener mantidos na tabela
+QUOTE_FIELDS = (
+    "symbol", "shortName", "longName", "sector", "regularMarketPrice", "regularMarketChangePercent",
+    "regularMarketVolume", "marketCap", "trailingPE", "dividendYield", "beta", "regularMarketDayRange",
+    "fiftyTwoWeekRange", "fiftyTwoWeekChangePercent", "averageDailyVolume3Month", "epsTrailingTwelveMonths",
+    "returnOnEquity", "bookValue", "exchange", "fullExchangeName", "currency",
+)
+
+# Campo de ordenação aceito, em minúsculas (nomes do screener do Yahoo e da resposta)
+# -> (campo da cotação, campo de ordenação do screener do Yahoo)
+SORT_FIELDS = {
+    "ticker": ("symbol", "ticker"),
+    "symbol": ("symbol", "ticker"),
+    "percentchange": ("regularMarketChangePercent", "percentchange"),
+    "change": ("regularMarketChangePercent", "percentchange"),
+    "intradayprice": ("regularMarketPrice", "intradayprice"),
+    "price": ("regularMarketPrice", "intradayprice"),
+    "dayvolume": ("regularMarketVolume", "dayvolume"),
+    "volume": ("regularMarketVolume", "dayvolume"),
+    "intradaymarketcap": ("marketCap", "intradaymarketcap"),
+    "market_cap": ("marketCap", "intradaymarketcap"),
+    "peratio.lasttwelvemonths": ("trailingPE", "peratio.lasttwelvemonths"),
+    "pe_ratio": ("trailingPE", "peratio.lasttwelvemonths"),
+    "forward_dividend_yield": ("dividendYield", "forward_dividend_yield"),
+    "dividend_yield": ("dividendYield", "forward_dividend_yield"),
+    "avgdailyvol3m": ("averageDailyVolume3Month", "avgdailyvol3m"),
+    "avg_volume_3m": ("averageDailyVolume3Month", "avgdailyvol3m"),
+    "beta": ("beta", "beta"),
+    "fiftytwowkpercentchange": ("fiftyTwoWeekChangePercent", "fiftytwowkpercentchange"),
+    "fiftytwoweekchangepercent": ("fiftyTwoWeekChangePercent", "fiftytwowkpercentchange"),
+    "returnonequity.lasttwelvemonths": ("returnOnEquity", "returnonequity.lasttwelvemonths"),
+    "returnonequity": ("returnOnEquity", "returnonequity.lasttwelvemonths"),
+    "book_value": ("bookValue", "bookvalueshare.lasttwelvemonths"),
+}
+
+
+def _quote_row(quote: Dict[str, Any]) -> Dict[str, Any]:
+    """Campos da cotação mantidos na tabela."""
+    return {field: quote.get(field) for field in QUOTE_FIELDS}
+
+
+def _number(value: Any) -> float:
+    """Valor numérico para ordenação (NaN quando ausente ou não numérico)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.nan
+
+
+class ScreenerTable:
+    """
+    Resultado completo de uma consulta, com ordens e filtros calculados sob demanda.
+
+    Attributes:
+        rows: Cotações na ordem do screener (maiores empresas primeiro)
+        total: Total de resultados informado pelo Yahoo
+        updated_at: Momento da consulta (epoch)
+    """
+
+    __slots__ = ("rows", "total", "updated_at", "_sectors", "_orders", "_masks")
+
+    def __init__(self, rows: List[Dict[str, Any]], total: int, updated_at: float):
+        self.rows = rows
+        self.total = total
+        self.updated_at = updated_at
+        self._sectors = np.array([(row.get("sector") or "").lower() for row in rows], dtype=object)
+        # Caches sem lock: os cálculos são idempotentes e a atribuição ao dict é atômica
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._masks: Dict[str, np.ndarray] = {}
+
+    @property
+    def complete(self) -> bool:
+        """Indica se a tabela tem todos os resultados da consulta."""
+        return len(self.rows) >= self.total
+
+    def select(self, setor: Optional[str], sort_key: str, ascending: bool) -> np.ndarray:
+        """Índices das linhas do setor na ordem pedida (valores ausentes por último)."""
+        order = self._orders.get((sort_key, ascending))
+        if order is None:
+            order = self._order(sort_key, ascending)
+            self._orders[(sort_key, ascending)] = order
+        if not setor:
+            return order
+        key = setor.strip().lower()
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._sectors == key
+            self._masks[key] = mask
+        return order[mask[order]]
+
+    def _order(self, sort_key: str, ascending: bool) -> np.ndarray:
+        if sort_key == "symbol":
+            order = sorted(range(len(self.rows)), key=lambda i: self.rows[i].get("symbol") or "", reverse=not ascending)
+            return np.array(order, dtype=np.int64)
+        values = np.array([_number(row.get(sort_key)) for row in self.rows], dtype=np.float64)
+        # argsort estável deixa os NaN no fim nas duas direções
+        return np.argsort(values if ascending else -values, kind="stable")
+
+
+class ScreenerStore(LoggerMixin):
+    """
+    Mantém as tabelas dos screeners registrados e as atualiza em segundo plano.
+
+    Attributes:
+        snapshot_path: Arquivo com as tabelas gravadas
+        refresh_seconds: Intervalo entre atualizações de cada consulta
+        max_results: Máximo de resultados guardados por consulta
+    """
+
+    def __init__(self, snapshot_path: str = None, refresh_seconds: int = None, max_results: int = None):
+        """
+        Configura o armazenamento (o estado gravado é carregado em ``start`` ou no primeiro uso).
+
+        Args:
+            snapshot_path: Arquivo do estado gravado (padrão: diretório de armazenamento local)
+            refresh_seconds: Intervalo entre atualizações (padrão: configuração global)
+            max_results: Resultados guardados por consulta (padrão: configuração global)
+        """
+        self.snapshot_path = snapshot_path or os.path.join(settings.LOCAL_STORAGE_DIR, "screener_store.json")
+        self.refresh_seconds = refresh_seconds or settings.SCREENER_REFRESH_SECONDS
+        self.max_results = max_results or settings.SCREENER_MAX_RESULTS
+        self._queries: Dict[str, Any] = {}
+        self._tables: Dict[str, ScreenerTable] = {}
+        # (consulta, setor, campo, ascendente, offset, limite) -> (buscada em, página)
+        self._live: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._query_locks: Dict[str, threading.Lock] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, queries: Dict[str, Any]) -> None:
+        """Registra consultas do screener por nome (ex: as categorias predefinidas)."""
+        with self._lock:
+            for name, query in queries.items():
+                self._queries[name] = query
+                self._query_locks.setdefault(name, threading.Lock())
+
+    def start(self) -> None:
+        """Carrega o estado gravado e inicia a atualização em segundo plano."""
+        self._ensure_loaded()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="screener-store", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe a atualização em segundo plano."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def ready(self, name: str) -> bool:
+        """Indica se a consulta tem resultados completos (qualquer página sai sem acessar o Yahoo)."""
+        self._ensure_loaded()
+        table = self._tables.get(name)
+        return table is not None and table.complete
+
+    def page(
+        self,
+        name: str,
+        setor: Optional[str] = None,
+        limit: int = 25,
+        offset: int = 0,
+        sort_field: str = "percentchange",
+        sort_asc: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Página dos resultados de uma consulta, filtrada e ordenada localmente.
+
+        Na primeira consulta de um nome sem resultados guardados, o screener é
+        executado na hora (bloqueante). Se a tabela foi truncada em
+        ``max_results`` e a página pedida não é um prefixo exato dela, a página
+        é buscada no Yahoo.
+
+        Args:
+            name: Nome da consulta registrada
+            setor: Setor (ex: "Financial Services"), sem diferenciar maiúsculas
+            limit: Número de resultados
+            offset: Posição inicial
+            sort_field: Campo de ordenação (ver ``SORT_FIELDS``), sem diferenciar maiúsculas
+            sort_asc: Ordem ascendente
+
+        Returns:
+            Dicionário com "resultados" (cotações, com "website"), "total_disponivel",
+            "fonte" ("armazenado" ou "yahoo", para páginas de consultas truncadas),
+            "atualizado_em", "idade_segundos" e "desatualizado"
+
+        Raises:
+            KeyError: Consulta não registrada
+            ValueError: Campo de ordenação não suportado
+            RuntimeError: Falha no screener sem resultados anteriores
+        """
+        if name not in self._queries:
+            raise KeyError(f"Categoria '{name}' não encontrada.")
+        fields = SORT_FIELDS.get((sort_field or "").strip().lower())
+        if fields is None:
+            raise ValueError(
+                f"Campo de ordenação '{sort_field}' não suportado. Use: {', '.join(sorted(SORT_FIELDS))}"
+            )
+        sort_key, yahoo_field = fields
+
+        table = self._table(name)
+        if not table.complete:
+            # Só as maiores empresas estão na tabela: ela responde apenas a ordem por valor de mercado
+            prefix = not setor and sort_key == "marketCap" and not sort_asc and offset + limit <= len(table.rows)
+            if not prefix:
+                if setor:
+                    # O Yahoo diferencia maiúsculas: usa o nome do setor como aparece na tabela
+                    key = setor.strip().lower()
+                    setor = next((row["sector"] for row in table.rows if (row.get("sector") or "").lower() == key), setor)
+                return self._live_page(name, setor, limit, offset, yahoo_field, sort_asc)
+
+        selected = table.select(setor, sort_key, sort_asc)
+        rows = [table.rows[i] for i in selected[offset:offset + limit]]
+        age = time.time() - table.updated_at
+        return {
+            "resultados": self._with_websites(rows),
+            "total_disponivel": int(len(selected)) if table.complete else table.total,
+            "fonte": "armazenado",
+            "atualizado_em": datetime.fromtimestamp(table.updated_at).isoformat(),
+            "idade_segundos": round(age, 1),
+            "desatualizado": age > 2 * self.refresh_seconds,
+        }
+
+    def refresh(self, name: str) -> bool:
+        """
+        Executa a consulta por inteiro e publica a nova tabela.
+
+        Args:
+            name: Nome da consulta registrada
+
+        Returns:
+            True se a tabela foi atualizada (em caso de falha a anterior é mantida)
+        """
+        query = self._queries[name]
+        started = time.perf_counter()
+        rows: List[Dict[str, Any]] = []
+        total = 0
+        try:
+            while len(rows) < self.max_results:
+                size = min(_SCREEN_PAGE_SIZE, self.max_results - len(rows))
+                result = yf.screen(query, offset=len(rows), size=size, sortField="intradaymarketcap", sortAsc=False)
+                quotes = [q for q in (result or {}).get("quotes", []) if isinstance(q, dict) and q.get("symbol")]
+                total = int((result or {}).get("total", 0) or 0)
+                rows.extend(_quote_row(quote) for quote in quotes)
+                if len(quotes) < size or len(rows) >= total:
+                    break
+        except Exception as e:
+            self.logger.error(f"Erro no yf.screen() para a categoria '{name}': {str(e)}")
+            return False
+
+        self._tables[name] = ScreenerTable(rows, max(total, len(rows)), time.time())
+        self.logger.info(
+            f"Screener '{name}' atualizado ({len(rows)} de {total} resultados) "
+            f"em {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return True
+
+    # ==================== AUXILIARES ====================
+
+    def _with_websites(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Acrescenta o website (cache compartilhado; os ausentes são agendados)."""
+        websites = company_websites.get_many(row["symbol"] for row in rows)
+        return [{**row, "website": websites.get(row["symbol"]) or ""} for row in rows]
+
+    def _live_page(
+        self, name: str, setor: Optional[str], limit: int, offset: int, yahoo_field: str, sort_asc: bool
+    ) -> Dict[str, Any]:
+        """Página buscada no Yahoo (consultas truncadas), em cache por ``refresh_seconds``."""
+        key = (name, (setor or "").strip().lower(), yahoo_field, sort_asc, offset, limit)
+        now = time.time()
+        with self._lock:
+            cached = self._live.get(key)
+            if cached is not None:
+                self._live.move_to_end(key)
+        if cached is not None and now - cached[0] < self.refresh_seconds:
+            fetched_at, page = cached
+            return {
+                **page,
+                "resultados": self._with_websites(page["resultados"]),
+                "idade_segundos": round(now - fetched_at, 1),
+            }
+
+        query = self._queries[name]
+        if setor:
+            query = EquityQuery("and", [query, EquityQuery("eq", ["sector", setor])])
+        try:
+            result = yf.screen(query, offset=offset, size=limit, sortField=yahoo_field, sortAsc=sort_asc) or {}
+        except Exception as e:
+            self.logger.error(f"Erro no yf.screen() para a categoria '{name}': {str(e)}")
+            raise RuntimeError(f"Erro ao executar screening: {str(e)}")
+        quotes = [q for q in result.get("quotes", []) if isinstance(q, dict) and q.get("symbol")]
+        page = {
+            "resultados": [_quote_row(quote) for quote in quotes],
+            "total_disponivel": int(result.get("total", len(quotes)) or 0),
+            "fonte": "yahoo",
+            "atualizado_em": datetime.fromtimestamp(now).isoformat(),
+            "idade_segundos": 0.0,
+            "desatualizado": False,
+        }
+        with self._lock:
+            self._live[key] = (now, page)
+            self._live.move_to_end(key)
+            while len(self._live) > _LIVE_CACHE_MAXSIZE:
+                self._live.popitem(last=False)
+        return {**page, "resultados": self._with_websites(page["resultados"])}
+
+    def _table(self, name: str) -> ScreenerTable:
+        """Tabela atual da consulta, executando o screener se ainda não houver uma."""
+        self._ensure_loaded()
+        table = self._tables.get(name)
+        if table is None:
+            with self._query_locks[name]:
+                table = self._tables.get(name)
+                if table is None:
+                    if not self.refresh(name):
+                        raise RuntimeError(f"Erro ao executar screening da categoria '{name}'")
+                    table = self._tables[name]
+        return table
+
+    def _refresh_due(self) -> bool:
+        """Atualiza as consultas cuja tabela passou do intervalo; indica se alguma mudou."""
+        changed = False
+        now = time.time()
+        for name in list(self._queries):
+            if self._stop.is_set():
+                break
+            table = self._tables.get(name)
+            if table is not None and now - table.updated_at < self.refresh_seconds:
+                continue
+            with self._query_locks[name]:
+                changed |= self.refresh(name)
+        return changed
+
+    def _fill_websites(self) -> None:
+        """Busca em lotes os websites ausentes ou vencidos dos símbolos das tabelas."""
+        symbols = sorted({row["symbol"] for table in list(self._tables.values()) for row in table.rows})
+        company_websites.fill(symbols, stop=self._stop)
+
+    def _ensure_loaded(self) -> None:
+        """Carrega as tabelas gravadas (uma vez por processo)."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.snapshot_path, "rb") as f:
+                    state = orjson.loads(f.read())
+                for name, data in state.get("tables", {}).items():
+                    if name in self._queries and name not in self._tables:
+                        self._tables[name] = ScreenerTable(data["rows"], data["total"], data["updated_at"])
+                self.logger.info(f"Screeners carregados do armazenamento local ({len(self._tables)} categorias)")
+            except OSError:
+                pass
+            except (ValueError, KeyError, TypeError) as e:
+                self.logger.warning(f"Estado gravado dos screeners ignorado: {str(e)}")
+            self._loaded = True
+
+    def _save(self) -> None:
+        """Grava as tabelas de forma atômica (arquivo temporário + ``os.replace``)."""
+        state = {
+            "tables": {
+                name: {"rows": table.rows, "total": table.total, "updated_at": table.updated_at}
+                for name, table in list(self._tables.items())
+            },
+        }
+        directory = os.path.dirname(self.snapshot_path)
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(state))
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            self.logger.warning(f"Estado dos screeners não gravado: {str(e)}")
+
+    def _refresh_loop(self) -> None:
+        """Atualiza as consultas e os websites periodicamente até ``stop``."""
+        while not self._stop.is_set():
+            try:
+                if self._refresh_due():
+                    self._save()
+                self._fill_websites()
+            except Exception as e:
+                self.logger.error(f"Erro na atualização dos screeners: {str(e)}")
+            # Reavalia a cada fração do intervalo: cada tabela vence no seu próprio tempo
+            self._stop.wait(max(1.0, self.refresh_seconds / 4))
+
+
+# Instância única compartilhada pelas rotas e serviços
+screener_store = ScreenerStore()
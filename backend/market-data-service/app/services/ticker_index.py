@@ -0,0 +1,328 @@
+"""
+Índice em memória para busca, sugestões e autocomplete de tickers.
+
+A busca percorria a lista inteira do ``tickers.csv`` a cada requisição,
+convertendo cada nome para minúsculas e registrando um log por candidato.
+Aqui cada versão do universo de tickers (``services.ticker_universe``) é
+indexada uma única vez:
+
+- chaves ordenadas (símbolos, palavras e nome completo normalizados) para
+  busca por prefixo com ``bisect``;
+- índice invertido de trigramas sobre símbolo, nome e setor para buscas por
+  trecho ("brasil", "energia");
+- variantes das chaves com caracteres removidos, para tolerar erros de
+  digitação com distância de edição limitada (sugestões de tickers
+  inválidos, buscas sem resultado).
+
+Os tickers recebem um identificador na ordem de relevância pré-calculada
+(componentes do Ibovespa, ações antes de BDRs, símbolos mais curtos), então
+ordenar resultados é ordenar inteiros.
+
+Example:
+    from services.ticker_index import TickerIndex
+
+    index = TickerIndex(entries)
+    results = index.search("petro", limit=5)
+"""
+
+import bisect
+import heapq
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.hot_series import IBOV_SYMBOLS
+
+TICKERS_CSV_PATH = os.path.join(os.path.dirname(__file__), "data", "tickers.csv")
+
+_NON_WORD_RE = re.compile(r"[^0-9a-z]+")
+_TYPE_ORDER = {"Ação": 0, "BDR": 1}
+_IBOV = frozenset(IBOV_SYMBOLS)
+
+# Relevância por tipo de correspondência (menor = mais relevante)
+EXACT, SYMBOL_PREFIX, NAME_PREFIX, SUBSTRING, FUZZY = range(5)
+_TIER_SCORES = {EXACT: 1.0, SYMBOL_PREFIX: 0.9, NAME_PREFIX: 0.8, SUBSTRING: 0.6, FUZZY: 0.4}
+
+
+def normalize(text: str) -> str:
+    """Minúsculas sem acentos, com pontuação trocada por espaços."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def symbol_base(symbol: str) -> str:
+    """Símbolo normalizado sem o sufixo da B3 (``PETR4.SA`` -> ``petr4``)."""
+    symbol = symbol.strip().casefold()
+    return normalize(symbol[:-3] if symbol.endswith(".sa") else symbol).replace(" ", "")
+
+
+def ticker_type(symbol: str) -> str:
+    """Tipo do ticker pelo sufixo (BDRs terminam em 34/35)."""
+    if symbol.endswith("34.SA") or symbol.endswith("35.SA"):
+        return "BDR"
+    return "Ação" if symbol.endswith(".SA") else "Outro"
+
+
+def load_ticker_entries(path: str = TICKERS_CSV_PATH) -> List[Dict[str, str]]:
+    """
+    Lê o ``tickers.csv`` (colunas Ticker, Nome e, se houver, Setor/Sector).
+
+    Returns:
+        Lista de dicionários com "symbol", "name", "sector" e "type"
+
+    Raises:
+        OSError, KeyError, ValueError: Arquivo ausente ou em formato inválido
+    """
+    frame = pd.read_csv(path, sep=",", dtype=str, encoding="utf-8", on_bad_lines="skip")
+    sector_column = next((column for column in ("Setor", "Sector") if column in frame.columns), None)
+    symbols = frame["Ticker"].fillna("").str.strip()
+    names = frame["Nome"].fillna("").str.strip() if "Nome" in frame.columns else pd.Series("", index=frame.index)
+    sectors = (
+        frame[sector_column].fillna("").str.strip().replace("", "Unknown")
+        if sector_column
+        else pd.Series("Unknown", index=frame.index)
+    )
+    return [
+        {"symbol": symbol, "name": name, "sector": sector, "type": ticker_type(symbol)}
+        for symbol, name, sector in zip(symbols, names, sectors)
+        if symbol
+    ]
+
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    """
+    Distância de edição (transposição de vizinhos conta como uma edição).
+
+    O cálculo é interrompido ao passar de ``limit``, retornando ``limit + 1``.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    before: List[int] = []
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        current = [i]
+        for j, other in enumerate(second, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other))
+            if i > 1 and j > 1 and char == second[j - 2] and first[i - 2] == other:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _deletions(word: str, distance: int) -> Set[str]:
+    """Variantes da palavra com até ``distance`` caracteres removidos (inclui a própria)."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        variants |= frontier
+    return variants
+
+
+class _TypoIndex:
+    """
+    Palavras indexadas pelas variantes com caracteres removidos.
+
+    Duas palavras a até ``distance`` edições compartilham alguma variante, então
+    a busca só calcula a distância de edição contra esses candidatos.
+    """
+
+    __slots__ = ("distance", "_variants")
+
+    def __init__(self, words: Iterable[str], distance: int = 2):
+        self.distance = distance
+        self._variants: Dict[str, List[str]] = {}
+        for word in words:
+            for variant in _deletions(word, distance):
+                self._variants.setdefault(variant, []).append(word)
+
+    def search(self, word: str, limit: int) -> List[Tuple[int, str]]:
+        """Palavras a no máximo ``limit`` edições, como (distância, palavra)."""
+        limit = min(limit, self.distance)
+        candidates = {
+            candidate for variant in _deletions(word, limit) for candidate in self._variants.get(variant, ())
+        }
+        found = [(edit_distance(word, candidate, limit), candidate) for candidate in candidates]
+        return sorted(match for match in found if match[0] <= limit)
+
+
+class _PrefixKeys:
+    """Chaves ordenadas com os tickers de cada uma, para busca por prefixo."""
+
+    __slots__ = ("keys", "ids", "_flat", "_offsets")
+
+    def __init__(self, mapping: Dict[str, Set[int]]):
+        self.keys = sorted(mapping)
+        self.ids = [sorted(mapping[key]) for key in self.keys]
+        # Identificadores de todas as chaves em sequência: um prefixo é uma fatia contígua
+        self._flat = np.fromiter((i for ids in self.ids for i in ids), dtype=np.int32)
+        self._offsets = np.cumsum([0] + [len(ids) for ids in self.ids])
+
+    def exact(self, key: str) -> List[int]:
+        position = bisect.bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return self.ids[position]
+        return []
+
+    def prefix(self, prefix: str, limit: int) -> List[int]:
+        """Os ``limit`` tickers mais relevantes com alguma chave iniciada por ``prefix``."""
+        first = bisect.bisect_left(self.keys, prefix)
+        last = bisect.bisect_left(self.keys, prefix + "\uffff", first)
+        if last - first <= 1:
+            return self.ids[first][:limit] if last > first else []
+        ids = self._flat[self._offsets[first]:self._offsets[last]]
+        if len(ids) > limit * 8:
+            ids = np.partition(ids, limit * 8 - 1)[: limit * 8]
+        return np.unique(ids)[:limit].tolist()
+
+
+class TickerIndex:
+    """
+    Índice imutável de um universo de tickers.
+
+    Attributes:
+        entries: Tickers ("symbol", "name", "sector", "type") em ordem de relevância
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, str]]):
+        """
+        Monta o índice.
+
+        Args:
+            entries: Tickers com "symbol", "name" e, opcionalmente, "sector" e "type"
+        """
+        unique = {entry["symbol"].strip().upper(): entry for entry in entries if entry.get("symbol")}
+        self.entries: List[Dict[str, str]] = [
+            {
+                "symbol": symbol,
+                "name": entry.get("name") or "",
+                "sector": entry.get("sector") or "Unknown",
+                "type": entry.get("type") or ticker_type(symbol),
+            }
+            for symbol, entry in sorted(
+                unique.items(),
+                key=lambda item: (
+                    item[0] not in _IBOV,
+                    _TYPE_ORDER.get(item[1].get("type") or ticker_type(item[0]), 2),
+                    len(item[0]),
+                    item[0],
+                ),
+            )
+        ]
+
+        symbol_keys: Dict[str, Set[int]] = {}
+        name_keys: Dict[str, Set[int]] = {}
+        trigrams: Dict[str, Set[int]] = {}
+        self._texts: List[str] = []
+        for i, entry in enumerate(self.entries):
+            base = symbol_base(entry["symbol"])
+            name = normalize(entry["name"])
+            symbol_keys.setdefault(base, set()).add(i)
+            if name:
+                name_keys.setdefault(name, set()).add(i)
+                for word in name.split():
+                    if len(word) > 1:
+                        name_keys.setdefault(word, set()).add(i)
+            text = f" {base} {name} {normalize(entry['sector'])} "
+            self._texts.append(text)
+            for start in range(len(text) - 2):
+                trigrams.setdefault(text[start:start + 3], set()).add(i)
+
+        self._symbols = _PrefixKeys(symbol_keys)
+        self._names = _PrefixKeys(name_keys)
+        self._trigrams = {gram: frozenset(ids) for gram, ids in trigrams.items()}
+        self._symbol_typos = _TypoIndex(symbol_keys)
+        self._word_typos = _TypoIndex(key for key in name_keys if " " not in key)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Dict[str, object]]:
+        """
+        Busca tickers por símbolo, nome ou setor.
+
+        A ordem é: símbolo exato, prefixo do símbolo, prefixo do nome (ou de
+        uma palavra dele), trecho de símbolo/nome/setor e, sem nenhum resultado,
+        correspondência aproximada (erros de digitação). Empates seguem a
+        relevância pré-calculada.
+
+        Args:
+            query: Termo de busca
+            limit: Número máximo de resultados
+            fuzzy: Tentar correspondência aproximada quando nada for encontrado
+
+        Returns:
+            Tickers encontrados, com "relevance_score"
+        """
+        text = normalize(query)
+        if not text or limit <= 0:
+            return []
+        base = symbol_base(query)
+        tiers: Dict[int, int] = {}
+
+        def collect(ids: Iterable[int], tier: int) -> None:
+            for i in ids:
+                if tiers.get(i, FUZZY + 1) > tier:
+                    tiers[i] = tier
+
+        if base:
+            collect(self._symbols.exact(base), EXACT)
+            collect(self._symbols.prefix(base, limit), SYMBOL_PREFIX)
+        collect(self._names.prefix(text, limit), NAME_PREFIX)
+
+        if len(tiers) < limit and len(text.replace(" ", "")) >= 3:
+            collect(self._substring(text), SUBSTRING)
+
+        if not tiers and fuzzy and len(text) >= 3:
+            distance = 1 if len(text) <= 5 else 2
+            for edits, key in self._symbol_typos.search(base, distance) if base else []:
+                collect(self._symbols.exact(key), FUZZY + max(edits - 1, 0))
+            for word in text.split():
+                for edits, key in self._word_typos.search(word, distance):
+                    collect(self._names.exact(key), FUZZY + max(edits - 1, 0))
+
+        ranked = heapq.nsmallest(limit, tiers.items(), key=lambda item: (item[1], item[0]))
+        return [
+            {**self.entries[i], "relevance_score": round(_TIER_SCORES.get(tier, 0.3), 2)}
+            for i, tier in ranked
+        ]
+
+    def suggest(self, symbol: str, limit: int = 3) -> List[str]:
+        """
+        Símbolos parecidos com um ticker inválido (prefixo ou até 2 edições).
+
+        Args:
+            symbol: Ticker informado
+            limit: Número máximo de sugestões
+
+        Returns:
+            Símbolos sugeridos, dos mais próximos para os menos
+        """
+        base = symbol_base(symbol)
+        if not base:
+            return []
+        ranked = {i: 0 for i in self._symbols.prefix(base, limit)}
+        for distance, key in self._symbol_typos.search(base, 1 if len(base) <= 4 else 2):
+            for i in self._symbols.exact(key):
+                ranked.setdefault(i, distance)
+        best = heapq.nsmallest(limit, ranked.items(), key=lambda item: (item[1], item[0]))
+        return [self.entries[i]["symbol"] for i, _ in best]
+
+    def _substring(self, text: str) -> List[int]:
+        """Tickers cujo texto indexado contém todas as palavras da consulta."""
+        words = text.split()
+        grams = {word[start:start + 3] for word in words for start in range(len(word) - 2)}
+        if grams:
+            postings = sorted((self._trigrams.get(gram, frozenset()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = range(len(self.entries))
+        return sorted(i for i in candidates if all(word in self._texts[i] for word in words))
@@ -0,0 +1,308 @@
+"""
+Universo de tickers da B3 compilado em um snapshot compartilhado pelo processo.
+
+O ``tickers.csv`` era relido dentro das requisições quando o cache de 24 horas
+de cada instância do provedor expirava (``read_csv`` + ``iterrows``). Aqui o
+CSV é compilado em um snapshot binário versionado (``tickers_universe.bin`` no
+diretório de armazenamento local) com os campos derivados já calculados (tipo
+Ação/BDR, mercado, agrupamentos por setor e tipo). O snapshot é carregado na
+inicialização do serviço junto com o índice de busca e fica disponível para
+todo o processo.
+
+Uma thread em segundo plano verifica o CSV periodicamente; quando o conteúdo
+muda, compila um novo snapshot, monta o índice e troca a referência de uma vez
+só. Requisições nunca esperam por uma recarga: sempre leem o snapshot
+completo atual (o antigo ou o novo).
+
+Formato do arquivo: assinatura ``TICKU001``, tamanho do cabeçalho (uint32),
+cabeçalho JSON (versão, origem, data de compilação) e colunas JSON
+compactadas com zlib.
+
+Example:
+    from services.ticker_universe import ticker_universe
+
+    snapshot = ticker_universe.snapshot()
+    bancos = snapshot.sectors.get("Financial Services", ())
+    results = snapshot.index.search("petro", limit=5)
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from core.config import settings
+from core.logging import LoggerMixin
+from services.ticker_index import TICKERS_CSV_PATH, TickerIndex, load_ticker_entries, ticker_type
+
+_MAGIC = b"TICKU001"
+_COLUMNS = ("symbol", "name", "sector", "type", "market")
+
+
+def ticker_market(symbol: str) -> str:
+    """Mercado pelo sufixo do símbolo (sem sufixo: bolsa americana)."""
+    if symbol.endswith(".SA"):
+        return "B3"
+    return "NYSE" if "." not in symbol else "Unknown"
+
+
+class UniverseSnapshot:
+    """
+    Versão imutável do universo de tickers.
+
+    Attributes:
+        version: Hash do conteúdo de origem (identifica o snapshot)
+        built_at: Data de compilação (ISO)
+        entries: Tickers com "symbol", "name", "sector", "type" e "market"
+        symbols: Símbolos em ordem alfabética
+        sectors: Setor -> símbolos
+        types: Tipo (Ação, BDR, Outro) -> símbolos
+        index: Índice de busca do universo
+    """
+
+    __slots__ = ("version", "built_at", "entries", "symbols", "sectors", "types", "index", "_members")
+
+    def __init__(self, version: str, built_at: str, columns: Dict[str, List[str]]):
+        self.version = version
+        self.built_at = built_at
+        self.entries: Tuple[Dict[str, str], ...] = tuple(
+            dict(zip(_COLUMNS, row)) for row in zip(*(columns[name] for name in _COLUMNS))
+        )
+        self.symbols: Tuple[str, ...] = tuple(sorted(columns["symbol"]))
+        self._members = frozenset(self.symbols)
+        self.sectors = self._group("sector")
+        self.types = self._group("type")
+        self.index = TickerIndex(self.entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._members
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _group(self, field: str) -> Dict[str, Tuple[str, ...]]:
+        groups: Dict[str, List[str]] = {}
+        for entry in self.entries:
+            groups.setdefault(entry[field], []).append(entry["symbol"])
+        return {key: tuple(sorted(symbols)) for key, symbols in groups.items()}
+
+
+def compile_columns(entries: List[Dict[str, str]]) -> Dict[str, List[str]]:
+    """Colunas do snapshot (uma entrada por símbolo, campos derivados calculados)."""
+    unique = {entry["symbol"].strip().upper(): entry for entry in entries if entry.get("symbol")}
+    columns: Dict[str, List[str]] = {name: [] for name in _COLUMNS}
+    for symbol, entry in unique.items():
+        columns["symbol"].append(symbol)
+        columns["name"].append(entry.get("name") or "")
+        columns["sector"].append(entry.get("sector") or "Unknown")
+        columns["type"].append(entry.get("type") or ticker_type(symbol))
+        columns["market"].append(ticker_market(symbol))
+    return columns
+
+
+def write_snapshot(path: str, header: Dict[str, Any], columns: Dict[str, List[str]]) -> None:
+    """Grava o snapshot de forma atômica (arquivo temporário + ``os.replace``)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    header_bytes = orjson.dumps(header)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(zlib.compress(orjson.dumps(columns), 6))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """
+    Lê um snapshot gravado por ``write_snapshot``.
+
+    Returns:
+        Tupla (cabeçalho, colunas)
+
+    Raises:
+        OSError: Arquivo ausente
+        ValueError: Arquivo de outro formato ou corrompido
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(_MAGIC)] != _MAGIC:
+        raise ValueError(f"Snapshot com formato desconhecido: {path}")
+    try:
+        offset = len(_MAGIC) + 4
+        (header_size,) = struct.unpack("<I", data[len(_MAGIC):offset])
+        header = orjson.loads(data[offset:offset + header_size])
+        columns = orjson.loads(zlib.decompress(data[offset + header_size:]))
+    except (struct.error, zlib.error, orjson.JSONDecodeError) as e:
+        raise ValueError(f"Snapshot corrompido: {path} ({str(e)})")
+    return header, columns
+
+
+class TickerUniverse(LoggerMixin):
+    """
+    Mantém o snapshot atual do universo e o atualiza em segundo plano.
+
+    Attributes:
+        source_path: CSV de origem
+        snapshot_path: Arquivo do snapshot compilado
+        refresh_seconds: Intervalo entre verificações da origem
+    """
+
+    def __init__(
+        self,
+        source_path: str = TICKERS_CSV_PATH,
+        snapshot_path: str = None,
+        refresh_seconds: int = None,
+        loader: Callable[[str], List[Dict[str, str]]] = load_ticker_entries,
+    ):
+        """
+        Configura o universo (o snapshot é carregado em ``start`` ou no primeiro uso).
+
+        Args:
+            source_path: CSV de origem
+            snapshot_path: Arquivo do snapshot (padrão: diretório de armazenamento local)
+            refresh_seconds: Intervalo entre verificações (padrão: configuração global)
+            loader: Função que lê a origem e retorna os tickers ("symbol", "name", "sector")
+        """
+        self.source_path = source_path
+        self.snapshot_path = snapshot_path or os.path.join(settings.LOCAL_STORAGE_DIR, "tickers_universe.bin")
+        self.refresh_seconds = refresh_seconds or settings.TICKER_UNIVERSE_REFRESH_SECONDS
+        self._loader = loader
+        self._snapshot: Optional[UniverseSnapshot] = None
+        self._source_stat: Optional[Tuple[float, int]] = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Carrega o snapshot e inicia a atualização em segundo plano."""
+        self.snapshot()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="ticker-universe", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe a atualização em segundo plano."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def snapshot(self) -> UniverseSnapshot:
+        """Snapshot atual (carregado na primeira chamada se ``start`` não rodou)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                snapshot = self._snapshot
+        return snapshot
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Recompila o snapshot se a origem mudou e troca a versão atual.
+
+        Args:
+            force: Recompilar mesmo sem mudança aparente no arquivo de origem
+
+        Returns:
+            True se uma nova versão foi publicada
+        """
+        with self._lock:
+            return self._refresh(force)
+
+    # ==================== AUXILIARES ====================
+
+    def _refresh(self, force: bool) -> bool:
+        """Corpo de ``refresh`` (chamado com o lock adquirido)."""
+        stat = self._stat_source()
+        if stat is None or (stat == self._source_stat and not force):
+            return False
+        try:
+            with open(self.source_path, "rb") as f:
+                version = hashlib.sha1(f.read()).hexdigest()[:16]
+        except OSError as e:
+            self.logger.error(f"Erro ao ler a origem do universo de tickers: {str(e)}")
+            return False
+        current = self._snapshot
+        if current is not None and current.version == version and not force:
+            self._source_stat = stat
+            return False
+
+        snapshot = self._compile(version, stat)
+        if snapshot is None:
+            return False
+        # Troca atômica: leitores seguem com a referência antiga até a próxima leitura
+        self._snapshot = snapshot
+        self._source_stat = stat
+        return True
+
+    def _load(self) -> UniverseSnapshot:
+        """Carrega o snapshot gravado, recompilando se a origem mudou desde a compilação."""
+        stat = self._stat_source()
+        try:
+            header, columns = read_snapshot(self.snapshot_path)
+            if stat is None or header.get("source_stat") == list(stat):
+                self._source_stat = stat
+                snapshot = UniverseSnapshot(header["version"], header["built_at"], columns)
+                self.logger.info(f"Universo de tickers {snapshot.version} carregado ({len(snapshot)} tickers)")
+                return snapshot
+        except OSError:
+            pass
+        except (ValueError, KeyError) as e:
+            self.logger.warning(f"Snapshot do universo de tickers ignorado: {str(e)}")
+
+        self._snapshot = None
+        if stat is not None and self._refresh(force=True):
+            return self._snapshot
+        self.logger.warning("Universo de tickers indisponível; usando universo vazio")
+        return UniverseSnapshot("", datetime.now().isoformat(), {name: [] for name in _COLUMNS})
+
+    def _compile(self, version: str, stat: Tuple[float, int]) -> Optional[UniverseSnapshot]:
+        """Lê a origem, grava o snapshot e monta a nova versão em memória."""
+        started = time.perf_counter()
+        try:
+            columns = compile_columns(self._loader(self.source_path))
+        except (OSError, KeyError, ValueError) as e:
+            self.logger.error(f"Erro ao compilar o universo de tickers: {str(e)}")
+            return None
+        header = {"version": version, "built_at": datetime.now().isoformat(), "source_stat": list(stat)}
+        try:
+            write_snapshot(self.snapshot_path, header, columns)
+        except OSError as e:
+            self.logger.warning(f"Snapshot do universo de tickers não gravado: {str(e)}")
+        snapshot = UniverseSnapshot(version, header["built_at"], columns)
+        self.logger.info(
+            f"Universo de tickers {version} compilado ({len(snapshot)} tickers) "
+            f"em {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return snapshot
+
+    def _stat_source(self) -> Optional[Tuple[float, int]]:
+        """(mtime, tamanho) da origem, ou None se ela não existir."""
+        try:
+            stat = os.stat(self.source_path)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def _refresh_loop(self) -> None:
+        """Verifica a origem periodicamente até ``stop``."""
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Erro na atualização do universo de tickers: {str(e)}")
+
+
+# Instância única compartilhada pelas rotas e serviços
+ticker_universe = TickerUniverse()
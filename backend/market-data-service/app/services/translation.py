@@ -0,0 +1,295 @@
+"""
+Tradução de textos de perfil e notícias com cache persistente.
+
+As rotas de informações e de notícias chamavam ``GoogleTranslator.translate``
+de forma síncrona em cada requisição: duas chamadas por notícia (título e
+resumo) e o mesmo ``longBusinessSummary`` traduzido de novo a cada cache miss
+e para cada usuário. Aqui cada tradução é guardada pelo hash do conteúdo
+(texto + idioma de destino), em memória e em SQLite no diretório de
+armazenamento local, e sobrevive a reinícios.
+
+Textos ausentes do cache são agrupados em poucas chamadas (textos de uma
+linha vão juntos, separados por quebras de linha, até o limite de tamanho do
+tradutor) executadas no grupo "translation" do executor upstream, com
+concorrência e fila limitadas. Com ``wait=False`` o texto original é devolvido
+na hora e a tradução entra no cache em segundo plano, pronta para as próximas
+requisições.
+
+Example:
+    from services.translation import translation_service
+
+    summary = translation_service.translate(info["longBusinessSummary"])
+    news = translation_service.translate_fields(news, ("title", "summary"), wait=False)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait as wait_futures
+from typing import Any, Dict, Iterable, List, Sequence
+
+from deep_translator import GoogleTranslator
+
+from core.config import settings
+from core.executor import UpstreamSaturatedError, upstream_executor
+from core.local_db import LocalDatabase
+from core.logging import LoggerMixin
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    key TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    translated TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Limite de caracteres por chamada ao tradutor (o do Google é 5000)
+_MAX_CHARS = 4500
+
+# Chaves por consulta ao SQLite (limite de parâmetros do SQLite)
+_QUERY_CHUNK = 500
+
+
+def content_key(text: str, target: str) -> str:
+    """Chave do cache: hash do idioma de destino e do texto."""
+    return hashlib.sha256(f"{target}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _pack(texts: Sequence[str]) -> List[List[str]]:
+    """Agrupa textos de uma linha em blocos até ``_MAX_CHARS`` (os demais vão sozinhos)."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for text in texts:
+        if "\n" in text or len(text) >= _MAX_CHARS:
+            chunks.append([text])
+            continue
+        if current and size + len(text) + 1 > _MAX_CHARS:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TranslationService(LoggerMixin):
+    """
+    Traduções com cache em memória e em SQLite, buscadas em lote.
+
+    Attributes:
+        target: Idioma de destino padrão
+        maxsize: Traduções mantidas em memória
+        timeout: Prazo (s) para aguardar traduções no modo síncrono
+    """
+
+    def __init__(self, path: str = None, target: str = None, maxsize: int = None, timeout: float = None):
+        """
+        Inicializa o serviço (o banco é criado no primeiro uso).
+
+        Args:
+            path: Caminho do banco SQLite (padrão: diretório de armazenamento local)
+            target: Idioma de destino padrão (padrão: configuração global)
+            maxsize: Traduções em memória (padrão: configuração global)
+            timeout: Prazo do modo síncrono (padrão: configuração global)
+        """
+        path = path or os.path.join(settings.LOCAL_STORAGE_DIR, "translations.sqlite3")
+        self.target = target or settings.TRANSLATION_TARGET
+        self.maxsize = maxsize or settings.TRANSLATION_CACHE_MAXSIZE
+        self.timeout = timeout or settings.TRANSLATION_TIMEOUT_SECONDS
+        self._db = LocalDatabase(path, _SCHEMA)
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        # Reentrante: um Future já concluído executa o callback de ``_release``
+        # na hora, na thread que o registra (dentro de ``_schedule``)
+        self._lock = threading.RLock()
+
+    def translate(self, text: str, target: str = None, wait: bool = True) -> str:
+        """
+        Traduz um texto.
+
+        Args:
+            text: Texto original
+            target: Idioma de destino (padrão: ``self.target``)
+            wait: Aguardar a tradução; se False, devolve o original quando ela não está em cache
+
+        Returns:
+            Texto traduzido (ou o original, se a tradução não estiver disponível)
+        """
+        return self.translate_many([text], target=target, wait=wait)[0]
+
+    def translate_many(self, texts: Iterable[str], target: str = None, wait: bool = True) -> List[str]:
+        """
+        Traduz vários textos, consultando o cache uma vez e agrupando os ausentes.
+
+        Args:
+            texts: Textos originais (vazios e não-textos são devolvidos como estão)
+            target: Idioma de destino (padrão: ``self.target``)
+            wait: Aguardar as traduções ausentes (até ``timeout``); se False,
+                elas são agendadas em segundo plano e o original é devolvido
+
+        Returns:
+            Textos traduzidos, na mesma ordem (o original onde não houver tradução)
+        """
+        texts = list(texts)
+        target = target or self.target
+        keys = {text: content_key(text, target) for text in texts if isinstance(text, str) and text.strip()}
+        if not keys:
+            return texts
+
+        found = self._lookup(keys)
+        missing = [text for text in keys if text not in found]
+        if missing:
+            futures = self._schedule(missing, keys, target)
+            if wait and futures:
+                done, _ = wait_futures(futures, timeout=self.timeout)
+                for future in done:
+                    if future.exception() is None:
+                        found.update(future.result())
+        return [found.get(text, text) if text in keys else text for text in texts]
+
+    def translate_fields(
+        self,
+        records: Any,
+        fields: Sequence[str],
+        target: str = None,
+        wait: bool = True,
+    ) -> Any:
+        """
+        Traduz campos de um dicionário ou de uma lista de dicionários (sem alterar os originais).
+
+        Args:
+            records: Dicionário ou lista de dicionários
+            fields: Campos de texto a traduzir
+            target: Idioma de destino (padrão: ``self.target``)
+            wait: Ver ``translate_many``
+
+        Returns:
+            Cópias dos registros com os campos traduzidos
+        """
+        single = isinstance(records, dict)
+        items = [dict(record) for record in ([records] if single else records)]
+        positions = [(item, field) for item in items for field in fields if isinstance(item.get(field), str)]
+        translated = self.translate_many([item[field] for item, field in positions], target=target, wait=wait)
+        for (item, field), text in zip(positions, translated):
+            item[field] = text
+        return items[0] if single else items
+
+    # ==================== AUXILIARES ====================
+
+    def _lookup(self, keys: Dict[str, str]) -> Dict[str, str]:
+        """Traduções em cache (memória e depois SQLite) por texto original."""
+        found: Dict[str, str] = {}
+        with self._lock:
+            for text, key in keys.items():
+                translated = self._memory.get(key)
+                if translated is not None:
+                    self._memory.move_to_end(key)
+                    found[text] = translated
+
+        remaining = {key: text for text, key in keys.items() if text not in found}
+        if remaining:
+            key_list = list(remaining)
+            rows = []
+            try:
+                conn = self._db.connection()
+                for start in range(0, len(key_list), _QUERY_CHUNK):
+                    chunk = key_list[start:start + _QUERY_CHUNK]
+                    rows += conn.execute(
+                        f"SELECT key, translated FROM translations WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+            except (sqlite3.Error, OSError) as e:
+                # Armazenamento indisponível: segue só com o cache em memória
+                self.logger.warning(f"Consulta ao cache de traduções falhou: {str(e)}")
+                return found
+            self._remember({key: translated for key, translated in rows})
+            found.update({remaining[key]: translated for key, translated in rows})
+        return found
+
+    def _schedule(self, texts: List[str], keys: Dict[str, str], target: str) -> List[Future]:
+        """Agenda a tradução dos textos que ainda não estão sendo traduzidos."""
+        futures: Dict[int, Future] = {}
+        with self._lock:
+            new = []
+            for text in texts:
+                pending = self._pending.get(keys[text])
+                if pending is not None:
+                    futures[id(pending)] = pending
+                else:
+                    new.append(text)
+
+            for chunk in _pack(new):
+                try:
+                    future = upstream_executor.submit("translation", self._translate_chunk, chunk, target)
+                except (UpstreamSaturatedError, RuntimeError) as e:
+                    # Fila cheia ou executor encerrado: fica para uma próxima requisição
+                    self.logger.warning(f"Tradução de {len(chunk)} texto(s) não agendada: {str(e)}")
+                    continue
+                chunk_keys = [keys[text] for text in chunk]
+                for key in chunk_keys:
+                    self._pending[key] = future
+                future.add_done_callback(lambda _, chunk_keys=chunk_keys: self._release(chunk_keys))
+                futures[id(future)] = future
+        return list(futures.values())
+
+    def _release(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._pending.pop(key, None)
+
+    def _translate_chunk(self, chunk: List[str], target: str) -> Dict[str, str]:
+        """Traduz um bloco em uma chamada (com fallback texto a texto) e guarda no cache."""
+        translator = GoogleTranslator(source="auto", target=target)
+        translations: Dict[str, str] = {}
+        if len(chunk) > 1:
+            try:
+                parts = (translator.translate("\n".join(chunk)) or "").split("\n")
+                if len(parts) == len(chunk):
+                    translations = {text: part.strip() for text, part in zip(chunk, parts) if part.strip()}
+            except Exception as e:
+                self.logger.warning(f"Tradução em bloco falhou ({str(e)}); traduzindo texto a texto")
+        for text in chunk:
+            if text in translations:
+                continue
+            try:
+                translated = translator.translate(text)
+            except Exception as e:
+                self.logger.warning(f"Falha ao traduzir texto ({len(text)} caracteres): {str(e)}")
+                continue
+            if translated:
+                translations[text] = translated
+
+        stored = {content_key(text, target): translated for text, translated in translations.items()}
+        if stored:
+            now = time.time()
+            try:
+                with self._db.connection() as conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO translations (key, target, translated, created_at) VALUES (?, ?, ?, ?)",
+                        [(key, target, translated, now) for key, translated in stored.items()],
+                    )
+            except (sqlite3.Error, OSError) as e:
+                self.logger.warning(f"Traduções não gravadas no armazenamento local: {str(e)}")
+            self._remember(stored)
+        return translations
+
+    def _remember(self, translations: Dict[str, str]) -> None:
+        """Guarda traduções no cache em memória (LRU)."""
+        if not translations:
+            return
+        with self._lock:
+            for key, translated in translations.items():
+                self._memory[key] = translated
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+
+# Instância única compartilhada pelas rotas e serviços
+translation_service = TranslationService()
@@ -12,12 +12,11 @@ Example:
 """
 
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 import yfinance as yf
-from deep_translator import GoogleTranslator
-import os
 
 from core.config import settings
 from core.logging import LoggerMixin
@@ -28,7 +27,12 @@ from models.responses import (
     StockDataResponse,
     ValidationResponse,
 )
+from services.ohlcv_store import ohlcv_store
+from services.quote_batch import quote_batch_engine
 from services.interfaces import IMarketDataProvider, ProviderException
+from services.ticker_index import TickerIndex
+from services.ticker_universe import ticker_universe
+from services.translation import translation_service
 
 
 class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
@@ -70,13 +74,14 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
         self.max_retries = max_retries or settings.MAX_RETRIES
         self.retry_delay = retry_delay
 
-        # Cache de tickers brasileiros para otimização
-        self._brazilian_stocks_cache: Optional[List[Dict[str, str]]] = None
-        self._cache_timestamp: Optional[datetime] = None
-        self._cache_ttl = timedelta(hours=24)  # Cache válido por 24h
+        # Índice da lista estática, usado se o universo de tickers estiver vazio
+        self._static_index: Optional[TickerIndex] = None
 
     def get_stock_data(
-        self, symbol: str, request: StockDataRequest
+        self,
+        symbol: str,
+        request: StockDataRequest,
+        history: Optional[pd.DataFrame] = None,
     ) -> StockDataResponse:
         """
         Obtém dados completos de uma ação específica.
@@ -84,6 +89,8 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
         Args:
             symbol: Símbolo da ação (ex: "PETR4.SA")
             request: Parâmetros da requisição
+            history: Histórico já obtido (ex: download em lote). Se None,
+                o histórico é buscado individualmente para o ticker
 
         Returns:
             Dados formatados da ação com informações atuais e históricas
@@ -120,7 +127,7 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
             response = StockDataResponse(
                 symbol=normalized_symbol,
                 company_name=info.get("longName") or info.get("shortName"),
-                about=GoogleTranslator(source='auto', target='pt').translate(info.get("longBusinessSummary", "Resumo não disponível"), dest='pt'),
+                about=translation_service.translate(info.get("longBusinessSummary", "Resumo não disponível")),
                 current_price=self._safe_get_price(
                     info, "currentPrice", "regularMarketPrice"
                 ),
@@ -147,9 +154,14 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
             response.fundamentals = self._extract_fundamental_data(info)
 
             # Sempre incluir dados históricos
-            response.historical_data = self._get_historical_data(
-                ticker, request, normalized_symbol
-            )
+            if history is not None:
+                response.historical_data = self._format_historical_data(
+                    history, request, normalized_symbol
+                )
+            else:
+                response.historical_data = self._get_historical_data(
+                    ticker, request, normalized_symbol
+                )
 
             # Adicionar metadados
             response.metadata = {
@@ -177,6 +189,33 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
                 details={"symbol": symbol, "original_error": str(e)},
             )
 
+    def get_batch_history(
+        self, symbols: List[str], period: str = "1mo", interval: str = "1d"
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Obtém o histórico de vários símbolos com download em lote.
+
+        Símbolos sem histórico recebem um DataFrame vazio, evitando uma nova
+        busca individual em get_stock_data.
+
+        Args:
+            symbols: Símbolos das ações (normalizados como em get_stock_data)
+            period: Período dos dados
+            interval: Intervalo dos dados
+
+        Returns:
+            DataFrame de histórico por símbolo original
+        """
+        normalized = {symbol: self._normalize_symbol(symbol) for symbol in symbols}
+        frames, errors = ohlcv_store.fetch(
+            normalized.values(), period=period, interval=interval
+        )
+        for symbol, error in errors.items():
+            self.logger.warning(f"Histórico em lote indisponível para {symbol}: {error}")
+        return {
+            symbol: frames.get(norm, pd.DataFrame()) for symbol, norm in normalized.items()
+        }
+
     def validate_ticker(self, symbol: str) -> ValidationResponse:
         """
         Valida se um ticker existe e é válido no Yahoo Finance ou no CSV local.
@@ -207,12 +246,9 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
                 )
             # Fallback: se não for válido, checar se está no CSV de ações brasileiras
             if not is_valid and normalized_symbol.endswith(".SA"):
-                brazilian_stocks = self._get_brazilian_stocks()
-                for stock in brazilian_stocks:
-                    if stock["symbol"].upper() == normalized_symbol.upper():
-                        is_valid = True
-                        tradeable = True  # Assume negociável se está no CSV
-                        break
+                if normalized_symbol in ticker_universe.snapshot():
+                    is_valid = True
+                    tradeable = True  # Assume negociável se está no CSV
             # Montar resposta
             if is_valid:
                 return ValidationResponse(
@@ -257,85 +293,39 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
             Lista de tickers encontrados com informações básicas
         """
         try:
-            self.logger.info(f"Buscando tickers para query: '{query}'")
-
-            # Passo 1: Obter lista de ações brasileiras do cache (populado por investpy)
-            brazilian_stocks = self._get_brazilian_stocks()
-            self.logger.info(
-                f"Total de ações brasileiras para busca: {len(brazilian_stocks)}"
+            # Passo 1: Candidatos do índice em memória, já ordenados por relevância
+            top_candidates = [
+                {
+                    "symbol": stock["symbol"],
+                    "name": stock["name"],
+                    "sector": stock["sector"],
+                    "market": self._extract_market_from_symbol(stock["symbol"]),
+                    "current_price": 0.0,
+                    "currency": "BRL",
+                    "relevance_score": stock["relevance_score"],
+                }
+                for stock in self._get_ticker_index().search(query, limit)
+            ]
+
+            # Passo 2: Cotações do cache compartilhado; as que faltam são buscadas
+            # em paralelo até o prazo, e quem não chegar volta só com os dados locais
+            quotes = quote_batch_engine.get_quotes(
+                [candidate["symbol"] for candidate in top_candidates],
+                timeout=settings.SEARCH_ENRICH_TIMEOUT_SECONDS,
             )
-
-            # Passo 2: Filtrar baseado na query para encontrar candidatos
-            query_lower = query.lower()
-            self.logger.info(f"Query normalizada: {query_lower}")
-            candidate_results = []
-
-            for stock in brazilian_stocks:
-                stock_name = stock.get("name", "") or ""
-
-                if (
-                    query_lower in stock_name.lower()
-                    or query_lower in stock["symbol"].lower()
-                    or query_lower in stock["name"].lower()
-                    or query_lower.replace(".sa", "") in stock["symbol"].lower()
-                ):
-                    self.logger.info(f"Encontrado candidato: {stock['name']}")
-
-                    candidate_results.append(
-                        {
-                            "symbol": stock["symbol"],
-                            "name": stock["name"],
-                            "sector": stock.get("sector", "Unknown"),
-                            "market": self._extract_market_from_symbol(stock["symbol"]),
-                            "current_price": stock.get("current_price", 0.0),
-                            "currency": stock.get("currency", "BRL"),
-                            "relevance_score": self._calculate_relevance_score(
-                                query_lower, stock
-                            ),
-                        }
-                    )
-
-            # Passo 3: Ordenar candidatos por relevância e pegar o top 'limit'
-            candidate_results.sort(key=lambda x: x["relevance_score"], reverse=True)
-            top_candidates = candidate_results[:limit]
-
-            # Passo 4: Usar yfinance para obter dados atualizados e construir resultado final
             final_results = []
             for candidate in top_candidates:
-                try:
-                    symbol = candidate["symbol"]
-                    ticker = self._create_ticker_with_retry(symbol)
-                    info = self._get_ticker_info_with_retry(ticker, symbol)
-
-                    if not info:
-                        self.logger.warning(
-                            f"Sem informações do yfinance para {symbol}, pulando."
-                        )
-                        continue
-
-                    final_results.append(
-                        {
-                            "symbol": symbol,
-                            "name": info.get("longName")
-                            or info.get("shortName")
-                            or candidate["name"],
-                            "sector": info.get("sector", "Unknown"),
-                            "market": self._extract_market_from_symbol(symbol),
-                            "currency": info.get("currency", "BRL"),
-                            "current_price": self._safe_get_price(
-                                info, "currentPrice", "regularMarketPrice"
-                            ),
-                            "relevance_score": candidate["relevance_score"],
-                        }
-                    )
-                except Exception as e:
-                    self.logger.warning(
-                        f"Erro ao buscar dados do yfinance para {candidate['symbol']}: {e}"
-                    )
-                    continue
+                quote = quotes.get(candidate["symbol"])
+                if quote and quote["success"]:
+                    data = quote["data"]
+                    candidate["name"] = candidate["name"] or data.get("name") or ""
+                    candidate["currency"] = data.get("currency") or candidate["currency"]
+                    candidate["current_price"] = data.get("price") or 0.0
+                final_results.append(candidate)
 
             self.logger.info(
-                f"Encontrados {len(final_results)} resultados para '{query}' via yfinance"
+                f"Encontrados {len(final_results)} resultados para '{query}' "
+                f"({sum(1 for quote in quotes.values() if quote['success'])} com cotação)"
             )
             return final_results
 
@@ -506,73 +496,118 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
         )
 
     def _get_historical_data(
-        self, ticker: yf.Ticker, request: StockDataRequest, symbol: str
-    ) -> List[HistoricalDataPoint]:
-        """Obtém dados históricos formatados."""
+        self, ticker: yf.Ticker, request: StockDataRequest, symbol: str, response_format: str = "records"
+    ) -> Union[List[HistoricalDataPoint], Dict[str, Any]]:
+        """
+        Obtém dados históricos formatados.
+
+        Com ``response_format="columnar"`` devolve um array por coluna
+        (``{"index": [...], "open": [...], ...}``) em vez da lista de pontos.
+        """
+        columnar = response_format == "columnar"
         try:
             # Usar o período e intervalo especificados no request
             self.logger.info(
                 f"Obtendo dados históricos para {symbol} - period: {request.period}, interval: {request.interval}"
             )
 
-            hist = ticker.history(
-                period=request.period,
-                interval=request.interval,  # Usar o intervalo do request
+            # Barras diárias ou maiores vêm do armazenamento local; intraday, do cache por faixa
+            frames, errors = ohlcv_store.fetch(
+                [ticker.ticker], period=request.period, interval=request.interval
             )
+            if errors:
+                self.logger.warning(f"Histórico indisponível para {symbol}: {errors}")
+            hist = frames.get(ticker.ticker, pd.DataFrame())
 
             self.logger.info(f"Dados retornados pelo yfinance: {len(hist)} linhas")
+            if columnar:
+                return self._format_historical_columns(hist, request, symbol)
+            return self._format_historical_data(hist, request, symbol)
 
-            if hist.empty:
-                self.logger.warning(f"Nenhum dado histórico retornado para {symbol}")
-                return []
+        except Exception as e:
+            self.logger.error(f"Erro ao obter dados históricos para {symbol}: {e}")
+            return self._format_historical_columns(pd.DataFrame(), request, symbol) if columnar else []
 
-            # Debug: mostrar colunas e primeiras linhas
-            self.logger.debug(f"Colunas retornadas: {list(hist.columns)}")
-            self.logger.debug(f"Index type: {type(hist.index)}")
-            self.logger.debug(f"Primeiras 3 linhas:\n{hist.head(3)}")
+    def _historical_columns(
+        self, hist: pd.DataFrame, request: StockDataRequest, symbol: str
+    ) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """
+        Prepara as colunas de um DataFrame de histórico do yfinance.
 
-            # Converter para lista de pontos históricos
-            hist = hist.reset_index()
+        Descarta barras sem abertura ou fechamento, formata as datas e arredonda
+        os preços com operações vetorizadas.
 
-            # Determinar nome da coluna de data
-            date_column = "Datetime" if "Datetime" in hist.columns else "Date"
-            self.logger.debug(f"Usando coluna de data: {date_column}")
+        Returns:
+            Tupla (datas formatadas, coluna -> array) com as colunas open, high,
+            low, close, volume e adj_close (vazias se não houver dados)
+        """
+        names = ("open", "high", "low", "close", "volume", "adj_close")
+        if not hist.empty:
+            self.logger.debug(f"Colunas retornadas: {list(hist.columns)}")
+            self.logger.debug(f"Index type: {type(hist.index)}")
+            # Descartar barras sem abertura ou fechamento
+            hist = hist[hist["Open"].notna() & hist["Close"].notna()]
+        if hist.empty:
+            self.logger.warning(f"Nenhum dado histórico retornado para {symbol}")
+            return [], {name: np.empty(0, dtype=np.int64 if name == "volume" else np.float64) for name in names}
+
+        # Para dados intraday, incluir hora (horário local da bolsa)
+        if isinstance(hist.index, pd.DatetimeIndex):
+            local = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+            if request.interval in ["1m", "2m", "5m", "15m", "30m", "1h"]:
+                dates = np.char.replace(
+                    np.datetime_as_string(local.values, unit="s"), "T", " "
+                ).tolist()
+            else:
+                dates = np.datetime_as_string(local.values, unit="D").tolist()
+        else:
+            dates = hist.index.astype(str).tolist()
 
-            historical_points = []
+        prices = hist[["Open", "High", "Low", "Close"]].astype(float).round(2)
+        adj_close = (
+            hist["Adj Close"].astype(float).round(2)
+            if "Adj Close" in hist.columns
+            else prices["Close"]
+        )
+        columns = {name.lower(): prices[name].to_numpy() for name in ("Open", "High", "Low", "Close")}
+        columns["volume"] = hist["Volume"].fillna(0).astype("int64").to_numpy()
+        columns["adj_close"] = adj_close.to_numpy()
+        return dates, columns
 
-            for _, row in hist.iterrows():
-                try:
-                    # Verificar se temos dados válidos
-                    if pd.isna(row["Open"]) or pd.isna(row["Close"]):
-                        continue
+    def _format_historical_data(
+        self, hist: pd.DataFrame, request: StockDataRequest, symbol: str
+    ) -> List[HistoricalDataPoint]:
+        """
+        Converte um DataFrame de histórico do yfinance em pontos históricos.
 
-                    # Formatar data/datetime apropriadamente usando a coluna correta
-                    date_value = row[date_column]
-
-                    if hasattr(date_value, "strftime"):
-                        # Para dados intraday, incluir hora se disponível
-                        if request.interval in ["1m", "2m", "5m", "15m", "30m", "1h"]:
-                            formatted_date = date_value.strftime("%Y-%m-%d %H:%M:%S")
-                        else:
-                            formatted_date = date_value.strftime("%Y-%m-%d")
-                    else:
-                        formatted_date = str(date_value)
-
-                    point = HistoricalDataPoint(
-                        date=formatted_date,
-                        symbol=symbol,
-                        open=round(float(row["Open"]), 2),
-                        high=round(float(row["High"]), 2),
-                        low=round(float(row["Low"]), 2),
-                        close=round(float(row["Close"]), 2),
-                        volume=int(row["Volume"]) if pd.notna(row["Volume"]) else 0,
-                        adj_close=round(float(row.get("Adj Close", row["Close"])), 2),
-                    )
-                    historical_points.append(point)
-                except (ValueError, TypeError) as e:
-                    self.logger.warning(f"Erro ao processar ponto histórico: {e}")
-                    self.logger.debug(f"Dados da linha problemática: {row}")
-                    continue
+        As colunas vêm de ``_historical_columns`` e os pontos são criados com
+        ``model_construct``, sem validação por linha: os tipos já são garantidos
+        pelas conversões das colunas.
+        """
+        try:
+            dates, columns = self._historical_columns(hist, request, symbol)
+            construct = HistoricalDataPoint.model_construct
+            historical_points = [
+                construct(
+                    date=date,
+                    symbol=symbol,
+                    open=open_,
+                    high=high,
+                    low=low,
+                    close=close,
+                    volume=vol,
+                    adj_close=adj,
+                )
+                for date, open_, high, low, close, vol, adj in zip(
+                    dates,
+                    columns["open"].tolist(),
+                    columns["high"].tolist(),
+                    columns["low"].tolist(),
+                    columns["close"].tolist(),
+                    columns["volume"].tolist(),
+                    columns["adj_close"].tolist(),
+                )
+            ]
 
             self.logger.info(
                 f"Processados {len(historical_points)} pontos históricos para {symbol}"
@@ -583,75 +618,25 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
             self.logger.error(f"Erro ao obter dados históricos para {symbol}: {e}")
             return []
 
-    def _get_brazilian_stocks(self) -> List[Dict[str, str]]:
-        """Obtém lista de ações brasileiras a partir do CSV em /data com cache."""
-        # Verificar se o cache é válido
-        if (
-            self._brazilian_stocks_cache
-            and self._cache_timestamp
-            and datetime.now() - self._cache_timestamp < self._cache_ttl
-        ):
-            self.logger.info("Retornando ações brasileiras do cache.")
-            self.logger.debug(
-                f"Primeiros 5 tickers do cache: {self._brazilian_stocks_cache[:5]}"
-            )
-            return self._brazilian_stocks_cache
+    def _format_historical_columns(
+        self, hist: pd.DataFrame, request: StockDataRequest, symbol: str
+    ) -> Dict[str, Any]:
+        """
+        Converte um DataFrame de histórico do yfinance no formato colunar.
 
-        self.logger.info(
-            "Cache de ações brasileiras expirado ou vazio. Carregando do tickers.csv."
-        )
-        csv_path = os.path.join(os.path.dirname(__file__), "data", "tickers.csv")
-        csv_path = os.path.abspath(csv_path)
-        brazilian_stocks = []
-        try:
-            df = pd.read_csv(
-                csv_path, sep=",", dtype=str, encoding="utf-8", on_bad_lines="skip"
-            )
-            # Detecta se existe coluna de setor
-            has_sector = "Setor" in df.columns or "Sector" in df.columns
-            sector_col = (
-                "Setor"
-                if "Setor" in df.columns
-                else ("Sector" if "Sector" in df.columns else None)
-            )
-            for _, row in df.iterrows():
-                symbol = row.get("Ticker", "").strip()
-                name = row.get("Nome", "").strip()
-                # Define tipo
-                if symbol.endswith("34.SA") or symbol.endswith("35.SA"):
-                    tipo = "BDR"
-                elif symbol.endswith(".SA"):
-                    tipo = "Ação"
-                else:
-                    tipo = "Outro"
-                # Setor do CSV, se existir
-                sector = (
-                    row.get(sector_col, "Unknown").strip()
-                    if sector_col and row.get(sector_col)
-                    else "Unknown"
-                )
-                brazilian_stocks.append(
-                    {"symbol": symbol, "name": name, "sector": sector, "type": tipo}
-                )
-            # Atualizar cache
-            self._brazilian_stocks_cache = brazilian_stocks
-            self._cache_timestamp = datetime.now()
-            self.logger.info(
-                f"Cache de ações brasileiras atualizado com {len(brazilian_stocks)} tickers do tickers.csv."
-            )
-            self.logger.debug(
-                f"Primeiros 5 tickers do tickers.csv: {brazilian_stocks[:5]}"
-            )
-            return brazilian_stocks
-        except Exception as e:
-            self.logger.error(f"Erro ao carregar ações brasileiras do tickers.csv: {e}")
-            # Fallback para lista estática em caso de erro
-            self.logger.warning("Usando lista estática como fallback.")
-            static_stocks = self._get_static_brazilian_stocks()
-            self.logger.debug(
-                f"Primeiros 5 tickers do fallback estático: {static_stocks[:5]}"
-            )
-            return static_stocks
+        Mesmas colunas e arredondamentos de ``_format_historical_data``, sem criar
+        um objeto por ponto: ``{"index": [...], "open": [...], ..., "adj_close": [...]}``.
+        """
+        dates, columns = self._historical_columns(hist, request, symbol)
+        return {"index": dates, **columns}
+
+    def _get_brazilian_stocks(self) -> List[Dict[str, str]]:
+        """Obtém a lista de ações brasileiras do universo de tickers compartilhado."""
+        snapshot = ticker_universe.snapshot()
+        if len(snapshot):
+            return list(snapshot.entries)
+        self.logger.warning("Universo de tickers vazio; usando lista estática como fallback.")
+        return self._get_static_brazilian_stocks()
 
     def _get_static_brazilian_stocks(self) -> List[Dict[str, str]]:
         """Retorna uma lista estática de ações brasileiras como fallback."""
@@ -734,27 +719,6 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
             },
         ]
 
-    def _calculate_relevance_score(self, query: str, stock: Dict[str, str]) -> float:
-        """Calcula score de relevância para busca."""
-        score = 0.0
-        stock_name = stock.get("name", "") or ""
-
-        # Score baseado em correspondência no símbolo
-        if query in stock["symbol"].lower():
-            score += 1.0
-
-        # Score baseado em correspondência no nome
-        if query in stock_name.lower():
-            score += 0.8
-
-        # Score baseado em correspondência parcial
-        words = query.split()
-        for word in words:
-            if word in stock_name.lower():
-                score += 0.3
-
-        return score
-
     def _extract_market_from_symbol(self, symbol: str) -> str:
         """Extrai mercado baseado no símbolo."""
         if symbol.endswith(".SA"):
@@ -772,13 +736,18 @@ class YahooFinanceProvider(IMarketDataProvider, LoggerMixin):
         if not invalid_symbol.endswith(".SA") and "." not in invalid_symbol:
             suggestions.append(f"{invalid_symbol}.SA")
 
-        # Buscar símbolos similares na lista brasileira
-        brazilian_stocks = self._get_brazilian_stocks()
-        invalid_lower = invalid_symbol.lower().replace(".sa", "")
-
-        for stock in brazilian_stocks:
-            symbol_base = stock["symbol"].replace(".SA", "").lower()
-            if invalid_lower in symbol_base or symbol_base in invalid_lower:
-                suggestions.append(stock["symbol"])
+        # Símbolos com o mesmo prefixo ou a poucas edições de distância
+        for symbol in self._get_ticker_index().suggest(invalid_symbol, limit=3):
+            if symbol not in suggestions:
+                suggestions.append(symbol)
 
         return suggestions[:3]  # Retornar até 3 sugestões
+
+    def _get_ticker_index(self) -> TickerIndex:
+        """Índice de busca do universo de tickers (ou da lista estática, se ele estiver vazio)."""
+        index = ticker_universe.snapshot().index
+        if not len(index):
+            if self._static_index is None:
+                self._static_index = TickerIndex(self._get_static_brazilian_stocks())
+            index = self._static_index
+        return index
@@ -20,7 +20,7 @@ Version: 1.0.0
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 import yfinance as yf
 from yfinance import EquityQuery
 import pandas as pd
@@ -28,7 +28,14 @@ import numpy as np
 from fastapi import APIRouter, HTTPException, Query, Path
 from pydantic import BaseModel, Field
 
+from core.executor import UpstreamSaturatedError, upstream_executor
 from core.logging import get_logger
+from core.serialization import dumps_json, json_response
+from services.analytics import compare_tickers
+from services.correlation import correlation_service
+from services.indicators import indicator_engine
+from services.portfolio import analyze_portfolio
+from services.scanner import technical_scanner
 
 # Configurar logger
 logger = get_logger(__name__)
@@ -66,6 +73,25 @@ class MultiTickerRequest(BaseModel):
     period: str = Field(default="1mo", description="Período")
     interval: str = Field(default="1d", description="Intervalo")
 
+class PortfolioRequest(BaseModel):
+    """Modelo para análise de carteira (pesos ou posições)"""
+    weights: Optional[Dict[str, float]] = Field(default=None, description="Peso por ticker (carteira rebalanceada)")
+    positions: Optional[Dict[str, float]] = Field(default=None, description="Quantidade de ações por ticker (comprada e mantida)")
+    period: str = Field(default="1y", description="Período")
+    interval: str = Field(default="1d", description="Intervalo")
+    benchmark: Optional[str] = Field(default=None, description="Índice de referência do beta (padrão: ^BVSP)")
+    risk_free_rate: Optional[float] = Field(default=None, description="Taxa livre de risco anual, em fração (ex: 0.1)")
+    confidence: float = Field(default=0.95, description="Nível de confiança do VaR")
+
+class CorrelationRequest(BaseModel):
+    """Modelo para correlação entre muitos tickers"""
+    symbols: Optional[List[str]] = Field(default=None, description="Tickers (padrão: universo do tickers.csv)")
+    period: str = Field(default="1y", description="Período dos retornos diários")
+    min_periods: Optional[int] = Field(default=None, description="Mínimo de pregões em comum por par")
+    shrinkage: Optional[Union[float, str]] = Field(default=None, description="Encolhimento: 0 a 1 ou 'auto'")
+    top_k: int = Field(default=20, description="Pares mais e menos correlacionados retornados")
+    include_matrix: bool = Field(default=False, description="Incluir as matrizes completas")
+
 
 # ==================== UTILITÁRIOS ====================
 
@@ -79,6 +105,14 @@ def safe_ticker_operation(symbol: str, operation):
         logger.error(f"Erro ao obter dados para {symbol}: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Erro ao obter dados para {symbol}: {str(e)}")
 
+async def run_upstream(group: str, func, *args, **kwargs):
+    """Executa chamada bloqueante ao yfinance no executor gerenciado, fora do event loop"""
+    try:
+        return await upstream_executor.run(group, func, *args, **kwargs)
+    except UpstreamSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+
 def convert_to_serializable(data):
     """Converte dados pandas/numpy para formato serializável"""
     if isinstance(data, pd.DataFrame):
@@ -130,7 +164,7 @@ async def get_historical_data(
             auto_adjust=auto_adjust
         )
     
-    data = safe_ticker_operation(symbol, get_history)
+    data = await run_upstream("history", safe_ticker_operation, symbol, get_history)
     return {
         "symbol": symbol.upper(),
         "period": period,
@@ -146,7 +180,9 @@ async def download_multiple_tickers(request: MultiTickerRequest):
     """
     try:
         symbols_str = " ".join([s.upper() for s in request.symbols])
-        data = yf.download(
+        data = await run_upstream(
+            "history",
+            yf.download,
             symbols_str,
             period=request.period,
             interval=request.interval,
@@ -162,6 +198,8 @@ async def download_multiple_tickers(request: MultiTickerRequest):
             "interval": request.interval,
             "data": convert_to_serializable(data)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erro ao baixar dados: {str(e)}")
 
@@ -178,7 +216,7 @@ async def get_ticker_info(symbol: str = Path(..., description="Símbolo do ticke
     def get_info(ticker):
         return ticker.info
     
-    info = safe_ticker_operation(symbol, get_info)
+    info = await run_upstream("quote", safe_ticker_operation, symbol, get_info)
     return {
         "symbol": symbol.upper(),
         "info": convert_to_serializable(info)
@@ -209,7 +247,7 @@ async def get_company_profile(symbol: str = Path(..., description="Símbolo do t
             "52_week_low": info.get("fiftyTwoWeekLow")
         }
     
-    profile = safe_ticker_operation(symbol, get_profile)
+    profile = await run_upstream("quote", safe_ticker_operation, symbol, get_profile)
     return {
         "symbol": symbol.upper(),
         "profile": convert_to_serializable(profile)
@@ -224,7 +262,7 @@ async def get_financials(symbol: str = Path(..., description="Símbolo do ticker
     def get_financials(ticker):
         return ticker.financials
     
-    data = safe_ticker_operation(symbol, get_financials)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_financials)
     return {
         "symbol": symbol.upper(),
         "type": "annual_income_statement",
@@ -238,7 +276,7 @@ async def get_quarterly_financials(symbol: str = Path(..., description="Símbolo
     def get_quarterly_financials(ticker):
         return ticker.quarterly_financials
     
-    data = safe_ticker_operation(symbol, get_quarterly_financials)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_quarterly_financials)
     return {
         "symbol": symbol.upper(),
         "type": "quarterly_income_statement",
@@ -252,7 +290,7 @@ async def get_balance_sheet(symbol: str = Path(..., description="Símbolo do tic
     def get_balance_sheet(ticker):
         return ticker.balance_sheet
     
-    data = safe_ticker_operation(symbol, get_balance_sheet)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_balance_sheet)
     return {
         "symbol": symbol.upper(),
         "type": "annual_balance_sheet",
@@ -266,7 +304,7 @@ async def get_quarterly_balance_sheet(symbol: str = Path(..., description="Símb
     def get_quarterly_balance_sheet(ticker):
         return ticker.quarterly_balance_sheet
     
-    data = safe_ticker_operation(symbol, get_quarterly_balance_sheet)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_quarterly_balance_sheet)
     return {
         "symbol": symbol.upper(),
         "type": "quarterly_balance_sheet",
@@ -280,7 +318,7 @@ async def get_cashflow(symbol: str = Path(..., description="Símbolo do ticker")
     def get_cashflow(ticker):
         return ticker.cashflow
     
-    data = safe_ticker_operation(symbol, get_cashflow)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_cashflow)
     return {
         "symbol": symbol.upper(),
         "type": "annual_cashflow",
@@ -294,7 +332,7 @@ async def get_quarterly_cashflow(symbol: str = Path(..., description="Símbolo d
     def get_quarterly_cashflow(ticker):
         return ticker.quarterly_cashflow
     
-    data = safe_ticker_operation(symbol, get_quarterly_cashflow)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_quarterly_cashflow)
     return {
         "symbol": symbol.upper(),
         "type": "quarterly_cashflow",
@@ -310,7 +348,7 @@ async def get_dividends(symbol: str = Path(..., description="Símbolo do ticker"
     def get_dividends(ticker):
         return ticker.dividends
     
-    data = safe_ticker_operation(symbol, get_dividends)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_dividends)
     return {
         "symbol": symbol.upper(),
         "dividends": convert_to_serializable(data)
@@ -323,7 +361,7 @@ async def get_splits(symbol: str = Path(..., description="Símbolo do ticker")):
     def get_splits(ticker):
         return ticker.splits
     
-    data = safe_ticker_operation(symbol, get_splits)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_splits)
     return {
         "symbol": symbol.upper(),
         "splits": convert_to_serializable(data)
@@ -336,7 +374,7 @@ async def get_actions(symbol: str = Path(..., description="Símbolo do ticker"))
     def get_actions(ticker):
         return ticker.actions
     
-    data = safe_ticker_operation(symbol, get_actions)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_actions)
     return {
         "symbol": symbol.upper(),
         "actions": convert_to_serializable(data)
@@ -351,7 +389,7 @@ async def get_recommendations(symbol: str = Path(..., description="Símbolo do t
     def get_recommendations(ticker):
         return ticker.recommendations
     
-    data = safe_ticker_operation(symbol, get_recommendations)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_recommendations)
     return {
         "symbol": symbol.upper(),
         "recommendations": convert_to_serializable(data)
@@ -364,7 +402,7 @@ async def get_recommendations_summary(symbol: str = Path(..., description="Símb
     def get_recommendations_summary(ticker):
         return ticker.recommendations_summary
     
-    data = safe_ticker_operation(symbol, get_recommendations_summary)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_recommendations_summary)
     return {
         "symbol": symbol.upper(),
         "recommendations_summary": convert_to_serializable(data)
@@ -377,7 +415,7 @@ async def get_upgrades_downgrades(symbol: str = Path(..., description="Símbolo
     def get_upgrades_downgrades(ticker):
         return ticker.upgrades_downgrades
     
-    data = safe_ticker_operation(symbol, get_upgrades_downgrades)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_upgrades_downgrades)
     return {
         "symbol": symbol.upper(),
         "upgrades_downgrades": convert_to_serializable(data)
@@ -392,7 +430,7 @@ async def get_institutional_holders(symbol: str = Path(..., description="Símbol
     def get_institutional_holders(ticker):
         return ticker.institutional_holders
     
-    data = safe_ticker_operation(symbol, get_institutional_holders)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_institutional_holders)
     return {
         "symbol": symbol.upper(),
         "institutional_holders": convert_to_serializable(data)
@@ -405,7 +443,7 @@ async def get_major_holders(symbol: str = Path(..., description="Símbolo do tic
     def get_major_holders(ticker):
         return ticker.major_holders
     
-    data = safe_ticker_operation(symbol, get_major_holders)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_major_holders)
     return {
         "symbol": symbol.upper(),
         "major_holders": convert_to_serializable(data)
@@ -418,7 +456,7 @@ async def get_mutualfund_holders(symbol: str = Path(..., description="Símbolo d
     def get_mutualfund_holders(ticker):
         return ticker.mutualfund_holders
     
-    data = safe_ticker_operation(symbol, get_mutualfund_holders)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_mutualfund_holders)
     return {
         "symbol": symbol.upper(),
         "mutualfund_holders": convert_to_serializable(data)
@@ -433,7 +471,7 @@ async def get_earnings(symbol: str = Path(..., description="Símbolo do ticker")
     def get_earnings(ticker):
         return ticker.earnings
     
-    data = safe_ticker_operation(symbol, get_earnings)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_earnings)
     return {
         "symbol": symbol.upper(),
         "earnings": convert_to_serializable(data)
@@ -446,7 +484,7 @@ async def get_quarterly_earnings(symbol: str = Path(..., description="Símbolo d
     def get_quarterly_earnings(ticker):
         return ticker.quarterly_earnings
     
-    data = safe_ticker_operation(symbol, get_quarterly_earnings)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_quarterly_earnings)
     return {
         "symbol": symbol.upper(),
         "quarterly_earnings": convert_to_serializable(data)
@@ -459,7 +497,7 @@ async def get_earnings_dates(symbol: str = Path(..., description="Símbolo do ti
     def get_earnings_dates(ticker):
         return ticker.earnings_dates
     
-    data = safe_ticker_operation(symbol, get_earnings_dates)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_earnings_dates)
     return {
         "symbol": symbol.upper(),
         "earnings_dates": convert_to_serializable(data)
@@ -472,7 +510,7 @@ async def get_earnings_history(symbol: str = Path(..., description="Símbolo do
     def get_earnings_history(ticker):
         return ticker.earnings_history
     
-    data = safe_ticker_operation(symbol, get_earnings_history)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_earnings_history)
     return {
         "symbol": symbol.upper(),
         "earnings_history": convert_to_serializable(data)
@@ -485,7 +523,7 @@ async def get_calendar(symbol: str = Path(..., description="Símbolo do ticker")
     def get_calendar(ticker):
         return ticker.calendar
     
-    data = safe_ticker_operation(symbol, get_calendar)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_calendar)
     return {
         "symbol": symbol.upper(),
         "calendar": convert_to_serializable(data)
@@ -500,7 +538,7 @@ async def get_options_dates(symbol: str = Path(..., description="Símbolo do tic
     def get_options(ticker):
         return ticker.options
     
-    data = safe_ticker_operation(symbol, get_options)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_options)
     return {
         "symbol": symbol.upper(),
         "options_expiration_dates": list(data) if data else []
@@ -520,7 +558,7 @@ async def get_option_chain(
             "puts": chain.puts
         }
     
-    data = safe_ticker_operation(symbol, get_option_chain)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_option_chain)
     return {
         "symbol": symbol.upper(),
         "expiration_date": expiration_date,
@@ -537,7 +575,7 @@ async def get_news(symbol: str = Path(..., description="Símbolo do ticker")):
     def get_news(ticker):
         return ticker.news
     
-    data = safe_ticker_operation(symbol, get_news)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_news)
     return {
         "symbol": symbol.upper(),
         "news": convert_to_serializable(data)
@@ -550,7 +588,7 @@ async def get_sustainability(symbol: str = Path(..., description="Símbolo do ti
     def get_sustainability(ticker):
         return ticker.sustainability
     
-    data = safe_ticker_operation(symbol, get_sustainability)
+    data = await run_upstream("fundamentals", safe_ticker_operation, symbol, get_sustainability)
     return {
         "symbol": symbol.upper(),
         "sustainability": convert_to_serializable(data)
@@ -562,39 +600,25 @@ async def get_sustainability(symbol: str = Path(..., description="Símbolo do ti
 @router.get("/{symbol}/analysis/technical")
 async def get_technical_analysis(
     symbol: str = Path(..., description="Símbolo do ticker"),
-    period: str = Query("3mo", description="Período para análise")
+    period: str = Query("3mo", description="Período para análise"),
+    interval: str = Query("1d", description="Intervalo: 1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 1wk, 1mo"),
+    indicators: Optional[str] = Query(
+        None,
+        description="Indicadores separados por vírgula, com parâmetros opcionais (ex: sma_200,rsi_14,macd_12_26_9). "
+                    "Disponíveis: sma, ema, rsi, bbands, macd, atr, obv, vwap. "
+                    "Padrão: sma_20, sma_50, ema_12, ema_26, rsi_14, bbands_20_2",
+    ),
 ):
     """
-    Realiza análise técnica básica incluindo médias móveis e indicadores.
+    Realiza análise técnica com médias móveis e indicadores.
+
+    Os indicadores são mantidos com estado incremental por símbolo/intervalo:
+    chamadas seguintes só processam as barras novas.
     """
     def get_technical_data(ticker):
-        hist = ticker.history(period=period)
-        
-        if hist.empty:
-            return None
-            
-        # Calcular médias móveis
-        hist['SMA_20'] = hist['Close'].rolling(window=20).mean()
-        hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
-        hist['EMA_12'] = hist['Close'].ewm(span=12).mean()
-        hist['EMA_26'] = hist['Close'].ewm(span=26).mean()
-        
-        # RSI simplificado
-        delta = hist['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        hist['RSI'] = 100 - (100 / (1 + rs))
-        
-        # Bandas de Bollinger
-        hist['BB_Middle'] = hist['Close'].rolling(window=20).mean()
-        bb_std = hist['Close'].rolling(window=20).std()
-        hist['BB_Upper'] = hist['BB_Middle'] + (bb_std * 2)
-        hist['BB_Lower'] = hist['BB_Middle'] - (bb_std * 2)
-        
-        return hist
+        return indicator_engine.compute(ticker.ticker, period=period, interval=interval, indicators=indicators)
     
-    data = safe_ticker_operation(symbol, get_technical_data)
+    data = await run_upstream("history", safe_ticker_operation, symbol, get_technical_data)
     return {
         "symbol": symbol.upper(),
         "period": period,
@@ -608,39 +632,127 @@ async def get_technical_analysis(
 async def compare_performance(request: MultiTickerRequest):
     """
     Compara performance de múltiplos tickers.
+
+    Os preços são alinhados nas datas comuns a todos os tickers. Além das
+    métricas por ticker (retorno, volatilidade anualizada, drawdown máximo),
+    retorna as séries rebaseadas em 100 e as matrizes de correlação e
+    covariância (anualizada) dos retornos.
     """
     try:
-        symbols = [s.upper() for s in request.symbols]
-        data = {}
-        
-        for symbol in symbols:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=request.period)
-            
-            if not hist.empty:
-                # Calcular métricas de performance
-                returns = hist['Close'].pct_change().dropna()
-                total_return = (hist['Close'][-1] / hist['Close'][0] - 1) * 100
-                volatility = returns.std() * (252 ** 0.5) * 100  # Anualizada
-                
-                data[symbol] = {
-                    "total_return_pct": round(total_return, 2),
-                    "volatility_pct": round(volatility, 2),
-                    "max_price": float(hist['High'].max()),
-                    "min_price": float(hist['Low'].min()),
-                    "current_price": float(hist['Close'][-1]),
-                    "avg_volume": float(hist['Volume'].mean())
-                }
+        symbols = list(dict.fromkeys(s.upper() for s in request.symbols))
+        result = await run_upstream(
+            "history", compare_tickers, symbols, period=request.period, interval=request.interval
+        )
         
-        return {
-            "comparison": data,
+        # Séries e matrizes grandes: serializadas direto com orjson
+        return json_response(dumps_json({
+            "comparison": result["comparison"],
             "period": request.period,
-            "symbols": symbols
-        }
+            "symbols": symbols,
+            "dates": result["dates"],
+            "rebased": result["rebased"],
+            "correlation": result["correlation"],
+            "covariance": result["covariance"],
+            "errors": result["errors"] or None
+        }))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erro na comparação: {str(e)}")
 
 
+# ==================== ENDPOINTS DE CARTEIRA ====================
+
+@router.post("/portfolio/analytics")
+async def portfolio_analytics(request: PortfolioRequest):
+    """
+    Calcula métricas de risco e retorno de uma carteira.
+
+    Recebe pesos (carteira rebalanceada) ou posições em quantidade de ações
+    (carteira comprada e mantida). Retorna a série de valor e de retornos da
+    carteira, volatilidade anualizada, beta contra o índice de referência,
+    Sharpe/Sortino, drawdown máximo e VaR histórico e paramétrico de um período.
+    """
+    try:
+        result = await run_upstream(
+            "history",
+            analyze_portfolio,
+            weights=request.weights,
+            positions=request.positions,
+            period=request.period,
+            interval=request.interval,
+            benchmark=request.benchmark,
+            risk_free_rate=request.risk_free_rate,
+            confidence=request.confidence,
+        )
+        result["period"] = request.period
+        result["errors"] = result["errors"] or None
+        return json_response(dumps_json(result))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na análise da carteira: {str(e)}")
+
+
+# ==================== ENDPOINTS DE CORRELAÇÃO ====================
+
+@router.post("/correlation")
+async def correlation_matrix(request: CorrelationRequest):
+    """
+    Correlação e covariância (anualizada) dos retornos diários entre muitos tickers.
+
+    Cada par usa os pregões encerrados em que os dois negociaram. Por padrão
+    retorna só os ``top_k`` pares mais e menos correlacionados; a matriz
+    completa vem com ``include_matrix``. Os resultados ficam em cache até o
+    próximo pregão.
+    """
+    try:
+        symbols = request.symbols or technical_scanner.universe()
+        result = await run_upstream(
+            "history",
+            correlation_service.correlate,
+            symbols,
+            period=request.period,
+            min_periods=request.min_periods,
+            shrinkage=request.shrinkage,
+            top_k=request.top_k,
+            include_matrix=request.include_matrix,
+        )
+        return json_response(dumps_json(result))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro no cálculo de correlação: {str(e)}")
+
+
+# ==================== ENDPOINTS DE VARREDURA ====================
+
+@router.get("/scan/technical")
+async def scan_technical(
+    where: str = Query(..., description="Filtros separados por vírgula (ex: cross_above:sma_200,rsi_14<30)"),
+    symbols: Optional[str] = Query(None, description="Tickers separados por vírgula (padrão: universo do tickers.csv)"),
+):
+    """
+    Varre o universo de tickers com filtros técnicos avaliados no último pregão encerrado.
+
+    Séries: close, sma_N, ema_N, rsi_N. Filtros: comparações (rsi_14<30,
+    close>sma_200) e cruzamentos (cross_above:sma_200, cross_below:sma_50:sma_200).
+    """
+    try:
+        universe = [s for s in symbols.split(",") if s.strip()] if symbols else None
+        return await run_upstream("history", technical_scanner.scan, where, universe)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na varredura: {str(e)}")
+
+
 # ==================== ENDPOINT DE RESUMO COMPLETO ====================
 
 @router.get("/{symbol}/complete")
@@ -704,7 +816,7 @@ async def get_complete_data(symbol: str = Path(..., description="Símbolo do tic
         
         return result
     
-    data = safe_ticker_operation(symbol, get_complete_info)
+    data = await run_upstream("quote", safe_ticker_operation, symbol, get_complete_info)
     return {
         "symbol": symbol.upper(),
         "timestamp": datetime.now().isoformat(),
@@ -720,7 +832,7 @@ async def yfinance_health_check():
     try:
         # Teste simples com um ticker conhecido
         test_ticker = yf.Ticker("AAPL")
-        test_info = test_ticker.info
+        test_info = await upstream_executor.run("quote", lambda: test_ticker.info)
         
         return {
             "status": "healthy",
@@ -891,13 +1003,17 @@ async def obter_trending(
         
         # Executar screening com try/except específico
         try:
-            results = yf.screen(
+            results = await upstream_executor.run(
+                "screener",
+                yf.screen,
                 query=query,
                 size=limit,
                 offset=offset,
                 sortField=sort_field,
                 sortAsc=sort_asc
             )
+        except UpstreamSaturatedError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         except Exception as e:
             logger.error(f"Erro no yf.screen(): {str(e)}")
             raise HTTPException(
@@ -970,6 +1086,8 @@ async def obter_trending(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao executar screening '{categoria}': {str(e)}")
         raise HTTPException(
@@ -1016,7 +1134,9 @@ async def busca_personalizada(
             
         query = EquityQuery('and', conditions)
         
-        results = yf.screen(
+        results = await run_upstream(
+            "screener",
+            yf.screen,
             query=query,
             size=limit,
             sortField="marketCap",
@@ -1052,6 +1172,8 @@ async def busca_personalizada(
             "total": len(formatted_results)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro na busca personalizada: {str(e)}")
         raise HTTPException(
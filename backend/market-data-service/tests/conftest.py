@@ -0,0 +1,12 @@
+"""
+Configuração comum dos testes.
+
+Os módulos do serviço são importados como ``core.*``/``services.*`` (o
+diretório ``app`` está no ``pythonpath`` do pytest). Os singletons gravam no
+diretório de armazenamento local, então os testes usam um diretório temporário.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("LOCAL_STORAGE_DIR", tempfile.mkdtemp(prefix="market-data-tests-"))
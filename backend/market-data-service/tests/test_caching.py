@@ -0,0 +1,177 @@
+"""Coalescência de misses (single-flight) do cache por namespace."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cadu.caching import CacheManager
+
+_WAITERS = 8
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condição não atingida a tempo")
+        time.sleep(0.001)
+
+
+def _blocking(manager: CacheManager, result=None, error: Exception = None):
+    """Função cacheada que só termina quando ``release`` é sinalizado."""
+    release = threading.Event()
+    calls = []
+
+    @manager.cached(ttl=60, jitter=0, early_beta=0)
+    def load(symbol):
+        calls.append(symbol)
+        release.wait(5)
+        if error is not None:
+            raise error
+        return {"symbol": symbol, "value": result}
+
+    return load, release, calls
+
+
+def test_threads_missing_same_key_execute_once():
+    manager = CacheManager()
+    load, release, calls = _blocking(manager, result=42)
+    counters = load.cache_namespace.counters
+    results = [None] * _WAITERS
+
+    def worker(i):
+        results[i] = load("PETR4")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(_WAITERS)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: counters["coalesced"] == _WAITERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ["PETR4"]
+    assert counters["executed"] == 1
+    assert counters["coalesced"] == _WAITERS - 1
+    assert results == [{"symbol": "PETR4", "value": 42}] * _WAITERS
+    assert load("PETR4") == {"symbol": "PETR4", "value": 42}
+    assert calls == ["PETR4"]
+
+
+def test_async_callers_coalesce():
+    manager = CacheManager()
+    load, release, calls = _blocking(manager, result=7)
+    counters = load.cache_namespace.counters
+
+    async def main():
+        tasks = [asyncio.ensure_future(load.aio("VALE3")) for _ in range(_WAITERS)]
+        while counters["coalesced"] < _WAITERS - 1:
+            await asyncio.sleep(0.001)
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(*tasks), 5)
+
+    results = asyncio.run(main())
+
+    assert calls == ["VALE3"]
+    assert counters["executed"] == 1
+    assert counters["coalesced"] == _WAITERS - 1
+    assert results == [{"symbol": "VALE3", "value": 7}] * _WAITERS
+
+
+def test_leader_error_reaches_waiters_and_is_not_cached():
+    manager = CacheManager()
+    load, release, calls = _blocking(manager, error=ConnectionError("Yahoo indisponível"))
+    counters = load.cache_namespace.counters
+    errors = []
+
+    def worker():
+        try:
+            load("ITUB4")
+        except ConnectionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(_WAITERS)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: counters["coalesced"] == _WAITERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == _WAITERS
+    assert all(str(e) == "Yahoo indisponível" for e in errors)
+    assert calls == ["ITUB4"]
+    assert len(load.cache_namespace) == 0
+    assert not load.cache_namespace.inflight
+
+    # A falha não fica em cache: a próxima chamada executa de novo
+    with pytest.raises(ConnectionError):
+        load("ITUB4")
+    assert calls == ["ITUB4", "ITUB4"]
+    assert counters["executed"] == 2
+
+
+class _Clock:
+    """Relógio manual para controlar as expirações do cache."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_stale_entry_served_while_single_refresh_runs():
+    clock = _Clock()
+    manager = CacheManager(clock=clock)
+    release = threading.Event()
+    calls = []
+
+    @manager.cached(ttl=10, stale_ttl=20, jitter=0, early_beta=0)
+    def quote(symbol):
+        calls.append(symbol)
+        if len(calls) > 1:
+            release.wait(5)
+        return len(calls)
+
+    counters = quote.cache_namespace.counters
+    assert quote("BBAS3") == 1
+
+    clock.now += 15
+    # Vencido, mas dentro da janela de stale: todos recebem o valor antigo
+    assert [quote("BBAS3") for _ in range(5)] == [1] * 5
+    assert counters["stale_hits"] == 5
+    assert counters["refreshes"] == 1
+    _wait_for(lambda: len(calls) == 2)
+
+    release.set()
+    _wait_for(lambda: not quote.cache_namespace.inflight)
+    assert quote("BBAS3") == 2
+    assert calls == ["BBAS3", "BBAS3"]
+
+
+def test_entry_expires_after_ttl_plus_stale_ttl():
+    clock = _Clock()
+    manager = CacheManager(clock=clock)
+    calls = []
+
+    @manager.cached(ttl=10, stale_ttl=20, jitter=0, early_beta=0)
+    def quote(symbol):
+        calls.append(symbol)
+        return len(calls)
+
+    counters = quote.cache_namespace.counters
+    assert quote("WEGE3") == 1
+
+    clock.now += 5
+    assert quote("WEGE3") == 1
+    assert counters["stale_hits"] == 0
+
+    clock.now += 25
+    # Exatamente em ttl + stale_ttl a entrada expira e a chamada é síncrona
+    assert quote("WEGE3") == 2
+    assert counters["expirations"] == 1
+    assert counters["refreshes"] == 0
+    assert calls == ["WEGE3", "WEGE3"]
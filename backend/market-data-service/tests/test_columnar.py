@@ -0,0 +1,86 @@
+"""Formato colunar dos históricos comparado com o formato de registros."""
+
+import numpy as np
+import orjson
+import pandas as pd
+import pytest
+
+from cadu.yfinance_logic import convert_to_serializable
+from core.serialization import arrays_to_columnar, dumps_json, frame_to_columnar
+from models.requests import StockDataRequest
+from services.yahoo_finance_provider import YahooFinanceProvider
+
+
+def _history(intraday: bool) -> pd.DataFrame:
+    """Histórico no formato do yfinance, com fuso e uma barra sem fechamento."""
+    if intraday:
+        index = pd.date_range("2024-03-01 10:00", periods=6, freq="5min", tz="America/Sao_Paulo", name="Datetime")
+    else:
+        index = pd.date_range("2024-03-01", periods=6, freq="B", tz="America/Sao_Paulo", name="Date")
+    rng = np.random.default_rng(1)
+    close = 30 + rng.normal(0, 1, len(index))
+    frame = pd.DataFrame({
+        "Open": close + 0.123456,
+        "High": close + 1.005,
+        "Low": close - 0.994999,
+        "Close": close,
+        "Adj Close": close * 0.97,
+        "Volume": rng.integers(1_000, 10_000, len(index)).astype(float),
+    }, index=index)
+    frame.iloc[2, frame.columns.get_loc("Close")] = np.nan
+    frame.iloc[4, frame.columns.get_loc("Volume")] = np.nan
+    return frame
+
+
+@pytest.mark.parametrize("interval", ["1d", "5m"])
+def test_provider_columnar_matches_records(interval):
+    provider = YahooFinanceProvider()
+    request = StockDataRequest(symbol="PETR4.SA", period="5d", interval=interval)
+    hist = _history(intraday=interval == "5m")
+
+    records = provider._format_historical_data(hist, request, "PETR4.SA")
+    columnar = orjson.loads(dumps_json(provider._format_historical_columns(hist, request, "PETR4.SA")))
+
+    # Barra sem fechamento descartada nos dois formatos
+    assert len(records) == len(columnar["index"]) == len(hist) - 1
+    assert columnar["index"] == [point.date for point in records]
+    for name in ("open", "high", "low", "close", "volume", "adj_close"):
+        assert columnar[name] == [getattr(point, name) for point in records], name
+    if interval == "5m":
+        assert columnar["index"][0] == "2024-03-01 10:00:00"
+    else:
+        assert columnar["index"][0] == "2024-03-01"
+    assert columnar["open"][0] == round(hist["Open"].iloc[0], 2)
+    assert columnar["volume"][3] == 0
+
+
+def test_provider_columnar_without_data():
+    provider = YahooFinanceProvider()
+    request = StockDataRequest(symbol="PETR4.SA")
+
+    columnar = provider._format_historical_columns(pd.DataFrame(), request, "PETR4.SA")
+
+    assert provider._format_historical_data(pd.DataFrame(), request, "PETR4.SA") == []
+    assert orjson.loads(dumps_json(columnar)) == {
+        "index": [], "open": [], "high": [], "low": [], "close": [], "volume": [], "adj_close": [],
+    }
+
+
+def test_frame_and_arrays_columnar_match_records():
+    frame = _history(intraday=True).tz_localize(None)
+    frame["Volume"] = frame["Volume"].fillna(0).astype(np.int64)
+
+    records = convert_to_serializable(frame)
+    from_frame = orjson.loads(dumps_json(frame_to_columnar(frame)))
+    from_arrays = orjson.loads(dumps_json(arrays_to_columnar(
+        frame.index.values.astype("datetime64[s]"), {name: frame[name].to_numpy() for name in frame.columns}
+    )))
+
+    assert from_frame == from_arrays
+    assert from_frame["index"] == [record["Datetime"] for record in records]
+    for name in frame.columns:
+        key = name.lower().replace(" ", "_")
+        # Sem arredondamento; NaN vira null no colunar (e 0 nos registros)
+        expected = [None if pd.isna(value) else value for value in frame[name].tolist()]
+        assert from_frame[key] == expected
+        assert [0 if value is None else value for value in expected] == [record[name] for record in records]
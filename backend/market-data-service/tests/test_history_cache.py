@@ -0,0 +1,152 @@
+"""Busca intraday em blocos, união das barras e atualização incremental das séries."""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import history_cache as module
+from services.history_cache import YAHOO_INTRADAY_LIMITS, HistoryRangeCache, _Series
+from services.market_calendar import MAX_COVERAGE
+
+_SYMBOL = "PETR4.SA"
+_KEY = (_SYMBOL, "5m", False, True)
+
+
+def _bars(first: pd.Timestamp, last: pd.Timestamp, value: float = 1.0) -> pd.DataFrame:
+    """Barras de 5m do pregão da B3 (horário local, sem fuso) em [first, last)."""
+    days = pd.bdate_range(first.normalize(), last.normalize() - pd.Timedelta(days=1))
+    offsets = pd.timedelta_range("10:00:00", "17:55:00", freq="5min")
+    index = pd.DatetimeIndex([day + offset for day in days for offset in offsets], name="Datetime")
+    close = np.full(len(index), value)
+    return pd.DataFrame({
+        "Open": close, "High": close, "Low": close, "Close": close,
+        "Volume": np.full(len(index), 100, dtype=np.int64),
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+
+
+class _Downloader:
+    """Substituto de ``history_batch_fetcher.fetch`` que registra cada bloco pedido."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, symbols, period=None, interval=None, start=None, end=None, **kwargs):
+        self.calls.append((period, start, end))
+        if self.fail:
+            return {}, {symbol: "Tempo esgotado" for symbol in symbols}
+        last = pd.Timestamp(end) if end else pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+        return {symbol: _bars(pd.Timestamp(start), last) for symbol in symbols}, {}
+
+
+@pytest.fixture
+def downloader(monkeypatch):
+    stub = _Downloader()
+    monkeypatch.setattr(module.history_batch_fetcher, "fetch", stub)
+    return stub
+
+
+@pytest.mark.parametrize("interval", sorted(YAHOO_INTRADAY_LIMITS))
+def test_chunks_respect_yahoo_limits(interval):
+    chunk_days, lookback_days = YAHOO_INTRADAY_LIMITS[interval]
+    today = pd.Timestamp.now().normalize()
+
+    specs = HistoryRangeCache._chunk_specs(MAX_COVERAGE, None, interval)
+
+    starts = [pd.Timestamp(start) for _, start, _ in specs]
+    ends = [pd.Timestamp(end) for _, _, end in specs[:-1]] + [today + pd.Timedelta(days=1)]
+    assert all(period is None for period, _, _ in specs)
+    # Recortado ao histórico disponível, blocos contíguos e último bloco aberto
+    assert starts[0] == today - pd.Timedelta(days=lookback_days)
+    assert specs[-1][2] is None
+    assert starts[1:] == ends[:-1]
+    assert all(pd.Timedelta(0) < end - start <= pd.Timedelta(days=chunk_days) for start, end in zip(starts, ends))
+
+
+def test_chunks_with_explicit_window():
+    today = pd.Timestamp.now().normalize()
+    start = today - pd.Timedelta(days=20)
+    end = today - pd.Timedelta(days=2)
+
+    specs = HistoryRangeCache._chunk_specs(int(start.timestamp()), int(end.timestamp()), "1m")
+
+    assert specs == [
+        (None, (start + pd.Timedelta(days=7 * i)).strftime("%Y-%m-%d"),
+         min(start + pd.Timedelta(days=7 * (i + 1)), end + pd.Timedelta(days=1)).strftime("%Y-%m-%d"))
+        for i in range(3)
+    ]
+
+
+def test_overlapping_chunk_bars_are_deduplicated(monkeypatch):
+    def fetch(symbols, period=None, interval=None, start=None, end=None, **kwargs):
+        # Cada bloco repete o último dia do anterior, com outro valor
+        first = pd.Timestamp(start) - pd.Timedelta(days=1)
+        last = pd.Timestamp(end) if end else pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+        return {symbol: _bars(first, last, value=first.day) for symbol in symbols}, {}
+
+    monkeypatch.setattr(module.history_batch_fetcher, "fetch", fetch)
+    cache = HistoryRangeCache(path=None, workers=2)
+    start = pd.Timestamp.now().normalize() - pd.Timedelta(days=20)
+
+    frames, errors = cache._fetch_range([_SYMBOL], int(start.timestamp()), None, "1m", False, True)
+    cache.shutdown()
+
+    frame = frames[_SYMBOL]
+    assert not errors
+    assert frame.index.is_unique and frame.index.is_monotonic_increasing
+    specs = HistoryRangeCache._chunk_specs(int(start.timestamp()), None, "1m")
+    first = pd.Timestamp(specs[0][1]) - pd.Timedelta(days=1)
+    assert len(frame) == len(_bars(first, frame.index[-1].normalize() + pd.Timedelta(days=1)))
+    for _, chunk_start, _ in specs[1:]:
+        # No dia repetido prevalece o bloco seguinte
+        overlap = pd.Timestamp(chunk_start) - pd.Timedelta(days=1)
+        day = frame[frame.index.normalize() == overlap]["Close"]
+        assert (day == overlap.day).all()
+
+
+def test_failed_delta_is_not_marked_checked(downloader):
+    cache = HistoryRangeCache(ttl=0, path=None)
+    frames, errors = cache.fetch([_SYMBOL], period="5d", interval="5m")
+    assert not errors and not frames[_SYMBOL].empty
+
+    stale_check = time.time() - 7 * 86400
+    cache._get(_KEY).checked_at = stale_check
+    downloader.fail = True
+    calls = len(downloader.calls)
+
+    frames, errors = cache.fetch([_SYMBOL], period="5d", interval="5m")
+
+    # A série atual é servida, mas continua pendente de verificação
+    assert not errors and not frames[_SYMBOL].empty
+    assert len(downloader.calls) > calls
+    assert cache._get(_KEY).checked_at == stale_check
+
+    downloader.fail = False
+    calls = len(downloader.calls)
+    cache.fetch([_SYMBOL], period="5d", interval="5m")
+    assert len(downloader.calls) > calls
+    assert cache._get(_KEY).checked_at > stale_check
+
+
+def test_series_beyond_lookback_is_reloaded(downloader, tmp_path):
+    path = str(tmp_path / "intraday.sqlite3")
+    cache = HistoryRangeCache(ttl=0, path=path)
+    lookback_days = YAHOO_INTRADAY_LIMITS["5m"][1]
+    old_end = pd.Timestamp.now().normalize() - pd.Timedelta(days=lookback_days + 30)
+    old = _bars(old_end - pd.Timedelta(days=10), old_end, value=-1.0)
+    covered_from = int(old.index[0].timestamp())
+    cache._put(_KEY, _Series(old, covered_from, time.time() - 40 * 86400))
+    cache._save(_KEY, old, covered_from, time.time() - 40 * 86400)
+
+    frames, errors = cache.fetch([_SYMBOL], period="5d", interval="5m")
+
+    assert not errors
+    # Baixada de novo a partir da janela padrão, sem as barras antigas
+    assert downloader.calls and all(start > old_end.strftime("%Y-%m-%d") for _, start, _ in downloader.calls)
+    assert (frames[_SYMBOL]["Close"] == 1.0).all()
+    assert cache._get(_KEY).ts[0] > int(old_end.timestamp())
+    reloaded = HistoryRangeCache(path=path)._load(_KEY)
+    assert reloaded.ts[0] > int(old_end.timestamp())
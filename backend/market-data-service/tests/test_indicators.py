@@ -0,0 +1,118 @@
+"""Indicadores incrementais comparados com as implementações de referência do pandas."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.indicators import EMA, RSI, SMA, IndicatorEngine, _State, parse_indicators
+from services.scanner import _series
+
+_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _bars(size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, size))
+    spread = rng.uniform(0.1, 2.0, size)
+    ts = (np.arange(size, dtype=np.int64) + 19000) * 86400
+    bars = {
+        "Open": close + rng.normal(0, 0.5, size),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 100_000, size).astype(np.float64),
+    }
+    return ts, bars
+
+
+def _seeded_ewm(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """Média exponencial do pandas semeada pela média simples dos primeiros ``period`` valores."""
+    seeded = pd.Series(np.concatenate(([values[:period].mean()], values[period:])))
+    result = np.full(len(values), np.nan)
+    result[period - 1:] = seeded.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return result
+
+
+@pytest.mark.parametrize("period", [1, 5, 20])
+def test_sma_matches_rolling_mean(period):
+    _, bars = _bars(120)
+    close = bars["Close"]
+    result = SMA(period).update({"close": close})["SMA_" + str(period)]
+    expected = pd.Series(close).rolling(period).mean().to_numpy()
+    np.testing.assert_allclose(result, expected, rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [5, 12, 26])
+def test_ema_matches_pandas_ewm(period):
+    _, bars = _bars(300)
+    close = bars["Close"]
+    result = EMA(period).update({"close": close})[f"EMA_{period}"]
+    np.testing.assert_allclose(result, _seeded_ewm(close, period, 2.0 / (period + 1)), rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [7, 14])
+def test_wilder_rsi_matches_pandas_ewm(period):
+    _, bars = _bars(300)
+    close = bars["Close"]
+    result = RSI(period).update({"close": close})
+    result = result["RSI" if period == 14 else f"RSI_{period}"]
+
+    delta = np.diff(close)
+    gains = _seeded_ewm(np.maximum(delta, 0.0), period, 1.0 / period)
+    losses = _seeded_ewm(np.maximum(-delta, 0.0), period, 1.0 / period)
+    expected = np.concatenate(([np.nan], 100.0 - 100.0 / (1.0 + gains / losses)))
+    np.testing.assert_allclose(result, expected, rtol=1e-10, equal_nan=True)
+
+
+def test_chunked_append_matches_one_shot():
+    ts, bars = _bars(700, seed=1)
+    names = parse_indicators("sma_20,ema_12,rsi_14,bbands_20_2,macd,atr,obv,vwap")
+
+    one_shot = _State(_COLUMNS)
+    for name in names:
+        one_shot.add(name)
+    one_shot.append(ts, bars)
+
+    # Parte do histórico antes dos indicadores e o restante em blocos de tamanhos variados
+    chunked = _State(_COLUMNS)
+    chunked.append(ts[:30], {name: values[:30] for name, values in bars.items()})
+    for name in names:
+        chunked.add(name)
+    position = 30
+    for size in [1, 2, 7, 64, 1, 300]:
+        chunked.append(ts[position:position + size], {n: v[position:position + size] for n, v in bars.items()})
+        position += size
+    chunked.append(ts[position:], {name: values[position:] for name, values in bars.items()})
+
+    assert set(chunked.outputs) == set(one_shot.outputs)
+    for column, buffer in one_shot.outputs.items():
+        np.testing.assert_allclose(
+            chunked.outputs[column].values, buffer.values, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column
+        )
+
+
+def test_scanner_series_match_indicator_engine():
+    _, bars = _bars(150, seed=2)
+    closes = np.column_stack([bars["Close"], bars["Close"] * 1.5])
+    # A segunda coluna começa a ser negociada depois
+    closes[:40, 1] = np.nan
+    for name, indicator, column in [("ema_20", EMA(20), "EMA_20"), ("rsi_14", RSI(14), "RSI")]:
+        result = _series(closes, name, {})
+        np.testing.assert_allclose(result[:, 0], indicator.update({"close": closes[:, 0]})[column], equal_nan=True)
+        second = np.full(len(closes), np.nan)
+        second[40:] = type(indicator)(indicator.period).update({"close": closes[40:, 1]})[column]
+        np.testing.assert_allclose(result[:, 1], second, equal_nan=True)
+
+
+def test_engine_evicts_locks_with_state():
+    engine = IndicatorEngine(maxsize=2)
+    keys = [("A", "1d"), ("B", "1d"), ("C", "1d")]
+    for key in keys:
+        with engine._key_lock(key):
+            engine._put(key, _State(_COLUMNS))
+
+    assert list(engine._states) == keys[1:]
+    assert set(engine._locks) == set(keys[1:])
+
+    engine.clear()
+    assert not engine._states and not engine._locks
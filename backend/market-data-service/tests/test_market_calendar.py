@@ -0,0 +1,97 @@
+"""Resolução de períodos do Yahoo e calendário de pregões com datas fixas."""
+
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.market_calendar import CALENDARS, MAX_COVERAGE, last_sessions, resolve_period
+
+_NOW = pd.Timestamp("2024-08-15 14:30")
+
+
+def _ts(day: str) -> int:
+    return int(pd.Timestamp(day).timestamp())
+
+
+@pytest.mark.parametrize("period, now, expected", [
+    ("ytd", _NOW, (_ts("2024-01-01"), None, None)),
+    ("YTD", pd.Timestamp("2024-01-01 09:00"), (_ts("2024-01-01"), None, None)),
+    ("6mo", _NOW, (_ts("2024-02-15"), None, None)),
+    # Fim de mês: o mês de destino mais curto limita o dia
+    ("6mo", pd.Timestamp("2024-08-31"), (_ts("2024-02-29"), None, None)),
+    ("1mo", pd.Timestamp("2024-03-31"), (_ts("2024-02-29"), None, None)),
+    ("1y", _NOW, (_ts("2023-08-15"), None, None)),
+    ("2wk", _NOW, (_ts("2024-08-01"), None, None)),
+    # Dias contam pregões: janela com folga e número de sessões a manter
+    ("5d", _NOW, (_ts("2024-07-26"), None, 5)),
+    ("max", _NOW, (MAX_COVERAGE, None, None)),
+    # Sem período: padrão do Yahoo (1mo)
+    (None, _NOW, (_ts("2024-07-15"), None, None)),
+    ("", _NOW, (_ts("2024-07-15"), None, None)),
+])
+def test_resolve_period(period, now, expected):
+    assert resolve_period(period, now=now) == expected
+
+
+def test_start_takes_precedence_over_period():
+    assert resolve_period("max", start="2024-03-01", end="2024-04-01", now=_NOW) == (
+        _ts("2024-03-01"), _ts("2024-04-01"), None,
+    )
+    assert resolve_period("ytd", end="2024-06-01", now=_NOW) == (_ts("2024-01-01"), _ts("2024-06-01"), None)
+
+
+@pytest.mark.parametrize("period", ["10x", "mo", "1h"])
+def test_unknown_period_raises(period):
+    with pytest.raises(ValueError):
+        resolve_period(period, now=_NOW)
+
+
+@pytest.mark.parametrize("day, session", [
+    (date(2024, 1, 1), False),    # Confraternização Universal
+    (date(2024, 2, 12), False),   # Carnaval (segunda)
+    (date(2024, 2, 13), False),   # Carnaval (terça)
+    (date(2024, 2, 14), True),    # Quarta-feira de Cinzas (pregão à tarde)
+    (date(2024, 3, 29), False),   # Sexta-feira Santa
+    (date(2025, 4, 21), False),   # Tiradentes
+    (date(2024, 5, 30), False),   # Corpus Christi
+    (date(2024, 11, 20), False),  # Consciência Negra (a partir de 2024)
+    (date(2023, 11, 20), True),
+    (date(2024, 12, 24), False),
+    (date(2024, 12, 31), False),
+    (date(2025, 3, 3), False),    # Carnaval 2025
+    (date(2024, 8, 15), True),
+    (date(2024, 8, 17), False),   # Sábado
+])
+def test_b3_sessions(day, session):
+    assert CALENDARS["B3"].is_session(day) is session
+
+
+def _sp(*args) -> float:
+    return datetime(*args, tzinfo=ZoneInfo("America/Sao_Paulo")).timestamp()
+
+
+@pytest.mark.parametrize("since, now, traded", [
+    # Verificado depois do fechamento de sexta; sem pregão no Carnaval
+    (_sp(2024, 2, 9, 19, 0), _sp(2024, 2, 13, 20, 0), False),
+    (_sp(2024, 2, 9, 19, 0), _sp(2024, 2, 14, 19, 0), True),
+    # Fim de semana e segunda antes da abertura
+    (_sp(2024, 8, 16, 19, 0), _sp(2024, 8, 19, 9, 0), False),
+    # Pregão aberto
+    (_sp(2024, 8, 16, 19, 0), _sp(2024, 8, 19, 11, 0), True),
+    # Barras finais ainda podem chegar logo após o fechamento
+    (_sp(2024, 8, 16, 17, 50), _sp(2024, 8, 16, 18, 10), True),
+])
+def test_b3_traded_since(since, now, traded):
+    assert CALENDARS["B3"].traded_since(since, now) is traded
+
+
+def test_last_sessions_counts_intraday_days():
+    days = np.array([_ts(day) for day in ("2024-08-12", "2024-08-13", "2024-08-14", "2024-08-15")])
+    ts = np.concatenate([day + np.arange(0, 3 * 3600, 3600) for day in days])
+
+    assert last_sessions(ts, 2) == 6
+    assert last_sessions(ts, 10) == 0
+    assert last_sessions(days, 1) == 3
@@ -0,0 +1,119 @@
+"""Armazenamento local de barras diárias: busca incremental, ajuste na leitura e recarga."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import ohlcv_store as module
+from services.ohlcv_store import OHLCVStore
+
+_SYMBOL = "TEST3.SA"
+_START = "2024-01-02"
+
+
+def _daily(first: str, last: str) -> pd.DataFrame:
+    """Barras diárias sem ajuste em [first, last]: Close 10 e Adj Close 9."""
+    index = pd.bdate_range(first, last, name="Date")
+    return pd.DataFrame({
+        "Open": 10.5, "High": 11.0, "Low": 9.5, "Close": 10.0, "Adj Close": 9.0,
+        "Volume": np.full(len(index), 1_000, dtype=np.int64),
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+
+
+class _Downloader:
+    """Substituto de ``history_batch_fetcher.fetch`` que serve ``last`` como a barra mais recente."""
+
+    def __init__(self, last: str):
+        self.last = last
+        self.calls = []
+
+    def __call__(self, symbols, period=None, interval=None, start=None, end=None, auto_adjust=True, **kwargs):
+        self.calls.append((period, start, auto_adjust))
+        return {symbol: _daily(start, self.last) for symbol in symbols}, {}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(path=str(tmp_path / "ohlcv.sqlite3"), refresh_seconds=0)
+
+
+@pytest.fixture
+def downloader(monkeypatch):
+    stub = _Downloader(last="2024-01-31")
+    monkeypatch.setattr(module.history_batch_fetcher, "fetch", stub)
+    return stub
+
+
+def _expire(store: OHLCVStore) -> None:
+    """Marca a série como verificada há uma semana, forçando a busca incremental."""
+    with store._connection() as conn:
+        conn.execute("UPDATE series SET checked_at = checked_at - 7 * 86400")
+
+
+def test_incremental_sync_fetches_only_after_last_bar(store, downloader):
+    frames, errors = store.fetch([_SYMBOL], start=_START, interval="1d")
+    assert not errors
+    assert frames[_SYMBOL].index[-1] == pd.Timestamp("2024-01-31")
+
+    _expire(store)
+    downloader.last = "2024-02-02"
+    frames, errors = store.fetch([_SYMBOL], start=_START, interval="1d")
+
+    assert not errors
+    assert [start for _, start, _ in downloader.calls] == [_START, "2024-01-31"]
+    assert frames[_SYMBOL].index[-1] == pd.Timestamp("2024-02-02")
+    assert frames[_SYMBOL].index.is_unique
+    assert len(frames[_SYMBOL]) == len(pd.bdate_range(_START, "2024-02-02"))
+
+    # Dentro do intervalo de atualização a série é servida sem consultar o Yahoo
+    store.fetch([_SYMBOL], start=_START, interval="1d")
+    assert len(downloader.calls) == 2
+
+
+def test_bars_are_stored_unadjusted_and_adjusted_on_read(store, downloader):
+    adjusted, _ = store.fetch([_SYMBOL], start=_START, interval="1d", auto_adjust=True)
+    raw, _ = store.fetch([_SYMBOL], start=_START, interval="1d", auto_adjust=False)
+
+    assert all(auto_adjust is False for _, _, auto_adjust in downloader.calls)
+    stored = store._connection().execute(
+        "SELECT DISTINCT open, close, adj_close FROM bars WHERE symbol = ?", (_SYMBOL,)
+    ).fetchall()
+    assert stored == [(10.5, 10.0, 9.0)]
+
+    frame = adjusted[_SYMBOL]
+    assert "Adj Close" not in frame.columns
+    np.testing.assert_allclose(frame["Close"], 9.0)
+    np.testing.assert_allclose(frame["Open"], 10.5 * 0.9)
+    np.testing.assert_allclose(frame["High"], 11.0 * 0.9)
+    np.testing.assert_allclose(frame["Low"], 9.5 * 0.9)
+
+    frame = raw[_SYMBOL]
+    np.testing.assert_allclose(frame["Close"], 10.0)
+    np.testing.assert_allclose(frame["Adj Close"], 9.0)
+    np.testing.assert_allclose(frame["Open"], 10.5)
+
+
+@pytest.mark.parametrize("column", ["Dividends", "Stock Splits"])
+def test_new_corporate_event_reloads_series(store, downloader, monkeypatch, column):
+    store.fetch([_SYMBOL], start=_START, interval="1d")
+
+    _expire(store)
+    downloader.last = "2024-02-02"
+    events = []
+
+    def with_event(symbols, **kwargs):
+        frames, errors = downloader(symbols, **kwargs)
+        frame = frames[_SYMBOL].copy()
+        frame.loc[pd.Timestamp("2024-02-01"), column] = 0.5 if column == "Dividends" else 2.0
+        events.append(kwargs["start"])
+        return {_SYMBOL: frame}, errors
+
+    monkeypatch.setattr(module.history_batch_fetcher, "fetch", with_event)
+    frames, errors = store.fetch([_SYMBOL], start=_START, interval="1d")
+
+    assert not errors
+    # Busca incremental a partir da última barra e recarga desde o início da cobertura
+    assert events == ["2024-01-31", _START]
+    assert frames[_SYMBOL].loc[pd.Timestamp("2024-02-01"), column] != 0
+    assert len(frames[_SYMBOL]) == len(pd.bdate_range(_START, "2024-02-02"))
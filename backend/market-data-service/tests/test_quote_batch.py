@@ -0,0 +1,144 @@
+"""Cotações em lote: prazo, fallback via fast_info, TTL das falhas e perfis do /multi-info."""
+
+import threading
+import types
+
+import pytest
+
+from cadu import yfinance_logic as logic
+from services import quote_batch as module
+from services.quote_batch import _ERROR_TTL_SECONDS, QuoteBatchEngine
+
+
+def _v7(symbol: str, price: float = 10.0) -> dict:
+    return {"symbol": symbol, "shortName": symbol, "regularMarketPrice": price, "regularMarketChangePercent": 1.5}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(module, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def engine():
+    engine = QuoteBatchEngine(chunk_size=2, workers=2, ttl=300)
+    yield engine
+    engine.shutdown()
+
+
+def test_timeout_returns_available_quotes_and_caches_late_ones(engine, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def fetch_v7(chunk):
+        calls.append(tuple(chunk))
+        if "SLOW3.SA" in chunk:
+            release.wait(5)
+        return {symbol: _v7(symbol) for symbol in chunk}
+
+    monkeypatch.setattr(engine, "_fetch_v7", fetch_v7)
+
+    quotes = engine.get_quotes(["PETR4.SA", "VALE3.SA", "SLOW3.SA"], timeout=0.2)
+
+    # O bloco atrasado fica de fora, mas continua sendo buscado
+    assert list(quotes) == ["PETR4.SA", "VALE3.SA"]
+    release.set()
+    engine._pool.shutdown(wait=True)
+    engine._pool = None
+
+    quotes = engine.get_quotes(["PETR4.SA", "VALE3.SA", "SLOW3.SA"], timeout=0.2)
+    assert list(quotes) == ["PETR4.SA", "VALE3.SA", "SLOW3.SA"]
+    assert quotes["SLOW3.SA"]["success"]
+    assert sorted(calls) == [("PETR4.SA", "VALE3.SA"), ("SLOW3.SA",)]
+
+
+def test_failed_batch_falls_back_to_fast_info(engine, monkeypatch):
+    def fetch_v7(chunk):
+        raise ConnectionError("quoteResponse indisponível")
+
+    fast_info = {
+        "PETR4.SA": {"lastPrice": 30.0, "previousClose": 24.0, "yearChange": 0.1, "currency": "BRL"},
+        "GONE3.SA": {"lastPrice": None},
+    }
+    monkeypatch.setattr(engine, "_fetch_v7", fetch_v7)
+    monkeypatch.setattr(module.yf, "Ticker", lambda symbol: types.SimpleNamespace(fast_info=fast_info[symbol]))
+
+    quotes = engine.get_quotes(["petr4.sa", "GONE3.SA"])
+
+    data = quotes["PETR4.SA"]["data"]
+    assert quotes["PETR4.SA"]["success"]
+    assert data["price"] == 30.0
+    assert data["change_value"] == pytest.approx(6.0)
+    assert data["change"] == pytest.approx(25.0)
+    assert data["fiftyTwoWeekChangePercent"] == pytest.approx(10.0)
+    assert data["currency"] == "BRL"
+    assert quotes["GONE3.SA"] == {
+        "success": False, "error": "Nenhuma cotação encontrada para o ticker 'GONE3.SA'.", "data": None,
+    }
+
+
+def test_failures_expire_before_quotes(engine, monkeypatch, clock):
+    calls = []
+
+    def fetch_v7(chunk):
+        calls.append(tuple(chunk))
+        return {symbol: _v7(symbol) for symbol in chunk if symbol != "XXXX3.SA"}
+
+    monkeypatch.setattr(engine, "_fetch_v7", fetch_v7)
+    symbols = ["PETR4.SA", "XXXX3.SA"]
+
+    quotes = engine.get_quotes(symbols)
+    assert quotes["PETR4.SA"]["success"] and not quotes["XXXX3.SA"]["success"]
+
+    clock.now += _ERROR_TTL_SECONDS - 1
+    engine.get_quotes(symbols)
+    assert calls == [tuple(symbols)]
+
+    clock.now += 1
+    engine.get_quotes(symbols)
+    assert calls == [tuple(symbols), ("XXXX3.SA",)]
+
+    clock.now += engine.ttl
+    engine.get_quotes(symbols)
+    assert calls[-1] == tuple(symbols)
+
+
+def test_multi_info_profiles_are_merged_after_the_cache(monkeypatch):
+    quote_calls = []
+    profiles = {}
+
+    def get_quotes(symbols):
+        quote_calls.append(list(symbols))
+        return {symbol: {"success": True, "data": {"name": symbol, "price": 10.0}} for symbol in symbols}
+
+    monkeypatch.setattr(logic.quote_batch_engine, "get_quotes", get_quotes)
+    monkeypatch.setattr(
+        logic.company_websites, "get_profiles",
+        lambda symbols, fetch=True: {symbol: profiles.get(symbol) for symbol in symbols},
+    )
+    logic.get_multiple_tickers_info_logic.cache_namespace.clear()
+
+    first = logic.merge_ticker_profiles(logic.get_multiple_tickers_info_logic(["WEGE3.SA"]))
+    assert first["WEGE3.SA"]["data"]["sector"] == ""
+    assert first["WEGE3.SA"]["data"]["logo"] is None
+
+    # Perfil chega em segundo plano: aparece sem esperar o TTL das cotações
+    profiles["WEGE3.SA"] = {"sector": "Industrials", "beta": 0.8, "returnOnEquity": 0.3, "website": "weg.net"}
+    second = logic.merge_ticker_profiles(logic.get_multiple_tickers_info_logic(["WEGE3.SA"]))
+
+    data = second["WEGE3.SA"]["data"]
+    assert quote_calls == [["WEGE3.SA"]]
+    assert (data["sector"], data["beta"], data["returnOnEquity"], data["website"]) == (
+        "Industrials", 0.8, 0.3, "weg.net",
+    )
+    assert data["logo"] == logic.logo_url("weg.net")
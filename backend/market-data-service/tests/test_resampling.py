@@ -0,0 +1,74 @@
+"""Agregação intraday ancorada na abertura do pregão comparada com ``DataFrame.resample``."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.market_calendar import CALENDARS
+from services.resampling import resample_frame
+
+_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# (dia, fim do pregão): um pregão encurtado que não fecha bloco de 1h nem de 15m
+_SESSIONS = {
+    "B3": [("2024-03-04", "18:00"), ("2024-03-05", "18:00"), ("2024-03-06", "13:10")],
+    "US": [("2024-03-04", "16:00"), ("2024-03-05", "16:00"), ("2024-03-06", "13:10")],
+}
+
+
+def _bars_5m(market: str) -> pd.DataFrame:
+    """Barras de 5m (horário local, sem fuso) dos pregões de teste, com lacunas."""
+    open_time = CALENDARS[market].open_time.strftime("%H:%M")
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{day} {open_time}", f"{day} {close}", freq="5min", inclusive="left").values
+        for day, close in _SESSIONS[market]
+    ]), name="Datetime")
+    # Barras sem negociação não vêm do Yahoo
+    index = index.delete([7, 8, 40])
+    rng = np.random.default_rng(3)
+    close = 50 + np.cumsum(rng.normal(0, 0.2, len(index)))
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.05, len(index)),
+        "High": close + rng.uniform(0, 0.3, len(index)),
+        "Low": close - rng.uniform(0, 0.3, len(index)),
+        "Close": close,
+        "Volume": rng.integers(100, 5_000, len(index)),
+    }, index=index)
+
+
+def _pandas_resample(frame: pd.DataFrame, rule: str, market: str) -> pd.DataFrame:
+    """Referência: ``resample`` de cada pregão com origem na abertura."""
+    open_time = CALENDARS[market].open_time.strftime("%H:%M")
+    days = []
+    for day, group in frame.groupby(frame.index.normalize()):
+        origin = pd.Timestamp(f"{day.date()} {open_time}")
+        resampled = group.resample(rule, origin=origin, label="left", closed="left").agg(_AGG)
+        days.append(resampled[resampled["Open"].notna()])
+    expected = pd.concat(days)
+    expected.index = expected.index.as_unit("s")
+    return expected
+
+
+@pytest.mark.parametrize("market", ["B3", "US"])
+@pytest.mark.parametrize("interval, rule", [("15m", "15min"), ("1h", "1h")])
+def test_intraday_resample_matches_pandas(market, interval, rule):
+    frame = _bars_5m(market)
+
+    result = resample_frame(frame, interval, CALENDARS[market])
+    expected = _pandas_resample(frame, rule, market)
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_hourly_buckets_start_at_session_open():
+    us = resample_frame(_bars_5m("US"), "1h", CALENDARS["US"])
+    b3 = resample_frame(_bars_5m("B3"), "1h", CALENDARS["B3"])
+
+    first_day = us.index[us.index.normalize() == pd.Timestamp("2024-03-04")]
+    assert first_day[0] == pd.Timestamp("2024-03-04 09:30")
+    # 6h30 de pregão: o último bloco de 1h tem só meia hora
+    assert first_day[-1] == pd.Timestamp("2024-03-04 15:30")
+    assert len(first_day) == 7
+    assert b3.index[0] == pd.Timestamp("2024-03-04 10:00")
+    # Pregão encurtado: bloco final parcial a partir das 13:00
+    assert b3.index[-1] == pd.Timestamp("2024-03-06 13:00")
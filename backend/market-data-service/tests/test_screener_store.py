@@ -0,0 +1,116 @@
+"""Tabelas do screener: filtro por setor, ordenação local e páginas de consultas truncadas."""
+
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.cadu import frontend_api
+from services import screener_store as module
+from services.screener_store import ScreenerStore, ScreenerTable
+
+_ROWS = [
+    {"symbol": "PETR4.SA", "sector": "Energy", "marketCap": 500.0, "regularMarketChangePercent": 1.2},
+    {"symbol": "VALE3.SA", "sector": "Basic Materials", "marketCap": 300.0, "regularMarketChangePercent": None},
+    {"symbol": "ITUB4.SA", "sector": "Financial Services", "marketCap": 280.0, "regularMarketChangePercent": -0.8},
+    {"symbol": "PRIO3.SA", "sector": "energy", "marketCap": 60.0, "regularMarketChangePercent": 3.5},
+    {"symbol": "BBAS3.SA", "sector": "Financial Services", "marketCap": 150.0, "regularMarketChangePercent": 1.2},
+    {"symbol": "RECV3.SA", "sector": None, "marketCap": None, "regularMarketChangePercent": "n/d"},
+]
+
+
+def _symbols(table: ScreenerTable, selected: np.ndarray) -> list:
+    return [table.rows[i]["symbol"] for i in selected]
+
+
+def test_select_filters_sector_case_insensitively():
+    table = ScreenerTable(_ROWS, total=len(_ROWS), updated_at=0)
+
+    selected = table.select(" ENERGY ", "marketCap", ascending=False)
+
+    assert _symbols(table, selected) == ["PETR4.SA", "PRIO3.SA"]
+    assert _symbols(table, table.select("Utilities", "marketCap", ascending=False)) == []
+
+
+@pytest.mark.parametrize("ascending, expected", [
+    # Empates mantêm a ordem do screener; ausentes e não numéricos por último
+    (False, ["PRIO3.SA", "PETR4.SA", "BBAS3.SA", "ITUB4.SA", "VALE3.SA", "RECV3.SA"]),
+    (True, ["ITUB4.SA", "PETR4.SA", "BBAS3.SA", "PRIO3.SA", "VALE3.SA", "RECV3.SA"]),
+])
+def test_select_orders_with_missing_values_last(ascending, expected):
+    table = ScreenerTable(_ROWS, total=len(_ROWS), updated_at=0)
+
+    assert _symbols(table, table.select(None, "regularMarketChangePercent", ascending)) == expected
+    # A ordem em cache é reaproveitada e combinada com o filtro de setor
+    assert _symbols(table, table.select("Financial Services", "regularMarketChangePercent", ascending)) == [
+        symbol for symbol in expected if symbol in ("ITUB4.SA", "BBAS3.SA")
+    ]
+
+
+def test_select_orders_by_symbol():
+    table = ScreenerTable(_ROWS, total=len(_ROWS), updated_at=0)
+
+    assert _symbols(table, table.select(None, "symbol", ascending=True)) == sorted(row["symbol"] for row in _ROWS)
+    assert _symbols(table, table.select(None, "symbol", ascending=False)) == sorted(
+        (row["symbol"] for row in _ROWS), reverse=True
+    )
+
+
+@pytest.fixture
+def truncated_store(monkeypatch, tmp_path):
+    """Consulta com 100 resultados no Yahoo, dos quais só os 6 maiores estão na tabela."""
+    store = ScreenerStore(snapshot_path=str(tmp_path / "screener.json"), refresh_seconds=60)
+    store.register({"mercado_br": object()})
+    store._tables["mercado_br"] = ScreenerTable(_ROWS, total=100, updated_at=time.time())
+    store._loaded = True
+    live = []
+
+    def live_page(name, setor, limit, offset, yahoo_field, sort_asc):
+        live.append((setor, offset, limit, yahoo_field, sort_asc))
+        return {"resultados": [], "fonte": "yahoo"}
+
+    monkeypatch.setattr(store, "_live_page", live_page)
+    monkeypatch.setattr(module.company_websites, "get_many", lambda symbols, fetch=True: {})
+    return store, live
+
+
+def test_truncated_table_serves_market_cap_prefix(truncated_store):
+    store, live = truncated_store
+
+    page = store.page("mercado_br", limit=3, offset=3, sort_field="intradaymarketcap")
+
+    assert not live
+    assert page["fonte"] == "armazenado"
+    assert page["total_disponivel"] == 100
+    assert [row["symbol"] for row in page["resultados"]] == ["BBAS3.SA", "PRIO3.SA", "RECV3.SA"]
+
+
+@pytest.mark.parametrize("kwargs, expected", [
+    # Página além das linhas guardadas
+    ({"limit": 4, "offset": 3, "sort_field": "market_cap"}, (None, 3, 4, "intradaymarketcap", False)),
+    # Outra ordem ou direção não é um prefixo da tabela
+    ({"sort_field": "percentchange"}, (None, 0, 25, "percentchange", False)),
+    ({"limit": 3, "sort_field": "market_cap", "sort_asc": True}, (None, 0, 3, "intradaymarketcap", True)),
+    # Setor filtrado: usa o nome como aparece na tabela
+    ({"limit": 2, "setor": "financial services", "sort_field": "market_cap"},
+     ("Financial Services", 0, 2, "intradaymarketcap", False)),
+])
+def test_truncated_table_fetches_other_pages_live(truncated_store, kwargs, expected):
+    store, live = truncated_store
+
+    page = store.page("mercado_br", **kwargs)
+
+    assert page["fonte"] == "yahoo"
+    assert live == [expected]
+
+
+def test_unknown_sort_field_is_a_bad_request():
+    app = FastAPI()
+    app.include_router(frontend_api.router)
+
+    response = TestClient(app).get("/categorias/mercado_br", params={"sort_field": "preco_justo"})
+
+    assert response.status_code == 400
+    assert "preco_justo" in response.json()["detail"]
@@ -0,0 +1,109 @@
+"""Busca e sugestões do índice de tickers: exato, prefixo, trecho e erros de digitação."""
+
+import pytest
+
+from services.ticker_index import TickerIndex, edit_distance, normalize
+
+_ENTRIES = [
+    {"symbol": "PETR4.SA", "name": "Petróleo Brasileiro S.A. - Petrobras", "sector": "Petróleo, Gás e Biocombustíveis"},
+    {"symbol": "PETR3.SA", "name": "Petróleo Brasileiro S.A. - Petrobras", "sector": "Petróleo, Gás e Biocombustíveis"},
+    {"symbol": "PRIO3.SA", "name": "PetroRio S.A.", "sector": "Petróleo, Gás e Biocombustíveis"},
+    {"symbol": "VALE3.SA", "name": "Vale S.A.", "sector": "Mineração"},
+    {"symbol": "ITUB4.SA", "name": "Itaú Unibanco Holding S.A.", "sector": "Financeiro"},
+    {"symbol": "BBAS3.SA", "name": "Banco do Brasil S.A.", "sector": "Financeiro"},
+    {"symbol": "BBDC4.SA", "name": "Banco Bradesco S.A.", "sector": "Financeiro"},
+    {"symbol": "ELET3.SA", "name": "Centrais Elétricas Brasileiras S.A. - Eletrobras", "sector": "Energia Elétrica"},
+    {"symbol": "PETZ3.SA", "name": "Pet Center Comércio e Participações S.A.", "sector": "Comércio"},
+    {"symbol": "AAPL34.SA", "name": "Apple Inc.", "sector": "Tecnologia"},
+    {"symbol": "WEGE3.SA", "name": "WEG S.A.", "sector": "Bens Industriais"},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return TickerIndex(_ENTRIES)
+
+
+def _found(results):
+    return [(result["symbol"], result["relevance_score"]) for result in results]
+
+
+def test_exact_symbol_comes_first(index):
+    assert _found(index.search("PETR4"))[0] == ("PETR4.SA", 1.0)
+    assert _found(index.search("petr4.sa"))[0] == ("PETR4.SA", 1.0)
+
+
+def test_symbol_prefix(index):
+    # "PetroRio" entra pelo prefixo do nome, depois dos símbolos
+    assert _found(index.search("PETR")) == [("PETR3.SA", 0.9), ("PETR4.SA", 0.9), ("PRIO3.SA", 0.8)]
+    assert _found(index.search("bb")) == [("BBAS3.SA", 0.9), ("BBDC4.SA", 0.9)]
+
+
+def test_name_prefix(index):
+    # "Unibanco" só contém o termo: vem depois dos prefixos
+    assert _found(index.search("banco")) == [("BBAS3.SA", 0.8), ("BBDC4.SA", 0.8), ("ITUB4.SA", 0.6)]
+    assert _found(index.search("brad")) == [("BBDC4.SA", 0.8)]
+    # Prefixo do símbolo é mais relevante que o do nome
+    assert _found(index.search("pet")) == [
+        ("PETR3.SA", 0.9), ("PETR4.SA", 0.9), ("PETZ3.SA", 0.9), ("PRIO3.SA", 0.8),
+    ]
+
+
+def test_substring_of_name_and_sector(index):
+    assert _found(index.search("obras")) == [("ELET3.SA", 0.6), ("PETR3.SA", 0.6), ("PETR4.SA", 0.6)]
+    assert {symbol for symbol, _ in _found(index.search("financeiro"))} == {"ITUB4.SA", "BBAS3.SA", "BBDC4.SA"}
+    # Todas as palavras precisam aparecer
+    assert _found(index.search("unibanco holding")) == [("ITUB4.SA", 0.6)]
+    # Sem trecho com todas as palavras: aproximação por palavra, abaixo do trecho
+    assert _found(index.search("unibanco petro")) == [("ITUB4.SA", 0.4)]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ITAÚ", ["ITUB4.SA"]),
+    ("itau", ["ITUB4.SA"]),
+    ("elétricas", ["ELET3.SA"]),
+    ("eletricas", ["ELET3.SA"]),
+    # Nome e setor ("Petróleo, Gás e Biocombustíveis")
+    ("PETRÓLEO", ["PETR3.SA", "PETR4.SA", "PRIO3.SA"]),
+    ("mineracao", ["VALE3.SA"]),
+])
+def test_accent_insensitive(index, query, expected):
+    assert [result["symbol"] for result in index.search(query)] == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("petrolio", {"PETR3.SA", "PETR4.SA", "PRIO3.SA"}),
+    ("vael", {"VALE3.SA"}),
+    ("bradesko", {"BBDC4.SA"}),
+])
+def test_fuzzy_when_nothing_matches(index, query, expected):
+    results = index.search(query)
+
+    assert {result["symbol"] for result in results} == expected
+    assert all(result["relevance_score"] < 0.6 for result in results)
+    assert index.search(query, fuzzy=False) == []
+
+
+def test_limit_and_empty_queries(index):
+    assert len(index.search("pet", limit=2)) == 2
+    assert index.search("   ") == []
+    assert index.search("petr", limit=0) == []
+    assert index.search("zzzzzz") == []
+
+
+@pytest.mark.parametrize("symbol, expected", [
+    ("PETR5.SA", ["PETR3.SA", "PETR4.SA", "PETZ3.SA"]),
+    ("VALE4", ["VALE3.SA"]),
+    ("ITBU4", ["ITUB4.SA"]),
+    ("WEG", ["WEGE3.SA"]),
+    ("XPTO9", []),
+])
+def test_suggest(index, symbol, expected):
+    assert index.suggest(symbol) == expected
+
+
+def test_helpers():
+    assert normalize("  Itaú-Unibanco  S.A. ") == "itau unibanco s a"
+    assert edit_distance("vael", "vale", 2) == 1
+    assert edit_distance("petrolio", "petroleo", 2) == 1
+    assert edit_distance("abc", "xyzw", 2) > 2
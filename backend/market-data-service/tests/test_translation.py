@@ -0,0 +1,62 @@
+"""Traduções em lote: falhas imediatas do tradutor não podem travar a requisição."""
+
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from services import translation as module
+from services.translation import TranslationService
+
+
+class _FailingTranslator:
+    """Tradutor que falha na hora (ex: sem rede ou limite do Google atingido)."""
+
+    calls = 0
+
+    def __init__(self, source: str, target: str):
+        pass
+
+    def translate(self, text: str) -> str:
+        type(self).calls += 1
+        raise ConnectionError("Tradutor indisponível")
+
+
+def _inline_submit(group, func, *args, **kwargs) -> Future:
+    """Executa a tarefa na própria thread: o future já volta concluído ao ``_schedule``."""
+    future = Future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    _FailingTranslator.calls = 0
+    monkeypatch.setattr(module, "GoogleTranslator", _FailingTranslator)
+    monkeypatch.setattr(module.upstream_executor, "submit", _inline_submit)
+    return TranslationService(path=str(tmp_path / "translations.sqlite3"), timeout=1)
+
+
+def _call_with_deadline(func, *args, **kwargs):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func(*args, **kwargs)), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), "tradução travou com o tradutor falhando na hora"
+    return result[0]
+
+
+@pytest.mark.parametrize("wait", [True, False])
+def test_failing_translator_returns_originals(service, wait):
+    news = [{"title": "Oil prices rise", "summary": "Brent climbs.\nSupply is tight."}]
+
+    translated = _call_with_deadline(service.translate_fields, news, ("title", "summary"), wait=wait)
+
+    assert translated == news
+    assert _FailingTranslator.calls > 0
+    # Nada fica pendente nem em cache: a próxima requisição tenta de novo
+    assert not service._pending
+    assert _call_with_deadline(service.translate, "Oil prices rise", wait=wait) == "Oil prices rise"